@@ -0,0 +1,98 @@
+# benchmarks/bench_analytics.py
+
+"""
+Vektörel kira analizinin (emlak.analytics) hızını ölçer.
+
+Varsayılan olarak sentetik dizilerle yalnızca hesaplama ölçülür (veritabanı gerekmez): bölge
+başına çeyrekler + medyan, m² fiyatı yüzdelikleri ve MAD aykırı işaretleri. --dongu verilirse yalnızca
+kira medyanı hem vektörel olarak hem de her grup için ayrı np.median çağrısıyla hesaplanıp karşılaştırılır.
+--veritabani verilirse mevcut ilanlar üzerinde tek sorguluk yükleme ve rent_statistics() ölçülür.
+
+Kullanım:
+    python benchmarks/bench_analytics.py --satir 5000000 --grup 20000
+    python benchmarks/bench_analytics.py --satir 500000 --dongu
+    python benchmarks/bench_analytics.py --veritabani --sehir İstanbul
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+import numpy as np
+
+from emlak.analytics import grouped_quantiles, load_arrays, mad_outliers, rent_statistics
+
+
+def sentetik(satir, grup_sayisi, tohum=7):
+    rastgele = np.random.default_rng(tohum)
+    grup = rastgele.integers(0, grup_sayisi, satir)
+    # Bölgeye göre değişen taban fiyat + sağa çarpık (lognormal) dağılım
+    taban = rastgele.uniform(8000, 60000, grup_sayisi)
+    fiyat = np.round(taban[grup] * rastgele.lognormal(0, 0.35, satir), -1)
+    metrekare = rastgele.integers(35, 250, satir).astype(np.float64)
+    return grup, fiyat, metrekare
+
+
+def hesapla(grup, fiyat, metrekare, grup_sayisi):
+    adetler, _ = grouped_quantiles(grup, fiyat, grup_sayisi, [0.25, 0.5, 0.75])
+    m2_fiyati = fiyat / metrekare
+    _, (_, m2_medyan, _) = grouped_quantiles(grup, m2_fiyati, grup_sayisi, [0.1, 0.5, 0.9])
+    _, aykiri = mad_outliers(grup, m2_fiyati, grup_sayisi, medyan=m2_medyan)
+    return adetler, aykiri
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vektörel kira analizi benchmark')
+    parser.add_argument('--satir', type=int, nargs='+', default=[100000, 1000000, 5000000])
+    parser.add_argument('--grup', type=int, default=20000, help='Bölge (grup) sayısı')
+    parser.add_argument('--tekrar', type=int, default=3)
+    parser.add_argument('--dongu', action='store_true', help='Grup başına np.median döngüsüyle karşılaştır')
+    parser.add_argument('--veritabani', action='store_true', help='Mevcut ilanlar üzerinde uçtan uca ölç')
+    parser.add_argument('--sehir', default=None)
+    args = parser.parse_args()
+
+    if args.veritabani:
+        baslangic = time.perf_counter()
+        diziler = load_arrays(sehir=args.sehir)
+        yukleme = time.perf_counter() - baslangic
+        baslangic = time.perf_counter()
+        istatistikler, _ = rent_statistics(sehir=args.sehir)
+        toplam = time.perf_counter() - baslangic
+        print(f"{len(diziler.ilan_id)} ilan: yükleme {yukleme:.2f} sn, rent_statistics (yükleme dahil) "
+              f"{toplam:.2f} sn, {len(istatistikler)} grup")
+        return
+
+    print(f"{'satır':>9} {'grup':>7} {'tümü':>10} {'satır/sn':>12} {'medyan':>10} {'medyan döngü':>13}")
+    for satir in args.satir:
+        grup, fiyat, metrekare = sentetik(satir, args.grup)
+        sureler = []
+        for _ in range(args.tekrar):
+            baslangic = time.perf_counter()
+            hesapla(grup, fiyat, metrekare, args.grup)
+            sureler.append(time.perf_counter() - baslangic)
+        en_iyi = min(sureler)
+
+        medyan_metni = dongu_metni = '-'
+        if args.dongu:
+            baslangic = time.perf_counter()
+            _, (vektorel,) = grouped_quantiles(grup, fiyat, args.grup, [0.5])
+            medyan_metni = f"{time.perf_counter() - baslangic:>8.2f} s"
+            baslangic = time.perf_counter()
+            sirali = np.argsort(grup, kind='stable')
+            sinirlar = np.searchsorted(grup[sirali], np.arange(args.grup + 1))
+            medyanlar = [np.median(fiyat[sirali[sinirlar[g]:sinirlar[g + 1]]]) for g in range(args.grup)
+                         if sinirlar[g + 1] > sinirlar[g]]
+            dongu_metni = f"{time.perf_counter() - baslangic:>8.2f} s"
+            assert np.allclose(medyanlar, vektorel[~np.isnan(vektorel)])
+        print(f"{satir:>9} {args.grup:>7} {en_iyi:>8.2f} s {satir / en_iyi:>12.0f} {medyan_metni:>10} {dongu_metni:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/bench_api.py
+
+"""
+JSON API (emlak/views.py) için eşzamanlı yük testi.
+
+Varsayılan olarak istekler Django test istemcisiyle süreç içinde atılır (sunucu gerekmez; görünüm,
+önbellek ve veritabanı maliyeti ölçülür). --url verilirse çalışan bir sunucuya HTTP ile gidilir:
+    python manage.py runserver      # veya bir ASGI/WSGI sunucusu
+    python benchmarks/bench_api.py --url http://127.0.0.1:8000 --istek 5000 --eszamanli 16
+
+Kullanım:
+    python benchmarks/bench_api.py --sehir İstanbul --ilce Kadıköy --istek 2000 --eszamanli 8
+    python benchmarks/bench_api.py --etag         # koşullu GET (If-None-Match) ile 304 yolu
+
+Her uç nokta için saniyedeki istek, p50/p95/p99 gecikme ve durum kodu dağılımı yazdırılır.
+İlk istek önbelleği ısıtır ve ölçüme dahil edilmez.
+Süreç içi modda iş parçacıkları aynı GIL'i paylaşır; p95/p99 değerleri görünüm maliyetinden çok
+iş parçacığı zamanlamasını yansıtır. Gerçek eşzamanlılık için --url ile çok işçili bir sunucu ölçün.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from django.db import connections
+from django.test import Client
+
+
+def uc_noktalar(sehir, ilce):
+    return [
+        ('/api/ozet/', {'sehir': sehir, 'ilce': ilce}),
+        ('/api/aylik/', {'sehir': sehir, 'ilce': ilce, 'gun': 90}),
+        ('/api/uyarilar/', {'sehir': sehir}),
+    ]
+
+
+class SurecIciIstemci:
+    """Her iş parçacığına ayrı bir Django test istemcisi verir."""
+
+    def __init__(self):
+        self._yerel = threading.local()
+
+    def get(self, yol, parametreler, etag=None):
+        istemci = getattr(self._yerel, 'istemci', None)
+        if istemci is None:
+            istemci = self._yerel.istemci = Client(SERVER_NAME='localhost')
+        basliklar = {'If-None-Match': etag} if etag else {}
+        yanit = istemci.get(yol, parametreler, headers=basliklar)
+        return yanit.status_code, yanit.get('ETag')
+
+
+class HttpIstemci:
+    def __init__(self, taban_url):
+        self.taban_url = taban_url.rstrip('/')
+
+    def get(self, yol, parametreler, etag=None):
+        istek = urllib.request.Request(f"{self.taban_url}{yol}?{urllib.parse.urlencode(parametreler)}")
+        if etag:
+            istek.add_header('If-None-Match', etag)
+        try:
+            with urllib.request.urlopen(istek, timeout=10) as yanit:
+                yanit.read()
+                return yanit.status, yanit.headers.get('ETag')
+        except urllib.error.HTTPError as hata: # 304 ve 4xx urllib'de istisna olarak gelir
+            return hata.code, hata.headers.get('ETag')
+
+
+def yukle(istemci, yol, parametreler, istek_sayisi, eszamanli, etag):
+    def tek_istek(_):
+        baslangic = time.perf_counter()
+        durum, _ = istemci.get(yol, parametreler, etag)
+        return durum, time.perf_counter() - baslangic
+
+    baslangic = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=eszamanli) as havuz:
+        sonuclar = list(havuz.map(tek_istek, range(istek_sayisi)))
+    sure = time.perf_counter() - baslangic
+    # Süreç içi modda iş parçacıklarının açtığı veritabanı bağlantılarını kapatıyoruz
+    connections.close_all()
+
+    gecikmeler = sorted(s for _, s in sonuclar)
+    yuzdelik = statistics.quantiles(gecikmeler, n=100) if len(gecikmeler) > 1 else gecikmeler * 99
+    return {
+        'istek_sn': istek_sayisi / sure,
+        'p50': yuzdelik[49] * 1000,
+        'p95': yuzdelik[94] * 1000,
+        'p99': yuzdelik[98] * 1000,
+        'durumlar': Counter(d for d, _ in sonuclar),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON API yük testi')
+    parser.add_argument('--url', default=None, help='Çalışan sunucunun adresi (verilmezse süreç içi)')
+    parser.add_argument('--sehir', default='İstanbul')
+    parser.add_argument('--ilce', default='Kadıköy')
+    parser.add_argument('--istek', type=int, default=2000, help='Uç nokta başına istek sayısı')
+    parser.add_argument('--eszamanli', type=int, default=8, help='Eşzamanlı istemci sayısı')
+    parser.add_argument('--etag', action='store_true', help='İlk yanıtın ETag\'i ile koşullu GET gönder')
+    args = parser.parse_args()
+
+    istemci = HttpIstemci(args.url) if args.url else SurecIciIstemci()
+    print(f"{'süreç içi' if not args.url else args.url} | {args.istek} istek x {args.eszamanli} eşzamanlı"
+          f"{' | koşullu GET' if args.etag else ''}")
+
+    for yol, parametreler in uc_noktalar(args.sehir, args.ilce):
+        durum, etag = istemci.get(yol, parametreler) # Önbelleği ısıt
+        if durum != 200:
+            print(f"  {yol:<16} ısıtma isteği {durum} döndü; bu bölge için veri var mı?")
+            continue
+        sonuc = yukle(istemci, yol, parametreler, args.istek, args.eszamanli, etag if args.etag else None)
+        durumlar = ', '.join(f"{d}: {n}" for d, n in sorted(sonuc['durumlar'].items()))
+        print(f"  {yol:<16} {sonuc['istek_sn']:>8.0f} istek/sn   p50 {sonuc['p50']:6.2f} ms   "
+              f"p95 {sonuc['p95']:6.2f} ms   p99 {sonuc['p99']:6.2f} ms   ({durumlar})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_archive.py
+
+"""
+Sayfa arşivini (emlak.archive) ve arşivden yeniden ayrıştırmayı (emlak.reparse) ölçer:
+- sıkıştırma seçenekleri: gerçek bir Emlakjet sayfasında oran, yazma ve okuma süresi
+- yeniden ayrıştırma: geçici bir arşive N sayfa (G güne dağılmış) yazılır ve farklı süreç sayılarıyla
+  veritabanına yazmadan ayrıştırılır; sayfa/sn ve hızlanma yazılır
+
+Kullanım:
+    python benchmarks/bench_archive.py --sayfa 2000 --gun 10 --isci 1 2 4 8
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from emlak import archive, reparse
+
+ORNEK_SAYFA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'emlakjet_timeout_page_source.html')
+
+
+def sikistirma_olc(sayfa, tekrar):
+    veri = sayfa.encode('utf-8')
+    secenekler = [(f'gzip {seviye}', lambda v, s=seviye: gzip.compress(v, compresslevel=s, mtime=0), gzip.decompress)
+                  for seviye in (1, 6, 9)]
+    if archive.zstandard is not None:
+        for seviye in (3, 9, 19):
+            secenekler.append((f'zstd {seviye}', archive.zstandard.ZstdCompressor(level=seviye).compress,
+                               archive.zstandard.ZstdDecompressor().decompress))
+    print(f"Sıkıştırma ({len(veri) / 1024:.0f} KB sayfa, {tekrar} tekrar):")
+    print(f"  {'yöntem':<9} {'boyut (KB)':>10} {'oran':>6} {'yazma (ms)':>11} {'okuma (ms)':>11}")
+    for ad, sikistir, ac in secenekler:
+        baslangic = time.perf_counter()
+        for _ in range(tekrar):
+            sikistirilmis = sikistir(veri)
+        yazma = (time.perf_counter() - baslangic) * 1000 / tekrar
+        baslangic = time.perf_counter()
+        for _ in range(tekrar):
+            ac(sikistirilmis)
+        okuma = (time.perf_counter() - baslangic) * 1000 / tekrar
+        print(f"  {ad:<9} {len(sikistirilmis) / 1024:>10.1f} {len(veri) / len(sikistirilmis):>6.1f} "
+              f"{yazma:>11.2f} {okuma:>11.2f}")
+
+
+def arsiv_olustur(kok, sayfa, sayfa_sayisi, gun_sayisi):
+    """Sayfanın her biri farklı içerikli (farklı özetli) kopyalarını günlere dağıtarak arşive yazar."""
+    arsiv = archive.PageArchive(kok)
+    bugun = datetime.now().astimezone()
+    baslangic = time.perf_counter()
+    for i in range(sayfa_sayisi):
+        zaman = bugun - timedelta(days=gun_sayisi - 1 - i * gun_sayisi // sayfa_sayisi)
+        arsiv.store(f'https://www.emlakjet.com/kiralik-konut/istanbul-kadikoy/?sayfa={i}', f'{sayfa}<!-- {i} -->',
+                    'emlakjet', 'http', zaman=zaman)
+    sure = time.perf_counter() - baslangic
+    kullanim = arsiv.usage()
+    print(f"\nArşiv: {sayfa_sayisi} sayfa, {gun_sayisi} gün; yazma {sayfa_sayisi / sure:.0f} sayfa/sn, "
+          f"{kullanim['ham_bayt'] / 2 ** 20:.0f} MB -> diskte {kullanim['disk_bayt'] / 2 ** 20:.1f} MB "
+          f"({arsiv.sikistirma})")
+    return arsiv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sayfa', type=int, default=2000, help='Arşive yazılacak sayfa sayısı')
+    parser.add_argument('--gun', type=int, default=10, help='Sayfaların dağıtılacağı gün sayısı')
+    parser.add_argument('--isci', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()], help='Denenecek süreç sayıları')
+    parser.add_argument('--tekrar', type=int, default=20, help='Sıkıştırma ölçümü tekrar sayısı')
+    args = parser.parse_args()
+
+    with open(ORNEK_SAYFA, encoding='utf-8') as f:
+        sayfa = f.read()
+    sikistirma_olc(sayfa, args.tekrar)
+
+    kok = tempfile.mkdtemp(prefix='bench_arsiv_')
+    try:
+        arsiv = arsiv_olustur(kok, sayfa, args.sayfa, args.gun)
+        print("\nYeniden ayrıştırma (veritabanına yazmadan):")
+        print(f"  {'süreç':>5} {'süre (sn)':>10} {'sayfa/sn':>9} {'kart':>8} {'hızlanma':>9}")
+        tek_surec = None
+        for isci in sorted(set(args.isci)):
+            ozet = reparse.reparse(arsiv, isci_sayisi=isci, kaydet=None)
+            tek_surec = tek_surec or ozet['sure_sn']
+            print(f"  {isci:>5} {ozet['sure_sn']:>10.2f} {ozet['sayfa_saniye']:>9.1f} {ozet['kart']:>8} "
+                  f"{tek_surec / ozet['sure_sn']:>8.1f}x")
+    finally:
+        shutil.rmtree(kok)
+
+
+if __name__ == '__main__':
+    main()
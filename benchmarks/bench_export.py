@@ -0,0 +1,138 @@
+# benchmarks/bench_export.py
+
+"""
+Akışlı dışa aktarmanın (emlak.export) hızını ve bellek kullanımını ölçer.
+
+Betik önce en büyük boyut kadar sentetik ilan ekler, ardından her (boyut, biçim, yöntem) için
+dışa aktarmayı ayrı bir alt süreçte çalıştırır ve alt sürecin saniyedeki satır sayısını ve
+tepe bellek kullanımını (peak RSS) yazdırır. Akış yönteminde tepe bellek boyuttan
+bağımsız kalmalı; karşılaştırma için 'liste' yöntemi tüm satırları önce belleğe alır.
+
+Kullanım:
+    python benchmarks/bench_export.py --boyut 10000 100000 --bicim csv ndjson
+    python benchmarks/bench_export.py --boyut 100000 --yontem akis liste
+
+Tepe bellek Linux'ta /proc/self/status (VmHWM), diğer sistemlerde resource modülünden okunur
+(Windows'ta ölçülmez). Eklenen ilanlar ve bölgeler sonunda silinir.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from emlak.export import available_formats, export_chunks, export_queryset, get_encoder
+from emlak.models import Bolge, KiraIlani
+
+BENCH_SEHIR = 'Bench Şehir'
+BENCH_KAYNAK = 'BenchExport'
+
+
+def veri_ekle(adet):
+    rastgele = random.Random(7)
+    bolgeler = Bolge.objects.bulk_create([
+        Bolge(sehir=BENCH_SEHIR, ilce=f'Bench İlçe {i // 20}', mahalle=f'Mahalle {i}') for i in range(200)
+    ])
+    bolgeler = list(Bolge.objects.filter(sehir=BENCH_SEHIR)) if bolgeler[0].pk is None else bolgeler
+    bugun = date.today()
+    for baslangic in range(0, adet, 10000):
+        KiraIlani.objects.bulk_create([
+            KiraIlani(
+                bolge=rastgele.choice(bolgeler),
+                fiyat=Decimal(rastgele.randrange(8000, 120000, 250)),
+                metrekare=rastgele.randint(35, 250),
+                oda_sayisi=rastgele.choice(['1+1', '2+1', '3+1']),
+                ilan_url=f'https://bench-export.kiraradar.local/ilan/{i}/',
+                ilan_kaynagi=BENCH_KAYNAK,
+                ilan_tarihi=bugun - timedelta(days=rastgele.randint(0, 365)),
+            )
+            for i in range(baslangic, min(baslangic + 10000, adet))
+        ])
+
+
+def temizle():
+    KiraIlani.objects.filter(ilan_kaynagi=BENCH_KAYNAK).delete()
+    Bolge.objects.filter(sehir=BENCH_SEHIR).delete()
+
+
+def tepe_bellek_mb():
+    """Bu sürecin tepe RSS değeri (MB); ölçülemiyorsa None."""
+    try:
+        with open('/proc/self/status') as durum:
+            for satir in durum:
+                if satir.startswith('VmHWM:'):
+                    return int(satir.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # macOS'ta ru_maxrss bayt cinsinden
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def cocuk(bicim, limit, yontem):
+    """Alt süreç: dışa aktarmayı /dev/null'a yazar; geçen süreyi ve tepe belleği yazdırır."""
+    ilanlar = export_queryset(kaynak=BENCH_KAYNAK)[:limit]
+    baslangic = time.perf_counter()
+    with open(os.devnull, 'wb') as hedef:
+        if yontem == 'akis':
+            for parca in export_chunks(ilanlar, bicim):
+                hedef.write(parca)
+        else:
+            # Karşılaştırma: tüm satırlar önce listeye alınır (akışsız eski yöntem)
+            satirlar = list(ilanlar)
+            kodlayici = get_encoder(bicim)
+            hedef.write(kodlayici.baslik() + kodlayici.satirlar(satirlar) + kodlayici.bitir())
+    print(time.perf_counter() - baslangic, tepe_bellek_mb())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Akışlı dışa aktarma benchmark')
+    parser.add_argument('--boyut', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--bicim', nargs='+', choices=available_formats(), default=available_formats())
+    parser.add_argument('--yontem', nargs='+', choices=['akis', 'liste'], default=['akis', 'liste'])
+    parser.add_argument('--cocuk', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--limit', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cocuk:
+        cocuk(args.bicim[0], args.limit, args.yontem[0])
+        return
+
+    print(f"{max(args.boyut)} sentetik ilan ekleniyor...")
+    temizle()
+    veri_ekle(max(args.boyut))
+    try:
+        print(f"{'satır':>9} {'biçim':<8} {'yöntem':<6} {'satır/sn':>10} {'tepe RSS':>10}")
+        for boyut in sorted(args.boyut):
+            for bicim in args.bicim:
+                for yontem in args.yontem:
+                    surec = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), '--cocuk', '--bicim', bicim,
+                         '--limit', str(boyut), '--yontem', yontem],
+                        stdout=subprocess.PIPE, text=True,
+                    )
+                    if surec.returncode != 0:
+                        print(f"{boyut:>9} {bicim:<8} {yontem:<6} alt süreç hata verdi ({surec.returncode})")
+                        continue
+                    sure, rss_mb = surec.stdout.strip().splitlines()[-1].split()
+                    rss_metni = f"{float(rss_mb):>8.1f} MB" if rss_mb != 'None' else '       -'
+                    print(f"{boyut:>9} {bicim:<8} {yontem:<6} {boyut / float(sure):>10.0f} {rss_metni}")
+    finally:
+        temizle()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_http_fetch.py
+
+"""
+Tarayıcısız HTTP motoru ile Selenium motorunun başlatma ve sayfa başı sürelerini karşılaştırır.
+
+Kullanım:
+    python benchmarks/bench_http_fetch.py                 # Yalnızca kayıtlı HTML üzerinde ayrıştırma
+    python benchmarks/bench_http_fetch.py --canli 3       # Canlı: 3 sayfayı iki motorla da çeker
+
+Django gerekmez; veritabanına yazılmaz.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emlak import http_fetch, parsing, scraping
+from emlak.scheduler import Hedef, hedef_url
+
+KOK_DIZIN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KAYITLI_SAYFA = os.path.join(KOK_DIZIN, 'emlakjet_timeout_page_source.html')
+
+
+def kayitli_sayfa_olc(tekrar):
+    with open(KAYITLI_SAYFA, encoding='utf-8') as f:
+        html_content = f.read()
+    baslangic = time.perf_counter()
+    for _ in range(tekrar):
+        kartlar = http_fetch.extract_cards_from_payload(html_content)
+    sure = (time.perf_counter() - baslangic) / tekrar
+    print(f"Kayıtlı sayfa ({len(html_content) / 1024:.0f} KB): gömülü veriden {len(kartlar)} kart, "
+          f"{sure * 1000:.1f} ms/sayfa")
+
+
+def canli_olc(sayfa_sayisi):
+    urller = [hedef_url(Hedef('İstanbul', 'Kadıköy', sayfa)) for sayfa in range(1, sayfa_sayisi + 1)]
+
+    baslangic = time.perf_counter()
+    oturum = http_fetch.create_session()
+    baslatma = time.perf_counter() - baslangic
+    sureler = []
+    for url in urller:
+        t = time.perf_counter()
+        kartlar = http_fetch.extract_cards_from_payload(http_fetch.fetch_html(oturum, url))
+        sureler.append(time.perf_counter() - t)
+        print(f"  http     {url}: {len(kartlar or [])} kart")
+    print(f"HTTP:     başlatma {baslatma * 1000:8.1f} ms, sayfa başı ort. {sum(sureler) / len(sureler) * 1000:8.1f} ms")
+
+    baslangic = time.perf_counter()
+    driver = scraping.create_driver()
+    baslatma = time.perf_counter() - baslangic
+    sureler = []
+    try:
+        for url in urller:
+            t = time.perf_counter()
+            kartlar = parsing.extract_cards(scraping.fetch_page_source(driver, url))
+            sureler.append(time.perf_counter() - t)
+            print(f"  selenium {url}: {len(kartlar)} kart")
+    finally:
+        driver.quit()
+    print(f"Selenium: başlatma {baslatma * 1000:8.1f} ms, sayfa başı ort. {sum(sureler) / len(sureler) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tekrar', type=int, default=20, help='Kayıtlı sayfa ayrıştırma tekrar sayısı')
+    parser.add_argument('--canli', type=int, default=0, help='Canlı olarak çekilecek sayfa sayısı (0: kapalı)')
+    args = parser.parse_args()
+
+    kayitli_sayfa_olc(args.tekrar)
+    if args.canli:
+        canli_olc(args.canli)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_locations.py
+
+"""
+Konum çözme hızını ölçer:
+- konum metni başına: parsing.parse_location (her seferinde regex + sezgisel ayrıştırma) ile
+  locations.resolve_location (gazetteer + LRU önbellek), soğuk ve sıcak önbellekle
+- kart grubu başına: persistence.resolve_bolgeler'in önbelleksiz (her grupta bölge sorgusu) ve
+  preload_bolgeler() ile önceden yüklenmiş hali; süre ve sorgu sayısı
+
+Kullanım:
+    python benchmarks/bench_locations.py --metin 200000 --grup 200
+
+Betik yapılandırılmış veritabanını kullanır; oluşturduğu test bölgelerini sonunda siler.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from django.db import connection
+
+from emlak import locations, parsing, persistence
+from emlak.models import Bolge
+
+BENCH_SEHIR = 'Bench Şehir'
+
+
+def konum_metinleri(adet, tohum):
+    """Gazetteer'daki ilçe/mahallelerden Emlakjet biçiminde ('İlçe - Mahalle Mahallesi') metinler üretir."""
+    rastgele = random.Random(tohum)
+    gazetteer = locations.get_gazetteer()
+    ciftler = [(gazetteer.ilceler[i], m) for i, mahalleler in gazetteer.mahalleler.items() for m in mahalleler.values()]
+    return [f"{ilce} - {mahalle} Mahallesi" for ilce, mahalle in (rastgele.choice(ciftler) for _ in range(adet))]
+
+
+def metin_olc(ad, fonksiyon, metinler):
+    baslangic = time.perf_counter()
+    for metin in metinler:
+        fonksiyon(metin)
+    sure = time.perf_counter() - baslangic
+    print(f"  {ad:<28} {sure:8.3f} sn  {len(metinler) / sure:12.0f} metin/sn")
+
+
+def bolge_olc(ad, gruplar):
+    sorgu_sayisi = 0
+
+    def sorgu_say(execute, sql, params, many, context):
+        nonlocal sorgu_sayisi
+        sorgu_sayisi += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(sorgu_say):
+        baslangic = time.perf_counter()
+        for grup in gruplar:
+            persistence.resolve_bolgeler(grup)
+        sure = time.perf_counter() - baslangic
+    print(f"  {ad:<28} {sure:8.3f} sn  {sorgu_sayisi:6d} sorgu")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--metin', type=int, default=200000, help='Çözülecek konum metni sayısı')
+    parser.add_argument('--grup', type=int, default=200, help='Kaydedilecek kart grubu (sayfa) sayısı')
+    parser.add_argument('--tohum', type=int, default=42)
+    args = parser.parse_args()
+
+    metinler = konum_metinleri(args.metin, args.tohum)
+    print(f"{len(metinler)} konum metni ({len(set(metinler))} farklı):")
+    metin_olc('parse_location', parsing.parse_location, metinler)
+    locations.resolve_location.cache_clear()
+    metin_olc('resolve_location (soğuk)', locations.resolve_location, metinler)
+    metin_olc('resolve_location (sıcak)', locations.resolve_location, metinler)
+
+    # Sayfa başına ~30 kart: her grup bilinen bölgelerden rastgele anahtarlar
+    rastgele = random.Random(args.tohum)
+    anahtarlar = [(BENCH_SEHIR, f'İlçe {i}', f'Mahalle {j}') for i in range(20) for j in range(30)]
+    gruplar = [rastgele.sample(anahtarlar, 30) for _ in range(args.grup)]
+    print(f"\n{args.grup} grup x 30 kart, {len(anahtarlar)} bölge (veritabanı: {connection.vendor}):")
+    try:
+        persistence.clear_bolge_cache()
+        persistence.resolve_bolgeler(anahtarlar)  # bölgeleri oluştur
+        bolge_olc('önbelleksiz', gruplar)
+        baslangic = time.perf_counter()
+        yuklenen = persistence.preload_bolgeler()
+        print(f"  preload_bolgeler: {yuklenen} bölge, {time.perf_counter() - baslangic:.3f} sn")
+        bolge_olc('önceden yüklenmiş', gruplar)
+    finally:
+        persistence.clear_bolge_cache()
+        Bolge.objects.filter(sehir=BENCH_SEHIR).delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_parsing.py
+
+"""
+Kayıtlı HTML sayfaları üzerinde kart ayrıştırma hızını (kart/sn) karşılaştırır:
+- 'eski': scraper.py'deki eski yol (BeautifulSoup + her kartta yeniden derlenen regex'ler),
+  seçicileri güncel Emlakjet düzenine uyarlanmış hali
+- emlak.parsing arka uçları: bs4, lxml, selectolax (kurulu olanlar)
+
+Kullanım:
+    python benchmarks/bench_parsing.py
+    python benchmarks/bench_parsing.py --dosya emlakjet_timeout_page_source.html --tekrar 50
+
+Django gerekmez.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from emlak import parsing
+
+KOK_DIZIN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KAYITLI_SAYFALAR = ['emlakjet_timeout_page_source.html', 'initial_page_source.html', 'timeout_page_source.html']
+
+
+def eski_yol(html_content):
+    """Eski scraper.py ayrıştırma döngüsü; yalnızca sınıf adları güncel düzene göre değiştirildi."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    listings = soup.find_all('div', class_=re.compile(r'styles_listingWrapper__'))
+    kartlar = []
+    for listing in listings:
+        price_element = listing.find('span', class_=re.compile(r'styles_price__'))
+        price = parsing.parse_price(price_element.get_text(strip=True)) if price_element else None
+        location_element = listing.find('span', class_=re.compile(r'styles_location__'))
+        location_str = location_element.get_text(strip=True) if location_element else "Konum Yok"
+        sehir, ilce, mahalle = parsing.parse_location(location_str)
+        metrekare = None
+        oda_sayisi = None
+        info = listing.find('div', class_=re.compile(r'styles_quickinfoWrapper__'))
+        for text in (info.get_text(strip=True).split('|') if info else []):
+            if 'm²' in text or 'm2' in text:
+                metrekare = int(re.sub(r'[^\d]', '', text))
+            elif '+' in text:
+                oda_sayisi = text
+        link = listing.find('a', href=True)
+        if link and price:
+            kartlar.append((link['href'], price, metrekare, oda_sayisi, sehir, ilce, mahalle))
+    return kartlar
+
+
+def olc(ad, fonksiyon, html_content, tekrar):
+    fonksiyon(html_content) # ısınma
+    baslangic = time.perf_counter()
+    for _ in range(tekrar):
+        kartlar = fonksiyon(html_content)
+    sure = (time.perf_counter() - baslangic) / tekrar
+    kart_hizi = f"{len(kartlar) / sure:10.0f} kart/sn" if kartlar else f"{'-':>10} kart/sn"
+    print(f"  {ad:<12} {len(kartlar):4d} kart  {sure * 1000:8.2f} ms/sayfa  {kart_hizi}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dosya', action='append', help='Ayrıştırılacak HTML dosyası (varsayılan: kayıtlı sayfalar)')
+    parser.add_argument('--tekrar', type=int, default=20, help='Her ölçüm için tekrar sayısı')
+    args = parser.parse_args()
+
+    for dosya in args.dosya or [os.path.join(KOK_DIZIN, ad) for ad in KAYITLI_SAYFALAR]:
+        with open(dosya, encoding='utf-8') as f:
+            html_content = f.read()
+        print(f"{os.path.basename(dosya)} ({len(html_content) / 1024:.0f} KB):")
+        olc('eski', eski_yol, html_content, args.tekrar)
+        for backend in parsing.available_backends():
+            olc(backend, lambda h, b=backend: parsing.extract_cards(h, backend=b, verbose=False), html_content, args.tekrar)
+
+
+if __name__ == '__main__':
+    main()
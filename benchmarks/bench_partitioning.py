@@ -0,0 +1,126 @@
+# benchmarks/bench_partitioning.py
+
+"""
+Aylık bölümlenmiş ilan tablosunda (bkz. emlak/partitioning.py) bölüm budamasını gösterir: tarih filtreli
+sorguların planında kaç bölümün tarandığını, okunan blok sayısını ve sorgu süresini yazdırır.
+
+    son_90_gun     kira_analizi --gun 90'ın yükleme sorgusu (ilan_tarihi >= bugün - 90)
+    ozet_kovasi    özet yenilemenin bölge-ay sorgusu (bolge_id = ? AND ilan_tarihi bir ay içinde)
+    admin_sayfasi  admin listesinin ilk sayfası (ORDER BY ilan_tarihi DESC LIMIT 100)
+    tum_tablo      karşılaştırma için tüm tablo (tarih filtresi yok, bütün bölümler taranır)
+
+Yalnızca PostgreSQL'de ve migrations/0011 uygulanmışsa anlamlıdır. --ilan verilirse ornek_veri_uret ile o kadar
+sentetik ilan (son --gun güne yayılmış) üretilir, bölümleri oluşturulur ve ölçümden sonra silinir (--koru ile kalır).
+
+Kullanım:
+    python benchmarks/bench_partitioning.py
+    python benchmarks/bench_partitioning.py --ilan 1000000 --gun 730
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from emlak import partitioning
+from emlak.maliyet import son_donem_baslangici
+from emlak.models import KiraIlani
+from emlak.rollup import _sonraki_ay, ay_baslangici
+
+
+def sorgular():
+    son = KiraIlani.objects.order_by('-ilan_tarihi').values_list('bolge_id', 'ilan_tarihi').first()
+    if son is None:
+        raise SystemExit('İlan tablosu boş; --ilan ile sentetik veri üretin.')
+    bolge_id, tarih = son
+    ay = ay_baslangici(tarih)
+    return {
+        'son_90_gun': KiraIlani.objects.filter(asil_ilan__isnull=True, ilan_tarihi__gte=son_donem_baslangici(90))
+                      .order_by().values_list('id', 'bolge_id', Cast('fiyat', FloatField()), 'metrekare'),
+        'ozet_kovasi': KiraIlani.objects.filter(bolge_id=bolge_id, ilan_tarihi__gte=ay, ilan_tarihi__lt=_sonraki_ay(ay),
+                                                asil_ilan__isnull=True)
+                       .order_by().values_list('bolge_id', 'ilan_tarihi', 'fiyat', 'metrekare'),
+        'admin_sayfasi': KiraIlani.objects.order_by('-ilan_tarihi').values_list('id', 'fiyat', 'ilan_tarihi')[:100],
+        'tum_tablo': KiraIlani.objects.order_by().values_list('id', 'fiyat'),
+    }
+
+
+def plan_ozeti(queryset):
+    """EXPLAIN ANALYZE planından taranan bölümleri, budanan alt planları ve okunan blokları çıkarır."""
+    plan = json.loads(queryset.explain(format='json', analyze=True, buffers=True))[0]
+    taranan = set()
+    budanan = 0
+
+    def gez(dugum):
+        nonlocal budanan
+        ad = dugum.get('Relation Name', '')
+        if ad.startswith(partitioning.TABLO + '_'):
+            taranan.add(ad)
+        budanan += dugum.get('Subplans Removed', 0)
+        for alt in dugum.get('Plans', []):
+            gez(alt)
+
+    gez(plan['Plan'])
+    bloklar = plan['Plan'].get('Shared Hit Blocks', 0) + plan['Plan'].get('Shared Read Blocks', 0)
+    return {'taranan': len(taranan), 'budanan': budanan, 'blok': bloklar,
+            'planlama_ms': plan.get('Planning Time'), 'calisma_ms': plan.get('Execution Time')}
+
+
+def olc(queryset, tekrar):
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        list(queryset.iterator(chunk_size=10000))
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return statistics.median(sureler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ilan', type=int, default=None, help='Ölçümden önce üretilecek sentetik ilan sayısı')
+    parser.add_argument('--gun', type=int, default=730, help='Sentetik ilan tarihlerinin yayılacağı gün sayısı')
+    parser.add_argument('--tekrar', type=int, default=5, help='Her sorgunun tekrar sayısı')
+    parser.add_argument('--koru', action='store_true', help='Sentetik veriyi sonunda silme')
+    args = parser.parse_args()
+
+    if connection.vendor != 'postgresql' or not partitioning.is_partitioned():
+        raise SystemExit('Bölüm budaması yalnızca PostgreSQL\'de, migrations/0011 uygulanmış tabloda ölçülebilir.')
+
+    try:
+        if args.ilan:
+            print(f"{args.ilan} sentetik ilan üretiliyor ({args.gun} güne yayılmış)...")
+            call_command('ornek_veri_uret', ilan=args.ilan, gun=args.gun, stdout=io.StringIO())
+            # Varsayılan bölüme düşen eski ayların bölümleri oluşturulur ve satırları taşınır
+            partitioning.ensure_partitions(0)
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {partitioning.TABLO}')
+
+        bolumler = partitioning.list_partitions()
+        print(f"{len(bolumler)} bölüm, tahmini {sum(b[3] for b in bolumler)} ilan.")
+        print(f"\n{'sorgu':<14} {'bölüm':>9} {'budanan':>8} {'blok':>9} {'planlama':>10} {'süre':>10}")
+        for ad, queryset in sorgular().items():
+            ozet = plan_ozeti(queryset)
+            sure = olc(queryset, args.tekrar)
+            print(f"{ad:<14} {ozet['taranan']:>4}/{len(bolumler):<4} {ozet['budanan']:>8} {ozet['blok']:>9} "
+                  f"{ozet['planlama_ms']:>7.2f} ms {sure:>7.1f} ms")
+    finally:
+        if args.ilan and not args.koru:
+            call_command('ornek_veri_uret', temizle=True, stdout=io.StringIO())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/bench_persistence.py
+
+"""
+Toplu kayıt (emlak.persistence.save_cards) ile eski kart-kart kayıt yolunu
+(get_or_create + update_or_create) karşılaştırır.
+
+Kullanım:
+    python benchmarks/bench_persistence.py --kart 2000
+    python benchmarks/bench_persistence.py --kart 2000 --yapilandirilmis-veritabani
+
+Ölçüm varsayılan olarak Django'nun test veritabanında (ayarlardaki adın başına test_ eklenmiş, migration'ları
+uygulanmış geçici bir veritabanı; SQLite'ta bellek içi) yapılır ve veritabanı sonunda silinir. Dolu bir tabloda
+ölçmek için --yapilandirilmis-veritabani ile yapılandırılmış veritabanı kullanılabilir; betik oraya bench
+ilanları ve bölgeleri yazıp sonunda siler, bu yüzden üretim veritabanında çalıştırılmamalıdır.
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+from datetime import date
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from django.db import connection
+
+from emlak.models import Bolge, KiraIlani
+from emlak.persistence import save_cards
+
+URL_ONEKI = 'https://bench.kiraradar.local/ilan/'
+BENCH_SEHIR = 'Bench Şehir'
+
+
+def kartlar_olustur(adet, tohum):
+    rastgele = random.Random(tohum)
+    ilceler = [f'Bench İlçe {i}' for i in range(10)]
+    kartlar = []
+    for i in range(adet):
+        kartlar.append({
+            'ilan_url': f'{URL_ONEKI}{i}/',
+            'fiyat': rastgele.randint(10_000, 150_000),
+            'metrekare': rastgele.randint(40, 250),
+            'oda_sayisi': rastgele.choice(['1+1', '2+1', '3+1', '4+1']),
+            'sehir': BENCH_SEHIR,
+            'ilce': rastgele.choice(ilceler),
+            'mahalle': f'Mahalle {rastgele.randint(0, 30)}',
+            'ilan_kaynagi': 'Emlakjet',
+            'ilan_tarihi': date.today(),
+        })
+    return kartlar
+
+
+def kart_kart_kaydet(kartlar):
+    """Eski scraper.py yolu: her kart için get_or_create + update_or_create."""
+    for kart in kartlar:
+        bolge, _ = Bolge.objects.get_or_create(sehir=kart['sehir'], ilce=kart['ilce'], mahalle=kart['mahalle'])
+        KiraIlani.objects.update_or_create(
+            ilan_url=kart['ilan_url'],
+            defaults={
+                'bolge': bolge,
+                'fiyat': kart['fiyat'],
+                'metrekare': kart['metrekare'],
+                'oda_sayisi': kart['oda_sayisi'],
+                'ilan_kaynagi': kart['ilan_kaynagi'],
+                'ilan_tarihi': kart['ilan_tarihi'],
+            },
+        )
+
+
+def temizle():
+    KiraIlani.objects.filter(ilan_url__startswith=URL_ONEKI).delete()
+    Bolge.objects.filter(sehir=BENCH_SEHIR).delete()
+
+
+@contextlib.contextmanager
+def gecici_veritabani():
+    """Ölçüm süresince bağlantıyı migration'ları uygulanmış bir test veritabanına yönlendirir, sonra siler."""
+    eski_ad = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(eski_ad, verbosity=0)
+
+
+def olc(ad, fonksiyon, kartlar):
+    sorgu_sayisi = 0
+
+    def sorgu_say(execute, sql, params, many, context):
+        nonlocal sorgu_sayisi
+        sorgu_sayisi += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(sorgu_say):
+        baslangic = time.perf_counter()
+        sonuc = fonksiyon(kartlar)
+        sure = time.perf_counter() - baslangic
+    print(f"  {ad:<12} {sure:8.3f} sn  {sorgu_sayisi:6d} sorgu  {len(kartlar) / sure:10.0f} kart/sn")
+    return sonuc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--kart', type=int, default=2000, help='Kaydedilecek kart sayısı')
+    parser.add_argument('--tohum', type=int, default=42, help='Rastgele veri tohumu')
+    parser.add_argument('--yapilandirilmis-veritabani', action='store_true',
+                        help='Geçici test veritabanı yerine ayarlardaki veritabanına yaz (bench satırları sonunda silinir)')
+    args = parser.parse_args()
+
+    ilk_tur = kartlar_olustur(args.kart, args.tohum)
+    ikinci_tur = kartlar_olustur(args.kart, args.tohum + 1)  # Aynı URL'ler, farklı fiyatlar
+
+    veritabani = contextlib.nullcontext() if args.yapilandirilmis_veritabani else gecici_veritabani()
+    with veritabani:
+        print(f"Veritabanı: {connection.vendor} ({connection.settings_dict['NAME']}), kart sayısı: {args.kart}")
+        try:
+            temizle()
+            print("Boş tablo (hepsi yeni ilan):")
+            olc('kart-kart', kart_kart_kaydet, ilk_tur)
+            temizle()
+            olc('toplu', save_cards, ilk_tur)
+
+            print("Dolu tablo (hepsi güncelleme):")
+            olc('kart-kart', kart_kart_kaydet, ikinci_tur)
+            ozet = olc('toplu', save_cards, ilk_tur)
+            print(f"  toplu özet: {ozet}")
+        finally:
+            temizle()
+
+
+if __name__ == '__main__':
+    main()
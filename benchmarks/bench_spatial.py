@@ -0,0 +1,110 @@
+# benchmarks/bench_spatial.py
+
+"""
+Emsal kira sorgusunun (emlak.spatial) gecikmesinin ilan sayısıyla değişmediğini kontrol eder.
+
+Sentetik bölgeler İstanbul sınırları içinde rastgele noktalara, sentetik ilanlar bu bölgelere
+dağıtılır (veritabanı gerekmez). Her ilan sayısı için indeks kurulur ve rastgele merkezlerden
+"R km içinde, ±%15 m², aynı oda sayısı" sorguları çalıştırılır; p50/p95/en uzun gecikme yazılır.
+--kaba verilirse aynı sorgular tüm ilanları tek tek tarayan döngüyle de ölçülür (yalnızca küçük
+ilan sayılarında anlamlı).
+
+Kullanım:
+    python benchmarks/bench_spatial.py --ilan 100000 1000000 5000000
+    python benchmarks/bench_spatial.py --ilan 100000 --kaba --sorgu 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# --- Django Ortamını Yükle ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from emlak.spatial import SpatialIndex, haversine_km
+
+ENLEM_ARALIGI = (40.80, 41.25)
+BOYLAM_ARALIGI = (28.40, 29.60)
+ODALAR = ['1+0', '1+1', '2+1', '3+1', '4+1']
+
+
+def sentetik_indeks(bolge_sayisi, ilan_sayisi, tohum):
+    rastgele = random.Random(tohum)
+    indeks = SpatialIndex()
+    bolgeler = [(rastgele.uniform(*ENLEM_ARALIGI), rastgele.uniform(*BOYLAM_ARALIGI)) for _ in range(bolge_sayisi)]
+    for bolge_id, (enlem, boylam) in enumerate(bolgeler):
+        indeks.add_region(bolge_id, enlem, boylam)
+    ilanlar = []
+    for ilan_id in range(ilan_sayisi):
+        satir = (rastgele.randrange(bolge_sayisi), rastgele.choice(ODALAR), rastgele.randint(35, 250),
+                 float(rastgele.randrange(8000, 150000, 100)), ilan_id)
+        indeks.add_listing(*satir)
+        ilanlar.append(satir)
+    return indeks.freeze(), bolgeler, ilanlar
+
+
+def sorgular(adet, tohum):
+    rastgele = random.Random(tohum)
+    return [(rastgele.uniform(*ENLEM_ARALIGI), rastgele.uniform(*BOYLAM_ARALIGI), rastgele.randint(50, 200),
+             rastgele.choice(ODALAR)) for _ in range(adet)]
+
+
+def kaba_tarama(bolgeler, ilanlar, enlem, boylam, yaricap, metrekare, oda, tolerans):
+    sonuc = []
+    for bolge_id, ilan_oda, ilan_m2, fiyat, ilan_id in ilanlar:
+        if ilan_oda == oda and abs(ilan_m2 - metrekare) <= metrekare * tolerans:
+            mesafe = haversine_km(enlem, boylam, *bolgeler[bolge_id])
+            if mesafe <= yaricap:
+                sonuc.append((mesafe, ilan_id))
+    sonuc.sort()
+    return sonuc
+
+
+def yuzdelik(sirali, q):
+    return sirali[min(len(sirali) - 1, int(q * len(sirali)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Emsal kira sorgusu benchmark')
+    parser.add_argument('--ilan', type=int, nargs='+', default=[100000, 1000000, 3000000])
+    parser.add_argument('--bolge', type=int, default=2000, help='Bölge sayısı')
+    parser.add_argument('--yaricap', type=float, default=2.0, help='Sorgu yarıçapı (km)')
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--sorgu', type=int, default=1000, help='Ölçülecek sorgu sayısı')
+    parser.add_argument('--kaba', action='store_true', help='Tüm ilanları tarayan döngüyle karşılaştır')
+    parser.add_argument('--tohum', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'ilan':>9} {'kurulum':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9} {'ort. emsal':>10} {'kaba (ms)':>10}")
+    for ilan_sayisi in args.ilan:
+        baslangic = time.perf_counter()
+        indeks, bolgeler, ilanlar = sentetik_indeks(args.bolge, ilan_sayisi, args.tohum)
+        kurulum = time.perf_counter() - baslangic
+
+        sureler = []
+        emsal_sayisi = 0
+        for enlem, boylam, metrekare, oda in sorgular(args.sorgu, args.tohum + 1):
+            baslangic = time.perf_counter()
+            emsaller = indeks.comparables(enlem, boylam, args.yaricap, metrekare, oda, limit=args.limit)
+            sureler.append((time.perf_counter() - baslangic) * 1000)
+            emsal_sayisi += len(emsaller)
+        sureler.sort()
+
+        kaba_metni = '-'
+        if args.kaba:
+            baslangic = time.perf_counter()
+            for enlem, boylam, metrekare, oda in sorgular(args.sorgu, args.tohum + 1):
+                kaba_tarama(bolgeler, ilanlar, enlem, boylam, args.yaricap, metrekare, oda, 0.15)
+            kaba_metni = f"{(time.perf_counter() - baslangic) * 1000 / args.sorgu:.1f}"
+        del ilanlar
+        print(f"{ilan_sayisi:>9} {kurulum:>7.1f} s {yuzdelik(sureler, 0.5):>9.3f} {yuzdelik(sureler, 0.95):>9.3f} "
+              f"{sureler[-1]:>9.3f} {emsal_sayisi / args.sorgu:>10.1f} {kaba_metni:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+# benchmarks/bench_suite.py
+
+"""
+Uçtan uca performans ölçümü: her veri ölçeğinde (sentetik ilan sayısı) aşağıdaki yolları ölçer ve
+sonuçları çalıştırmalar arasında karşılaştırılabilecek bir JSON dosyasına yazar.
+
+- ayristirma: depodaki kayıtlı HTML sayfalarında kart ayrıştırma (her arka uç) ve gömülü veri yolu
+  (tablo boyutundan bağımsız olduğu için bir kez ölçülür)
+- kayit: save_cards ile K yeni ilan, ardından aynı ilanların fiyat güncellemesi
+- maliyet: maliyet_hesapla tek ilçe, tek mahalle ve şehir geneli (mahalle ve ilçe seviyesi)
+- admin: ilan listesi (filtresiz, ilçe filtreli, arama, 50. sayfa); süre ve sorgu sayısı
+
+Veri ornek_veri_uret komutuyla ölçekten ölçeğe artımlı büyütülür ve sonunda silinir (--koru ile kalır).
+Betik yapılandırılmış veritabanını kullanır; ölçüm için ayrı bir veritabanı önerilir.
+
+Kullanım:
+    python benchmarks/bench_suite.py --olcek 10000 100000 1000000
+    python benchmarks/bench_suite.py --olcek 10000 --karsilastir benchmarks/sonuclar/onceki.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# --- Django Ortamını Yükle ---
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOK)
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiraradar.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.urls import reverse
+
+from emlak import http_fetch, parsing, persistence, rollup, synthetic
+from emlak.models import KiraIlani
+
+HTML_DOSYALARI = ['emlakjet_timeout_page_source.html', 'initial_page_source.html', 'timeout_page_source.html']
+KAYIT_URL_ONEKI = 'https://bench-suite.invalid/ilan/'
+YONETICI = 'bench-suite-yonetici'
+VARSAYILAN_CIKTI_DIZINI = os.path.join(KOK, 'benchmarks', 'sonuclar')
+# Karşılaştırmada bu orandan fazla yavaşlayan ölçümler işaretlenir
+YAVASLAMA_ESIGI = 0.10
+
+
+def olc(fonksiyon, tekrar, isinma=1):
+    """Fonksiyonu `isinma` kez boşa, `tekrar` kez ölçerek çalıştırır; ms cinsinden medyan/en az/en çok."""
+    for _ in range(isinma):
+        fonksiyon()
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        fonksiyon()
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return {'medyan_ms': round(statistics.median(sureler), 3), 'en_az_ms': round(min(sureler), 3),
+            'en_cok_ms': round(max(sureler), 3), 'tekrar': tekrar}
+
+
+def ortam_bilgisi():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=KOK, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT version()' if connection.vendor == 'postgresql' else 'SELECT sqlite_version()')
+        surum = cursor.fetchone()[0]
+    return {
+        'zaman': datetime.now().astimezone().isoformat(timespec='seconds'),
+        'commit': commit,
+        'makine': platform.node(),
+        'platform': platform.platform(),
+        'islemci': platform.processor() or platform.machine(),
+        'cekirdek': os.cpu_count(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'veritabani': connection.vendor,
+        'veritabani_surumu': surum,
+    }
+
+
+def ayristirma_olc(tekrar):
+    sonuclar = {}
+    for dosya in HTML_DOSYALARI:
+        yol = os.path.join(KOK, dosya)
+        if not os.path.exists(yol):
+            continue
+        with open(yol, encoding='utf-8') as f:
+            sayfa = f.read()
+        for arka_uc in parsing.available_backends():
+            kartlar = parsing.extract_cards(sayfa, backend=arka_uc, verbose=False)
+            sonuclar[f'{dosya}:{arka_uc}'] = {
+                **olc(lambda: parsing.extract_cards(sayfa, backend=arka_uc, verbose=False), tekrar), 'kart': len(kartlar)}
+        kartlar = http_fetch.extract_cards_from_payload(sayfa)
+        if kartlar is not None:
+            sonuclar[f'{dosya}:gomulu_veri'] = {
+                **olc(lambda: http_fetch.extract_cards_from_payload(sayfa), tekrar), 'kart': len(kartlar)}
+    return sonuclar
+
+
+def kayit_olc(profil, kart_sayisi):
+    """save_cards'ın ekleme ve güncelleme yolları; yazılan ilanlar sonunda silinir, özetler yeniden kurulur."""
+    kartlar = list(synthetic.generate_cards(0, kart_sayisi, profil, url_oneki=KAYIT_URL_ONEKI))
+    guncel = [{**kart, 'fiyat': kart['fiyat'] + 500} for kart in kartlar]
+    persistence.clear_bolge_cache()
+    try:
+        sonuc = {}
+        for ad, grup in (('ekleme', kartlar), ('guncelleme', guncel)):
+            baslangic = time.perf_counter()
+            ozet = persistence.save_cards(grup)
+            sure = time.perf_counter() - baslangic
+            sonuc[ad] = {'sure_ms': round(sure * 1000, 1), 'kart_saniye': round(len(grup) / sure),
+                         'eklenen': ozet.get('eklenen', 0), 'guncellenen': ozet.get('guncellenen', 0)}
+        return sonuc
+    finally:
+        yazilanlar = KiraIlani.objects.filter(ilan_url__startswith=KAYIT_URL_ONEKI)
+        bolge_idleri = list(yazilanlar.order_by().values_list('bolge_id', flat=True).distinct())
+        yazilanlar.delete()
+        rollup.rebuild_all(bolge_idleri)
+
+
+def maliyet_olc(tekrar):
+    ilce, mahalle = (KiraIlani.objects.filter(ilan_url__startswith=synthetic.URL_ONEKI)
+                     .values_list('bolge__ilce', 'bolge__mahalle').order_by('-pk').first())
+
+    def calistir(**secenekler):
+        return lambda: call_command('maliyet_hesapla', stdout=io.StringIO(), **secenekler)
+
+    return {
+        'ilce': olc(calistir(sehir=synthetic.SEHIR, ilce=ilce), tekrar),
+        'mahalle': olc(calistir(sehir=synthetic.SEHIR, ilce=ilce, mahalle=mahalle), tekrar),
+        'sehir_mahalle_seviyesi': olc(calistir(sehir=synthetic.SEHIR, cikti='json'), tekrar),
+        'sehir_ilce_seviyesi': olc(calistir(sehir=synthetic.SEHIR, seviye='ilce', cikti='json'), tekrar),
+    }
+
+
+def admin_olc(istemci, tekrar):
+    ilce = KiraIlani.objects.filter(ilan_url__startswith=synthetic.URL_ONEKI).values_list(
+        'bolge__ilce', flat=True).order_by('-pk').first()
+    url = reverse('admin:emlak_kirailani_changelist')
+    sayfalar = {
+        'liste': {},
+        'ilce_filtresi': {'bolge__sehir': synthetic.SEHIR, 'bolge__ilce': ilce},
+        'arama': {'q': 'deniz manzaralı'},
+        'sayfa_50': {'p': 50},
+    }
+    sonuclar = {}
+    for ad, parametreler in sayfalar.items():
+        # İstek başında sorgu günlüğü sıfırlanır; sayım da sıfırdan başlamalı
+        reset_queries()
+        with CaptureQueriesContext(connection) as sorgular:
+            yanit = istemci.get(url, parametreler)
+        if yanit.status_code != 200:
+            raise RuntimeError(f"Admin {ad} sayfası {yanit.status_code} döndü")
+        sonuclar[ad] = {**olc(lambda: istemci.get(url, parametreler), tekrar, isinma=0), 'sorgu': len(sorgular)}
+    return sonuclar
+
+
+def duzlestir(sonuc, onek=''):
+    """İç içe sonuçtan {'olcekler.10000.admin.liste.medyan_ms': değer} biçiminde süre ölçümleri."""
+    for anahtar, deger in sonuc.items():
+        if isinstance(deger, dict):
+            yield from duzlestir(deger, f'{onek}{anahtar}.')
+        elif anahtar in ('medyan_ms', 'sure_ms'):
+            yield f'{onek}{anahtar}', deger
+
+
+def karsilastir(onceki, simdiki):
+    eski = dict(duzlestir(onceki))
+    yavaslayan = 0
+    print(f"\nKarşılaştırma ({onceki['ortam'].get('commit')} -> {simdiki['ortam'].get('commit')}):")
+    print(f"  {'ölçüm':<70} {'önceki':>10} {'şimdi':>10} {'değişim':>9}")
+    for anahtar, deger in duzlestir(simdiki):
+        if anahtar not in eski or not eski[anahtar]:
+            continue
+        degisim = deger / eski[anahtar] - 1
+        isaret = '  YAVAŞLAMA' if degisim > YAVASLAMA_ESIGI else ''
+        yavaslayan += bool(isaret)
+        print(f"  {anahtar:<70} {eski[anahtar]:>10.1f} {deger:>10.1f} {degisim * 100:>+8.1f}%{isaret}")
+    print(f"{yavaslayan} ölçüm %{YAVASLAMA_ESIGI * 100:.0f}'dan fazla yavaşladı.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--olcek', type=int, nargs='+', default=[10_000, 100_000],
+                        help='Sentetik ilan sayıları (küçükten büyüğe ölçülür)')
+    parser.add_argument('--tekrar', type=int, default=5, help='Her ölçümün tekrar sayısı')
+    parser.add_argument('--kart', type=int, default=2000, help='Kayıt ölçümünde yazılacak kart sayısı')
+    parser.add_argument('--tohum', type=int, default=42, help='Sentetik veri tohumu')
+    parser.add_argument('--cikti', type=str, default=None,
+                        help='Sonuç JSON dosyası (varsayılan: benchmarks/sonuclar/suite-<zaman>.json)')
+    parser.add_argument('--karsilastir', type=str, default=None, help='Karşılaştırılacak önceki sonuç dosyası')
+    parser.add_argument('--koru', action='store_true', help='Sentetik veriyi sonunda silme')
+    args = parser.parse_args()
+
+    # Test istemcisinin 'testserver' host'una izin verilir
+    setup_test_environment()
+    sonuc = {'ortam': ortam_bilgisi(), 'ayarlar': vars(args).copy(), 'ayristirma': {}, 'olcekler': {}}
+    print(f"Veritabanı: {connection.vendor} {sonuc['ortam']['veritabani_surumu']}, "
+          f"{sonuc['ortam']['cekirdek']} çekirdek")
+
+    print("Ayrıştırma ölçülüyor...")
+    # Ayrıştırıcıların bilgi mesajları ölçüm çıktısına karışmasın
+    with contextlib.redirect_stdout(io.StringIO()):
+        sonuc['ayristirma'] = ayristirma_olc(args.tekrar)
+    for ad, olcum in sonuc['ayristirma'].items():
+        print(f"  {ad:<55} {olcum['medyan_ms']:>9.2f} ms  ({olcum['kart']} kart)")
+
+    profil = synthetic.Profil(args.tohum)
+    kullanici_modeli = get_user_model()
+    yonetici, _ = kullanici_modeli.objects.get_or_create(username=YONETICI, defaults={'is_staff': True,
+                                                                                     'is_superuser': True})
+    istemci = Client()
+    istemci.force_login(yonetici)
+    try:
+        for olcek in sorted(args.olcek):
+            print(f"\n--- {olcek} ilan ---")
+            baslangic = time.perf_counter()
+            call_command('ornek_veri_uret', ilan=olcek, tohum=args.tohum, stdout=io.StringIO())
+            olcek_sonucu = {'veri_hazirlama_sn': round(time.perf_counter() - baslangic, 1),
+                            'ilan_tablosu': KiraIlani.objects.count()}
+            olcek_sonucu['kayit'] = kayit_olc(profil, args.kart)
+            olcek_sonucu['maliyet'] = maliyet_olc(args.tekrar)
+            olcek_sonucu['admin'] = admin_olc(istemci, args.tekrar)
+            sonuc['olcekler'][str(olcek)] = olcek_sonucu
+
+            print(f"  veri hazırlama {olcek_sonucu['veri_hazirlama_sn']} sn, tabloda {olcek_sonucu['ilan_tablosu']} ilan")
+            for ad, olcum in olcek_sonucu['kayit'].items():
+                print(f"  kayıt {ad:<38} {olcum['sure_ms']:>9.1f} ms  ({olcum['kart_saniye']} kart/sn)")
+            for ad, olcum in olcek_sonucu['maliyet'].items():
+                print(f"  maliyet {ad:<36} {olcum['medyan_ms']:>9.1f} ms")
+            for ad, olcum in olcek_sonucu['admin'].items():
+                print(f"  admin {ad:<38} {olcum['medyan_ms']:>9.1f} ms  ({olcum['sorgu']} sorgu)")
+    finally:
+        yonetici.delete()
+        if not args.koru:
+            call_command('ornek_veri_uret', temizle=True, stdout=io.StringIO())
+
+    cikti = args.cikti or os.path.join(VARSAYILAN_CIKTI_DIZINI, f"suite-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(cikti)), exist_ok=True)
+    with open(cikti, 'w', encoding='utf-8') as f:
+        json.dump(sonuc, f, ensure_ascii=False, indent=2)
+    print(f"\nSonuçlar {cikti} dosyasına yazıldı.")
+
+    if args.karsilastir:
+        with open(args.karsilastir, encoding='utf-8') as f:
+            karsilastir(json.load(f), sonuc)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 # emlak/admin.py
 from django.contrib import admin
-from .models import Bolge, KiraIlani
+from . import admin_tools
+from .models import Bolge, BolgeOzeti, IlanArsivi, KiraIlani, TaramaCalismasi, TaramaSayfasi
 
 # Bolge modelini admin paneline kaydet
 @admin.register(Bolge)
@@ -9,10 +10,50 @@ class BolgeAdmin(admin.ModelAdmin):
     search_fields = ('sehir', 'ilce', 'mahalle')
     list_filter = ('sehir', 'ilce')
 
-# KiraIlani modelini admin paneline kaydet
+# KiraIlani modelini admin paneline kaydet (büyük tablo: tahmini sayım, önbellekli filtreler, indeksli arama;
+# bkz. emlak/admin_tools.py)
 @admin.register(KiraIlani)
 class KiraIlaniAdmin(admin.ModelAdmin):
     list_display = ('fiyat', 'bolge', 'metrekare', 'ilan_tarihi', 'ilan_kaynagi', 'veri_cekme_tarihi')
-    list_filter = ('ilan_kaynagi', 'ilan_tarihi', 'bolge__sehir', 'bolge__ilce', 'esyalimi')
+    list_filter = (admin_tools.KaynakFiltresi, 'ilan_tarihi', admin_tools.SehirFiltresi, admin_tools.IlceFiltresi,
+                   'esyalimi')
+    list_select_related = ('bolge',)
     search_fields = ('aciklama', 'ilan_url')
-    raw_id_fields = ('bolge',)
\ No newline at end of file
+    search_help_text = "Açıklamada kelime araması veya https:// ile başlayan ilan URL'si"
+    raw_id_fields = ('bolge', 'asil_ilan')
+    paginator = admin_tools.TahminiSayfalayici
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        sonuc = admin_tools.ilan_ara(queryset, search_term)
+        if sonuc is None:
+            return super().get_search_results(request, queryset, search_term)
+        return sonuc, False
+
+# BolgeOzeti modelini admin paneline kaydet (taramalar tarafından doldurulur, salt okunur inceleme için)
+@admin.register(BolgeOzeti)
+class BolgeOzetiAdmin(admin.ModelAdmin):
+    list_display = ('bolge', 'donem', 'donem_baslangici', 'ilan_sayisi', 'ortalama_fiyat', 'medyan_fiyat', 'ortalama_m2_fiyati')
+    list_filter = ('donem', 'bolge__sehir', 'bolge__ilce')
+    list_select_related = ('bolge',)
+    raw_id_fields = ('bolge',)
+
+# TaramaCalismasi modelini admin paneline kaydet (kira_tara komutu tarafından yazılır; geçmiş ve eğilimler için bkz. tarama_gecmisi komutu)
+@admin.register(TaramaCalismasi)
+class TaramaCalismasiAdmin(admin.ModelAdmin):
+    list_display = ('baslangic', 'durum', 'sayfa', 'hatali_sayfa', 'kart', 'eklenen', 'guncellenen', 'atlanan', 'sure_sn')
+    list_filter = ('durum',)
+    date_hierarchy = 'baslangic'
+
+# TaramaSayfasi modelini admin paneline kaydet (kalıcı URL sınırı; bkz. emlak/frontier.py)
+@admin.register(TaramaSayfasi)
+class TaramaSayfasiAdmin(admin.ModelAdmin):
+    list_display = ('url', 'kaynak', 'ilce', 'sayfa', 'durum', 'deneme', 'kart_sayisi', 'son_cekme')
+    list_filter = ('durum', 'kaynak')
+    search_fields = ('url', 'ilce')
+
+# IlanArsivi modelini admin paneline kaydet (ilan_bolumleri --arsivle tarafından yazılır; bkz. emlak/partitioning.py)
+@admin.register(IlanArsivi)
+class IlanArsiviAdmin(admin.ModelAdmin):
+    list_display = ('ay', 'ilan_sayisi', 'fiyat_gozlemi_sayisi', 'ilan_dosyasi', 'olusturma')
+    date_hierarchy = 'ay'
@@ -0,0 +1,131 @@
+# emlak/admin_tools.py
+
+"""
+Milyonlarca satırlı KiraIlani tablosunda admin listesinin ölçeklenmesi için yardımcılar.
+
+    - TahminiSayfalayici: filtresiz listelerde COUNT(*) yerine PostgreSQL'in tablo istatistiğini
+      (pg_class.reltuples) kullanır; tam sayım tüm tabloyu taramak demektir.
+    - Şehir, ilçe ve kaynak filtreleri seçeneklerini her sayfada DISTINCT taramasıyla değil önbellekten
+      alır. Seçenekler taramadan sonra refresh_filter_choices() ile yenilenir (kira_tara,
+      yeniden_ayristir); önbellek boşsa veya süresi dolmuşsa ilk istekte hesaplanır.
+    - ilan_ara: açıklamada icontains taraması yerine tam metin araması (GIN indeksi, bkz. migrations/0010);
+      URL ile arama ilan_url'nin tekil indeksini kullanır.
+
+PostgreSQL dışındaki veritabanlarında (yerel SQLite) sayfalayıcı tam sayıma, arama icontains'e döner.
+"""
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+from emlak.models import Bolge, KiraIlani
+
+# Bu satır sayısının altındaki tablolarda tam sayım zaten ucuzdur ve sayfa sayısı kesin kalır
+TAHMIN_ESIGI = 100_000
+FILTRE_ANAHTARI = 'kiraradar-admin:filtreler'
+# Taramadan sonra yenilenmezse seçeneklerin en fazla ne kadar eski kalacağı (saniye)
+FILTRE_SURESI = 6 * 60 * 60
+ARAMA_DILI = 'turkish'
+
+
+def estimated_count(queryset):
+    """Filtresiz sorgular için PostgreSQL satır tahmini; tahmin kullanılamıyorsa None."""
+    if connection.vendor != 'postgresql' or queryset.query.where or queryset.query.distinct:
+        return None
+    with connection.cursor() as cursor:
+        # Bölümlü tabloda (bkz. emlak/partitioning.py) satırlar bölümlerdedir; bölümsüz tabloda ağacın tek yaprağı
+        # tablonun kendisidir. Hiç ANALYZE edilmemiş tabloda reltuples -1'dir.
+        cursor.execute('SELECT sum(greatest(c.reltuples, 0))::bigint FROM pg_partition_tree(%s::regclass) t '
+                       'JOIN pg_class c ON c.oid = t.relid WHERE t.isleaf',
+                       [queryset.model._meta.db_table])
+        satir = cursor.fetchone()
+    if satir is None or satir[0] is None or satir[0] < TAHMIN_ESIGI:
+        return None
+    return satir[0]
+
+
+class TahminiSayfalayici(Paginator):
+    @cached_property
+    def count(self):
+        tahmin = estimated_count(self.object_list)
+        return super().count if tahmin is None else tahmin
+
+
+def refresh_filter_choices():
+    """Admin filtrelerinin seçeneklerini veritabanından yeniden hesaplayıp önbelleğe yazar."""
+    ilceler = {}
+    for sehir, ilce in Bolge.objects.order_by('sehir', 'ilce').values_list('sehir', 'ilce').distinct():
+        ilceler.setdefault(sehir, []).append(ilce)
+    secenekler = {
+        'sehir': list(ilceler),
+        'ilce': ilceler,
+        'kaynak': list(KiraIlani.objects.order_by('ilan_kaynagi').values_list('ilan_kaynagi', flat=True).distinct()),
+    }
+    cache.set(FILTRE_ANAHTARI, secenekler, timeout=FILTRE_SURESI)
+    return secenekler
+
+
+def filter_choices():
+    return cache.get(FILTRE_ANAHTARI) or refresh_filter_choices()
+
+
+class _OnbellekliFiltre(admin.SimpleListFilter):
+    # parameter_name varsayılan filtrelerin adlarıyla aynı; eski bağlantılar çalışmaya devam eder
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class SehirFiltresi(_OnbellekliFiltre):
+    title = 'şehir'
+    parameter_name = 'bolge__sehir'
+
+    def lookups(self, request, model_admin):
+        return [(sehir, sehir) for sehir in filter_choices()['sehir']]
+
+
+class IlceFiltresi(_OnbellekliFiltre):
+    title = 'ilçe'
+    parameter_name = 'bolge__ilce'
+
+    def lookups(self, request, model_admin):
+        ilceler = filter_choices()['ilce']
+        sehir = request.GET.get(SehirFiltresi.parameter_name)
+        # Şehir seçiliyse yalnızca o şehrin ilçeleri
+        secilenler = ilceler.get(sehir, []) if sehir else sorted({i for liste in ilceler.values() for i in liste})
+        return [(ilce, ilce) for ilce in secilenler]
+
+
+class KaynakFiltresi(_OnbellekliFiltre):
+    title = 'ilan kaynağı'
+    parameter_name = 'ilan_kaynagi'
+
+    def lookups(self, request, model_admin):
+        return [(kaynak, kaynak) for kaynak in filter_choices()['kaynak']]
+
+
+def search_vector():
+    """Açıklama GIN indeksinin ifadesi; arama sorgusu indeksle birebir aynı ifadeyi kullanmalı."""
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('aciklama', config=ARAMA_DILI)
+
+
+def ilan_ara(queryset, terim):
+    """
+    Admin araması: URL ile başlayan terimler ilan_url'de önek araması (tekil indeks), diğerleri
+    açıklamada tam metin araması. PostgreSQL dışında None döner (varsayılan icontains araması kullanılır).
+    """
+    terim = terim.strip()
+    if not terim:
+        return queryset
+    if terim.startswith(('http://', 'https://')):
+        return queryset.filter(ilan_url__startswith=terim)
+    if connection.vendor != 'postgresql':
+        return None
+    from django.contrib.postgres.search import SearchQuery
+    return queryset.alias(arama=search_vector()).filter(
+        arama=SearchQuery(terim, config=ARAMA_DILI, search_type='websearch'))
@@ -0,0 +1,244 @@
+# emlak/analytics.py
+
+"""
+Kira ilanları için vektörel istatistik motoru (NumPy).
+
+Ortalama lüks ilanlarla yukarı çekilir, ORM ise binlerce bölge için medyan ve yüzdelik
+hesaplayamaz. Burada fiyat, metrekare, oda sayısı ve bölge sütunları tek sorguyla sütunsal
+dizilere yüklenir ve bütün gruplar aynı anda hesaplanır:
+    - kira medyanı, çeyrekler (Q1, Q3) ve çeyrekler açıklığı (IQR),
+    - m² fiyatı dağılımı (P10, medyan, P90),
+    - medyan mutlak sapmaya (MAD) dayalı aykırı ilan işaretleri.
+
+Gruplu hesaplar sıralamaya dayanır: satırlar önce değere, sonra grup koduna göre kararlı olarak
+sıralanır (grup kodları 16 bite sığınca NumPy taban sıralaması kullanır; np.lexsort'tan ~3 kat hızlı).
+Grup sınırları np.bincount ile bulunur ve her grubun yüzdeliği grup başlangıcından indekslenerek
+okunur. Gruplar üzerinde Python döngüsü yoktur.
+
+Aykırı değerler bölge içindeki m² fiyatına göre işaretlenir (büyük daire doğal olarak pahalıdır):
+değiştirilmiş z-skoru 0.6745 * (x - medyan) / MAD, mutlak değeri AYKIRI_ESIGI'ni aşarsa aykırıdır.
+
+NumPy gerekir (pip install numpy); kurulu değilse fonksiyonlar ValueError verir.
+"""
+
+from collections import namedtuple
+from itertools import islice
+
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from emlak.maliyet import SEVIYE_MAHALLE, son_donem_baslangici
+from emlak.models import Bolge, KiraIlani
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Iglewicz & Hoaglin'in değiştirilmiş z-skoru ve önerilen eşik
+MAD_OLCEGI = 0.6745
+AYKIRI_ESIGI = 3.5
+# Bu sayıdan az m² fiyatı olan gruplarda aykırı değer işaretlenmez
+AYKIRI_EN_AZ_ILAN = 5
+
+# Veritabanından tek seferde okunan satır sayısı
+OKUMA_PARCASI = 50000
+
+IlanDizileri = namedtuple('IlanDizileri', 'ilan_id bolge_id fiyat metrekare oda oda_etiketleri')
+
+
+def _numpy_gerekli():
+    if np is None:
+        raise ValueError("Kira analizi için numpy kurulu olmalı (pip install numpy).")
+
+
+def _bolge_filtresi(sorgu, onek, sehir, ilce, mahalle):
+    for alan, deger in (('sehir', sehir), ('ilce', ilce), ('mahalle', mahalle)):
+        if deger:
+            sorgu = sorgu.filter(**{f'{onek}{alan}__iexact': deger})
+    return sorgu
+
+
+def load_arrays(sehir=None, ilce=None, mahalle=None, gun=None):
+    """
+    Filtreye uyan ilanları tek sorguyla sütunsal dizilere yükler. Oda sayısı küçük tamsayı
+    kodlarına çevrilir; kodun etiketi oda_etiketleri[kod]'dur (boş oda sayısı için None).
+    """
+    _numpy_gerekli()
+    # Başka kaynaktaki bir ilanın kopyası olanlar sayılmaz (bkz. emlak/dedup.py)
+    ilanlar = _bolge_filtresi(KiraIlani.objects.filter(asil_ilan__isnull=True), 'bolge__', sehir, ilce, mahalle)
+    if gun:
+        ilanlar = ilanlar.filter(ilan_tarihi__gte=son_donem_baslangici(gun))
+    # Decimal nesneleri üretmemek için fiyat veritabanında float'a çevrilir
+    satir_akisi = ilanlar.order_by().values_list(
+        'id', 'bolge_id', Cast('fiyat', FloatField()), 'metrekare', 'oda_sayisi'
+    ).iterator(chunk_size=OKUMA_PARCASI)
+
+    oda_kodlari = {}
+    sutunlar = ([], [], [], [], [])
+    while parca := list(islice(satir_akisi, OKUMA_PARCASI)):
+        ilan_id, bolge_id, fiyat, metrekare, oda = zip(*parca)
+        sutunlar[0].append(np.array(ilan_id, dtype=np.int64))
+        sutunlar[1].append(np.array(bolge_id, dtype=np.int64))
+        sutunlar[2].append(np.array(fiyat, dtype=np.float64))
+        sutunlar[3].append(np.array(metrekare, dtype=np.float64))
+        sutunlar[4].append(np.fromiter((oda_kodlari.setdefault(o or None, len(oda_kodlari)) for o in oda),
+                                       dtype=np.int32, count=len(oda)))
+
+    turler = (np.int64, np.int64, np.float64, np.float64, np.int32)
+    return IlanDizileri(
+        *(np.concatenate(sutun) if sutun else np.empty(0, dtype=tur) for sutun, tur in zip(sutunlar, turler)),
+        oda_etiketleri=list(oda_kodlari),
+    )
+
+
+def grouped_quantiles(grup, deger, grup_sayisi, yuzdelikler):
+    """
+    Her grup (0..grup_sayisi-1) için istenen yüzdelikleri (0-1 arası) numpy.percentile'ın doğrusal
+    yöntemiyle hesaplar. (adetler, [yüzdelik dizisi, ...]) döndürür; boş grupların değeri NaN'dır.
+    """
+    sira = np.argsort(deger)
+    # uint16 anahtarlarda kararlı sıralama taban sıralamasıdır (O(n))
+    grup_turu = np.uint16 if grup_sayisi <= 1 << 16 else np.int64
+    sira = sira[np.argsort(grup[sira].astype(grup_turu, copy=False), kind='stable')]
+    sirali = deger[sira]
+    adetler = np.bincount(grup, minlength=grup_sayisi)
+    dolu = adetler > 0
+    baslangic = (np.cumsum(adetler) - adetler)[dolu]
+    adet = adetler[dolu]
+
+    sonuclar = []
+    for q in yuzdelikler:
+        konum = baslangic + q * (adet - 1)
+        alt = konum.astype(np.int64)
+        ust = np.minimum(alt + 1, baslangic + adet - 1)
+        sonuc = np.full(grup_sayisi, np.nan)
+        sonuc[dolu] = sirali[alt] + (sirali[ust] - sirali[alt]) * (konum - alt)
+        sonuclar.append(sonuc)
+    return adetler, sonuclar
+
+
+def mad_outliers(grup, deger, grup_sayisi, esik=AYKIRI_ESIGI, medyan=None):
+    """
+    Her değerin kendi grubundaki değiştirilmiş z-skorunu ve aykırı maskesini döndürür.
+    MAD'i 0 olan ya da AYKIRI_EN_AZ_ILAN'dan az değeri olan gruplarda z-skoru 0 kabul edilir.
+    Grup medyanları önceden hesaplandıysa `medyan` ile verilerek bir sıralama atlanabilir.
+    """
+    if medyan is None:
+        adetler, (medyan,) = grouped_quantiles(grup, deger, grup_sayisi, [0.5])
+    else:
+        adetler = np.bincount(grup, minlength=grup_sayisi)
+    sapma = deger - medyan[grup]
+    _, (mad,) = grouped_quantiles(grup, np.abs(sapma), grup_sayisi, [0.5])
+    mad = mad[grup]
+    gecerli = (mad > 0) & (adetler[grup] >= AYKIRI_EN_AZ_ILAN)
+    z = np.zeros(len(deger))
+    z[gecerli] = MAD_OLCEGI * sapma[gecerli] / mad[gecerli]
+    return z, np.abs(z) > esik
+
+
+def _gruplar(diziler, sehir, ilce, mahalle, seviye, oda_bazinda):
+    """Her ilanın grup indeksini ve grup etiketlerini [(sehir, ilce, mahalle|None, oda|None), ...] döndürür."""
+    bolgeler = _bolge_filtresi(Bolge.objects.all(), '', sehir, ilce, mahalle)
+    arama = np.full(int(diziler.bolge_id.max()) + 1, -1, dtype=np.int64)
+    indeksler = {}
+    for bolge_id, b_sehir, b_ilce, b_mahalle in bolgeler.order_by('pk').values_list('id', 'sehir', 'ilce', 'mahalle'):
+        if bolge_id < len(arama):
+            anahtar = (b_sehir, b_ilce, b_mahalle if seviye == SEVIYE_MAHALLE else None)
+            arama[bolge_id] = indeksler.setdefault(anahtar, len(indeksler))
+    grup = arama[diziler.bolge_id]
+    etiketler = [anahtar + (None,) for anahtar in indeksler]
+
+    if oda_bazinda:
+        # (bölge grubu, oda) çiftleri yoğun indekslere sıkıştırılır
+        oda_sayisi = max(len(diziler.oda_etiketleri), 1)
+        birlesik = np.where(grup >= 0, grup * oda_sayisi + diziler.oda, -1)
+        benzersiz, grup = np.unique(birlesik, return_inverse=True)
+        grup = grup.reshape(-1) - (1 if len(benzersiz) and benzersiz[0] < 0 else 0)
+        benzersiz = benzersiz[benzersiz >= 0]
+        etiketler = [etiketler[k // oda_sayisi][:3] + (diziler.oda_etiketleri[k % oda_sayisi],)
+                     for k in benzersiz.tolist()]
+    return grup, etiketler
+
+
+def _sayi(deger):
+    return None if deger != deger else round(deger, 2) # NaN -> None
+
+
+def rent_statistics(sehir=None, ilce=None, mahalle=None, seviye=SEVIYE_MAHALLE, gun=None,
+                    oda_bazinda=False, aykiri_limiti=0):
+    """
+    Filtreye uyan ilanlardan grup istatistiklerini hesaplar; (istatistikler, aykiri_ilanlar) döndürür.
+
+    `seviye` 'mahalle' ise her Bolge kaydı, 'ilce' ise her (şehir, ilçe) bir gruptur; `oda_bazinda`
+    verilirse gruplar oda sayısına göre de ayrılır. `gun` verilirse yalnızca son `gun` günün ilanları
+    kullanılır. Her istatistik satırı: sehir, ilce, mahalle, oda_sayisi, ilan_sayisi, medyan_kira,
+    q1_kira, q3_kira, iqr, medyan_m2_fiyati, p10_m2_fiyati, p90_m2_fiyati, aykiri_sayisi.
+    aykiri_ilanlar z-skorunun mutlak değerine göre sıralı en fazla `aykiri_limiti` ilandır.
+    """
+    diziler = load_arrays(sehir=sehir, ilce=ilce, mahalle=mahalle, gun=gun)
+    if not len(diziler.ilan_id):
+        return [], []
+    grup, etiketler = _gruplar(diziler, sehir, ilce, mahalle, seviye, oda_bazinda)
+    # Sorgular arasında eklenen bölgelerin ilanları (grup -1) atlanır
+    gecerli = grup >= 0
+    if not gecerli.all():
+        diziler = IlanDizileri(*(dizi[gecerli] for dizi in diziler[:5]), diziler.oda_etiketleri)
+        grup = grup[gecerli]
+    grup_sayisi = len(etiketler)
+
+    adetler, (q1, medyan, q3) = grouped_quantiles(grup, diziler.fiyat, grup_sayisi, [0.25, 0.5, 0.75])
+
+    m2_var = diziler.metrekare > 0
+    m2_grup = grup[m2_var]
+    m2_fiyati = diziler.fiyat[m2_var] / diziler.metrekare[m2_var]
+    _, (m2_p10, m2_medyan, m2_p90) = grouped_quantiles(m2_grup, m2_fiyati, grup_sayisi, [0.1, 0.5, 0.9])
+    z, aykiri = mad_outliers(m2_grup, m2_fiyati, grup_sayisi, medyan=m2_medyan)
+    aykiri_sayilari = np.bincount(m2_grup[aykiri], minlength=grup_sayisi)
+
+    sutunlar = zip(adetler.tolist(), q1.tolist(), medyan.tolist(), q3.tolist(), m2_p10.tolist(),
+                   m2_medyan.tolist(), m2_p90.tolist(), aykiri_sayilari.tolist())
+    istatistikler = [
+        {
+            'sehir': g_sehir,
+            'ilce': g_ilce,
+            'mahalle': g_mahalle,
+            'oda_sayisi': g_oda,
+            'ilan_sayisi': adet,
+            'medyan_kira': _sayi(g_medyan),
+            'q1_kira': _sayi(g_q1),
+            'q3_kira': _sayi(g_q3),
+            'iqr': _sayi(g_q3 - g_q1),
+            'medyan_m2_fiyati': _sayi(g_m2_medyan),
+            'p10_m2_fiyati': _sayi(g_m2_p10),
+            'p90_m2_fiyati': _sayi(g_m2_p90),
+            'aykiri_sayisi': aykiri_sayisi,
+        }
+        for (g_sehir, g_ilce, g_mahalle, g_oda), (adet, g_q1, g_medyan, g_q3, g_m2_p10, g_m2_medyan, g_m2_p90,
+                                                  aykiri_sayisi) in zip(etiketler, sutunlar)
+        if adet
+    ]
+    istatistikler.sort(key=lambda s: (s['sehir'], s['ilce'], s['mahalle'] or '', s['oda_sayisi'] or ''))
+
+    aykiri_ilanlar = []
+    if aykiri_limiti:
+        indeksler = np.flatnonzero(aykiri)
+        indeksler = indeksler[np.argsort(-np.abs(z[indeksler]), kind='stable')[:aykiri_limiti]]
+        ilan_idleri = diziler.ilan_id[m2_var]
+        fiyatlar = diziler.fiyat[m2_var]
+        metrekareler = diziler.metrekare[m2_var]
+        for i in indeksler.tolist():
+            g_sehir, g_ilce, g_mahalle, g_oda = etiketler[m2_grup[i]]
+            aykiri_ilanlar.append({
+                'ilan_id': int(ilan_idleri[i]),
+                'sehir': g_sehir,
+                'ilce': g_ilce,
+                'mahalle': g_mahalle,
+                'oda_sayisi': g_oda,
+                'fiyat': _sayi(float(fiyatlar[i])),
+                'metrekare': int(metrekareler[i]),
+                'm2_fiyati': _sayi(float(m2_fiyati[i])),
+                'grup_medyan_m2_fiyati': _sayi(float(m2_medyan[m2_grup[i]])),
+                'z_skoru': _sayi(float(z[i])),
+            })
+    return istatistikler, aykiri_ilanlar
@@ -0,0 +1,78 @@
+# emlak/api_cache.py
+
+"""
+JSON API yanıtları için önbellek katmanı.
+
+Her yanıt (durum kodu, ETag, gövde) olarak önbelleğe yazılır. Anahtar uç noktanın adı, istek
+parametreleri ve ilgili bölgenin *sürümünden* oluşur. Sürümler şehir ve (şehir, ilçe) başına
+tutulur; bir tarama bir bölgeye yeni satır yazıp bölge özetleri yenilendiğinde (bkz. emlak/rollup.py)
+o bölgenin şehir ve ilçe sürümleri değişir. Eski anahtarlar bir daha okunmaz ve süreleri dolunca düşer;
+böylece bir bölgenin tüm zaman pencerelerini tek tek silmek gerekmez.
+
+Ayarlardaki varsayılan önbellek dosya tabanlıdır: scraper ayrı bir süreçte çalışsa da yaptığı
+geçersiz kılma web sunucusu tarafından görülür.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from emlak.models import Bolge
+
+# Yanıtların önbellekte kalma süresi (saniye); sürüm değişince zaten okunmazlar
+YANIT_SURESI = 60 * 60
+ANAHTAR_ONEKI = 'kiraradar-api'
+
+
+def _normal(ad):
+    # Bölge aramaları __iexact ile yapılıyor; anahtarlar da büyük/küçük harften bağımsız olmalı
+    return (ad or '').strip().upper()
+
+
+def _surum_anahtari(sehir, ilce=None):
+    parcalar = [_normal(sehir)]
+    if ilce is not None:
+        parcalar.append(_normal(ilce))
+    ozet = hashlib.blake2b('\x1f'.join(parcalar).encode('utf-8'), digest_size=8).hexdigest()
+    return f'{ANAHTAR_ONEKI}:surum:{ozet}'
+
+
+def region_version(sehir, ilce=None):
+    """Şehrin (ilce verilirse ilçenin) güncel önbellek sürümünü döndürür; yoksa yenisini oluşturur."""
+    anahtar = _surum_anahtari(sehir, ilce)
+    surum = cache.get(anahtar)
+    if surum is None:
+        # Sürüm anahtarı önbellekten düşmüşse eski yanıtlarla çakışmasın diye zaman damgası kullanıyoruz
+        surum = time.time_ns()
+        cache.set(anahtar, surum, timeout=None)
+    return surum
+
+
+def invalidate_regions(bolge_idleri):
+    """Verilen bölgelerin şehir ve ilçe sürümlerini yeniler; bu bölgelere ait önbellekli yanıtlar geçersiz olur."""
+    konumlar = set(Bolge.objects.filter(id__in=bolge_idleri).values_list('sehir', 'ilce').distinct().order_by())
+    if not konumlar:
+        return
+    yeni_surum = time.time_ns()
+    anahtarlar = {_surum_anahtari(sehir) for sehir, _ in konumlar}
+    anahtarlar |= {_surum_anahtari(sehir, ilce) for sehir, ilce in konumlar}
+    cache.set_many({anahtar: yeni_surum for anahtar in anahtarlar}, timeout=None)
+
+
+def cached_response(uc_nokta, parametreler, surum, uret):
+    """
+    (durum, etag, gövde) üçlüsünü önbellekten döndürür; yoksa `uret()` ile üretip yazar.
+    `uret` (durum, gövde bayt) döndürmelidir.
+    """
+    parametre_metni = '\x1f'.join(f'{ad}={_normal(str(deger))}' for ad, deger in sorted(parametreler.items()))
+    ozet = hashlib.blake2b(parametre_metni.encode('utf-8'), digest_size=12).hexdigest()
+    anahtar = f'{ANAHTAR_ONEKI}:{uc_nokta}:{ozet}:{surum}'
+
+    girdi = cache.get(anahtar)
+    if girdi is None:
+        durum, govde = uret()
+        etag = '"' + hashlib.blake2b(govde, digest_size=12).hexdigest() + '"'
+        girdi = (durum, etag, govde)
+        cache.set(anahtar, girdi, timeout=YANIT_SURESI)
+    return girdi
@@ -0,0 +1,271 @@
+# emlak/archive.py
+
+"""
+Çekilen her sayfanın ham kaynağını saklayan, içerik adresli ve sıkıştırılmış sayfa arşivi.
+
+Dizin düzeni (kök: settings.SAYFA_ARSIVI_DIZINI):
+    nesneler/ab/abcd....html.zst      sayfa içeriği; adı içeriğin sha256 özeti, aynı içerik bir kez saklanır
+    kayitlar/2026-10-18/<pid>.jsonl   her çekme için bir satır: zaman, url, kaynak, motor, özet, boyut
+
+zstandard kuruluysa (pip install zstandard) zstd, değilse gzip kullanılır; okurken ikisi de tanınır.
+Her süreç kendi kayıt dosyasına ekler, nesneler geçici dosyadan os.replace ile yazılır; işçi süreçler
+arasında kilit gerekmez.
+
+Tarama sırasında işçiler activate() ile arşivi açar, kaynak adaptörleri (emlak.sources) çektikleri
+her sayfayı store() ile yazar. yeniden_ayristir komutu arşivdeki sayfaları güncel ayrıştırıcıdan geçirir
+(bkz. emlak/reparse.py); sayfa_arsivi komutu boyutları raporlar ve saklama süresini uygular.
+
+Bu modül Django'yu import etmez; işçi süreçlerde de kullanılır.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from emlak import telemetry
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SIKISTIRMA_ZSTD = 'zstd'
+SIKISTIRMA_GZIP = 'gzip'
+UZANTILAR = {SIKISTIRMA_ZSTD: '.html.zst', SIKISTIRMA_GZIP: '.html.gz'}
+# HTML sayfalarında zstd 9 gzip 6'dan hem daha küçük hem daha hızlı (bkz. benchmarks/bench_archive.py)
+ZSTD_SEVIYESI = 9
+GZIP_SEVIYESI = 6
+# Çöp toplama bundan yeni nesnelere dokunmaz: kaydı henüz yazılmamış (tarama sürerken eklenen) nesneler silinmesin
+COP_TOPLAMA_PAYI_SN = 60 * 60
+
+ArsivKaydi = namedtuple('ArsivKaydi', ['zaman', 'url', 'kaynak', 'motor', 'ozet', 'boyut'])
+
+
+class PageArchive:
+    """Kök dizindeki sayfa arşivi; store() ile yazılır, records() ve get() ile okunur."""
+
+    def __init__(self, kok, sikistirma=None):
+        self.kok = os.fspath(kok)
+        self.sikistirma = sikistirma or (SIKISTIRMA_ZSTD if zstandard is not None else SIKISTIRMA_GZIP)
+        if self.sikistirma not in UZANTILAR:
+            raise ValueError(f"Bilinmeyen sıkıştırma: {self.sikistirma}. Seçenekler: {', '.join(UZANTILAR)}")
+        if self.sikistirma == SIKISTIRMA_ZSTD and zstandard is None:
+            raise ValueError("zstd sıkıştırma için zstandard kurulu olmalı (pip install zstandard).")
+        self._kayit_dosyasi = None
+        self._kayit_anahtari = None  # (pid, gün): fork edilen süreç veya yeni gün yeni dosya açar
+
+    # --- Nesneler ---
+
+    def _nesne_yolu(self, ozet, sikistirma):
+        return os.path.join(self.kok, 'nesneler', ozet[:2], ozet + UZANTILAR[sikistirma])
+
+    def _bul(self, ozet):
+        for sikistirma in UZANTILAR:
+            yol = self._nesne_yolu(ozet, sikistirma)
+            if os.path.exists(yol):
+                return yol, sikistirma
+        return None, None
+
+    def _sikistir(self, veri):
+        if self.sikistirma == SIKISTIRMA_ZSTD:
+            return zstandard.ZstdCompressor(level=ZSTD_SEVIYESI).compress(veri)
+        return gzip.compress(veri, compresslevel=GZIP_SEVIYESI, mtime=0)
+
+    def put(self, veri):
+        """İçeriği (bytes) arşive ekler; (özet, diske yazılan bayt) döndürür. İçerik zaten varsa 0 bayt yazılır."""
+        ozet = hashlib.sha256(veri).hexdigest()
+        if self._bul(ozet)[0] is not None:
+            return ozet, 0
+        yol = self._nesne_yolu(ozet, self.sikistirma)
+        os.makedirs(os.path.dirname(yol), exist_ok=True)
+        sikistirilmis = self._sikistir(veri)
+        fd, gecici = tempfile.mkstemp(dir=os.path.dirname(yol), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(sikistirilmis)
+            os.replace(gecici, yol)
+        except BaseException:
+            os.unlink(gecici)
+            raise
+        return ozet, len(sikistirilmis)
+
+    def get(self, ozet):
+        """Özeti verilen sayfanın HTML metnini döndürür; yoksa KeyError."""
+        yol, sikistirma = self._bul(ozet)
+        if yol is None:
+            raise KeyError(f"Arşivde {ozet} özetli sayfa yok.")
+        with open(yol, 'rb') as f:
+            veri = f.read()
+        if sikistirma == SIKISTIRMA_ZSTD:
+            if zstandard is None:
+                raise ValueError("zstd ile sıkıştırılmış sayfaları okumak için zstandard kurulu olmalı (pip install zstandard).")
+            veri = zstandard.ZstdDecompressor().decompress(veri)
+        else:
+            veri = gzip.decompress(veri)
+        return veri.decode('utf-8')
+
+    # --- Kayıtlar ---
+
+    def _kayit_dizini(self, gun=None):
+        kayitlar = os.path.join(self.kok, 'kayitlar')
+        return os.path.join(kayitlar, gun.isoformat()) if gun else kayitlar
+
+    def store(self, url, html, kaynak, motor, zaman=None):
+        """Sayfayı arşive ekler ve çekmeyi kaydeder; (özet, diske yazılan bayt) döndürür."""
+        zaman = zaman or datetime.now().astimezone()
+        veri = html.encode('utf-8')
+        ozet, yazilan = self.put(veri)
+        anahtar = (os.getpid(), zaman.date())
+        if self._kayit_anahtari != anahtar:
+            if self._kayit_dosyasi is not None:
+                self._kayit_dosyasi.close()
+            dizin = self._kayit_dizini(zaman.date())
+            os.makedirs(dizin, exist_ok=True)
+            self._kayit_dosyasi = open(os.path.join(dizin, f'{os.getpid()}.jsonl'), 'a', encoding='utf-8')
+            self._kayit_anahtari = anahtar
+        kayit = ArsivKaydi(zaman.isoformat(timespec='seconds'), url, kaynak, motor, ozet, len(veri))
+        self._kayit_dosyasi.write(json.dumps(kayit._asdict(), ensure_ascii=False) + '\n')
+        self._kayit_dosyasi.flush()
+        return ozet, yazilan
+
+    def days(self):
+        """Kaydı olan günler (eskiden yeniye)."""
+        gunler = []
+        for ad in os.listdir(self._kayit_dizini()) if os.path.isdir(self._kayit_dizini()) else ():
+            try:
+                gunler.append(date.fromisoformat(ad))
+            except ValueError:
+                continue
+        return sorted(gunler)
+
+    def day_records(self, gun):
+        """Bir günün kayıtlarını zamana göre sıralı döndürür; yarım yazılmış satırlar atlanır."""
+        kayitlar = []
+        dizin = self._kayit_dizini(gun)
+        for ad in os.listdir(dizin) if os.path.isdir(dizin) else ():
+            if not ad.endswith('.jsonl'):
+                continue
+            with open(os.path.join(dizin, ad), encoding='utf-8') as f:
+                for satir in f:
+                    try:
+                        kayitlar.append(ArsivKaydi(**json.loads(satir)))
+                    except (ValueError, TypeError):
+                        continue
+        kayitlar.sort(key=lambda kayit: kayit.zaman)
+        return kayitlar
+
+    def records(self, baslangic=None, bitis=None, kaynaklar=None):
+        """[baslangic, bitis] günlerindeki kayıtları eskiden yeniye üretir; `kaynaklar` verilirse yalnızca onlar."""
+        for gun in self.days():
+            if (baslangic and gun < baslangic) or (bitis and gun > bitis):
+                continue
+            for kayit in self.day_records(gun):
+                if kaynaklar is None or kayit.kaynak in kaynaklar:
+                    yield kayit
+
+    # --- Boyut ve saklama ---
+
+    def _nesneler(self):
+        """(özet, yol, disk boyutu, değişme zamanı) üretir."""
+        kok = os.path.join(self.kok, 'nesneler')
+        for dizin, _, dosyalar in os.walk(kok):
+            for ad in dosyalar:
+                yol = os.path.join(dizin, ad)
+                bilgi = os.stat(yol)
+                yield ad.split('.', 1)[0], yol, bilgi.st_size, bilgi.st_mtime
+
+    def usage(self):
+        """
+        Arşivin boyut özetini döndürür: çekme (kayıt) ve tekil sayfa sayısı, çekilen toplam ham bayt,
+        tekil sayfaların ham baytı, diskteki bayt; ayrıca gün ve kaynak bazında kayıt sayısı ve ham bayt.
+        """
+        gunler = {}
+        kaynaklar = {}
+        tekil_boyutlar = {}
+        for gun in self.days():
+            gunluk = gunler[gun] = {'kayit': 0, 'ham_bayt': 0}
+            for kayit in self.day_records(gun):
+                gunluk['kayit'] += 1
+                gunluk['ham_bayt'] += kayit.boyut
+                kaynak = kaynaklar.setdefault(kayit.kaynak, {'kayit': 0, 'ham_bayt': 0})
+                kaynak['kayit'] += 1
+                kaynak['ham_bayt'] += kayit.boyut
+                tekil_boyutlar[kayit.ozet] = kayit.boyut
+        nesne = disk_bayt = 0
+        for _, _, boyut, _ in self._nesneler():
+            nesne += 1
+            disk_bayt += boyut
+        return {
+            'kayit': sum(g['kayit'] for g in gunler.values()),
+            'tekil_sayfa': len(tekil_boyutlar),
+            'nesne': nesne,
+            'ham_bayt': sum(g['ham_bayt'] for g in gunler.values()),
+            'tekil_ham_bayt': sum(tekil_boyutlar.values()),
+            'disk_bayt': disk_bayt,
+            'gunler': gunler,
+            'kaynaklar': kaynaklar,
+        }
+
+    def prune(self, sakla_gun, bugun=None):
+        """
+        Son `sakla_gun` günden eski kayıt günlerini siler, ardından hiçbir kaydın göstermediği nesneleri
+        toplar. (silinen gün, silinen nesne, boşalan bayt) döndürür.
+        """
+        sinir = (bugun or date.today()) - timedelta(days=sakla_gun)
+        silinen_gun = 0
+        for gun in self.days():
+            if gun < sinir:
+                shutil.rmtree(self._kayit_dizini(gun))
+                silinen_gun += 1
+        silinen_nesne, bosalan = self.collect_garbage()
+        return silinen_gun, silinen_nesne, bosalan
+
+    def collect_garbage(self):
+        """Kalan kayıtların hiçbirinin göstermediği nesneleri siler; (silinen nesne, boşalan bayt) döndürür."""
+        kullanilan = {kayit.ozet for kayit in self.records()}
+        sinir = time.time() - COP_TOPLAMA_PAYI_SN
+        silinen = bosalan = 0
+        for ozet, yol, boyut, degisme in self._nesneler():
+            if ozet in kullanilan or degisme > sinir:
+                continue
+            os.unlink(yol)
+            silinen += 1
+            bosalan += boyut
+        return silinen, bosalan
+
+
+# --- Tarama sırasında etkin arşiv ---
+# İşçi süreçte activate() ile açılır; açılmamışsa store() hiçbir şey yapmaz
+
+_aktif = None
+
+
+def activate(kok, sikistirma=None):
+    """Bu süreçte çekilen sayfaların yazılacağı arşivi açar; `kok` boşsa arşivlemeyi kapatır."""
+    global _aktif
+    _aktif = PageArchive(kok, sikistirma) if kok else None
+    return _aktif
+
+
+def store(url, html, kaynak, motor):
+    """
+    Etkin arşiv varsa sayfayı ekler ve özetini döndürür. Arşive yazılamaması taramayı durdurmaz;
+    hata yazdırılıp telemetride sayılır.
+    """
+    if _aktif is None or not html:
+        return None
+    try:
+        with telemetry.olc('arsivleme'):
+            ozet, yazilan = _aktif.store(url, html, kaynak, motor)
+    except OSError as e:
+        print(f"{url} sayfası arşive yazılamadı: {e}")
+        telemetry.say('arsiv_hatasi')
+        return None
+    telemetry.say('arsiv_yeni' if yazilan else 'arsiv_tekrar')
+    return ozet
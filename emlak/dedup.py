@@ -0,0 +1,110 @@
+# emlak/dedup.py
+
+"""
+Kaynaklar arası kopya ilan tespiti.
+
+Aynı daire birden fazla sitede ilandaysa her ilan ayrı bir KiraIlani satırıdır. Ortalamalara iki kez
+girmesin diye sonradan görülen ilan ilk görülene (asil_ilan) bağlanır; bölge özetleri, analizler ve
+bölge fiyat değişimleri yalnızca asil_ilan'ı boş olan ilanları sayar.
+
+İki ilan şu koşullarda aynı daire kabul edilir:
+    - farklı kaynaklardan ve aynı bölgede (Bolge kaydı),
+    - oda sayısı aynı (kaynak adaptörleri normalize eder, bkz. emlak.sources),
+    - metrekare farkı en fazla M2_TOLERANSI,
+    - fiyat farkı küçük fiyatın en fazla FIYAT_TOLERANSI kadarı.
+
+Adayları tabloyu taramadan bulmak için her ilana bir kopya anahtarı yazılır:
+hash(bolge_id, oda_sayisi, metrekare // M2_KOVASI). Bir ilanın adayları kendi kovası ve iki komşu
+kovanın anahtarlarıyla tek indeks sorgusunda okunur; kova genişliği toleranstan büyük olduğundan
+eşleşen hiçbir çift kaçmaz.
+"""
+
+import hashlib
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+from emlak.models import KiraIlani
+
+M2_KOVASI = 5
+M2_TOLERANSI = 3
+FIYAT_TOLERANSI = Decimal('0.05')
+
+IlanOzeti = namedtuple('IlanOzeti', ['id', 'bolge_id', 'oda_sayisi', 'metrekare', 'fiyat', 'ilan_kaynagi',
+                                     'ilan_tarihi', 'asil_ilan'])
+
+
+def duplicate_key(bolge_id, oda_sayisi, metrekare=None, kova=None):
+    """İlanın kopya anahtarını döndürür; metrekare bilinmiyorsa None (bu ilanlar eşleştirilmez)."""
+    if kova is None:
+        if not metrekare:
+            return None
+        kova = int(metrekare) // M2_KOVASI
+    metin = f"{bolge_id}\x1f{oda_sayisi or ''}\x1f{kova}"
+    return hashlib.blake2b(metin.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _aday_anahtarlari(ilan):
+    kova = ilan.metrekare // M2_KOVASI
+    return [duplicate_key(ilan.bolge_id, ilan.oda_sayisi, kova=k) for k in (kova - 1, kova, kova + 1)]
+
+
+def is_same_flat(a, b):
+    return (
+        a.ilan_kaynagi != b.ilan_kaynagi
+        and a.bolge_id == b.bolge_id
+        and a.oda_sayisi == b.oda_sayisi
+        and abs(a.metrekare - b.metrekare) <= M2_TOLERANSI
+        and abs(a.fiyat - b.fiyat) <= min(a.fiyat, b.fiyat) * FIYAT_TOLERANSI
+    )
+
+
+def _ozetler(ilanlar):
+    return [IlanOzeti(*satir) for satir in ilanlar.order_by().values_list(*IlanOzeti._fields)]
+
+
+def mark_duplicates(ilanlar):
+    """
+    Verilen ilanların (KiraIlani queryset'i) ve asıl ilanı bunlardan biri olan kopyaların bağlantılarını
+    yeniden hesaplar. Bir ilanın asıl ilanı, eşleşen ve kendisi kopya olmayan ilanlardan kendinden eski
+    (id'si küçük) olan ilkidir; eşleşme kalmadıysa bağlantı kaldırılır. İlanlar id sırasıyla işlendiği için
+    adayın kopya olup olmadığı bu çağrıda verilen karara göre değerlendirilir: asıl ilanı kopyaya dönen ya da
+    artık eşleşmeyen kopyalar yeni asıl ilana körü körüne taşınmaz, onunla yeniden karşılaştırılır.
+    Bağlantısı değişen bütün ilanların (bolge_id, ilan_tarihi) çiftlerini döndürür (bölge özetleri için).
+    """
+    ilanlar = {ilan.id: ilan for ilan in _ozetler(ilanlar)}
+    if not ilanlar:
+        return set()
+    # Asıl ilanın fiyatı/metrekaresi değiştiyse kopyaları artık eşleşmeyebilir
+    for ilan in _ozetler(KiraIlani.objects.filter(asil_ilan_id__in=list(ilanlar))):
+        ilanlar.setdefault(ilan.id, ilan)
+
+    anahtarlar = {anahtar for ilan in ilanlar.values() if ilan.metrekare for anahtar in _aday_anahtarlari(ilan)}
+    adaylar = defaultdict(list)
+    asil_ilanlar = {}  # aday id -> asıl ilan id (bu çağrıda yeniden hesaplananlar için yeni değer)
+    for satir in KiraIlani.objects.filter(kopya_anahtari__in=anahtarlar).order_by('id').values_list(
+        'kopya_anahtari', *IlanOzeti._fields
+    ):
+        aday = IlanOzeti(*satir[1:])
+        adaylar[satir[0]].append(aday)
+        asil_ilanlar[aday.id] = aday.asil_ilan
+
+    degisenler = {}
+    for ilan in sorted(ilanlar.values(), key=lambda ilan: ilan.id):
+        eslesen = None
+        if ilan.metrekare:
+            eslesen = min(
+                (aday.id for anahtar in _aday_anahtarlari(ilan) for aday in adaylar[anahtar]
+                 if aday.id < ilan.id and asil_ilanlar.get(aday.id) is None and is_same_flat(ilan, aday)),
+                default=None,
+            )
+        asil_ilanlar[ilan.id] = eslesen
+        if eslesen != ilan.asil_ilan:
+            degisenler[ilan.id] = (ilan, eslesen)
+    if not degisenler:
+        return set()
+
+    KiraIlani.objects.bulk_update(
+        [KiraIlani(pk=ilan_id, asil_ilan_id=asil) for ilan_id, (_, asil) in degisenler.items()],
+        ['asil_ilan'], batch_size=500,
+    )
+    return {(ilan.bolge_id, ilan.ilan_tarihi) for ilan, _ in degisenler.values()}
@@ -0,0 +1,197 @@
+# emlak/enrichment.py
+
+"""
+İlan detay sayfası zenginleştirmesi.
+
+Liste sayfaları KiraIlani'nin binanin_yasi, esyalimi, isinma_tipi ve aciklama alanlarını vermez; bu
+değerler yalnızca ilanın kendi sayfasındadır. Bu modül detayı eksik veya eskimiş ilanları sıraya alır
+ve detay sayfalarını sınırlı bir thread havuzuyla çeker:
+    - kuyruk: detay_ozeti'si içerik özetine (icerik_ozeti) eşit olmayan ilanlar, yani detayı hiç
+      çekilmemiş veya son çekimden sonra fiyatı/içeriği değişmiş ilanlar. Detayı alınamayan ilan
+      TEKRAR_DENEME_SAAT sonra yeniden denenir.
+    - Her thread kendi HTTP oturumunu (bağlantı havuzu, keep-alive) tüm ilanlar boyunca kullanır; host
+      başına nezaket limiti taramadakiyle aynıdır (emlak.scheduler.NezaketLimiti).
+    - Kuyruk id sırasıyla parça parça okunur ve havuza aynı anda en fazla isci_sayisi * 2 ilan verilir;
+      bellek kullanımı kuyruk uzunluğundan bağımsızdır.
+    - Sonuçlar ana thread'de toplanır ve bulk_update ile parça parça yazılır (tek yazıcı).
+
+Çalışmanın ilerlemesi (işlenen, hatalı, sayfa/dakika) önbelleğe yazılır; GET /api/zenginlestirme/
+bunu kuyruk derinliği ve son saatin hızıyla birlikte döndürür (bkz. status()).
+
+Komut satırı: python manage.py ilan_detaylari --isci 8 --limit 5000
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+from emlak import sources
+from emlak.models import KiraIlani
+from emlak.scheduler import VARSAYILAN_ESZAMANLI, VARSAYILAN_MIN_ARALIK, NezaketLimiti
+
+DETAY_ALANLARI = ['binanin_yasi', 'esyalimi', 'isinma_tipi', 'aciklama']
+VARSAYILAN_ISCI = 4
+# Detay sayfası alınamayan ilanın yeniden deneneceği süre
+TEKRAR_DENEME_SAAT = 24
+OKUMA_PARCASI = 500
+YAZMA_PARCASI = 100
+# Önbellekteki çalışma durumunun anahtarı ve en fazla hangi aralıkla (saniye) güncelleneceği
+DURUM_ANAHTARI = 'zenginlestirme:durum'
+DURUM_ARALIGI = 5
+
+
+def pending_listings(kaynaklar=None, simdi=None):
+    """Detay sayfası çekilecek ilanlar (kaynaklar: KiraIlani.ilan_kaynagi değerleri; varsayılan detayı desteklenenler)."""
+    kaynaklar = list(sources.detail_sources()) if kaynaklar is None else kaynaklar
+    sinir = (simdi or timezone.now()) - timedelta(hours=TEKRAR_DENEME_SAAT)
+    hic_cekilmemis = Q(detay_ozeti__isnull=True) & (Q(detay_tarihi__isnull=True) | Q(detay_tarihi__lt=sinir))
+    degismis = Q(detay_ozeti__isnull=False, icerik_ozeti__isnull=False) & ~Q(detay_ozeti=F('icerik_ozeti'))
+    return KiraIlani.objects.filter(hic_cekilmemis | degismis, ilan_kaynagi__in=kaynaklar)
+
+
+def _kuyruk_akisi(kuyruk, limit=None):
+    """Kuyruğu id sırasıyla parça parça okur; yazılan ilanlar kuyruktan çıksa da sıra kaymaz (id > son id)."""
+    son_id = 0
+    okunan = 0
+    while limit is None or okunan < limit:
+        boyut = OKUMA_PARCASI if limit is None else min(OKUMA_PARCASI, limit - okunan)
+        parca = list(kuyruk.filter(id__gt=son_id).order_by('id')[:boyut])
+        if not parca:
+            return
+        yield from parca
+        okunan += len(parca)
+        son_id = parca[-1].id
+
+
+class _DetayCekici:
+    """Thread başına bir HTTP oturumu ve host başına ortak nezaket limitiyle detay sayfalarını çeker."""
+
+    def __init__(self, min_aralik, eszamanli):
+        self.min_aralik = min_aralik
+        self.eszamanli = eszamanli
+        self._yerel = threading.local()
+        self._oturumlar = []
+        self._limitler = {}
+        self._kilit = threading.Lock()
+
+    def _oturum(self):
+        oturum = getattr(self._yerel, 'oturum', None)
+        if oturum is None:
+            from emlak import http_fetch  # requests web sürecinde (durum API'si) yüklenmesin
+            oturum = self._yerel.oturum = http_fetch.create_session(havuz_boyutu=2)
+            with self._kilit:
+                self._oturumlar.append(oturum)
+        return oturum
+
+    def _limit(self, url):
+        host = urlsplit(url).netloc
+        with self._kilit:
+            if host not in self._limitler:
+                self._limitler[host] = NezaketLimiti(self.min_aralik, self.eszamanli)
+            return self._limitler[host]
+
+    def cek(self, adaptor, ilan_url):
+        oturum = self._oturum()
+        with self._limit(ilan_url):
+            return adaptor.fetch_details(ilan_url, oturum)
+
+    def kapat(self):
+        for oturum in self._oturumlar:
+            oturum.close()
+
+
+def _durum_yaz(ozet, baslangic, calisiyor):
+    sure = time.monotonic() - baslangic
+    cache.set(DURUM_ANAHTARI, {
+        **ozet,
+        'calisiyor': calisiyor,
+        'guncelleme': timezone.now().isoformat(timespec='seconds'),
+        'sure_sn': round(sure, 1),
+        'sayfa_dakika': round(ozet['islenen'] / sure * 60, 1) if sure else 0.0,
+    }, None)
+
+
+def enrich(limit=None, isci_sayisi=VARSAYILAN_ISCI, min_aralik=VARSAYILAN_MIN_ARALIK, eszamanli=VARSAYILAN_ESZAMANLI,
+           kaynaklar=None):
+    """
+    Kuyruktaki ilanların (en fazla `limit`) detay sayfalarını `isci_sayisi` thread ile çeker ve ek alanları yazar.
+    Özet sözlüğü döndürür: kuyruk (başlangıçtaki derinlik), islenen, zenginlesen, bos (sayfada alan bulunamadı),
+    hatali, sure_sn, sayfa_dakika.
+    """
+    adaptorler = sources.detail_sources()
+    if kaynaklar is not None:
+        adaptorler = {ad: adaptor for ad, adaptor in adaptorler.items() if ad in kaynaklar}
+    kuyruk = pending_listings(list(adaptorler)).only('id', 'ilan_url', 'ilan_kaynagi', 'icerik_ozeti', *DETAY_ALANLARI)
+    ozet = {'kuyruk': kuyruk.count(), 'islenen': 0, 'zenginlesen': 0, 'bos': 0, 'hatali': 0}
+    baslangic = time.monotonic()
+    son_durum = 0.0
+    _durum_yaz(ozet, baslangic, calisiyor=True)
+
+    yazilacaklar = []
+
+    def yaz():
+        KiraIlani.objects.bulk_update(yazilacaklar, DETAY_ALANLARI + ['detay_ozeti', 'detay_tarihi'])
+        yazilacaklar.clear()
+
+    def isle(ilan, is_):
+        try:
+            detaylar = is_.result()
+        except Exception as e:
+            print(f"{ilan.ilan_url} detayı alınamadı: {e}")
+            ozet['hatali'] += 1
+            ilan.detay_ozeti = None
+        else:
+            for alan, deger in detaylar.items():
+                setattr(ilan, alan, deger)
+            ozet['zenginlesen' if detaylar else 'bos'] += 1
+            # İçerik özeti olmayan eski ilanlar da yeniden kuyruğa girmesin
+            ilan.detay_ozeti = ilan.icerik_ozeti or ''
+        ilan.detay_tarihi = timezone.now()
+        ozet['islenen'] += 1
+        yazilacaklar.append(ilan)
+        if len(yazilacaklar) >= YAZMA_PARCASI:
+            yaz()
+
+    cekici = _DetayCekici(min_aralik, eszamanli)
+    pencere = isci_sayisi * 2
+    try:
+        with ThreadPoolExecutor(max_workers=isci_sayisi, thread_name_prefix='detay') as havuz:
+            ucustaki = {}
+            for ilan in _kuyruk_akisi(kuyruk, limit):
+                if len(ucustaki) >= pencere:
+                    bitenler, _ = wait(ucustaki, return_when=FIRST_COMPLETED)
+                    for is_ in bitenler:
+                        isle(ucustaki.pop(is_), is_)
+                    if time.monotonic() - son_durum >= DURUM_ARALIGI:
+                        son_durum = time.monotonic()
+                        _durum_yaz(ozet, baslangic, calisiyor=True)
+                ucustaki[havuz.submit(cekici.cek, adaptorler[ilan.ilan_kaynagi], ilan.ilan_url)] = ilan
+            for is_ in wait(ucustaki).done:
+                isle(ucustaki[is_], is_)
+        if yazilacaklar:
+            yaz()
+    finally:
+        cekici.kapat()
+        _durum_yaz(ozet, baslangic, calisiyor=False)
+
+    ozet['sure_sn'] = round(time.monotonic() - baslangic, 2)
+    ozet['sayfa_dakika'] = round(ozet['islenen'] / ozet['sure_sn'] * 60, 1) if ozet['sure_sn'] else 0.0
+    return ozet
+
+
+def status():
+    """Kuyruk derinliği, son bir saatte zenginleştirilen ilanlar ve son (veya süren) çalışmanın ilerlemesi."""
+    simdi = timezone.now()
+    son_saat = KiraIlani.objects.filter(detay_tarihi__gte=simdi - timedelta(hours=1)).count()
+    return {
+        'kuyruk': pending_listings(simdi=simdi).count(),
+        'son_saat_islenen': son_saat,
+        'son_saat_sayfa_dakika': round(son_saat / 60, 1),
+        'calisma': cache.get(DURUM_ANAHTARI),
+    }
@@ -0,0 +1,223 @@
+# emlak/export.py
+
+"""
+KiraIlani + Bolge tablosunu CSV, NDJSON veya Parquet olarak akış halinde dışa aktarır.
+
+Satırlar .iterator(chunk_size=...) ile okunur; PostgreSQL'de bu sunucu taraflı imleç
+(server-side cursor) demektir, yani veritabanı sürücüsü de tabloyu belleğe almaz. Her parça ayrı
+kodlanıp hemen verilir; bellek kullanımı dışa aktarılan satır sayısından bağımsız olarak parça
+boyutuyla sınırlı kalır. Asenkron sürümde her parça sync_to_async ile bağlantının iş parçacığında
+okunup kodlanır (values_list üzerinde .aiterator() sorguyu async bağlamda çalıştırmaya çalışıyor).
+
+Parquet için pyarrow gerekir (pip install pyarrow); kurulu değilse yalnızca CSV ve NDJSON kullanılabilir.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from emlak.models import KiraIlani
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+BICIM_CSV = 'csv'
+BICIM_NDJSON = 'ndjson'
+BICIM_PARQUET = 'parquet'
+BICIMLER = (BICIM_CSV, BICIM_NDJSON, BICIM_PARQUET)
+
+# Veritabanından tek seferde okunan satır sayısı (sunucu taraflı imlecin parça boyutu)
+PARCA_BOYUTU = 2000
+# Parquet'te bir satır grubuna yazılan en fazla satır; grup dolunca diske/istemciye verilir
+PARQUET_SATIR_GRUBU = 20000
+
+# (sütun adı, ORM yolu)
+SUTUNLAR = [
+    ('id', 'id'),
+    ('ilan_url', 'ilan_url'),
+    ('fiyat', 'fiyat'),
+    ('metrekare', 'metrekare'),
+    ('oda_sayisi', 'oda_sayisi'),
+    ('sehir', 'bolge__sehir'),
+    ('ilce', 'bolge__ilce'),
+    ('mahalle', 'bolge__mahalle'),
+    ('ilan_kaynagi', 'ilan_kaynagi'),
+    ('ilan_tarihi', 'ilan_tarihi'),
+    ('veri_cekme_tarihi', 'veri_cekme_tarihi'),
+    # Başka kaynaktaki bir ilanın kopyasıysa o ilanın id'si (bkz. emlak/dedup.py)
+    ('asil_ilan', 'asil_ilan'),
+]
+SUTUN_ADLARI = [ad for ad, _ in SUTUNLAR]
+
+ICERIK_TIPLERI = {
+    BICIM_CSV: 'text/csv; charset=utf-8',
+    BICIM_NDJSON: 'application/x-ndjson',
+    BICIM_PARQUET: 'application/vnd.apache.parquet',
+}
+
+
+def available_formats():
+    """Kurulu bağımlılıklara göre kullanılabilir biçimleri döndürür."""
+    return [b for b in BICIMLER if b != BICIM_PARQUET or pa is not None]
+
+
+def export_queryset(sehir=None, ilce=None, mahalle=None, baslangic=None, bitis=None, kaynak=None):
+    """Filtrelere uyan ilanları Bolge ile birleştirilmiş düz satırlar (tuple) olarak döndüren queryset."""
+    ilanlar = KiraIlani.objects.all()
+    if sehir:
+        ilanlar = ilanlar.filter(bolge__sehir__iexact=sehir)
+    if ilce:
+        ilanlar = ilanlar.filter(bolge__ilce__iexact=ilce)
+    if mahalle:
+        ilanlar = ilanlar.filter(bolge__mahalle__iexact=mahalle)
+    if baslangic:
+        ilanlar = ilanlar.filter(ilan_tarihi__gte=baslangic)
+    if bitis:
+        ilanlar = ilanlar.filter(ilan_tarihi__lte=bitis)
+    if kaynak:
+        ilanlar = ilanlar.filter(ilan_kaynagi__iexact=kaynak)
+    # Varsayılan -ilan_tarihi sıralaması tüm tabloyu sıralatır; birincil anahtar sırası indeksten gelir
+    return ilanlar.order_by('id').values_list(*(yol for _, yol in SUTUNLAR))
+
+
+class CsvKodlayici:
+    def baslik(self):
+        return self.satirlar([SUTUN_ADLARI])
+
+    def satirlar(self, satirlar):
+        tampon = io.StringIO()
+        csv.writer(tampon).writerows(satirlar)
+        return tampon.getvalue().encode('utf-8')
+
+    def bitir(self):
+        return b''
+
+
+class NdjsonKodlayici:
+    def baslik(self):
+        return b''
+
+    def satirlar(self, satirlar):
+        parcalar = []
+        for satir in satirlar:
+            kayit = dict(zip(SUTUN_ADLARI, satir))
+            kayit['fiyat'] = float(kayit['fiyat'])
+            kayit['ilan_tarihi'] = kayit['ilan_tarihi'].isoformat()
+            kayit['veri_cekme_tarihi'] = kayit['veri_cekme_tarihi'].isoformat()
+            parcalar.append(json.dumps(kayit, ensure_ascii=False))
+        return ('\n'.join(parcalar) + '\n').encode('utf-8') if parcalar else b''
+
+    def bitir(self):
+        return b''
+
+
+class _ToplayanDosya(io.RawIOBase):
+    """ParquetWriter'ın yazdığı baytları biriktirir; akışa verilmek üzere alınıp boşaltılır."""
+
+    def __init__(self):
+        self._tampon = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, veri):
+        self._tampon += veri
+        return len(veri)
+
+    def al(self):
+        veri = bytes(self._tampon)
+        self._tampon.clear()
+        return veri
+
+
+class ParquetKodlayici:
+    def __init__(self, satir_grubu=PARQUET_SATIR_GRUBU):
+        if pa is None:
+            raise ValueError("Parquet için pyarrow kurulu olmalı (pip install pyarrow).")
+        self.sema = pa.schema([
+            ('id', pa.int64()),
+            ('ilan_url', pa.string()),
+            ('fiyat', pa.decimal128(10, 2)),
+            ('metrekare', pa.int32()),
+            ('oda_sayisi', pa.string()),
+            ('sehir', pa.string()),
+            ('ilce', pa.string()),
+            ('mahalle', pa.string()),
+            ('ilan_kaynagi', pa.string()),
+            ('ilan_tarihi', pa.date32()),
+            ('veri_cekme_tarihi', pa.timestamp('us', tz='UTC')),
+            ('asil_ilan', pa.int64()),
+        ])
+        self.satir_grubu = satir_grubu
+        self._bekleyen = []
+        self._dosya = _ToplayanDosya()
+        self._yazici = pq.ParquetWriter(self._dosya, self.sema, compression='zstd')
+
+    def baslik(self):
+        return b''
+
+    def _grup_yaz(self):
+        sutunlar = list(zip(*self._bekleyen))
+        self._yazici.write_table(pa.Table.from_arrays(
+            [pa.array(deger, type=alan.type) for deger, alan in zip(sutunlar, self.sema)], schema=self.sema
+        ))
+        self._bekleyen = []
+
+    def satirlar(self, satirlar):
+        self._bekleyen.extend(satirlar)
+        if len(self._bekleyen) >= self.satir_grubu:
+            self._grup_yaz()
+        return self._dosya.al()
+
+    def bitir(self):
+        if self._bekleyen:
+            self._grup_yaz()
+        self._yazici.close()
+        return self._dosya.al()
+
+
+def get_encoder(bicim):
+    if bicim == BICIM_CSV:
+        return CsvKodlayici()
+    if bicim == BICIM_NDJSON:
+        return NdjsonKodlayici()
+    if bicim == BICIM_PARQUET:
+        return ParquetKodlayici()
+    raise ValueError(f"Bilinmeyen biçim: {bicim}. Geçerli biçimler: {', '.join(BICIMLER)}")
+
+
+def export_chunks(queryset, bicim, parca_boyutu=PARCA_BOYUTU):
+    """Queryset satırlarını seçilen biçimde bayt parçaları olarak üretir (senkron)."""
+    kodlayici = get_encoder(bicim)
+    yield kodlayici.baslik()
+    parca = []
+    for satir in queryset.iterator(chunk_size=parca_boyutu):
+        parca.append(satir)
+        if len(parca) >= parca_boyutu:
+            yield kodlayici.satirlar(parca)
+            parca = []
+    if parca:
+        yield kodlayici.satirlar(parca)
+    yield kodlayici.bitir()
+
+
+async def aexport_chunks(queryset, bicim, parca_boyutu=PARCA_BOYUTU):
+    """export_chunks'ın asenkron karşılığı; ASGI altında olay döngüsünü bloklamadan akış sağlar."""
+    kodlayici = get_encoder(bicim)
+    satirlar = queryset.iterator(chunk_size=parca_boyutu)
+
+    def sonraki_parca():
+        # Okuma ve kodlama olay döngüsünün dışında, veritabanı bağlantısının iş parçacığında yapılır
+        parca = list(islice(satirlar, parca_boyutu))
+        return kodlayici.satirlar(parca) if parca else None
+
+    yield kodlayici.baslik()
+    while (veri := await sync_to_async(sonraki_parca)()) is not None:
+        yield veri
+    yield await sync_to_async(kodlayici.bitir)()
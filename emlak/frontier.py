@@ -0,0 +1,139 @@
+# emlak/frontier.py
+
+"""
+Sayfalı listeleme taraması için veritabanında tutulan URL sınırı (frontier).
+
+Her (kaynak, şehir, ilçe, sayfa) hedefinin URL'si TaramaSayfasi tablosuna bir kez yazılır ve
+durumu (bekliyor / tamamlandı / hatalı) izlenir. emlak.scheduler.run_targets bu nesneyi `takip`
+olarak alır ve şu noktalarda çağırır:
+    kesfet(hedefler)                -> taranacak hedefler (kaydedilir; taze ve tekrar eden URL'ler elenir)
+    bitti(hedef, kartlar, hata)     -> sayfanın kartları kaydedildikten sonra: durumu yazar ve
+                                       sayfalamada sıradaki hedefleri döndürür
+bitti() kayıt thread'inde çağrılır; sınırın bütün veritabanı yazıları ilan yazılarıyla aynı thread'de
+sıralanır (SQLite'ta da kilit çekişmesi olmaz).
+
+Sayfalama: her ilçe 1..onden sayfalarıyla başlar; k. sayfa yeni ilan getirdikçe k + onden. sayfa
+keşfedilir, böylece ilçe başına `onden` sayfa aynı anda taranır. Bir sayfada daha önce görülmemiş
+ilan yoksa (son sayfa geçildi) ilçenin sayfalaması durur; en fazla en_fazla_sayfa sayfaya gidilir.
+
+Tazelik: son `tazelik_saat` içinde başarıyla çekilmiş sayfa yeniden çekilmez; kart getirmişse
+sayfalama onun ardından devam eder. Bu pencerede art arda en_fazla_deneme kez hata veren sayfa da atlanır.
+
+Devam: bir sayfa ancak kartları kaydedildikten sonra 'tamamlandı' olur; yarıda kesilen taramanın
+keşfedilmiş ama bitmemiş sayfaları 'bekliyor' kalır ve pending() bunları yeni çalıştırmanın
+hedeflerine ekler.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, F
+from django.utils import timezone
+
+from emlak.models import TaramaSayfasi
+from emlak.scheduler import Hedef, hedef_url
+
+VARSAYILAN_TAZELIK_SAAT = 12
+EN_FAZLA_DENEME = 3
+
+
+class Frontier:
+    def __init__(self, en_fazla_sayfa=1, onden=1, tazelik_saat=VARSAYILAN_TAZELIK_SAAT, en_fazla_deneme=EN_FAZLA_DENEME):
+        self.en_fazla_sayfa = en_fazla_sayfa
+        self.onden = max(1, onden)
+        self.tazelik = timedelta(hours=tazelik_saat)
+        self.en_fazla_deneme = en_fazla_deneme
+        self._gonderilenler = set()               # bu çalıştırmada değerlendirilen URL'ler (tekrar işçiye gitmez)
+        self._gorulen_ilanlar = defaultdict(set)  # ilçe -> sayfalarda görülen ilan URL'leri
+        self._bitenler = set()                    # sayfalaması sona eren ilçeler
+        self.taze_atlanan = 0
+        self.hatali_atlanan = 0
+
+    @staticmethod
+    def _ilce(hedef):
+        return (hedef.kaynak, hedef.sehir, hedef.ilce)
+
+    def seeds(self, kaynaklar, sehir, ilceler):
+        """Her kaynak ve ilçe için ilk `onden` sayfanın hedefleri (kaynaklar her sayfada dönüşümlü)."""
+        return [Hedef(sehir, ilce, sayfa, kaynak) for ilce in ilceler
+                for sayfa in range(1, min(self.onden, self.en_fazla_sayfa) + 1) for kaynak in kaynaklar]
+
+    def pending(self, kaynaklar, sehir, ilceler):
+        """Verilen ilçelerde önceki çalıştırmalardan kalan (bekleyen veya yeniden denenecek) sayfalar."""
+        sayfalar = TaramaSayfasi.objects.filter(
+            durum__in=[TaramaSayfasi.BEKLIYOR, TaramaSayfasi.HATALI], kaynak__in=kaynaklar, sehir=sehir,
+            ilce__in=ilceler, sayfa__lte=self.en_fazla_sayfa,
+        ).order_by('sayfa', 'ilce', 'kaynak').values_list('sehir', 'ilce', 'sayfa', 'kaynak')
+        return [Hedef(*satir) for satir in sayfalar]
+
+    def _kaydet(self, hedefler):
+        urller = {hedef_url(h): h for h in hedefler}
+        TaramaSayfasi.objects.bulk_create(
+            [TaramaSayfasi(url=url, kaynak=h.kaynak, sehir=h.sehir, ilce=h.ilce, sayfa=h.sayfa) for url, h in urller.items()],
+            ignore_conflicts=True,
+        )
+        return {s.url: s for s in TaramaSayfasi.objects.filter(url__in=list(urller))}
+
+    def _ileri(self, hedef):
+        sayfa = hedef.sayfa + self.onden
+        if sayfa > self.en_fazla_sayfa or self._ilce(hedef) in self._bitenler:
+            return []
+        return [hedef._replace(sayfa=sayfa)]
+
+    def kesfet(self, hedefler):
+        """
+        Hedefleri sınıra kaydeder ve bu çalıştırmada taranacak olanları döndürür.
+        Bu çalıştırmada zaten değerlendirilmiş URL'ler, taze sayfalar ve deneme hakkı biten sayfalar elenir;
+        taze bir sayfa kart getirmişse sayfalama onun ardından sürer.
+        """
+        taranacaklar = []
+        sinir = timezone.now() - self.tazelik
+        hedefler = list(hedefler)
+        while hedefler:
+            kayitlar = self._kaydet(hedefler)
+            sonrakiler = []
+            for hedef in hedefler:
+                url = hedef_url(hedef)
+                if url in self._gonderilenler:
+                    continue
+                self._gonderilenler.add(url)
+                kayit = kayitlar[url]
+                taze = kayit.son_cekme is not None and kayit.son_cekme >= sinir
+                if taze and kayit.durum == TaramaSayfasi.TAMAMLANDI:
+                    self.taze_atlanan += 1
+                    if kayit.kart_sayisi:
+                        sonrakiler.extend(self._ileri(hedef))
+                    continue
+                if taze and kayit.durum == TaramaSayfasi.HATALI and kayit.deneme >= self.en_fazla_deneme:
+                    self.hatali_atlanan += 1
+                    continue
+                taranacaklar.append(hedef)
+            hedefler = sonrakiler
+        return taranacaklar
+
+    def bitti(self, hedef, kartlar, hata=None):
+        """
+        Sayfanın sonucunu yazar ve sayfalamada sıradaki taranacak hedefleri döndürür. Sayfa yeni ilan
+        içeriyorsa sıradaki sayfa keşfedilir; içermiyorsa (son sayfa geçildi) ilçenin sayfalaması biter.
+        """
+        sayfalar = TaramaSayfasi.objects.filter(url=hedef_url(hedef))
+        if hata:
+            sayfalar.update(durum=TaramaSayfasi.HATALI, deneme=F('deneme') + 1, son_cekme=timezone.now(), hata=hata)
+            return []
+        sayfalar.update(durum=TaramaSayfasi.TAMAMLANDI, deneme=0, kart_sayisi=len(kartlar),
+                        son_cekme=timezone.now(), hata=None)
+
+        ilce = self._ilce(hedef)
+        yeni = {kart['ilan_url'] for kart in kartlar} - self._gorulen_ilanlar[ilce]
+        if not yeni:
+            self._bitenler.add(ilce)
+            return []
+        self._gorulen_ilanlar[ilce] |= yeni
+        return self.kesfet(self._ileri(hedef))
+
+    def durum_ozeti(self, kaynaklar, sehir, ilceler):
+        """Verilen ilçelerdeki sayfaların durumlara göre sayısı."""
+        sayilar = dict.fromkeys(dict(TaramaSayfasi.DURUM_SECENEKLERI), 0)
+        sayilar.update(TaramaSayfasi.objects.filter(kaynak__in=kaynaklar, sehir=sehir, ilce__in=ilceler)
+                       .order_by().values_list('durum').annotate(adet=Count('id')))
+        return sayilar
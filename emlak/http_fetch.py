@@ -0,0 +1,159 @@
+# emlak/http_fetch.py
+
+"""
+Tarayıcısız (Selenium'suz) çekme motoru.
+
+Emlakjet listeleme sayfaları sunucu tarafında Next.js ile oluşturuluyor; ilan verisi
+sayfanın içine gömülü JSON olarak zaten geliyor. Bu modül sayfayı havuzlu bir HTTP
+oturumuyla indirir ve ilanları doğrudan bu JSON'dan çıkarır:
+- Eski "pages" yönlendiricisi: <script id="__NEXT_DATA__"> içindeki JSON
+- Yeni "app" yönlendiricisi: self.__next_f.push([1, "..."]) parçaları (RSC verisi)
+
+Veri bulunamazsa (ör. bot koruma sayfası) None döner; çağıran Selenium yoluna düşer.
+
+requests yalnızca create_session() çağrıldığında import edilir; kayıtlı sayfalardan gömülü veriyi
+ayrıştırmak (yeniden ayrıştırma, kira_tara --from-file) onu yüklemez.
+"""
+
+import json
+import re
+from datetime import date
+
+from emlak import locations, telemetry
+from emlak.parsing import EMLAKJET_BASE_URL, USER_AGENT, parse_price
+
+HTTP_ZAMAN_ASIMI = 15
+HAVUZ_BOYUTU = 10
+
+_NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+_NEXT_F_RE = re.compile(r'self\.__next_f\.push\((\[.*?\])\)</script>', re.S)
+_LISTING_CARD_ANAHTARI = '"listingCard":'
+
+_json_decoder = json.JSONDecoder()
+
+
+def create_session(havuz_boyutu=HAVUZ_BOYUTU):
+    """Bağlantıları yeniden kullanan, geçici hatalarda tekrar deneyen bir HTTP oturumu oluşturur."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml',
+        'Accept-Language': 'tr-TR,tr;q=0.9',
+    })
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=havuz_boyutu, pool_maxsize=havuz_boyutu, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def fetch_html(session, url, zaman_asimi=HTTP_ZAMAN_ASIMI):
+    """Sayfayı indirir ve HTML metnini döndürür."""
+    with telemetry.olc('http_indirme'):
+        response = session.get(url, timeout=zaman_asimi)
+    response.raise_for_status()
+    return response.text
+
+
+def _find_key(obj, anahtar):
+    """İç içe sözlük/listelerde verilen anahtarın ilk değerini arar."""
+    if isinstance(obj, dict):
+        if anahtar in obj:
+            return obj[anahtar]
+        degerler = obj.values()
+    elif isinstance(obj, list):
+        degerler = obj
+    else:
+        return None
+    for deger in degerler:
+        bulunan = _find_key(deger, anahtar)
+        if bulunan is not None:
+            return bulunan
+    return None
+
+
+def extract_listing_records(html_content):
+    """
+    Sayfaya gömülü Next.js verisinden ilan kayıtlarını (listingCard.records) çıkarır.
+    Veri yoksa None döndürür.
+    """
+    eslesme = _NEXT_DATA_RE.search(html_content)
+    if eslesme:
+        listing_card = _find_key(json.loads(eslesme.group(1)), 'listingCard')
+        if isinstance(listing_card, dict):
+            return listing_card.get('records')
+
+    # App Router: RSC parçalarını birleştirip listingCard nesnesini bul
+    rsc_metni = []
+    for parca in _NEXT_F_RE.findall(html_content):
+        try:
+            tip, *veri = json.loads(parca)
+        except ValueError:
+            continue
+        if tip == 1 and veri and isinstance(veri[0], str):
+            rsc_metni.append(veri[0])
+    rsc_metni = ''.join(rsc_metni)
+
+    konum = rsc_metni.find(_LISTING_CARD_ANAHTARI)
+    if konum < 0:
+        return None
+    try:
+        listing_card, _ = _json_decoder.raw_decode(rsc_metni, konum + len(_LISTING_CARD_ANAHTARI))
+    except ValueError:
+        return None
+    return listing_card.get('records') if isinstance(listing_card, dict) else None
+
+
+def record_to_card(kayit):
+    """Bir Next.js ilan kaydını Selenium yolunun ürettiği kart sözlüğüne dönüştürür."""
+    url = kayit.get('url')
+    fiyat_detayi = kayit.get('priceDetail') or {}
+    fiyat = fiyat_detayi.get('tlPrice') or fiyat_detayi.get('price')
+    location_str = kayit.get('locationSummary') or (kayit.get('location') or {}).get('summary') or ''
+    sehir, ilce, mahalle = locations.resolve_location(location_str)
+
+    return {
+        'ilan_url': EMLAKJET_BASE_URL + url if url else None,
+        'fiyat': parse_price(str(fiyat)) if fiyat is not None else None,
+        'metrekare': kayit.get('squareMeter'),
+        'oda_sayisi': kayit.get('roomCountName'),
+        'sehir': sehir,
+        'ilce': ilce,
+        'mahalle': mahalle,
+        'ilan_kaynagi': 'Emlakjet',
+        'ilan_tarihi': date.today(), # Selenium yolu ile aynı: şimdilik veri çekme tarihi
+    }
+
+
+def extract_cards_from_payload(html_content):
+    """
+    Gömülü Next.js verisindeki ilanları kart listesine çevirir.
+    Veri bulunamazsa None döndürür (çağıran Selenium yoluna düşmeli).
+    """
+    with telemetry.olc('gomulu_veri_ayristirma'):
+        kayitlar = extract_listing_records(html_content)
+    if kayitlar is None:
+        telemetry.say('gomulu_veri_yok')
+        return None
+
+    kartlar = []
+    for i, kayit in enumerate(kayitlar):
+        with telemetry.olc('kart_cikarma'):
+            kart = record_to_card(kayit)
+        if not kart['ilan_url']:
+            print(f"Uyarı: {i+1}. ilan için URL bulunamadı, atlanıyor.")
+            telemetry.say('atlanan_url_yok')
+            continue
+        if not kart['fiyat']:
+            print(f"Uyarı: {i+1}. ilan için fiyat ayrıştırılamadı, atlanıyor.")
+            telemetry.say('atlanan_fiyat_yok')
+            continue
+        kartlar.append(kart)
+    telemetry.say('kart_bulunan', len(kayitlar))
+    telemetry.say('kart_gecerli', len(kartlar))
+    print(f"Gömülü Next.js verisinden {len(kartlar)} ilan çıkarıldı.")
+    return kartlar
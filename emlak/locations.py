@@ -0,0 +1,215 @@
+# emlak/locations.py
+
+"""
+Konum metinlerini gazetteer (ilçe/mahalle sözlüğü) ile Bolge anahtarlarına çözer.
+
+Gazetteer emlak/data/istanbul_konumlar.csv dosyasından bir kez okunur: İstanbul'un 39 ilçesinin merkezi ve
+ilan sitelerinde en sık geçen mahalleler, yaklaşık merkez koordinatlarıyla. Mahalle satırı boş olan satır ilçenin
+merkezidir. Dosya eksiktir: İstanbul'un yaklaşık 960 mahallesinden yalnızca 120'si vardır ve 11 ilçenin (Bayrampaşa,
+Çatalca, Esenler, Esenyurt, Gaziosmanpaşa, Güngören, Sancaktepe, Silivri, Sultanbeyli, Sultangazi, Şile) hiç mahalle
+satırı yoktur. Listede olmayan mahalleler ilçe merkezinin koordinatını alır; locate() bunu ayrıca bildirir ve
+bolge_koordinatlari komutu ilçe merkezine düşen bölgeleri listeler. Mekânsal sorgularda (emlak.spatial) bu bölgelerin
+ilanları ilçe merkezinde toplanmış sayılır; küçük yarıçaplı sonuçlar buna göre yorumlanmalıdır.
+
+İsimler Türkçe kurallarına göre küçültülüp ASCII'ye indirgenmiş anahtarlarla (fold_tr) eşleştirilir;
+'KADIKÖY', 'kadıköy' ve 'Kadikoy' aynı ilçeye, 'Acıbadem Mah.' ve 'Acıbadem Mahallesi' aynı mahalleye düşer.
+
+resolve_location() ham konum metnini (ör. 'Kadıköy - Acıbadem Mahallesi') (sehir, ilce, mahalle)
+anahtarına çevirir; sonuçlar LRU önbellekte tutulur, bir sayfadaki kartların çoğu aynı birkaç
+metni paylaştığı için tekrar eden metinlerde hiç ayrıştırma yapılmaz. Gazetteer'da bulunamayan
+metinler eski sezgisel ayrıştırıcıya (parsing.parse_location) düşer.
+
+Anahtarın Bolge id'sine çevrilmesi emlak.persistence'tadır (çalıştırma başında önceden yüklenen
+bölge önbelleği). Bu modül Django'yu import etmez; işçi süreçlerde de kullanılır.
+"""
+
+import csv
+import os
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+GAZETTEER_DOSYASI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'istanbul_konumlar.csv')
+SEHIR = 'İstanbul'
+LRU_BOYUTU = 4096
+
+_TR_KUCUK = str.maketrans({'I': 'ı', 'İ': 'i'})
+_TR_ASCII = str.maketrans('çğıöşü', 'cgiosu')
+# Tire yalnızca iki yanında boşluk varsa ayırıcıdır; 'Büyükada-Nizam' gibi adlar tek parça kalır
+_AYIRICI_RE = re.compile(r'\s*[,/|]\s*|\s+[-–]\s+')
+_TIRE_RE = re.compile(r'\s*[-–]\s*')
+_MAHALLE_EKI_RE = re.compile(r'\s+(?:Mahallesi|Mahalle|Mah\.?|Mh\.?)$', re.IGNORECASE)
+_ANAHTAR_DISI_RE = re.compile(r'[^a-z0-9 ]+')
+_ANAHTAR_EKI_RE = re.compile(r' (?:mahallesi|mahalle|mah|mh)$')
+_KOORDINAT = Decimal('0.000001')
+
+
+def fold_tr(metin):
+    """Türkçe kurallarına göre küçültür ve ASCII'ye indirger: 'İSTANBUL' -> 'istanbul', 'Işıklar' -> 'isiklar'."""
+    metin = metin.translate(_TR_KUCUK).lower().translate(_TR_ASCII)
+    return ' '.join(_ANAHTAR_DISI_RE.sub(' ', metin).split())
+
+
+_SEHIR_ANAHTARI = fold_tr(SEHIR)
+
+
+def _anahtar(metin):
+    """Eşleştirme anahtarı: katlanmış metin, sondaki 'Mahallesi'/'Mah.' eki olmadan."""
+    return _ANAHTAR_EKI_RE.sub('', fold_tr(metin))
+
+
+def _mahalle_temizle(metin):
+    metin = ' '.join(metin.split())
+    return _MAHALLE_EKI_RE.sub('', metin).strip() or None
+
+
+class Gazetteer:
+    """Bellekteki ilçe/mahalle dizini: katlanmış adlardan kanonik adlara ve koordinatlara."""
+
+    def __init__(self, satirlar):
+        self.ilceler = {}       # ilçe anahtarı -> kanonik ilçe adı
+        self.mahalleler = {}    # ilçe anahtarı -> {mahalle anahtarı: kanonik mahalle adı}
+        self.mahalle_ilceleri = {}  # mahalle anahtarı -> bu adda mahallesi olan ilçe anahtarları
+        self.koordinatlar = {}  # (ilçe anahtarı, mahalle anahtarı veya None) -> (enlem, boylam)
+        for ilce, mahalle, enlem, boylam in satirlar:
+            ilce_anahtari = _anahtar(ilce)
+            self.ilceler.setdefault(ilce_anahtari, ilce)
+            self.mahalleler.setdefault(ilce_anahtari, {})
+            mahalle_anahtari = None
+            if mahalle:
+                mahalle_anahtari = _anahtar(mahalle)
+                self.mahalleler[ilce_anahtari][mahalle_anahtari] = mahalle
+                self.mahalle_ilceleri.setdefault(mahalle_anahtari, set()).add(ilce_anahtari)
+            if enlem and boylam:
+                self.koordinatlar[(ilce_anahtari, mahalle_anahtari)] = (
+                    Decimal(enlem).quantize(_KOORDINAT), Decimal(boylam).quantize(_KOORDINAT))
+
+    @classmethod
+    def from_csv(cls, dosya_yolu=GAZETTEER_DOSYASI):
+        with open(dosya_yolu, encoding='utf-8', newline='') as f:
+            okuyucu = csv.DictReader(f)
+            return cls([(s['ilce'], s['mahalle'], s['enlem'], s['boylam']) for s in okuyucu])
+
+    def canonical(self, ilce, mahalle=None):
+        """
+        İlçe ve mahalleyi kanonik yazımlarına getirir: (ilce, mahalle).
+        İlçe bilinmiyorsa None; mahalle bilinmiyorsa yalnızca eki temizlenmiş haliyle döner.
+        """
+        ilce_anahtari = _anahtar(ilce) if ilce else None
+        if ilce_anahtari not in self.ilceler:
+            return None
+        if mahalle:
+            mahalle = self.mahalleler[ilce_anahtari].get(_anahtar(mahalle)) or _mahalle_temizle(mahalle)
+        return self.ilceler[ilce_anahtari], mahalle or None
+
+    def _bilinen(self, anahtar):
+        return anahtar in self.ilceler or anahtar in self.mahalle_ilceleri
+
+    def _parcalar(self, konum_metni):
+        """
+        Metni ilçe/mahalle parçalarına ayırır. Boşluksuz tireli bir parça ('Kadıköy-Moda') bütün olarak bilinen
+        bir ad değilse tirelerden de bölünür. Şehir adı olan parçalar ('İstanbul') atılır.
+        """
+        parcalar = []
+        for parca in _AYIRICI_RE.split(konum_metni.strip()):
+            if _TIRE_RE.search(parca) and not self._bilinen(_anahtar(parca)):
+                parcalar.extend(_TIRE_RE.split(parca))
+            else:
+                parcalar.append(parca)
+        return [p for p in parcalar if p and _anahtar(p) != _SEHIR_ANAHTARI]
+
+    def match(self, konum_metni):
+        """
+        'İlçe - Mahalle', 'Mahalle, İlçe', 'İlçe Mahalle Mahallesi' veya yalnızca (tek ilçede bulunan)
+        mahalle adı içeren metni (ilce, mahalle) olarak çözer; çözülemezse None döndürür.
+        """
+        parcalar = self._parcalar(konum_metni)
+        anahtarlar = [_anahtar(p) for p in parcalar]
+
+        for i, anahtar in enumerate(anahtarlar):
+            if anahtar in self.ilceler:
+                digerleri = [p for j, p in enumerate(parcalar) if j != i]
+                mahalleler = self.mahalleler[anahtar]
+                # Bilinen mahalle varsa o, yoksa kalan ilk parça mahalle kabul edilir
+                mahalle = next((p for p in digerleri if _anahtar(p) in mahalleler), digerleri[0] if digerleri else None)
+                return self.canonical(anahtar, mahalle)
+
+        # Ayırıcısız 'Kadıköy Caferağa Mahallesi': ilk kelime ilçe, kalanı mahalle
+        if len(parcalar) == 1:
+            ilk, _, kalan = parcalar[0].partition(' ')
+            if _anahtar(ilk) in self.ilceler:
+                return self.canonical(ilk, kalan or None)
+
+        # Yalnızca mahalle adı: tek bir ilçede varsa o ilçeye bağlanır
+        for parca, anahtar in zip(parcalar, anahtarlar):
+            ilceler = self.mahalle_ilceleri.get(anahtar)
+            if ilceler and len(ilceler) == 1:
+                return self.canonical(next(iter(ilceler)), parca)
+        return None
+
+    def locate(self, ilce, mahalle=None):
+        """
+        ((enlem, boylam), mahalle_duzeyinde) döndürür: mahalle gazetteer'da varsa onun koordinatı ve True,
+        yoksa ilçe merkezinin koordinatı ve False. İlçe bilinmiyorsa None.
+        """
+        ilce_anahtari = _anahtar(ilce) if ilce else None
+        if mahalle:
+            koordinat = self.koordinatlar.get((ilce_anahtari, _anahtar(mahalle)))
+            if koordinat:
+                return koordinat, True
+        koordinat = self.koordinatlar.get((ilce_anahtari, None))
+        return (koordinat, False) if koordinat else None
+
+    def coordinates(self, ilce, mahalle=None):
+        """Mahallenin, mahalle bilinmiyorsa ilçe merkezinin (enlem, boylam) değerini döndürür; ilçe bilinmiyorsa None."""
+        konum = self.locate(ilce, mahalle)
+        return konum[0] if konum else None
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer():
+    """Paketle gelen gazetteer'ı ilk kullanımda bir kez yükler."""
+    return Gazetteer.from_csv()
+
+
+def _istanbul_mu(sehir):
+    return not sehir or fold_tr(sehir) == fold_tr(SEHIR)
+
+
+@lru_cache(maxsize=LRU_BOYUTU)
+def resolve_location(konum_metni):
+    """
+    Ham konum metnini (sehir, ilce, mahalle) anahtarına çevirir (LRU önbellekli).
+    Metin boşsa ilçe None döner (kart eksik veri nedeniyle atlanır).
+    """
+    if not konum_metni or not konum_metni.strip():
+        return SEHIR, None, None
+    eslesme = get_gazetteer().match(konum_metni)
+    if eslesme is not None:
+        return (SEHIR, *eslesme)
+    from emlak.parsing import parse_location  # parsing bu modülü import ediyor
+    return parse_location(konum_metni)
+
+
+@lru_cache(maxsize=LRU_BOYUTU)
+def canonicalize(sehir, ilce, mahalle=None):
+    """Ayrı alanlar olarak gelen konumu (ör. başka bir kaynaktan) kanonik yazımına getirir; bilinmiyorsa olduğu gibi bırakır."""
+    if not _istanbul_mu(sehir):
+        return sehir, ilce, mahalle
+    kanonik = get_gazetteer().canonical(ilce, mahalle)
+    if kanonik is None:
+        return sehir, ilce, mahalle
+    return (SEHIR, *kanonik)
+
+
+def locate(sehir, ilce, mahalle=None):
+    """Bölgenin gazetteer'daki ((enlem, boylam), mahalle_duzeyinde) değeri; bilinmiyorsa None (bkz. Gazetteer.locate)."""
+    if not _istanbul_mu(sehir):
+        return None
+    return get_gazetteer().locate(ilce, mahalle)
+
+
+def coordinates(sehir, ilce, mahalle=None):
+    """Bölgenin gazetteer'daki (enlem, boylam) değeri; bilinmiyorsa None."""
+    konum = locate(sehir, ilce, mahalle)
+    return konum[0] if konum else None
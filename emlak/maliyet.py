@@ -0,0 +1,166 @@
+# emlak/maliyet.py
+
+"""
+maliyet_hesapla komutunun toplu (şehir geneli) modu için bölge raporları.
+
+Tek bölge modunda her bölge için ayrı sorgular atılıyordu; burada tüm bölgeler birkaç gruplu
+sorguyla hesaplanır:
+    1. bölgeler (id, şehir, ilçe, mahalle),
+    2. aylık özetlerden bölge başına ilan sayısı ve fiyat toplamı,
+    3. son 90 günün günlük özetlerinden bölge-ay başına ilan sayısı ve fiyat toplamı,
+    4. günlük özetlerden bölge başına son dönem ve referans dönemi toplamları (uyarı için).
+İlçe seviyesindeki raporlar bu bölge satırlarının Python'da toplanmasıyla elde edilir.
+Sayılar tek bölge modundakiyle aynı formülle (fiyat toplamı / ilan sayısı) hesaplanır.
+Aynı fonksiyon JSON API'de ve maliyet_hesapla'nın tek bölge modunda da kullanılır (bkz. emlak/views.py).
+
+Uyarı, son SON_DONEM_GUN günün ortalamasını bundan önceki REFERANS_DONEM_GUN günün ortalamasıyla
+karşılaştırır (bkz. referans_donemi); son dönem referansa katılmadığı için artış kendi kendisiyle
+kıyaslanmaz. İlçe seviyesinde iki ortalama da ilçenin bütün bölgelerinin özetlerinden hesaplanır.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from emlak.models import Bolge, BolgeOzeti
+
+SEVIYE_MAHALLE = 'mahalle'
+SEVIYE_ILCE = 'ilce'
+SEVIYELER = (SEVIYE_MAHALLE, SEVIYE_ILCE)
+
+UYARI_FAHIS = 'fahis'
+UYARI_ARTIS = 'artis'
+UYARI_NORMAL = 'normal'
+
+# Son dönem ortalamasının referans ortalamaya göre uyarı eşikleri
+FAHIS_CARPANI = Decimal('1.20')
+ARTIS_CARPANI = Decimal('1.10')
+
+SON_DONEM_GUN = 90
+REFERANS_DONEM_GUN = 365
+
+
+def uyari_seviyesi(ortalama_kira, referans_kira):
+    """Son dönemin ortalama kirasını referans ortalamayla karşılaştırıp uyarı seviyesini döndürür."""
+    if ortalama_kira is None or not referans_kira:
+        return UYARI_NORMAL
+    if ortalama_kira > referans_kira * FAHIS_CARPANI:
+        return UYARI_FAHIS
+    if ortalama_kira > referans_kira * ARTIS_CARPANI:
+        return UYARI_ARTIS
+    return UYARI_NORMAL
+
+
+def son_donem_baslangici(gun=SON_DONEM_GUN):
+    return (timezone.now() - timedelta(days=gun)).date()
+
+
+def referans_donemi():
+    """Uyarı referansının [başlangıç, bitiş) aralığı: son dönemden hemen önceki REFERANS_DONEM_GUN gün."""
+    bitis = son_donem_baslangici()
+    return bitis - timedelta(days=REFERANS_DONEM_GUN), bitis
+
+
+def _ortalama(toplam, adet):
+    return toplam / adet if adet else None
+
+
+def _bos_toplam():
+    return {'adet': 0, 'toplam': Decimal(0), 'm2_toplam': Decimal(0), 'm2_adet': 0}
+
+
+def _topla(hedef, satir):
+    hedef['adet'] += satir['adet']
+    hedef['toplam'] += satir['toplam']
+    hedef['m2_toplam'] += satir['m2_toplam'] or 0
+    hedef['m2_adet'] += satir['m2_adet'] or 0
+
+
+def region_reports(sehir=None, seviye=SEVIYE_MAHALLE, ilce=None, mahalle=None, gun=SON_DONEM_GUN):
+    """
+    Tüm bölgeler (veya `sehir`/`ilce`/`mahalle` filtresine uyanlar) için rapor satırlarını döndürür.
+    `seviye` 'mahalle' ise her Bolge kaydı, 'ilce' ise her (şehir, ilçe) için bir satır üretilir.
+    Her satır: sehir, ilce, mahalle, ilan_sayisi, ortalama_kira, ortalama_m2_fiyati, son_donem_kira
+    (son SON_DONEM_GUN gün), referans_kira (bkz. referans_donemi), uyari ve son `gun` günün aylık serisi
+    aylik [{'ay': 'YYYY-MM', 'ilan_sayisi', 'ortalama_kira', 'ortalama_m2_fiyati'}].
+    İlanı olmayan bölgeler atlanır.
+    """
+    bolgeler = Bolge.objects.all()
+    ozetler = BolgeOzeti.objects.all()
+    for alan, deger in (('sehir', sehir), ('ilce', ilce), ('mahalle', mahalle)):
+        if deger:
+            bolgeler = bolgeler.filter(**{f'{alan}__iexact': deger})
+            ozetler = ozetler.filter(**{f'bolge__{alan}__iexact': deger})
+
+    gruplar = {}
+    grup_anahtari = {}
+    for bolge_id, b_sehir, b_ilce, b_mahalle in bolgeler.order_by('pk').values_list('id', 'sehir', 'ilce', 'mahalle'):
+        anahtar = (b_sehir, b_ilce, b_mahalle if seviye == SEVIYE_MAHALLE else None)
+        grup_anahtari[bolge_id] = anahtar
+        gruplar.setdefault(anahtar, {'toplam': _bos_toplam(), 'aylar': defaultdict(_bos_toplam),
+                                     'son_donem': [0, Decimal(0)], 'referans': [0, Decimal(0)]})
+
+    # m² fiyatı kova ortalamalarının ilan sayısıyla ağırlıklı ortalaması
+    toplamlar = dict(
+        adet=Sum('ilan_sayisi'),
+        toplam=Sum('fiyat_toplami'),
+        m2_toplam=Sum(F('ortalama_m2_fiyati') * F('ilan_sayisi')),
+        m2_adet=Sum('ilan_sayisi', filter=Q(ortalama_m2_fiyati__isnull=False)),
+    )
+    for satir in ozetler.filter(donem=BolgeOzeti.AYLIK).values('bolge').annotate(**toplamlar).order_by():
+        _topla(gruplar[grup_anahtari[satir['bolge']]]['toplam'], satir)
+
+    for satir in ozetler.filter(
+        donem=BolgeOzeti.GUNLUK, donem_baslangici__gte=son_donem_baslangici(gun)
+    ).annotate(ay=TruncMonth('donem_baslangici')).values('bolge', 'ay').annotate(**toplamlar).order_by():
+        _topla(gruplar[grup_anahtari[satir['bolge']]]['aylar'][satir['ay']], satir)
+
+    referans_baslangici, son_donem = referans_donemi()
+    for satir in ozetler.filter(donem=BolgeOzeti.GUNLUK, donem_baslangici__gte=referans_baslangici).values(
+        'bolge'
+    ).annotate(
+        son_adet=Sum('ilan_sayisi', filter=Q(donem_baslangici__gte=son_donem)),
+        son_toplam=Sum('fiyat_toplami', filter=Q(donem_baslangici__gte=son_donem)),
+        referans_adet=Sum('ilan_sayisi', filter=Q(donem_baslangici__lt=son_donem)),
+        referans_toplam=Sum('fiyat_toplami', filter=Q(donem_baslangici__lt=son_donem)),
+    ).order_by():
+        grup = gruplar[grup_anahtari[satir['bolge']]]
+        for anahtar, onek in (('son_donem', 'son'), ('referans', 'referans')):
+            grup[anahtar][0] += satir[f'{onek}_adet'] or 0
+            grup[anahtar][1] += satir[f'{onek}_toplam'] or 0
+
+    raporlar = []
+    for (g_sehir, g_ilce, g_mahalle), grup in gruplar.items():
+        toplam = grup['toplam']
+        if not toplam['adet']:
+            continue
+        ortalama_kira = toplam['toplam'] / toplam['adet']
+        son_donem_kira = _ortalama(grup['son_donem'][1], grup['son_donem'][0])
+        referans_kira = _ortalama(grup['referans'][1], grup['referans'][0])
+        raporlar.append({
+            'sehir': g_sehir,
+            'ilce': g_ilce,
+            'mahalle': g_mahalle,
+            'ilan_sayisi': toplam['adet'],
+            'ortalama_kira': ortalama_kira,
+            'ortalama_m2_fiyati': _ortalama(toplam['m2_toplam'], toplam['m2_adet']),
+            'aylik': [
+                {
+                    'ay': ay.strftime('%Y-%m'),
+                    'ilan_sayisi': ay_toplami['adet'],
+                    'ortalama_kira': ay_toplami['toplam'] / ay_toplami['adet'],
+                    'ortalama_m2_fiyati': _ortalama(ay_toplami['m2_toplam'], ay_toplami['m2_adet']),
+                }
+                for ay, ay_toplami in sorted(grup['aylar'].items())
+            ],
+            'son_donem_kira': son_donem_kira,
+            'referans_kira': referans_kira,
+            'uyari': uyari_seviyesi(son_donem_kira, referans_kira),
+        })
+    raporlar.sort(key=lambda r: (r['sehir'], r['ilce'], r['mahalle'] or ''))
+    return raporlar
+
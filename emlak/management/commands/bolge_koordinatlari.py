@@ -0,0 +1,54 @@
+# emlak/management/commands/bolge_koordinatlari.py
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from emlak import locations
+from emlak.models import Bolge
+
+
+class Command(BaseCommand):
+    help = ('Bölgelerin enlem/boylam alanlarını paketle gelen gazetteer\'dan (emlak/data/istanbul_konumlar.csv) '
+            'doldurur; mahallesi gazetteer\'da olmayan bölgeler ilçe merkezini alır ve bunlar ilçe ilçe raporlanır '
+            '(-v 2 ile tek tek listelenir).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hepsi', action='store_true',
+                            help='Koordinatı dolu bölgeleri de gazetteer değeriyle yeniden yaz')
+
+    def handle(self, *args, **options):
+        # Taramaların oluşturduğu yeni bölgeler koordinatlarıyla gelir; bu komut mevcut bölgeler için.
+        # Rapor her seferinde tüm bölgeleri kapsar, yazma yalnızca koordinatsızlara (--hepsi ile hepsine) yapılır.
+        bolgeler = Bolge.objects.only('id', 'sehir', 'ilce', 'mahalle', 'latitude', 'longitude').order_by('ilce', 'mahalle')
+
+        guncellenecekler = []
+        bulunamayan = 0
+        ilce_merkezine_dusen = defaultdict(list)  # ilçe -> koordinatı ilçe merkezi olan mahalle bölgeleri
+        for bolge in bolgeler.iterator():
+            konum = locations.locate(bolge.sehir, bolge.ilce, bolge.mahalle)
+            if konum is None:
+                bulunamayan += 1
+                continue
+            koordinat, mahalle_duzeyinde = konum
+            if bolge.mahalle and not mahalle_duzeyinde:
+                ilce_merkezine_dusen[bolge.ilce].append(bolge.mahalle)
+            if bolge.latitude is not None and not options['hepsi']:
+                continue
+            if (bolge.latitude, bolge.longitude) != koordinat:
+                bolge.latitude, bolge.longitude = koordinat
+                guncellenecekler.append(bolge)
+        Bolge.objects.bulk_update(guncellenecekler, ['latitude', 'longitude'], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f"{len(guncellenecekler)} bölgenin koordinatı yazıldı."))
+        if ilce_merkezine_dusen:
+            toplam = sum(map(len, ilce_merkezine_dusen.values()))
+            self.stdout.write(self.style.WARNING(
+                f"{toplam} mahalle gazetteer'da yok, ilçe merkezinin koordinatını kullanıyor "
+                f"(mekânsal sorgularda ilçe merkezinde sayılır):"))
+            for ilce, mahalleler in ilce_merkezine_dusen.items():
+                satir = f"  {ilce}: {len(mahalleler)} mahalle"
+                if options['verbosity'] >= 2:
+                    satir += f" ({', '.join(mahalleler)})"
+                self.stdout.write(satir)
+        if bulunamayan:
+            self.stdout.write(self.style.WARNING(f"{bulunamayan} bölgenin ilçesi gazetteer'da yok, koordinatsız kaldı."))
@@ -0,0 +1,30 @@
+# emlak/management/commands/bolge_ozeti_yenile.py
+
+from django.core.management.base import BaseCommand
+from emlak.models import Bolge
+from emlak.rollup import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Bölge özetlerini (günlük/aylık kira istatistikleri) ilan tablosundan baştan oluşturur.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sehir', type=str, default=None, help='Opsiyonel: Yalnızca bu şehrin bölgeleri (örn: İstanbul)')
+        parser.add_argument('--ilce', type=str, default=None, help='Opsiyonel: Yalnızca bu ilçenin bölgeleri (örn: Kadıköy)')
+
+    def handle(self, *args, **options):
+        # Taramalar özetleri zaten artımlı güncelliyor; bu komut ilk kurulum ve elle silinen ilanlar için
+        bolge_idleri = None
+        if options['sehir'] or options['ilce']:
+            bolgeler = Bolge.objects.all()
+            if options['sehir']:
+                bolgeler = bolgeler.filter(sehir__iexact=options['sehir'])
+            if options['ilce']:
+                bolgeler = bolgeler.filter(ilce__iexact=options['ilce'])
+            bolge_idleri = list(bolgeler.values_list('id', flat=True))
+            if not bolge_idleri:
+                self.stdout.write(self.style.WARNING("Belirtilen filtreye uyan bölge bulunamadı."))
+                return
+
+        yazilan = rebuild_all(bolge_idleri)
+        self.stdout.write(self.style.SUCCESS(f"{yazilan} bölge özeti satırı yeniden oluşturuldu."))
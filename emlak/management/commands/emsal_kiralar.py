@@ -0,0 +1,92 @@
+# emlak/management/commands/emsal_kiralar.py
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from emlak import locations, spatial
+from emlak.models import KiraIlani
+
+
+class Command(BaseCommand):
+    help = ('Bir noktanın, bölgenin veya ilanın çevresindeki (R km) benzer m² ve oda sayısındaki emsal kiraları '
+            'bellek içi mekânsal indeksle bulur.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enlem', type=float, default=None, help='Merkez noktanın enlemi')
+        parser.add_argument('--boylam', type=float, default=None, help='Merkez noktanın boylamı')
+        parser.add_argument('--ilce', type=str, default=None, help='Merkez: ilçe (gazetteer koordinatı)')
+        parser.add_argument('--mahalle', type=str, default=None, help='Merkez: ilçedeki mahalle')
+        parser.add_argument('--ilan', type=int, default=None,
+                            help='Merkez: bu ilanın bölgesi; m² ve oda sayısı verilmezse ilandan alınır')
+        parser.add_argument('--yaricap', type=float, default=spatial.VARSAYILAN_YARICAP_KM, help='Yarıçap (km)')
+        parser.add_argument('--metrekare', type=int, default=None, help='Hedef metrekare')
+        parser.add_argument('--tolerans', type=float, default=spatial.VARSAYILAN_M2_TOLERANSI,
+                            help='Metrekare toleransı (oran, örn: 0.15 = ±%%15)')
+        parser.add_argument('--oda', type=str, default=None, help='Oda sayısı (örn: 2+1)')
+        parser.add_argument('--limit', type=int, default=spatial.VARSAYILAN_LIMIT, help='En fazla emsal sayısı')
+        parser.add_argument('--gun', type=int, default=None, help='Opsiyonel: Yalnızca son N günün ilanları')
+        parser.add_argument('--goster', type=int, default=10, help='Listelenecek en yakın emsal sayısı')
+        parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yaz')
+
+    def _merkez(self, options):
+        metrekare, oda, haric = options['metrekare'], options['oda'], ()
+        if options['ilan'] is not None:
+            try:
+                ilan = KiraIlani.objects.select_related('bolge').get(pk=options['ilan'])
+            except KiraIlani.DoesNotExist:
+                raise CommandError(f"{options['ilan']} numaralı ilan bulunamadı.")
+            if ilan.bolge.latitude is None:
+                raise CommandError(f"{ilan.bolge} bölgesinin koordinatı yok (bkz. bolge_koordinatlari komutu).")
+            return ((float(ilan.bolge.latitude), float(ilan.bolge.longitude)),
+                    metrekare or ilan.metrekare, oda or ilan.oda_sayisi, (ilan.pk,))
+        if options['enlem'] is not None and options['boylam'] is not None:
+            return (options['enlem'], options['boylam']), metrekare, oda, haric
+        if options['ilce']:
+            konum = locations.locate(locations.SEHIR, options['ilce'], options['mahalle'])
+            if konum is None:
+                raise CommandError(f"'{options['ilce']}' ilçesi gazetteer'da bulunamadı.")
+            koordinat, mahalle_duzeyinde = konum
+            if options['mahalle'] and not mahalle_duzeyinde:
+                self.stderr.write(f"'{options['mahalle']}' mahallesi gazetteer'da yok; merkez olarak "
+                                  f"{options['ilce']} ilçe merkezi kullanılıyor.")
+            return tuple(map(float, koordinat)), metrekare, oda, haric
+        raise CommandError('Merkez için --enlem/--boylam, --ilce [--mahalle] veya --ilan verilmeli.')
+
+    def handle(self, *args, **options):
+        (enlem, boylam), metrekare, oda, haric = self._merkez(options)
+        oda = oda.replace(' ', '') if oda else None  # '2 + 1' -> '2+1' (kayıtlı biçim)
+        baslangic = time.perf_counter()
+        indeks = spatial.build_index(gun=options['gun'])
+        kurulum = time.perf_counter() - baslangic
+
+        baslangic = time.perf_counter()
+        emsaller = indeks.comparables(enlem, boylam, yaricap_km=options['yaricap'], metrekare=metrekare,
+                                      oda_sayisi=oda, m2_toleransi=options['tolerans'], limit=options['limit'],
+                                      haric=haric)
+        sorgu = time.perf_counter() - baslangic
+        ozet = spatial.summarize(emsaller)
+
+        gosterilecek = emsaller[:options['goster']]
+        urller = KiraIlani.objects.only('ilan_url').in_bulk([e.ilan_id for e in gosterilecek]) if gosterilecek else {}
+        if options['json']:
+            veri = {
+                'merkez': {'enlem': enlem, 'boylam': boylam, 'yaricap_km': options['yaricap'],
+                           'metrekare': metrekare, 'oda_sayisi': oda},
+                'ozet': ozet,
+                'emsaller': [dict(e._asdict(), ilan_url=urller[e.ilan_id].ilan_url) for e in gosterilecek],
+            }
+            self.stdout.write(json.dumps(veri, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(f"İndeks: {len(indeks.bolgeler)} bölge, {indeks.ilan_sayisi} ilan ({kurulum:.2f} sn); "
+                          f"sorgu {sorgu * 1000:.2f} ms.")
+        if not emsaller:
+            self.stdout.write(self.style.WARNING('Bu ölçütlere uyan emsal ilan bulunamadı.'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{ozet['ilan_sayisi']} emsal ({ozet['en_uzak_km']:.2f} km içinde): medyan kira {ozet['medyan_kira']:.0f}, "
+            f"Q1-Q3 {ozet['q1_kira']:.0f}-{ozet['q3_kira']:.0f}, medyan m² fiyatı {ozet['medyan_m2_fiyati']:.2f}"))
+        for e in gosterilecek:
+            self.stdout.write(f"  {e.mesafe_km:>6.2f} km  {e.fiyat:>10.0f}  {e.metrekare:>4} m²  {e.oda_sayisi or '-':<6} "
+                              f"{urller[e.ilan_id].ilan_url}")
@@ -0,0 +1,53 @@
+# emlak/management/commands/ilan_bolumleri.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from emlak import admin_tools, partitioning, rollup
+
+
+class Command(BaseCommand):
+    help = ('Aylık bölümlenmiş ilan tablosunun bakımı (bkz. emlak/partitioning.py): önümüzdeki ayların bölümlerini '
+            'oluşturur, varsayılan bölüme düşen satırları ay bölümlerine taşır; --arsivle ile saklama süresi dolan '
+            'ayları sıkıştırılmış dosyalara arşivleyip tablodan çıkarır. Cron ile günlük çalıştırılabilir.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--onden', type=int, default=settings.ILAN_BOLUMU_ONDEN_AY,
+                            help='Bu aydan sonra kaç ayın bölümü önceden oluşturulsun')
+        parser.add_argument('--saklama-ay', type=int, default=settings.ILAN_SAKLAMA_AY,
+                            help='İlan tarihi bu kadar aydan eski aylar arşivlenir (0: arşivleme yok)')
+        parser.add_argument('--arsiv', type=str, default=str(settings.ILAN_ARSIVI_DIZINI), help='Arşiv dizini')
+        parser.add_argument('--arsivle', action='store_true',
+                            help='Saklama süresi dolan ayları arşivle (verilmezse yalnızca listelenir)')
+
+    def handle(self, *args, **options):
+        if options['onden'] < 0 or options['saklama_ay'] < 0:
+            raise CommandError('--onden ve --saklama-ay negatif olamaz.')
+        if not partitioning.is_partitioned():
+            self.stdout.write(self.style.WARNING(
+                'İlan tablosu bölümlü değil (PostgreSQL ve migrations/0011 gerekli); yapılacak bakım yok.'))
+            return
+
+        for ay, tasinan in partitioning.ensure_partitions(options['onden'], options['saklama_ay']):
+            self.stdout.write(f"{partitioning.bolum_adi(ay)} oluşturuldu"
+                              + (f"; varsayılan bölümden {tasinan} ilan taşındı." if tasinan else "."))
+
+        sureli = partitioning.expired_months(options['saklama_ay'])
+        if sureli and not options['arsivle']:
+            self.stdout.write(self.style.WARNING(
+                f"Saklama süresi ({options['saklama_ay']} ay) dolan {len(sureli)} ay var: "
+                f"{', '.join(f'{ay:%Y-%m}' for ay in sureli)}. Arşivlemek için --arsivle ile çalıştırın."))
+        elif sureli:
+            kopyalar = set()
+            for kayit, ay_kopyalari in partitioning.archive_expired(options['saklama_ay'], options['arsiv']):
+                kopyalar |= ay_kopyalari
+                self.stdout.write(f"{kayit.ay:%Y-%m} arşivlendi: {kayit.ilan_sayisi} ilan, "
+                                  f"{kayit.fiyat_gozlemi_sayisi} fiyat gözlemi -> {kayit.ilan_dosyasi}")
+            # Asıl ilanı arşivlenen kopyalar artık ortalamalara katılır
+            if kopyalar:
+                self.stdout.write(f"{rollup.refresh_buckets(kopyalar)} bölge özeti satırı yenilendi "
+                                  f"({len(kopyalar)} kopya kovası).")
+            admin_tools.refresh_filter_choices()
+
+        self.stdout.write(f"\n{'bölüm':<32} {'başlangıç':>10} {'bitiş':>10} {'tahmini ilan':>13}")
+        for ad, baslangic, bitis, tahmin in partitioning.list_partitions():
+            self.stdout.write(f"{ad:<32} {str(baslangic or '-'):>10} {str(bitis or '-'):>10} {tahmin:>13}")
@@ -0,0 +1,39 @@
+# emlak/management/commands/ilan_detaylari.py
+
+from django.core.management.base import BaseCommand
+from emlak import enrichment, sources
+from emlak.scheduler import VARSAYILAN_ESZAMANLI, VARSAYILAN_MIN_ARALIK
+
+
+class Command(BaseCommand):
+    help = ('Bina yaşı, eşya durumu, ısınma tipi ve açıklaması eksik (veya fiyatı/içeriği değişmiş) ilanların '
+            'detay sayfalarını sınırlı bir thread havuzuyla çekip bu alanları doldurur.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='En fazla bu kadar ilan işle')
+        parser.add_argument('--isci', type=int, default=enrichment.VARSAYILAN_ISCI, help='Eşzamanlı thread sayısı')
+        parser.add_argument('--min-aralik', type=float, default=VARSAYILAN_MIN_ARALIK,
+                            help='Aynı siteye iki istek arasındaki en az süre (saniye)')
+        parser.add_argument('--eszamanli', type=int, default=VARSAYILAN_ESZAMANLI,
+                            help='Aynı siteye aynı anda yapılabilecek en fazla istek')
+        parser.add_argument('--kaynak', action='append',
+                            choices=[k for k in sources.available_sources() if sources.get_source(k).detay_sayfasi],
+                            help='Yalnızca bu kaynağın ilanları; birden fazla kez verilebilir')
+        parser.add_argument('--kuyruk', action='store_true', help='Yalnızca kuyruk derinliğini göster')
+
+    def handle(self, *args, **options):
+        if options['kuyruk']:
+            durum = enrichment.status()
+            self.stdout.write(f"Kuyrukta {durum['kuyruk']} ilan; son bir saatte {durum['son_saat_islenen']} "
+                              f"detay sayfası işlendi.")
+            return
+        ozet = enrichment.enrich(limit=options['limit'], isci_sayisi=options['isci'],
+                                 min_aralik=options['min_aralik'], eszamanli=options['eszamanli'],
+                                 kaynaklar=[sources.get_source(k).ad for k in options['kaynak']] if options['kaynak'] else None)
+        if not ozet['islenen']:
+            self.stdout.write(self.style.WARNING('Detay sayfası çekilecek ilan yok.'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{ozet['islenen']} ilan işlendi: {ozet['zenginlesen']} zenginleştirildi, {ozet['bos']} sayfada alan "
+            f"bulunamadı, {ozet['hatali']} hatalı; {ozet['sure_sn']} sn, {ozet['sayfa_dakika']} sayfa/dakika. "
+            f"Kuyrukta {max(ozet['kuyruk'] - ozet['islenen'], 0)} ilan kaldı."))
@@ -0,0 +1,62 @@
+# emlak/management/commands/ilan_disa_aktar.py
+
+import argparse
+import sys
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from emlak.export import BICIM_CSV, PARCA_BOYUTU, available_formats, export_chunks, export_queryset
+
+
+def _tarih(deger):
+    try:
+        return date.fromisoformat(deger)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Geçersiz tarih: {deger} (YYYY-AA-GG bekleniyor)")
+
+
+class Command(BaseCommand):
+    help = 'Kira ilanlarını (bölge bilgisiyle) CSV, NDJSON veya Parquet olarak akış halinde dışa aktarır.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bicim', choices=available_formats(), default=BICIM_CSV, help='Çıktı biçimi')
+        parser.add_argument('--dosya', type=str, default=None,
+                            help='Çıktı dosyası (varsayılan: standart çıktı)')
+        parser.add_argument('--sehir', type=str, default=None, help='Opsiyonel: Şehir filtresi')
+        parser.add_argument('--ilce', type=str, default=None, help='Opsiyonel: İlçe filtresi')
+        parser.add_argument('--mahalle', type=str, default=None, help='Opsiyonel: Mahalle filtresi')
+        parser.add_argument('--baslangic', type=_tarih, default=None, help='Opsiyonel: En erken ilan tarihi (YYYY-AA-GG)')
+        parser.add_argument('--bitis', type=_tarih, default=None, help='Opsiyonel: En geç ilan tarihi (YYYY-AA-GG)')
+        parser.add_argument('--kaynak', type=str, default=None, help='Opsiyonel: İlan kaynağı (örn: Emlakjet)')
+        parser.add_argument('--parca', type=int, default=PARCA_BOYUTU,
+                            help='Veritabanından tek seferde okunacak satır sayısı')
+
+    def handle(self, *args, **options):
+        ilanlar = export_queryset(
+            sehir=options['sehir'],
+            ilce=options['ilce'],
+            mahalle=options['mahalle'],
+            baslangic=options['baslangic'],
+            bitis=options['bitis'],
+            kaynak=options['kaynak'],
+        )
+
+        baslangic = time.perf_counter()
+        # Parçalar doğrudan dosyaya yazılır; tablo hiçbir zaman bütünüyle bellekte tutulmaz
+        hedef = open(options['dosya'], 'wb') if options['dosya'] else sys.stdout.buffer
+        yazilan = 0
+        try:
+            for parca in export_chunks(ilanlar, options['bicim'], parca_boyutu=options['parca']):
+                hedef.write(parca)
+                yazilan += len(parca)
+        finally:
+            if options['dosya']:
+                hedef.close()
+            else:
+                hedef.flush()
+
+        if options['dosya']:
+            sure = time.perf_counter() - baslangic
+            self.stdout.write(self.style.SUCCESS(
+                f"{options['dosya']} dosyasına {yazilan / 1024 / 1024:.1f} MB yazıldı ({sure:.1f} sn)."))
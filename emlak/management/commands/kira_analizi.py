@@ -0,0 +1,90 @@
+# emlak/management/commands/kira_analizi.py
+
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from emlak.analytics import rent_statistics
+from emlak.maliyet import SEVIYELER, SEVIYE_MAHALLE
+
+CIKTI_BICIMLERI = ('tablo', 'csv', 'json')
+ISTATISTIK_SUTUNLARI = ['sehir', 'ilce', 'mahalle', 'oda_sayisi', 'ilan_sayisi', 'medyan_kira', 'q1_kira', 'q3_kira',
+                        'iqr', 'medyan_m2_fiyati', 'p10_m2_fiyati', 'p90_m2_fiyati', 'aykiri_sayisi']
+
+
+def _metin(deger):
+    return '-' if deger is None else f'{deger:.2f}' if isinstance(deger, float) else str(deger)
+
+
+class Command(BaseCommand):
+    help = ('Bölgelerin kira medyanı, çeyrekler açıklığı (IQR), m² fiyatı dağılımı ve MAD tabanlı '
+            'aykırı ilan sayılarını hesaplar (numpy gerekir).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sehir', type=str, default=None, help='Opsiyonel: Şehir filtresi (örn: İstanbul)')
+        parser.add_argument('--ilce', type=str, default=None, help='Opsiyonel: İlçe filtresi')
+        parser.add_argument('--mahalle', type=str, default=None, help='Opsiyonel: Mahalle filtresi')
+        parser.add_argument('--seviye', choices=SEVIYELER, default=SEVIYE_MAHALLE,
+                            help="Gruplama seviyesi: her bölge kaydı ('mahalle') veya her ilçe ('ilce')")
+        parser.add_argument('--oda', action='store_true', help='Grupları oda sayısına göre de ayır')
+        parser.add_argument('--gun', type=int, default=None, help='Opsiyonel: Yalnızca son N günün ilanları')
+        parser.add_argument('--aykiri', type=int, default=0,
+                            help='En aykırı N ilanı da listele (m² fiyatının değiştirilmiş z-skoruna göre)')
+        parser.add_argument('--cikti', choices=CIKTI_BICIMLERI, default='tablo', help='Çıktı biçimi')
+        parser.add_argument('--dosya', type=str, default=None, help='Çıktının yazılacağı dosya (varsayılan: ekrana)')
+
+    def handle(self, *args, **options):
+        baslangic = time.perf_counter()
+        try:
+            istatistikler, aykiri_ilanlar = rent_statistics(
+                sehir=options['sehir'], ilce=options['ilce'], mahalle=options['mahalle'],
+                seviye=options['seviye'], gun=options['gun'], oda_bazinda=options['oda'],
+                aykiri_limiti=options['aykiri'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        sure = time.perf_counter() - baslangic
+
+        if not istatistikler:
+            self.stdout.write(self.style.WARNING('Filtreye uyan kira ilanı bulunamadı.'))
+            return
+
+        hedef = open(options['dosya'], 'w', encoding='utf-8', newline='') if options['dosya'] else self.stdout
+        try:
+            if options['cikti'] == 'json':
+                veri = {'bolgeler': istatistikler, 'aykiri_ilanlar': aykiri_ilanlar}
+                hedef.write(json.dumps(veri, ensure_ascii=False, indent=2) + '\n')
+            elif options['cikti'] == 'csv':
+                yazici = csv.writer(hedef)
+                yazici.writerow(ISTATISTIK_SUTUNLARI)
+                for satir in istatistikler:
+                    yazici.writerow(['' if satir[s] is None else satir[s] for s in ISTATISTIK_SUTUNLARI])
+            else:
+                self._tablo(hedef, istatistikler, aykiri_ilanlar)
+        finally:
+            if options['dosya']:
+                hedef.close()
+
+        ilan_sayisi = sum(satir['ilan_sayisi'] for satir in istatistikler)
+        self.stdout.write(self.style.SUCCESS(
+            f"{ilan_sayisi} ilan, {len(istatistikler)} grup {sure:.2f} sn'de analiz edildi."
+            + (f" Çıktı {options['dosya']} dosyasına yazıldı." if options['dosya'] else '')))
+        if aykiri_ilanlar and options['cikti'] == 'csv':
+            self.stdout.write(self.style.NOTICE('Aykırı ilan listesi yalnızca tablo ve json çıktısında yazılır.'))
+
+    def _tablo(self, hedef, istatistikler, aykiri_ilanlar):
+        hedef.write(f"{'Şehir':<15} {'İlçe':<18} {'Mahalle':<24} {'Oda':<6} {'İlan':>6} {'Medyan':>11} "
+                    f"{'IQR':>11} {'m² P10':>9} {'m² Medyan':>10} {'m² P90':>9} {'Aykırı':>7}\n")
+        for s in istatistikler:
+            hedef.write(f"{s['sehir']:<15} {s['ilce']:<18} {s['mahalle'] or '-':<24} {s['oda_sayisi'] or '-':<6} "
+                        f"{s['ilan_sayisi']:>6} {_metin(s['medyan_kira']):>11} {_metin(s['iqr']):>11} "
+                        f"{_metin(s['p10_m2_fiyati']):>9} {_metin(s['medyan_m2_fiyati']):>10} "
+                        f"{_metin(s['p90_m2_fiyati']):>9} {s['aykiri_sayisi']:>7}\n")
+        if aykiri_ilanlar:
+            hedef.write("\nEn aykırı ilanlar (m² fiyatı, değiştirilmiş z-skoru):\n")
+            for a in aykiri_ilanlar:
+                konum = ', '.join(p for p in (a['mahalle'], a['ilce'], a['sehir']) if p)
+                hedef.write(f"  #{a['ilan_id']:<8} {konum:<45} {_metin(a['fiyat']):>12} TL {a['metrekare']:>5} m² "
+                            f"{_metin(a['m2_fiyati']):>9} TL/m² (grup medyanı {_metin(a['grup_medyan_m2_fiyati'])}) "
+                            f"z={_metin(a['z_skoru'])}\n")
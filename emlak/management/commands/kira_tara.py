@@ -0,0 +1,177 @@
+# emlak/management/commands/kira_tara.py
+
+"""
+Kiralık konut ilanlarını bir veya birden fazla siteden (bkz. emlak/sources.py) çeker ve veritabanına kaydeder.
+
+Örnekler:
+    python manage.py kira_tara                                    # Emlakjet, İstanbul / Kadıköy, 1. sayfa
+    python manage.py kira_tara --ilce Kadıköy --ilce Beşiktaş --sayfa 3 --isci 4
+    python manage.py kira_tara --motor http --sayfa 5             # Tarayıcısız, gömülü Next.js verisinden
+    python manage.py kira_tara --kaynak emlakjet --kaynak <diğer> # Kaynaklar aynı işçi havuzunda eşzamanlı taranır
+    python manage.py kira_tara --sayfa 200 --isci 4 --tazelik 24  # Uzun tarama; yarıda kesilirse kaldığı yerden sürer
+    python manage.py kira_tara --from-file sayfa.html --dry-run   # Kayıtlı HTML'i tarayıcısız ayrıştır, yazma
+
+Sayfalar kalıcı URL sınırından (bkz. emlak/frontier.py) geçer: sonraki sayfa yalnızca önceki sayfa yeni
+ilan getirdiyse taranır, son --tazelik saat içinde çekilmiş sayfalar atlanır. Taranacak sayfa yoksa
+işçi süreçler ve Chrome hiç başlatılmaz.
+
+Çekilen her sayfa sıkıştırılmış sayfa arşivine (bkz. emlak/archive.py, settings.SAYFA_ARSIVI_DIZINI)
+yazılır; ayrıştırıcı düzeltildiğinde `python manage.py yeniden_ayristir` veritabanını arşivden yeniden kurar.
+
+Komutun yüklenmesi Selenium, requests ve BeautifulSoup'u import etmez; bunlar yalnızca işçiler bir
+sayfayı gerçekten çektiğinde (veya kayıtlı HTML ayrıştırılırken gereken arka uç) yüklenir.
+"""
+
+import functools
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from emlak import admin_tools, run_history, sources
+from emlak.frontier import Frontier, VARSAYILAN_TAZELIK_SAAT
+from emlak.persistence import preload_bolgeler, save_cards
+from emlak.scheduler import hedef_url, run_targets, VARSAYILAN_MIN_ARALIK, VARSAYILAN_ESZAMANLI
+
+
+class Command(BaseCommand):
+    help = ('Kiralık konut ilanlarını seçilen sitelerden çeker ve kaydeder; --from-file ile kayıtlı HTML '
+            'sayfalarını tarayıcı başlatmadan ayrıştırır.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sehir', type=str, default='İstanbul', help='Taranacak şehir (örn: İstanbul)')
+        parser.add_argument('--ilce', type=str, action='append',
+                            help='Taranacak ilçe; birden fazla kez verilebilir (varsayılan: Kadıköy)')
+        parser.add_argument('--sayfa', type=int, default=1,
+                            help='Her ilçe için taranacak en fazla sayfa; yeni ilan gelmeyen sayfada ilçe sona erer')
+        parser.add_argument('--onden', type=int, default=None,
+                            help='Her ilçede aynı anda taranacak ardışık sayfa sayısı (varsayılan: işçi sayısı)')
+        parser.add_argument('--tazelik', type=float, default=VARSAYILAN_TAZELIK_SAAT,
+                            help='Son bu kadar saat içinde çekilmiş sayfaları yeniden çekme (0: hepsini çek)')
+        parser.add_argument('--kaynak', choices=sources.available_sources(), action='append',
+                            help='Taranacak ilan sitesi; birden fazla kez verilebilir (varsayılan: emlakjet)')
+        parser.add_argument('--isci', type=int, default=1, help='Paralel çalışacak headless Chrome işçi sayısı')
+        parser.add_argument('--min-aralik', type=float, default=VARSAYILAN_MIN_ARALIK,
+                            help='Aynı host\'a yapılan iki istek arasındaki en kısa süre (saniye)')
+        parser.add_argument('--eszamanli', type=int, default=VARSAYILAN_ESZAMANLI,
+                            help='Aynı host\'a aynı anda yapılabilecek en fazla istek sayısı')
+        parser.add_argument('--motor', choices=sources.MOTORLAR, default=sources.MOTOR_SELENIUM,
+                            help="Çekme motoru: 'selenium' (headless Chrome) veya 'http' (gömülü Next.js verisi, "
+                                 "veri yoksa Selenium'a düşer)")
+        parser.add_argument('--artimli', action='store_true',
+                            help='İçerik özeti değişmemiş ilanları veritabanına yeniden yazma')
+        parser.add_argument('--durdur-sayfa', type=int, default=None,
+                            help='Artımlı modda, bir ilçede art arda bu kadar sayfa değişiklik içermezse '
+                                 'o ilçenin kalan sayfalarını tarama')
+        parser.add_argument('--arsiv', type=str, default=str(settings.SAYFA_ARSIVI_DIZINI),
+                            help='Çekilen sayfaların yazılacağı sayfa arşivi dizini')
+        parser.add_argument('--arsivsiz', action='store_true', help='Çekilen sayfaları arşivleme')
+        parser.add_argument('--engellemesiz', action='store_true',
+                            help="Selenium'da görsel, font ve izleyicileri engelleme (sayfa yükünü karşılaştırmak için)")
+        parser.add_argument('--from-file', dest='dosyalar', metavar='DOSYA', action='append',
+                            help='Siteye gitmek yerine bu kayıtlı HTML sayfasını ayrıştır (--kaynak adaptörüyle); '
+                                 'birden fazla kez verilebilir')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Veritabanına yazma: --from-file ile kartları listeler, aksi halde taranacak '
+                                 'sayfaları gösterir')
+
+    def handle(self, *args, **options):
+        if options['durdur_sayfa'] and not options['artimli']:
+            raise CommandError('--durdur-sayfa yalnızca --artimli ile kullanılabilir.')
+        kaynaklar = options['kaynak'] or ['emlakjet']
+        if options['dosyalar']:
+            return self.dosyalardan(options['dosyalar'], kaynaklar, options)
+
+        ilceler = options['ilce'] or ['Kadıköy']
+        takip = Frontier(en_fazla_sayfa=options['sayfa'], onden=options['onden'] or options['isci'],
+                         tazelik_saat=options['tazelik'])
+        # Önceki (yarıda kesilmiş) çalıştırmaların bu ilçelerde bekleyen sayfaları yeni tohumlarla birlikte taranır
+        bekleyenler = takip.pending(kaynaklar, options['sehir'], ilceler)
+        hedefler = takip.seeds(kaynaklar, options['sehir'], ilceler) + bekleyenler
+        self.stdout.write(
+            f"{len(ilceler)} ilçe x {len(kaynaklar)} kaynak ({', '.join(kaynaklar)}), ilçe başına en fazla "
+            f"{options['sayfa']} sayfa, {options['isci']} işçi; önceki çalıştırmalardan {len(bekleyenler)} "
+            f"bekleyen sayfa.")
+        if options['dry_run']:
+            # Sınıra da yazılmaz; tazelik elemesi ve sayfalamanın keşfedeceği sayfalar burada görünmez
+            for hedef in dict.fromkeys(hedefler):
+                self.stdout.write(f"  {hedef_url(hedef)}")
+            return
+
+        arsiv = None if options['arsivsiz'] else options['arsiv']
+        # Çalıştırma ve aşama süreleri TaramaCalismasi'na yazılır (bkz. tarama_gecmisi komutu)
+        calisma = run_history.start_run({
+            'sehir': options['sehir'], 'ilceler': ilceler, 'sayfa': options['sayfa'], 'kaynaklar': kaynaklar,
+            'isci': options['isci'], 'motor': options['motor'], 'artimli': options['artimli'],
+            'durdur_sayfa': options['durdur_sayfa'], 'tazelik': options['tazelik'], 'arsiv': arsiv,
+            'kaynak_engelleme': not options['engellemesiz'],
+        })
+        # Bilinen bölgelerin kartları çalıştırma boyunca bölge sorgusu atmadan çözülür
+        self.stdout.write(f"{preload_bolgeler()} bölge önbelleğe alındı.")
+        kaydet = functools.partial(save_cards, artimli=options['artimli'])
+        try:
+            ozet = run_targets(hedefler, kaydet, isci_sayisi=options['isci'],
+                               min_aralik=options['min_aralik'], eszamanli=options['eszamanli'],
+                               motor=options['motor'], durdurma_esigi=options['durdur_sayfa'], takip=takip,
+                               arsiv=arsiv, kaynak_engelleme=not options['engellemesiz'])
+        except BaseException as e:
+            run_history.finish_run(calisma, hata=repr(e))
+            raise
+        run_history.finish_run(calisma, ozet)
+        # Yeni şehir/ilçe/kaynaklar admin filtrelerinde hemen görünsün
+        admin_tools.refresh_filter_choices()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tarama tamamlandı: {ozet['sayfa']} sayfa ({ozet['hatali_sayfa']} hatalı, "
+            f"{ozet['erken_durdurulan_sayfa']} erken durdurma, {ozet['taze_atlanan_sayfa']} tazelik nedeniyle "
+            f"atlandı), {ozet['kart']} kart, {ozet['sure_sn']} sn, {ozet['sayfa_dakika']} sayfa/dakika."))
+        if len(kaynaklar) > 1:
+            self.stdout.write("Kaynaklara göre kart: " + ', '.join(
+                f"{k}: {n}" for k, n in ozet['kaynak_kartlari'].items()))
+        sayaclar = ozet['telemetri']['sayaclar']
+        if sayaclar.get('ag_istegi') and ozet['sayfa']:
+            self.stdout.write(
+                f"Tarayıcı sayfa başına ortalama {sayaclar['aktarilan_bayt'] / ozet['sayfa'] / 1024:.0f} KB aktardı; "
+                f"{sayaclar['ag_istegi']} istekten {sayaclar.get('engellenen_istek', 0)} engellendi.")
+        self.veritabani_ozeti(ozet)
+        en_yavas = run_history.slowest_stages(calisma, limit=3)
+        if en_yavas:
+            self.stdout.write(f"En uzun süren aşamalar (çalıştırma {calisma.id}): " + ', '.join(
+                f"{ad} {asama['toplam_sn']:.1f} sn (%{pay * 100:.0f})" for ad, asama, pay in en_yavas))
+
+    def dosyalardan(self, dosyalar, kaynaklar, options):
+        """Kayıtlı sayfaları ilk kaynağın adaptörüyle ayrıştırır; --dry-run değilse kartları kaydeder."""
+        if len(kaynaklar) > 1:
+            raise CommandError('--from-file ile yalnızca bir --kaynak verilebilir.')
+        adaptor = sources.get_source(kaynaklar[0])
+        kartlar = []
+        for dosya in dosyalar:
+            try:
+                with open(dosya, encoding='utf-8') as f:
+                    sayfa = f.read()
+            except OSError as e:
+                raise CommandError(f"{dosya} okunamadı: {e}")
+            # HTTP motoru gömülü veriyi dener, yoksa HTML kartlarına düşer; Selenium sayfalarında da çalışır
+            dosya_kartlari = adaptor.parse_cards(sayfa, sources.MOTOR_HTTP)
+            self.stdout.write(f"{dosya}: {len(dosya_kartlari)} kart")
+            kartlar.extend(dosya_kartlari)
+
+        if options['dry_run']:
+            for kart in kartlar:
+                self.stdout.write(f"  {kart.get('fiyat')} TL  {kart.get('metrekare')} m²  {kart.get('oda_sayisi')}  "
+                                  f"{kart.get('mahalle')}, {kart.get('ilce')}, {kart.get('sehir')}  {kart.get('ilan_url')}")
+            return
+        if not kartlar:
+            self.stdout.write(self.style.WARNING('Kaydedilecek kart yok.'))
+            return
+        preload_bolgeler()
+        ozet = save_cards(kartlar, artimli=options['artimli'])
+        admin_tools.refresh_filter_choices()
+        self.veritabani_ozeti(ozet)
+
+    def veritabani_ozeti(self, ozet):
+        self.stdout.write(
+            f"Veritabanı: {ozet.get('eklenen', 0)} yeni, {ozet.get('guncellenen', 0)} değişen, "
+            f"{ozet.get('degismeyen', 0)} değişmeyen (atlandı) ilan, {ozet.get('fiyat_gozlemi', 0)} fiyat gözlemi; "
+            f"{ozet.get('atlanan', 0)} kart eksik veri nedeniyle atlandı, "
+            f"{ozet.get('yeni_bolge', 0)} yeni bölge oluşturuldu, "
+            f"{ozet.get('bolge_ozeti', 0)} bölge özeti satırı yenilendi.")
@@ -0,0 +1,53 @@
+# emlak/management/commands/kopya_ilanlari_esle.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from emlak import dedup, rollup
+from emlak.models import KiraIlani
+
+
+class Command(BaseCommand):
+    help = ('Tüm ilanların kopya anahtarlarını yazar ve kaynaklar arası kopyaları yeniden eşleştirir; '
+            'bağlantısı değişen bölgelerin özetlerini yeniler.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--parca', type=int, default=2000, help='Tek seferde işlenecek ilan sayısı')
+
+    def handle(self, *args, **options):
+        # Taramalar yazdıkları ilanları zaten eşleştiriyor; bu komut mevcut veriler ve eşik değişiklikleri için
+        parca = options['parca']
+        sinirlar = KiraIlani.objects.aggregate(ilk=Min('id'), son=Max('id'), adet=Count('id'))
+        if not sinirlar['adet']:
+            self.stdout.write(self.style.WARNING("Veritabanında ilan yok."))
+            return
+        araliklar = [(ilk, ilk + parca - 1) for ilk in range(sinirlar['ilk'], sinirlar['son'] + 1, parca)]
+
+        # 1. Kopya anahtarları: eşleştirme adayları bu anahtarlarla bulunduğu için önce hepsi yazılır
+        anahtar_yazilan = 0
+        for ilk, son in araliklar:
+            ilanlar = []
+            for ilan_id, bolge_id, oda_sayisi, metrekare, anahtar in KiraIlani.objects.filter(
+                id__gte=ilk, id__lte=son
+            ).order_by().values_list('id', 'bolge_id', 'oda_sayisi', 'metrekare', 'kopya_anahtari'):
+                yeni_anahtar = dedup.duplicate_key(bolge_id, oda_sayisi, metrekare)
+                if yeni_anahtar != anahtar:
+                    ilanlar.append(KiraIlani(pk=ilan_id, kopya_anahtari=yeni_anahtar))
+            KiraIlani.objects.bulk_update(ilanlar, ['kopya_anahtari'], batch_size=500)
+            anahtar_yazilan += len(ilanlar)
+
+        # 2. Eşleştirme; id sırasıyla ilerlendiği için her ilan kendinden eski ilanlara bağlanır
+        dokunulan_gunler = set()
+        for ilk, son in araliklar:
+            with transaction.atomic():
+                dokunulan_gunler |= dedup.mark_duplicates(KiraIlani.objects.filter(id__gte=ilk, id__lte=son))
+
+        # Özet yenileme sorgusu makul boyutta kalsın diye kovalar parça parça yenilenir
+        dokunulan_gunler = sorted(dokunulan_gunler)
+        bolge_ozeti = sum(rollup.refresh_buckets(dokunulan_gunler[i:i + 500])
+                          for i in range(0, len(dokunulan_gunler), 500))
+        kopya_sayisi = KiraIlani.objects.filter(asil_ilan__isnull=False).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"{sinirlar['adet']} ilan işlendi: {anahtar_yazilan} kopya anahtarı yazıldı, "
+            f"{len(dokunulan_gunler)} ilan-gününde bağlantı değişti, toplam {kopya_sayisi} ilan kopya olarak işaretli; "
+            f"{bolge_ozeti} bölge özeti satırı yenilendi."))
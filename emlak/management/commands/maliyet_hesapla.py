@@ -1,24 +1,45 @@
 # emlak/management/commands/maliyet_hesapla.py
 
-from django.core.management.base import BaseCommand
-from emlak.models import KiraIlani, Bolge
-from django.db.models import Avg, Count
+from django.core.management.base import BaseCommand, CommandError
+from emlak.models import Bolge, BolgeOzeti
+from emlak.maliyet import (region_reports, son_donem_baslangici, SEVIYELER, SEVIYE_ILCE, SEVIYE_MAHALLE,
+                           SON_DONEM_GUN, UYARI_FAHIS, UYARI_ARTIS, UYARI_NORMAL)
+from django.db.models import Sum
 from django.db.models.functions import TruncMonth
-from datetime import timedelta
-from django.utils import timezone
+import csv
+import json
 import traceback # Hata ayıklama için ekledik
 
+CIKTI_BICIMLERI = ('tablo', 'csv', 'json')
+
 class Command(BaseCommand):
-    help = 'Belirli bir bölge (ilçe veya mahalle) için kira maliyet analizi yapar.'
+    help = ('Belirli bir bölge (ilçe veya mahalle) için kira maliyet analizi yapar. '
+            'Yalnızca --sehir veya --tumu verilirse tüm bölgeleri toplu olarak raporlar.')
 
     def add_arguments(self, parser):
         # Tüm argümanları anahtarlı yapıyoruz
-        parser.add_argument('--sehir', type=str, required=True, help='Analiz edilecek şehrin adı (örn: İstanbul)')
-        parser.add_argument('--ilce', type=str, required=True, help='Analiz edilecek ilçenin adı (örn: Kadıköy)')
+        parser.add_argument('--sehir', type=str, default=None, help='Analiz edilecek şehrin adı (örn: İstanbul)')
+        parser.add_argument('--ilce', type=str, default=None, help='Analiz edilecek ilçenin adı (örn: Kadıköy)')
         parser.add_argument('--mahalle', type=str, default=None,
                             help='Opsiyonel: Analiz edilecek mahallenin adı (örn: Caddebostan)')
+        # Toplu mod seçenekleri
+        parser.add_argument('--tumu', '--all', action='store_true', dest='tumu',
+                            help='Tüm şehirlerdeki bütün bölgeleri toplu olarak analiz et')
+        parser.add_argument('--seviye', choices=SEVIYELER, default=SEVIYE_MAHALLE,
+                            help="Toplu modda rapor seviyesi: her bölge kaydı ('mahalle') veya her ilçe ('ilce')")
+        parser.add_argument('--cikti', choices=CIKTI_BICIMLERI, default='tablo',
+                            help='Toplu modda çıktı biçimi')
+        parser.add_argument('--dosya', type=str, default=None,
+                            help='Toplu mod çıktısının yazılacağı dosya (varsayılan: ekrana)')
 
     def handle(self, *args, **options):
+        if options['tumu'] or (options['sehir'] and not options['ilce']):
+            if options['mahalle']:
+                raise CommandError('--mahalle yalnızca --ilce ile birlikte kullanılabilir.')
+            return self._toplu_analiz(None if options['tumu'] else options['sehir'], options)
+        if not options['sehir'] or not options['ilce']:
+            raise CommandError('Tek bölge analizi için --sehir ve --ilce gerekli; toplu analiz için --tumu veya yalnızca --sehir verin.')
+
         # Argümanlara options sözlüğü üzerinden erişim
         sehir_adi = options['sehir']
         ilce_adi = options['ilce']
@@ -44,41 +65,54 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.NOTICE("Lütfen önce Bolge modelinize ilgili kayıtları eklediğinizden veya scraping ile oluştuğundan emin olun."))
                 return
 
-            kira_ilanlari = KiraIlani.objects.filter(bolge__in=ilgili_bolgeler)
+            # İlanların kendisi yerine taramalardan sonra güncellenen bölge özetlerini okuyoruz
+            ozetler = BolgeOzeti.objects.filter(bolge__in=ilgili_bolgeler)
+            toplamlar = ozetler.filter(donem=BolgeOzeti.AYLIK).aggregate(
+                ilan_sayisi=Sum('ilan_sayisi'), fiyat_toplami=Sum('fiyat_toplami')
+            )
 
-            if not kira_ilanlari.exists():
+            if not toplamlar['ilan_sayisi']:
                 self.stdout.write(self.style.WARNING(f"Belirtilen bölge için (Şehir: {sehir_adi}, İlçe: {ilce_adi}, Mahalle: {mahalle_adi or 'Tümü'}) veritabanında kira ilanı bulunamadı."))
                 self.stdout.write(self.style.NOTICE("Lütfen veri çektiğinizden ve ilanların doğru bölgelerle ilişkilendirildiğinden emin olun."))
+                self.stdout.write(self.style.NOTICE("İlanlar varsa bölge özetlerini 'python manage.py bolge_ozeti_yenile' ile oluşturabilirsiniz."))
                 return
 
-            ortalama_kira = kira_ilanlari.aggregate(Avg('fiyat'))['fiyat__avg']
+            ortalama_kira = toplamlar['fiyat_toplami'] / toplamlar['ilan_sayisi']
 
             if ortalama_kira is not None:
                 mesaj_baslik = f"'{mahalle_adi}, {ilce_adi}, {sehir_adi}'" if mahalle_adi else f"'{ilce_adi}, {sehir_adi}'"
                 self.stdout.write(self.style.SUCCESS(f"{mesaj_baslik} bölgesindeki ortalama kira: {ortalama_kira:.2f} TL"))
-                self.stdout.write(self.style.NOTICE(f"Toplam {kira_ilanlari.count()} adet ilan üzerinden hesaplanmıştır."))
+                self.stdout.write(self.style.NOTICE(f"Toplam {toplamlar['ilan_sayisi']} adet ilan üzerinden hesaplanmıştır."))
 
                 self.stdout.write(self.style.HTTP_INFO("\n--- Daha Detaylı Analizler ---"))
 
-                uc_ay_once = timezone.now() - timedelta(days=90)
-                son_uc_aylik_ilanlar = kira_ilanlari.filter(ilan_tarihi__gte=uc_ay_once)
-
-                if son_uc_aylik_ilanlar.count() > 0:
-                    aylik_ortalama = son_uc_aylik_ilanlar.annotate(
-                        month=TruncMonth('ilan_tarihi')
-                    ).values('month').annotate(
-                        avg_fiyat=Avg('fiyat')
-                    ).order_by('month')
+                # 90 günlük pencere ay ortasından başlayabildiği için günlük özetleri aya göre topluyoruz
+                aylik_ortalama = ozetler.filter(
+                    donem=BolgeOzeti.GUNLUK, donem_baslangici__gte=son_donem_baslangici()
+                ).annotate(
+                    month=TruncMonth('donem_baslangici')
+                ).values('month').annotate(
+                    ilan=Sum('ilan_sayisi'), toplam=Sum('fiyat_toplami')
+                ).order_by('month')
 
+                if aylik_ortalama:
                     self.stdout.write(self.style.NOTICE("Son 3 Ayın Ortalama Kira Fiyatları:"))
                     for entry in aylik_ortalama:
-                        self.stdout.write(self.style.NOTICE(f"  {entry['month'].strftime('%Y-%m')}: {entry['avg_fiyat']:.2f} TL"))
+                        self.stdout.write(self.style.NOTICE(f"  {entry['month'].strftime('%Y-%m')}: {entry['toplam'] / entry['ilan']:.2f} TL"))
                 else:
                     self.stdout.write(self.style.WARNING("Son 3 ay için yeterli ilan verisi bulunamadı."))
 
-                if ilgili_bolgeler.first().ortalama_kira and ortalama_kira > ilgili_bolgeler.first().ortalama_kira * 1.20:
+                # Son 90 gün, bölgenin (ilçe analizinde ilçenin tüm bölgelerinin) bir önceki yılıyla karşılaştırılır
+                raporlar = region_reports(sehir=sehir_adi, ilce=ilce_adi, mahalle=mahalle_adi,
+                                          seviye=SEVIYE_MAHALLE if mahalle_adi else SEVIYE_ILCE)
+                uyari = raporlar[0]['uyari'] if raporlar else UYARI_NORMAL
+                if raporlar and raporlar[0]['son_donem_kira'] is not None and raporlar[0]['referans_kira']:
+                    self.stdout.write(self.style.NOTICE(
+                        f"Son {SON_DONEM_GUN} günün ortalaması {raporlar[0]['son_donem_kira']:.2f} TL, "
+                        f"önceki yılın ortalaması {raporlar[0]['referans_kira']:.2f} TL."))
+                if uyari == UYARI_FAHIS:
                     self.stdout.write(self.style.ERROR("UYARI: Bu bölgede fahiş kira artışı potansiyeli tespit edildi!"))
-                elif ilgili_bolgeler.first().ortalama_kira and ortalama_kira > ilgili_bolgeler.first().ortalama_kira * 1.10:
+                elif uyari == UYARI_ARTIS:
                      self.stdout.write(self.style.WARNING("Bu bölgede kira artışı mevcut, takipte kalın."))
                 else:
                     self.stdout.write(self.style.SUCCESS("Bu bölgedeki kira artışı normal seviyelerde görünüyor."))
@@ -93,4 +127,48 @@ class Command(BaseCommand):
         if mahalle_adi:
             self.stdout.write(self.style.SUCCESS(f'{mahalle_adi}, {ilce_adi}, {sehir_adi} için kira maliyet analizi tamamlandı!'))
         else:
-            self.stdout.write(self.style.SUCCESS(f'{ilce_adi}, {sehir_adi} için kira maliyet analizi tamamlandı!'))
\ No newline at end of file
+            self.stdout.write(self.style.SUCCESS(f'{ilce_adi}, {sehir_adi} için kira maliyet analizi tamamlandı!'))
+
+    def _toplu_analiz(self, sehir_adi, options):
+        # Bütün bölgeler birkaç gruplu sorguyla hesaplanır (bkz. emlak/maliyet.py)
+        raporlar = region_reports(sehir=sehir_adi, seviye=options['seviye'])
+        if not raporlar:
+            self.stdout.write(self.style.WARNING(f"{sehir_adi or 'Hiçbir şehir'} için kira ilanı olan bölge bulunamadı."))
+            return
+
+        satirlar = [
+            {
+                'sehir': rapor['sehir'],
+                'ilce': rapor['ilce'],
+                'mahalle': rapor['mahalle'] or '',
+                'ilan_sayisi': rapor['ilan_sayisi'],
+                'ortalama_kira': f"{rapor['ortalama_kira']:.2f}",
+                'son_uc_ay': {ay['ay']: f"{ay['ortalama_kira']:.2f}" for ay in rapor['aylik']},
+                'uyari': rapor['uyari'],
+            }
+            for rapor in raporlar
+        ]
+
+        hedef = open(options['dosya'], 'w', encoding='utf-8', newline='') if options['dosya'] else self.stdout
+        try:
+            if options['cikti'] == 'json':
+                hedef.write(json.dumps(satirlar, ensure_ascii=False, indent=2) + '\n')
+            elif options['cikti'] == 'csv':
+                yazici = csv.writer(hedef)
+                yazici.writerow(['sehir', 'ilce', 'mahalle', 'ilan_sayisi', 'ortalama_kira', 'son_uc_ay', 'uyari'])
+                for satir in satirlar:
+                    son_uc_ay = ';'.join(f"{ay}={ortalama}" for ay, ortalama in satir['son_uc_ay'].items())
+                    yazici.writerow([satir['sehir'], satir['ilce'], satir['mahalle'], satir['ilan_sayisi'],
+                                     satir['ortalama_kira'], son_uc_ay, satir['uyari']])
+            else:
+                hedef.write(f"{'Şehir':<15} {'İlçe':<18} {'Mahalle':<24} {'İlan':>6} {'Ort. Kira':>12}  {'Son 3 Ay':<75} Uyarı\n")
+                for satir in satirlar:
+                    son_uc_ay = ', '.join(f"{ay}: {ortalama}" for ay, ortalama in satir['son_uc_ay'].items()) or '-'
+                    hedef.write(f"{satir['sehir']:<15} {satir['ilce']:<18} {satir['mahalle'] or '-':<24} "
+                                f"{satir['ilan_sayisi']:>6} {satir['ortalama_kira']:>12}  {son_uc_ay:<75} {satir['uyari']}\n")
+        finally:
+            if options['dosya']:
+                hedef.close()
+
+        if options['dosya']:
+            self.stdout.write(self.style.SUCCESS(f"{len(satirlar)} bölgenin raporu {options['dosya']} dosyasına yazıldı."))
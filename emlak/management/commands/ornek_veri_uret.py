@@ -0,0 +1,124 @@
+# emlak/management/commands/ornek_veri_uret.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from emlak import dedup, rollup, synthetic
+from emlak.models import Bolge, BolgeOzeti, FiyatGozlemi, KiraIlani
+from emlak.persistence import listing_fingerprint
+
+
+class Command(BaseCommand):
+    help = ('Performans ölçümleri için İstanbul mahallelerine çarpık dağılmış gerçekçi sentetik ilanlar üretir '
+            '(bkz. emlak/synthetic.py). --ilan toplam hedeftir: mevcut sentetik ilanlar korunur, eksikler eklenir.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ilan', type=int, default=10_000,
+                            help='Ulaşılacak toplam sentetik ilan sayısı (10 bin - 10 milyon)')
+        parser.add_argument('--tohum', type=int, default=42, help='Rastgele veri tohumu')
+        parser.add_argument('--gun', type=int, default=365, help='İlan tarihlerinin yayılacağı gün sayısı')
+        parser.add_argument('--parti', type=int, default=10_000, help='Tek işlemde yazılacak ilan sayısı')
+        parser.add_argument('--ozetsiz', action='store_true',
+                            help='Bölge özetlerini yeniden oluşturma (ardından bolge_ozeti_yenile çalıştırılmalı)')
+        parser.add_argument('--temizle', action='store_true', help='Tüm sentetik ilanları ve gözlemlerini sil')
+
+    def handle(self, *args, **options):
+        if options['temizle']:
+            return self._temizle(options['parti'])
+        if options['ilan'] < 0 or options['parti'] < 1:
+            raise CommandError('--ilan negatif, --parti sıfır olamaz.')
+
+        profil = synthetic.Profil(options['tohum'])
+        bolge_idleri = self._bolgeler(profil)
+        sentetikler = KiraIlani.objects.filter(ilan_url__startswith=synthetic.URL_ONEKI)
+        mevcut = sentetikler.count()
+        if mevcut >= options['ilan']:
+            self.stdout.write(f"Zaten {mevcut} sentetik ilan var; eklenecek ilan yok.")
+            return
+
+        eksik = options['ilan'] - mevcut
+        self.stdout.write(f"{mevcut} sentetik ilan var; {eksik} ilan {len(bolge_idleri)} mahalleye ekleniyor "
+                          f"(ilk 5 mahallenin beklenen payı %{synthetic.expected_share(profil) * 100:.0f}).")
+        # Sıra numaraları en son eklenen ilandan devam eder: arşivlenen/silinen ilanlar yüzünden sayı en büyük
+        # numaranın gerisinde kalabilir ve oradan başlamak mevcut URL'leri yeniden üretirdi
+        son_url = sentetikler.order_by('-id').values_list('ilan_url', flat=True).first()
+        ilk_sira = int(son_url.removeprefix(synthetic.URL_ONEKI)) + 1 if son_url else 0
+        baslangic = time.monotonic()
+        for yazilan in range(0, eksik, options['parti']):
+            adet = min(options['parti'], eksik - yazilan)
+            kartlar = list(synthetic.generate_cards(ilk_sira + yazilan, adet, profil, gun=options['gun']))
+            self._yaz(kartlar, bolge_idleri)
+            gecen = time.monotonic() - baslangic
+            self.stdout.write(f"  {mevcut + yazilan + adet} / {options['ilan']} "
+                              f"({(yazilan + adet) / gecen:.0f} ilan/sn)")
+
+        if not options['ozetsiz']:
+            ozet_baslangic = time.monotonic()
+            satir = rollup.rebuild_all(list(bolge_idleri.values()))
+            self.stdout.write(f"{satir} bölge özeti satırı {time.monotonic() - ozet_baslangic:.1f} sn'de oluşturuldu.")
+        self._istatistik_guncelle()
+        self.stdout.write(self.style.SUCCESS(
+            f"{eksik} ilan {time.monotonic() - baslangic:.1f} sn'de eklendi; toplam {options['ilan']} sentetik ilan."))
+
+    def _bolgeler(self, profil):
+        """Profildeki mahallelerin Bolge kayıtlarını (eksikse oluşturarak) döndürür: (ilçe, mahalle) -> id."""
+        def mevcutlar():
+            return {(ilce, mahalle): bolge_id for bolge_id, ilce, mahalle in Bolge.objects.filter(
+                sehir=synthetic.SEHIR).values_list('id', 'ilce', 'mahalle')}
+
+        bolgeler = mevcutlar()
+        eksikler = [(ilce, mahalle) for ilce, mahalle, _ in profil.mahalleler if (ilce, mahalle) not in bolgeler]
+        if eksikler:
+            Bolge.objects.bulk_create([Bolge(sehir=synthetic.SEHIR, ilce=ilce, mahalle=mahalle)
+                                       for ilce, mahalle in eksikler], ignore_conflicts=True)
+            bolgeler = mevcutlar()
+        return {(ilce, mahalle): bolgeler[(ilce, mahalle)] for ilce, mahalle, _ in profil.mahalleler}
+
+    def _yaz(self, kartlar, bolge_idleri):
+        ilanlar = []
+        for kart in kartlar:
+            bolge_id = bolge_idleri[(kart['ilce'], kart['mahalle'])]
+            # Kopya anahtarı persistence._kart_to_ilan ile aynı: tarama yolunun aday sorgusu gerçek veriyi görsün
+            ilanlar.append(KiraIlani(
+                bolge_id=bolge_id, fiyat=kart['fiyat'], metrekare=kart['metrekare'], oda_sayisi=kart['oda_sayisi'],
+                ilan_url=kart['ilan_url'], ilan_kaynagi=kart['ilan_kaynagi'], ilan_tarihi=kart['ilan_tarihi'],
+                aciklama=kart['aciklama'], icerik_ozeti=listing_fingerprint(kart),
+                kopya_anahtari=dedup.duplicate_key(bolge_id, kart['oda_sayisi'], kart['metrekare']),
+            ))
+        with transaction.atomic():
+            KiraIlani.objects.bulk_create(ilanlar, batch_size=2000)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                idler = dict(KiraIlani.objects.filter(ilan_url__in=[i.ilan_url for i in ilanlar])
+                             .values_list('ilan_url', 'id'))
+                for ilan in ilanlar:
+                    ilan.id = idler[ilan.ilan_url]
+            # persistence ile aynı: her ilanın ilk görüldüğü günkü fiyatı bir gözlemdir
+            FiyatGozlemi.objects.bulk_create([
+                FiyatGozlemi(ilan_id=ilan.id, bolge_id=ilan.bolge_id, gozlem_tarihi=ilan.ilan_tarihi, fiyat=ilan.fiyat)
+                for ilan in ilanlar
+            ], batch_size=2000)
+
+    def _temizle(self, parti):
+        sentetikler = KiraIlani.objects.filter(ilan_url__startswith=synthetic.URL_ONEKI)
+        bolge_idleri = list(sentetikler.order_by().values_list('bolge_id', flat=True).distinct())
+        silinen = 0
+        while True:
+            idler = list(sentetikler.order_by('id').values_list('id', flat=True)[:parti])
+            if not idler:
+                break
+            with transaction.atomic():
+                _, silinenler = KiraIlani.objects.filter(id__in=idler).delete()
+            silinen += silinenler.get(KiraIlani._meta.label, 0)
+        if bolge_idleri:
+            rollup.rebuild_all(bolge_idleri)
+        self._istatistik_guncelle()
+        self.stdout.write(self.style.SUCCESS(f"{silinen} sentetik ilan silindi."))
+
+    def _istatistik_guncelle(self):
+        if connection.vendor == 'postgresql':
+            # Planlayıcı ve admin'in tahmini sayımı (reltuples) yeni satır sayısını görsün
+            with connection.cursor() as cursor:
+                for model in (KiraIlani, FiyatGozlemi, BolgeOzeti):
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
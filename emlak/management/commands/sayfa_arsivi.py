@@ -0,0 +1,58 @@
+# emlak/management/commands/sayfa_arsivi.py
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from emlak import archive
+
+
+def _boyut(bayt):
+    for birim in ('B', 'KB', 'MB'):
+        if bayt < 1024:
+            return f"{bayt:.1f} {birim}"
+        bayt /= 1024
+    return f"{bayt:.1f} GB"
+
+
+class Command(BaseCommand):
+    help = ('Sayfa arşivinin boyutunu (çekilen, tekil ve diskteki bayt; gün ve kaynak bazında) gösterir; '
+            '--temizle ile saklama süresinden eski sayfaları siler.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arsiv', type=str, default=str(settings.SAYFA_ARSIVI_DIZINI), help='Sayfa arşivi dizini')
+        parser.add_argument('--temizle', action='store_true',
+                            help='Saklama süresinden eski günleri ve artık kullanılmayan sayfaları sil')
+        parser.add_argument('--sakla-gun', type=int, default=settings.SAYFA_ARSIVI_SAKLAMA_GUN,
+                            help='--temizle ile saklanacak gün sayısı')
+        parser.add_argument('--gunluk', action='store_true', help='Gün bazında dökümü de göster')
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['arsiv']):
+            raise CommandError(f"Sayfa arşivi bulunamadı: {options['arsiv']}")
+        arsiv = archive.PageArchive(options['arsiv'])
+        if options['temizle']:
+            silinen_gun, silinen_nesne, bosalan = arsiv.prune(options['sakla_gun'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{options['sakla_gun']} günden eski {silinen_gun} gün ve {silinen_nesne} sayfa silindi "
+                f"({_boyut(bosalan)} boşaldı)."))
+
+        kullanim = arsiv.usage()
+        if not kullanim['kayit']:
+            self.stdout.write(self.style.WARNING('Arşivde sayfa yok.'))
+            return
+        gunler = sorted(kullanim['gunler'])
+        self.stdout.write(
+            f"{gunler[0]} - {gunler[-1]}: {kullanim['kayit']} çekme, {kullanim['tekil_sayfa']} tekil sayfa "
+            f"({kullanim['nesne']} nesne).")
+        self.stdout.write(
+            f"Çekilen {_boyut(kullanim['ham_bayt'])}, tekil {_boyut(kullanim['tekil_ham_bayt'])}, "
+            f"diskte {_boyut(kullanim['disk_bayt'])} "
+            f"(sıkıştırma {kullanim['tekil_ham_bayt'] / max(kullanim['disk_bayt'], 1):.1f}x, "
+            f"toplam {kullanim['ham_bayt'] / max(kullanim['disk_bayt'], 1):.1f}x).")
+        for kaynak, degerler in sorted(kullanim['kaynaklar'].items()):
+            self.stdout.write(f"  {kaynak:<12} {degerler['kayit']:>8} çekme  {_boyut(degerler['ham_bayt']):>10}")
+        if options['gunluk']:
+            for gun in gunler:
+                degerler = kullanim['gunler'][gun]
+                self.stdout.write(f"  {gun}  {degerler['kayit']:>8} çekme  {_boyut(degerler['ham_bayt']):>10}")
@@ -0,0 +1,144 @@
+# emlak/management/commands/sorgu_denetimi.py
+
+import random
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from emlak.models import Bolge, BolgeOzeti, FiyatGozlemi, KiraIlani
+from emlak.rollup import rebuild_all
+
+# PostgreSQL: "Seq Scan on emlak_kirailani", SQLite: "SCAN emlak_kirailani" (indeks kullanılmayan tam tarama)
+_SEQ_SCAN_RE = re.compile(r'Seq Scan on (\w+)|\bSCAN (\w+)\s*$', re.M)
+_SURE_RE = re.compile(r'Execution Time: ([\d.]+) ms')
+
+
+class Command(BaseCommand):
+    help = ('Analiz ve admin sorgularının çalışma planlarını (EXPLAIN ANALYZE) çıkarır, '
+            'büyük tablolardaki sıralı taramaları (Seq Scan) işaretler.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ornek', type=int, default=0,
+                            help='Denetimden önce bu kadar sentetik ilan ekle; denetim sonunda geri alınır')
+        parser.add_argument('--min-satir', type=int, default=10000,
+                            help='Bu satır sayısının altındaki tablolarda sıralı tarama işaretlenmez')
+        parser.add_argument('--plan', action='store_true', help='Her sorgunun tam planını yazdır')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['ornek']:
+                self._ornek_veri_ekle(options['ornek'])
+            sorunlu = self._denetle(options['min_satir'], options['plan'])
+            # Örnek veri kalıcı değil; mevcut veriyle denetimde de hiçbir şey yazılmadı
+            transaction.set_rollback(True)
+
+        if sorunlu:
+            self.stdout.write(self.style.ERROR(f"{sorunlu} sorguda büyük tablo üzerinde sıralı tarama var."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Tüm sorgular indeks kullanıyor."))
+
+    def _sorgular(self):
+        """Denetlenecek (ad, queryset) çiftleri; parametreler veritabanındaki gerçek bir bölge/ilandan alınır."""
+        ilan = KiraIlani.objects.select_related('bolge').order_by().first()
+        if ilan is None:
+            raise CommandError("Veritabanında ilan yok; --ornek ile sentetik veri ekleyerek deneyin.")
+        bolge = ilan.bolge
+        bitis = ilan.ilan_tarihi
+        baslangic = bitis - timedelta(days=90)
+        urller = list(KiraIlani.objects.order_by().values_list('ilan_url', flat=True)[:500])
+
+        return [
+            ('Bölge arama (__iexact)',
+             Bolge.objects.filter(sehir__iexact=bolge.sehir, ilce__iexact=bolge.ilce, mahalle__iexact=bolge.mahalle or '')),
+            ('Özet yenileme (bölge + ay)',
+             KiraIlani.objects.filter(bolge=bolge, ilan_tarihi__gte=bitis.replace(day=1), ilan_tarihi__lte=bitis)
+             .order_by().values_list('ilan_tarihi', 'fiyat', 'metrekare')),
+            ('Bölge fiyat ortalaması (son 90 gün)',
+             KiraIlani.objects.filter(bolge=bolge, ilan_tarihi__gte=baslangic).order_by()
+             .values('bolge').annotate(ortalama=Avg('fiyat'), adet=Count('id'))),
+            ('Admin ilan listesi',
+             KiraIlani.objects.select_related('bolge').order_by('-ilan_tarihi')[:100]),
+            ('Admin kaynak filtresi',
+             KiraIlani.objects.filter(ilan_kaynagi=ilan.ilan_kaynagi).select_related('bolge').order_by('-ilan_tarihi')[:100]),
+            ('Toplu kayıt URL eşleştirme',
+             KiraIlani.objects.filter(ilan_url__in=urller).order_by().values_list('ilan_url', 'id', 'icerik_ozeti', 'fiyat')),
+            ('Bölge fiyat geçmişi',
+             FiyatGozlemi.objects.filter(bolge=bolge, gozlem_tarihi__gt=baslangic, gozlem_tarihi__lte=bitis)
+             .values_list('ilan', 'fiyat')),
+            ('Bölge özeti (aylık)',
+             BolgeOzeti.objects.filter(bolge=bolge, donem=BolgeOzeti.AYLIK).values_list('ilan_sayisi', 'fiyat_toplami')),
+        ]
+
+    def _denetle(self, min_satir, plan_yazdir):
+        postgres = connection.vendor == 'postgresql'
+        if not postgres:
+            self.stdout.write(self.style.WARNING(
+                f"{connection.vendor} üzerinde EXPLAIN ANALYZE yok; yalnızca sorgu planı gösteriliyor. "
+                "Fonksiyonel ve INCLUDE'lu indeksler PostgreSQL hedeflidir."))
+
+        tablo_boyutlari = {}
+        for model in apps.get_app_config('emlak').get_models():
+            tablo_boyutlari[model._meta.db_table] = model.objects.count()
+
+        sorunlu = 0
+        for ad, sorgu in self._sorgular():
+            plan = sorgu.explain(analyze=True, buffers=True) if postgres else sorgu.explain()
+            taramalar = {t1 or t2 for t1, t2 in _SEQ_SCAN_RE.findall(plan)}
+            buyukler = sorted(t for t in taramalar if tablo_boyutlari.get(t, 0) >= min_satir)
+            sure = _SURE_RE.search(plan)
+            sure_metni = f" ({sure.group(1)} ms)" if sure else ""
+
+            if buyukler:
+                sorunlu += 1
+                self.stdout.write(self.style.ERROR(f"[SEQ SCAN] {ad}{sure_metni}: " + ', '.join(
+                    f"{t} ({tablo_boyutlari[t]} satır)" for t in buyukler)))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"[OK] {ad}{sure_metni}"))
+            if plan_yazdir or buyukler:
+                for satir in plan.splitlines():
+                    self.stdout.write(f"    {satir}")
+        return sorunlu
+
+    def _ornek_veri_ekle(self, adet):
+        """Sentetik bölge, ilan, fiyat gözlemi ve özet verisi ekler (çağıranın işlemi içinde)."""
+        self.stdout.write(f"{adet} sentetik ilan ekleniyor...")
+        rastgele = random.Random(42)
+        bugun = timezone.localdate()
+        bolgeler = Bolge.objects.bulk_create([
+            Bolge(sehir='Denetim', ilce=f'İlçe {i // 30}', mahalle=f'Mahalle {i}') for i in range(900)
+        ])
+        if not connection.features.can_return_rows_from_bulk_insert:
+            bolgeler = list(Bolge.objects.filter(sehir='Denetim'))
+
+        ilanlar = []
+        for i in range(adet):
+            ilanlar.append(KiraIlani(
+                bolge=rastgele.choice(bolgeler),
+                fiyat=Decimal(rastgele.randrange(8000, 120000, 500)),
+                metrekare=rastgele.randint(35, 250),
+                oda_sayisi=rastgele.choice(['1+1', '2+1', '3+1', '4+1']),
+                ilan_url=f'https://denetim.invalid/ilan/{i}',
+                ilan_kaynagi=rastgele.choice(['Emlakjet', 'Sahibinden', 'Hepsiemlak']),
+                ilan_tarihi=bugun - timedelta(days=rastgele.randint(0, 365)),
+            ))
+        KiraIlani.objects.bulk_create(ilanlar, batch_size=5000)
+        idler = dict(KiraIlani.objects.filter(ilan_url__startswith='https://denetim.invalid/')
+                     .values_list('ilan_url', 'id'))
+        FiyatGozlemi.objects.bulk_create([
+            FiyatGozlemi(ilan_id=idler[ilan.ilan_url], bolge_id=ilan.bolge_id,
+                         gozlem_tarihi=ilan.ilan_tarihi, fiyat=ilan.fiyat)
+            for ilan in ilanlar
+        ], batch_size=5000)
+        rebuild_all([bolge.pk for bolge in bolgeler])
+
+        if connection.vendor == 'postgresql':
+            # Planlayıcı yeni satırları görsün diye istatistikleri güncelliyoruz
+            with connection.cursor() as cursor:
+                for model in (Bolge, KiraIlani, FiyatGozlemi, BolgeOzeti):
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
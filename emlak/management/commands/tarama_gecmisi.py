@@ -0,0 +1,69 @@
+# emlak/management/commands/tarama_gecmisi.py
+
+from django.core.management.base import BaseCommand, CommandError
+from emlak import run_history
+from emlak.models import TaramaCalismasi
+
+
+class Command(BaseCommand):
+    help = ('Son tarama çalıştırmalarını, incelenen çalıştırmanın en yavaş aşamalarını ve önceki '
+            'çalıştırmalara göre gerilemeleri (site düzeni değişikliği belirtileri dahil) gösterir.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--son', type=int, default=10, help='Listelenecek ve karşılaştırılacak çalıştırma sayısı')
+        parser.add_argument('--calisma', type=int, default=None,
+                            help='İncelenecek çalıştırmanın id\'si (varsayılan: son tamamlanan)')
+        parser.add_argument('--asama', type=int, default=10, help='Gösterilecek en yavaş aşama sayısı')
+
+    def handle(self, *args, **options):
+        calismalar = list(TaramaCalismasi.objects.all()[:options['son']])
+        if not calismalar:
+            self.stdout.write(self.style.WARNING("Kayıtlı tarama çalıştırması yok."))
+            return
+
+        self.stdout.write(f"{'id':>5} {'başlangıç':<17} {'durum':<11} {'sayfa':>6} {'hatalı':>6} {'kart':>6} "
+                          f"{'kart/sayfa':>10} {'eklenen':>8} {'güncel.':>8} {'atlanan':>8} {'süre (sn)':>10}")
+        for c in calismalar:
+            kart_sayfa = f"{c.kart / c.sayfa:.1f}" if c.sayfa else '-'
+            sure = f"{c.sure_sn:.1f}" if c.sure_sn is not None else '-'
+            self.stdout.write(f"{c.id:>5} {c.baslangic:%Y-%m-%d %H:%M} {c.durum:<11} {c.sayfa:>6} {c.hatali_sayfa:>6} "
+                              f"{c.kart:>6} {kart_sayfa:>10} {c.eklenen:>8} {c.guncellenen:>8} {c.atlanan:>8} {sure:>10}")
+
+        if options['calisma'] is not None:
+            try:
+                calisma = TaramaCalismasi.objects.get(pk=options['calisma'])
+            except TaramaCalismasi.DoesNotExist:
+                raise CommandError(f"{options['calisma']} numaralı tarama çalıştırması bulunamadı.")
+        else:
+            calisma = TaramaCalismasi.objects.filter(durum=TaramaCalismasi.TAMAMLANDI).first()
+            if calisma is None:
+                return
+        # Karşılaştırma yalnızca incelenen çalıştırmadan önce tamamlanmış çalıştırmalarla yapılır
+        oncekiler = list(TaramaCalismasi.objects.filter(
+            durum=TaramaCalismasi.TAMAMLANDI, baslangic__lt=calisma.baslangic
+        )[:options['son']])
+
+        self.stdout.write(f"\n{calisma.id} numaralı çalıştırmanın en yavaş aşamaları:")
+        self.stdout.write(f"  {'aşama':<24} {'adet':>7} {'toplam (sn)':>12} {'ort. (ms)':>10} {'p95 (ms)':>10} "
+                          f"{'en uzun (ms)':>13} {'pay':>6}")
+        for ad, asama, pay in run_history.slowest_stages(calisma, options['asama']):
+            self.stdout.write(f"  {ad:<24} {asama['adet']:>7} {asama['toplam_sn']:>12.2f} {asama['ortalama_ms']:>10.1f} "
+                              f"{asama['p95_ms']:>10.1f} {asama['en_uzun_ms']:>13.1f} {pay:>6.0%}")
+        if calisma.sayaclar:
+            self.stdout.write("  Sayaçlar: " + ', '.join(f"{k}={v}" for k, v in sorted(calisma.sayaclar.items())))
+
+        if len(oncekiler) < run_history.EN_AZ_ONCEKI:
+            self.stdout.write(f"\nEğilim için en az {run_history.EN_AZ_ONCEKI} önceki tamamlanmış çalıştırma gerekli "
+                              f"(şu an {len(oncekiler)}).")
+            return
+
+        self.stdout.write(f"\nÖnceki {len(oncekiler)} çalıştırmanın medyanına göre ortalama aşama süreleri:")
+        for ad, son_ms, onceki_ms, kat, gerileme in run_history.stage_trends(calisma, oncekiler):
+            satir = f"  {ad:<24} {son_ms:>10.1f} ms  (önceki {onceki_ms:>10.1f} ms, {kat:>5.2f}x)"
+            self.stdout.write(self.style.ERROR(satir + '  GERİLEME') if gerileme else satir)
+
+        uyarilar = run_history.markup_signals(calisma, oncekiler)
+        for uyari in uyarilar:
+            self.stdout.write(self.style.WARNING(f"Uyarı: {uyari}"))
+        if not uyarilar:
+            self.stdout.write(self.style.SUCCESS("Kart sayısı ve ayrıştırma oranlarında düzen değişikliği belirtisi yok."))
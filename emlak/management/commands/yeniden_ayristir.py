@@ -0,0 +1,65 @@
+# emlak/management/commands/yeniden_ayristir.py
+
+import os
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from emlak import admin_tools, archive, reparse
+from emlak.persistence import save_cards
+from emlak.sources import available_sources
+
+
+def _tarih(metin):
+    try:
+        return date.fromisoformat(metin)
+    except ValueError:
+        raise CommandError(f"Geçersiz tarih: {metin} (YYYY-AA-GG bekleniyor).")
+
+
+class Command(BaseCommand):
+    help = ('Sayfa arşivindeki sayfaları güncel ayrıştırıcıdan paralel geçirip kartları veritabanına yeniden yazar '
+            '(ör. bir seçici düzeltmesinden sonra yeniden tarama yapmadan).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arsiv', type=str, default=str(settings.SAYFA_ARSIVI_DIZINI), help='Sayfa arşivi dizini')
+        parser.add_argument('--baslangic', type=str, default=None, help='Opsiyonel: Bu günden (YYYY-AA-GG) itibaren')
+        parser.add_argument('--bitis', type=str, default=None, help='Opsiyonel: Bu güne (YYYY-AA-GG) kadar')
+        parser.add_argument('--gun', type=int, default=None, help='Opsiyonel: Yalnızca son N günün sayfaları')
+        parser.add_argument('--kaynak', choices=available_sources(), action='append',
+                            help='Yalnızca bu kaynağın sayfaları; birden fazla kez verilebilir')
+        parser.add_argument('--isci', type=int, default=os.cpu_count(), help='Ayrıştırma süreci sayısı')
+        parser.add_argument('--artimli', action='store_true', help='İçerik özeti değişmemiş ilanları yeniden yazma')
+        parser.add_argument('--kuru', action='store_true', help='Yalnızca ayrıştır ve say; veritabanına yazma')
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['arsiv']):
+            raise CommandError(f"Sayfa arşivi bulunamadı: {options['arsiv']}")
+        baslangic = _tarih(options['baslangic']) if options['baslangic'] else None
+        bitis = _tarih(options['bitis']) if options['bitis'] else None
+        if options['gun']:
+            baslangic = max(baslangic or date.min, date.today() - timedelta(days=options['gun']))
+
+        def kaydet(kartlar, gozlem_tarihi):
+            return save_cards(kartlar, artimli=options['artimli'], gozlem_tarihi=gozlem_tarihi)
+
+        def ilerleme(gun, gunluk):
+            self.stdout.write(f"  {gun}: {gunluk['sayfa']} sayfa ({gunluk['tekil_sayfa']} tekil, "
+                              f"{gunluk['hatali_sayfa']} hatalı), {gunluk['kart']} kart, "
+                              f"{gunluk.get('eklenen', 0)} yeni, {gunluk.get('guncellenen', 0)} güncellenen ilan")
+
+        ozet = reparse.reparse(
+            archive.PageArchive(options['arsiv']), baslangic=baslangic, bitis=bitis, kaynaklar=options['kaynak'],
+            isci_sayisi=options['isci'], kaydet=None if options['kuru'] else kaydet, ilerleme=ilerleme,
+        )
+        if not ozet['gun']:
+            self.stdout.write(self.style.WARNING('Bu aralıkta arşivlenmiş sayfa yok.'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{ozet['gun']} gün, {ozet['sayfa']} sayfa ({ozet['tekil_sayfa']} tekil, {ozet['hatali_sayfa']} hatalı), "
+            f"{ozet['kart']} kart; {ozet['sure_sn']} sn, {ozet['sayfa_saniye']} sayfa/sn ({options['isci']} süreç)."))
+        if not options['kuru']:
+            admin_tools.refresh_filter_choices()
+            self.stdout.write(f"Veritabanı: {ozet.get('eklenen', 0)} yeni, {ozet.get('guncellenen', 0)} güncellenen, "
+                              f"{ozet.get('degismeyen', 0)} değişmeyen ilan, {ozet.get('fiyat_gozlemi', 0)} fiyat gözlemi; "
+                              f"{ozet.get('atlanan', 0)} kart eksik veri nedeniyle atlandı.")
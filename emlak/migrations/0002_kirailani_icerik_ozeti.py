@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kirailani',
+            name='icerik_ozeti',
+            field=models.CharField(blank=True, db_index=True, max_length=16, null=True, verbose_name='İçerik Özeti'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0002_kirailani_icerik_ozeti'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FiyatGozlemi',
+            fields=[
+                ('pk', models.CompositePrimaryKey('ilan', 'gozlem_tarihi', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('gozlem_tarihi', models.DateField(verbose_name='Gözlem Tarihi')),
+                ('fiyat', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Kira Fiyatı')),
+                ('bolge', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_gozlemleri', to='emlak.bolge', verbose_name='Bölge')),
+                ('ilan', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_gozlemleri', to='emlak.kirailani', verbose_name='Kira İlanı')),
+            ],
+            options={
+                'verbose_name': 'Fiyat Gözlemi',
+                'verbose_name_plural': 'Fiyat Gözlemleri',
+                'indexes': [models.Index(fields=['bolge', 'gozlem_tarihi'], include=('ilan', 'fiyat'), name='fiyatgozlemi_bolge_tarih_idx'), models.Index(fields=['gozlem_tarihi'], include=('ilan',), name='fiyatgozlemi_tarih_idx')],
+            },
+        ),
+        # Mevcut ilanların güncel fiyatını ilk gözlem olarak aktar
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO emlak_fiyatgozlemi (ilan_id, gozlem_tarihi, fiyat, bolge_id)
+                SELECT id, ilan_tarihi, fiyat, bolge_id FROM emlak_kirailani
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
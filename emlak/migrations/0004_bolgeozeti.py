@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0003_fiyatgozlemi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BolgeOzeti',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donem', models.CharField(choices=[('gun', 'Günlük'), ('ay', 'Aylık')], max_length=3, verbose_name='Dönem')),
+                ('donem_baslangici', models.DateField(verbose_name='Dönem Başlangıcı')),
+                ('ilan_sayisi', models.PositiveIntegerField(verbose_name='İlan Sayısı')),
+                ('fiyat_toplami', models.DecimalField(decimal_places=2, max_digits=16, verbose_name='Fiyat Toplamı')),
+                ('ortalama_fiyat', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Ortalama Fiyat')),
+                ('medyan_fiyat', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Medyan Fiyat')),
+                ('ortalama_m2_fiyati', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Ortalama m² Fiyatı')),
+                ('guncellenme_tarihi', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('bolge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ozetler', to='emlak.bolge', verbose_name='Bölge')),
+            ],
+            options={
+                'verbose_name': 'Bölge Özeti',
+                'verbose_name_plural': 'Bölge Özetleri',
+                'unique_together': {('bolge', 'donem', 'donem_baslangici')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:46
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0004_bolgeozeti'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bolge',
+            index=models.Index(django.db.models.functions.text.Upper('sehir'), django.db.models.functions.text.Upper('ilce'), django.db.models.functions.text.Upper('mahalle'), name='bolge_konum_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kirailani',
+            index=models.Index(fields=['bolge', 'ilan_tarihi'], include=('fiyat', 'metrekare'), name='kirailani_bolge_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kirailani',
+            index=models.Index(fields=['-ilan_tarihi'], name='kirailani_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kirailani',
+            index=models.Index(fields=['ilan_kaynagi', '-ilan_tarihi'], name='kirailani_kaynak_tarih_idx'),
+        ),
+        # Tek sütunlu bolge indeksi, yerine geçen (bolge, ilan_tarihi) indeksi oluşturulduktan sonra kaldırılır
+        migrations.AlterField(
+            model_name='kirailani',
+            name='bolge',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='kira_ilanlari', to='emlak.bolge', verbose_name='Bölge'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0005_analiz_indeksleri'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='kirailani',
+            name='kirailani_bolge_tarih_idx',
+        ),
+        migrations.AddField(
+            model_name='kirailani',
+            name='asil_ilan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kopyalar', to='emlak.kirailani', verbose_name='Asıl İlan (Kopyası Olduğu)'),
+        ),
+        migrations.AddField(
+            model_name='kirailani',
+            name='kopya_anahtari',
+            field=models.CharField(blank=True, db_index=True, max_length=16, null=True, verbose_name='Kopya Anahtarı'),
+        ),
+        migrations.AddIndex(
+            model_name='kirailani',
+            index=models.Index(fields=['bolge', 'ilan_tarihi'], include=('fiyat', 'metrekare', 'asil_ilan'), name='kirailani_bolge_tarih_idx'),
+        ),
+    ]
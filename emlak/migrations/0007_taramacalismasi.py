@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0006_kaynaklar_arasi_kopyalar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaramaCalismasi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('baslangic', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Başlangıç')),
+                ('bitis', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş')),
+                ('durum', models.CharField(choices=[('calisiyor', 'Çalışıyor'), ('tamamlandi', 'Tamamlandı'), ('hatali', 'Hatalı')], default='calisiyor', max_length=10, verbose_name='Durum')),
+                ('parametreler', models.JSONField(blank=True, default=dict, verbose_name='Parametreler')),
+                ('sayfa', models.PositiveIntegerField(default=0, verbose_name='Taranan Sayfa')),
+                ('hatali_sayfa', models.PositiveIntegerField(default=0, verbose_name='Hatalı Sayfa')),
+                ('kart', models.PositiveIntegerField(default=0, verbose_name='Kart')),
+                ('eklenen', models.PositiveIntegerField(default=0, verbose_name='Eklenen İlan')),
+                ('guncellenen', models.PositiveIntegerField(default=0, verbose_name='Güncellenen İlan')),
+                ('degismeyen', models.PositiveIntegerField(default=0, verbose_name='Değişmeyen İlan')),
+                ('atlanan', models.PositiveIntegerField(default=0, verbose_name='Eksik Veri Nedeniyle Atlanan')),
+                ('sure_sn', models.FloatField(blank=True, null=True, verbose_name='Süre (sn)')),
+                ('asamalar', models.JSONField(blank=True, default=dict, verbose_name='Aşama Süreleri')),
+                ('sayaclar', models.JSONField(blank=True, default=dict, verbose_name='Sayaçlar')),
+                ('hata', models.TextField(blank=True, null=True, verbose_name='Hata')),
+            ],
+            options={
+                'verbose_name': 'Tarama Çalışması',
+                'verbose_name_plural': 'Tarama Çalışmaları',
+                'ordering': ['-baslangic'],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0007_taramacalismasi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaramaSayfasi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True, verbose_name="Sayfa URL'si")),
+                ('kaynak', models.CharField(max_length=50, verbose_name='Kaynak')),
+                ('sehir', models.CharField(max_length=100, verbose_name='Şehir')),
+                ('ilce', models.CharField(max_length=100, verbose_name='İlçe')),
+                ('sayfa', models.PositiveIntegerField(verbose_name='Sayfa No')),
+                ('durum', models.CharField(choices=[('bekliyor', 'Bekliyor'), ('tamamlandi', 'Tamamlandı'), ('hatali', 'Hatalı')], default='bekliyor', max_length=10, verbose_name='Durum')),
+                ('deneme', models.PositiveSmallIntegerField(default=0, verbose_name='Art Arda Başarısız Deneme')),
+                ('kart_sayisi', models.PositiveIntegerField(blank=True, null=True, verbose_name='Kart Sayısı')),
+                ('son_cekme', models.DateTimeField(blank=True, null=True, verbose_name='Son Çekme')),
+                ('hata', models.TextField(blank=True, null=True, verbose_name='Hata')),
+                ('eklenme', models.DateTimeField(auto_now_add=True, verbose_name='Eklenme')),
+            ],
+            options={
+                'verbose_name': 'Tarama Sayfası',
+                'verbose_name_plural': 'Tarama Sayfaları',
+                'indexes': [models.Index(fields=['durum', 'kaynak', 'sehir', 'ilce'], name='tarama_sayfasi_durum_idx')],
+            },
+        ),
+    ]
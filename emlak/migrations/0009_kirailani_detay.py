@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0008_taramasayfasi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kirailani',
+            name='detay_ozeti',
+            field=models.CharField(blank=True, max_length=16, null=True, verbose_name='Detay Özeti'),
+        ),
+        migrations.AddField(
+            model_name='kirailani',
+            name='detay_tarihi',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Detay Çekme Tarihi'),
+        ),
+    ]
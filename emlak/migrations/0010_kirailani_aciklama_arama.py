@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:31
+
+from django.db import migrations
+
+INDEKS = 'kirailani_aciklama_fts_idx'
+
+
+def indeks_ekle(apps, schema_editor):
+    # Admin'deki açıklama araması için tam metin indeksi (bkz. emlak/admin_tools.py); ifade
+    # admin_tools.search_vector() ile aynı olmalı. SQLite'ta tam metin araması yok, atlanır.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    schema_editor.add_index(apps.get_model('emlak', 'KiraIlani'),
+                            GinIndex(SearchVector('aciklama', config='turkish'), name=INDEKS))
+
+
+def indeks_sil(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEKS}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0009_kirailani_detay'),
+    ]
+
+    operations = [
+        migrations.RunPython(indeks_ekle, indeks_sil),
+    ]
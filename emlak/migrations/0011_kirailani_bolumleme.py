@@ -0,0 +1,114 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:45
+
+import re
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.migrations.exceptions import IrreversibleError
+
+TABLO = 'emlak_kirailani'
+ONDEN_AY = 3
+
+
+def _sonraki_ay(ay):
+    return date(ay.year + ay.month // 12, ay.month % 12 + 1, 1)
+
+
+def bolumle(apps, schema_editor):
+    # İlan tablosunu ilan_tarihi'ne göre aylık bölümlenmiş tabloya çevirir (bkz. emlak/partitioning.py).
+    # SQLite'ta bölümleme yok, atlanır.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        # İlana başvuran yabancı anahtarlar yukarıdaki AlterField'larla (db_constraint=False) kaldırıldı;
+        # kalan varsa bölümlü tabloya bağlanamaz, migration durmalı
+        cursor.execute("SELECT conrelid::regclass::text, conname FROM pg_constraint "
+                       "WHERE confrelid = %s::regclass AND contype = 'f'", [TABLO])
+        kalanlar = cursor.fetchall()
+        if kalanlar:
+            raise RuntimeError(f'İlan tablosuna başvuran yabancı anahtarlar var, bölümlenemez: {kalanlar}')
+        # LIKE yabancı anahtarları kopyalamaz; tablonun kendi anahtarları (bolge_id) yeni tabloda yeniden eklenir
+        cursor.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                       "WHERE conrelid = %s::regclass AND contype = 'f'", [TABLO])
+        yabanci_anahtarlar = cursor.fetchall()
+
+        # İndeksler yeni tabloda aynı tanımlarla yeniden oluşturulur; tekil olanlar (ilan_url) sıradan indeks olur
+        cursor.execute('SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass '
+                       'AND NOT indisprimary', [TABLO])
+        indeksler = [re.sub(r'^CREATE UNIQUE INDEX', 'CREATE INDEX', tanim) for tanim, in cursor.fetchall()]
+        cursor.execute(f"SELECT DISTINCT date_trunc('month', ilan_tarihi)::date FROM {TABLO}")
+        aylar = {ay for ay, in cursor.fetchall()}
+        cursor.execute(f'SELECT max(id) FROM {TABLO}')
+        en_buyuk_id = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {TABLO} RENAME TO {TABLO}_eski')
+        # Kimlik (identity) sütunu kopyalanmaz; id aşağıda bir diziden beslenir
+        cursor.execute(f'CREATE TABLE {TABLO} (LIKE {TABLO}_eski INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+                       f'INCLUDING STORAGE) PARTITION BY RANGE (ilan_tarihi)')
+        ay = date.today().replace(day=1)
+        for _ in range(ONDEN_AY + 1):
+            aylar.add(ay)
+            ay = _sonraki_ay(ay)
+        for ay in sorted(aylar):
+            cursor.execute(f"CREATE TABLE {TABLO}_p{ay:%Y_%m} PARTITION OF {TABLO} "
+                           f"FOR VALUES FROM ('{ay}') TO ('{_sonraki_ay(ay)}')")
+        cursor.execute(f'CREATE TABLE {TABLO}_varsayilan PARTITION OF {TABLO} DEFAULT')
+        cursor.execute(f'INSERT INTO {TABLO} SELECT * FROM {TABLO}_eski')
+        cursor.execute(f'DROP TABLE {TABLO}_eski')
+
+        cursor.execute(f'CREATE SEQUENCE {TABLO}_id_seq OWNED BY {TABLO}.id')
+        if en_buyuk_id:
+            cursor.execute(f"SELECT setval('{TABLO}_id_seq', %s)", [en_buyuk_id])
+        cursor.execute(f"ALTER TABLE {TABLO} ALTER COLUMN id SET DEFAULT nextval('{TABLO}_id_seq')")
+        cursor.execute(f'ALTER TABLE {TABLO} ADD CONSTRAINT {TABLO}_pkey PRIMARY KEY (id, ilan_tarihi)')
+        for tanim in indeksler:
+            cursor.execute(tanim)
+        for kisit, tanim in yabanci_anahtarlar:
+            cursor.execute(f'ALTER TABLE {TABLO} ADD CONSTRAINT {schema_editor.quote_name(kisit)} {tanim}')
+        cursor.execute(f'ANALYZE {TABLO}')
+
+
+def bolumlemeyi_geri_al(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        raise IrreversibleError('İlan tablosunun bölümlemesi geri alınamaz; migration öncesi yedekten dönülmeli.')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0010_kirailani_aciklama_arama'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IlanArsivi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ay', models.DateField(db_index=True, verbose_name='Ay')),
+                ('ilan_sayisi', models.PositiveIntegerField(verbose_name='İlan Sayısı')),
+                ('fiyat_gozlemi_sayisi', models.PositiveIntegerField(verbose_name='Fiyat Gözlemi Sayısı')),
+                ('ilan_dosyasi', models.CharField(max_length=500, verbose_name='İlan Dosyası')),
+                ('gozlem_dosyasi', models.CharField(max_length=500, verbose_name='Gözlem Dosyası')),
+                ('olusturma', models.DateTimeField(auto_now_add=True, verbose_name='Arşivlenme')),
+            ],
+            options={
+                'verbose_name': 'İlan Arşivi',
+                'verbose_name_plural': 'İlan Arşivleri',
+                'ordering': ['-ay'],
+            },
+        ),
+        # Bölümlü tablonun tekil anahtarları bölümleme sütununu içermek zorunda: id tek başına tekil olmadığı
+        # için ilana başvuran yabancı anahtarlar veritabanında tutulamaz. Django CASCADE / SET_NULL'u ORM'de uygular.
+        migrations.AlterField(
+            model_name='fiyatgozlemi',
+            name='ilan',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_gozlemleri', to='emlak.kirailani', verbose_name='Kira İlanı'),
+        ),
+        migrations.AlterField(
+            model_name='kirailani',
+            name='asil_ilan',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kopyalar', to='emlak.kirailani', verbose_name='Asıl İlan (Kopyası Olduğu)'),
+        ),
+        migrations.RunPython(bolumle, bolumlemeyi_geri_al),
+    ]
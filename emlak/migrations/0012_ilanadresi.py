@@ -0,0 +1,114 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABLO = 'emlak_kirailani'
+ADRES_TABLOSU = 'emlak_ilanadresi'
+# İlana başvuran yabancı anahtarlar: (tablo, sütun, bölümlü tabloda eklenen kısıt)
+BASVURANLAR = [
+    ('emlak_fiyatgozlemi', 'ilan_id', 'emlak_fiyatgozlemi_ilan_id_adres_fk'),
+    (TABLO, 'asil_ilan_id', 'emlak_kirailani_asil_ilan_id_adres_fk'),
+]
+
+# İlan satırı eklenince/silinince adres satırı da eklenir/silinir. Bölümler arası taşınan satır (ilan_tarihi'si
+# başka aya geçen) PostgreSQL'de DELETE + INSERT olarak işlendiğinden adres satırı da silinip yeniden eklenir.
+ESITLEME_FONKSIYONU = f'''
+CREATE FUNCTION {ADRES_TABLOSU}_esitle() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM {ADRES_TABLOSU} WHERE id = OLD.id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO {ADRES_TABLOSU} (id, ilan_url) VALUES (NEW.id, NEW.ilan_url);
+    END IF;
+    RETURN NULL;
+END
+$$
+'''
+
+
+def _bolumlu(schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)', [TABLO])
+        return cursor.fetchone()[0]
+
+
+class BolumsuzAlterField(migrations.AlterField):
+    """Durumu her veritabanında değiştirir; şemaya yalnızca ilan tablosu bölümlü değilse uygulanır."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not _bolumlu(schema_editor):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not _bolumlu(schema_editor):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def adresleri_bagla(apps, schema_editor):
+    # Bölümlü tabloda (bkz. emlak/partitioning.py) ilan_url tekilliği ve ilana başvuran yabancı anahtarlar
+    # bölümsüz adres tablosu üzerinden kurulur. Bölümsüz tabloda yukarıdaki AlterField'lar yeterli.
+    if not _bolumlu(schema_editor):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {ADRES_TABLOSU} (id, ilan_url) SELECT id, ilan_url FROM {TABLO}')
+        cursor.execute(ESITLEME_FONKSIYONU)
+        cursor.execute(f'CREATE TRIGGER {TABLO}_adres AFTER INSERT OR DELETE ON {TABLO} '
+                       f'FOR EACH ROW EXECUTE FUNCTION {ADRES_TABLOSU}_esitle()')
+        cursor.execute(f'CREATE TRIGGER {TABLO}_adres_degisimi AFTER UPDATE OF id, ilan_url ON {TABLO} '
+                       f'FOR EACH ROW WHEN (OLD.id <> NEW.id OR OLD.ilan_url <> NEW.ilan_url) '
+                       f'EXECUTE FUNCTION {ADRES_TABLOSU}_esitle()')
+        # Kısıtsız geçen sürede silinmiş ilanlara kalan başvurular CASCADE / SET_NULL ile aynı şekilde temizlenir
+        cursor.execute(f'DELETE FROM emlak_fiyatgozlemi WHERE ilan_id NOT IN (SELECT id FROM {ADRES_TABLOSU})')
+        cursor.execute(f'UPDATE {TABLO} SET asil_ilan_id = NULL '
+                       f'WHERE asil_ilan_id NOT IN (SELECT id FROM {ADRES_TABLOSU})')
+        for tablo, sutun, kisit in BASVURANLAR:
+            cursor.execute(f'ALTER TABLE {tablo} ADD CONSTRAINT {kisit} FOREIGN KEY ({sutun}) '
+                           f'REFERENCES {ADRES_TABLOSU} (id) DEFERRABLE INITIALLY DEFERRED')
+
+
+def adresleri_ayir(apps, schema_editor):
+    if not _bolumlu(schema_editor):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for tablo, _, kisit in BASVURANLAR:
+            cursor.execute(f'ALTER TABLE {tablo} DROP CONSTRAINT {kisit}')
+        cursor.execute(f'DROP TRIGGER {TABLO}_adres_degisimi ON {TABLO}')
+        cursor.execute(f'DROP TRIGGER {TABLO}_adres ON {TABLO}')
+        cursor.execute(f'DROP FUNCTION {ADRES_TABLOSU}_esitle()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emlak', '0011_kirailani_bolumleme'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IlanAdresi',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='İlan ID')),
+                ('ilan_url', models.URLField(max_length=500, unique=True, verbose_name="İlan URL'si")),
+            ],
+            options={
+                'verbose_name': 'İlan Adresi',
+                'verbose_name_plural': 'İlan Adresleri',
+            },
+        ),
+        # 0011 kısıtları her veritabanında kaldırmıştı; bölümsüz tabloda (SQLite) geri eklenir
+        BolumsuzAlterField(
+            model_name='fiyatgozlemi',
+            name='ilan',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='fiyat_gozlemleri', to='emlak.kirailani', verbose_name='Kira İlanı'),
+        ),
+        BolumsuzAlterField(
+            model_name='kirailani',
+            name='asil_ilan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kopyalar', to='emlak.kirailani', verbose_name='Asıl İlan (Kopyası Olduğu)'),
+        ),
+        migrations.RunPython(adresleri_bagla, adresleri_ayir),
+    ]
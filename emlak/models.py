@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 class Bolge(models.Model):
     # Şehir, ilçe, mahalle gibi konum bilgileri
@@ -18,6 +20,10 @@ class Bolge(models.Model):
         verbose_name = "Bölge"
         verbose_name_plural = "Bölgeler"
         unique_together = (('sehir', 'ilce', 'mahalle'),) # Şehir, ilçe, mahalle kombinasyonu tekil olmalı
+        indexes = [
+            # Analiz komutları bölgeleri __iexact ile arıyor (UPPER(...) = UPPER(...)); unique_together indeksi bunu karşılamaz
+            models.Index(Upper('sehir'), Upper('ilce'), Upper('mahalle'), name='bolge_konum_upper_idx'),
+        ]
 
     def __str__(self):
         if self.mahalle:
@@ -26,7 +32,8 @@ class Bolge(models.Model):
 
 class KiraIlani(models.Model):
     # İlanın ait olduğu bölge
-    bolge = models.ForeignKey(Bolge, on_delete=models.CASCADE, related_name='kira_ilanlari', verbose_name="Bölge")
+    bolge = models.ForeignKey(Bolge, on_delete=models.CASCADE, related_name='kira_ilanlari',
+                              db_index=False, verbose_name="Bölge") # (bolge, ilan_tarihi) indeksinin ilk sütunu
 
     # İlanın temel bilgileri
     fiyat = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Kira Fiyatı")
@@ -37,18 +44,213 @@ class KiraIlani(models.Model):
     isinma_tipi = models.CharField(max_length=100, blank=True, null=True, verbose_name="Isınma Tipi")
 
     # İlana özel bilgiler
-    ilan_url = models.URLField(max_length=500, unique=True, verbose_name="İlan URL'si") # İlan URL'si tekil olmalı
+    # İlan URL'si tekil olmalı; bölümlü tabloda tekillik IlanAdresi'nin indeksiyle zorlanır (bkz. emlak/partitioning.py)
+    ilan_url = models.URLField(max_length=500, unique=True, verbose_name="İlan URL'si")
     ilan_kaynagi = models.CharField(max_length=100, verbose_name="İlan Kaynağı") # Sahibinden, Emlakjet vb.
     ilan_tarihi = models.DateField(verbose_name="İlan Tarihi")
     aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
 
+    # Artımlı tarama için içerik özeti (fiyat, m², oda sayısı, bölge); değişmeyen ilanlar yeniden yazılmaz
+    icerik_ozeti = models.CharField(max_length=16, blank=True, null=True, db_index=True, verbose_name="İçerik Özeti")
+
+    # Kaynaklar arası kopya tespiti (bkz. emlak/dedup.py): aynı daire başka bir sitede de ilandaysa
+    # asil_ilan ilk görülen ilanı gösterir ve bu ilan ortalamalara tekrar katılmaz
+    kopya_anahtari = models.CharField(max_length=16, blank=True, null=True, db_index=True, verbose_name="Kopya Anahtarı")
+    # Bölümlü tabloda kısıt ilanın IlanAdresi satırına bağlanır (bkz. emlak/partitioning.py)
+    asil_ilan = models.ForeignKey('self', on_delete=models.SET_NULL, blank=True, null=True,
+                                  related_name='kopyalar', verbose_name="Asıl İlan (Kopyası Olduğu)")
+
     # scraping tarihi
     veri_cekme_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Veri Çekme Tarihi")
 
+    # Detay sayfası zenginleştirmesi (bkz. emlak/enrichment.py): detaylar çekildiğinde ilanın içerik özeti
+    # detay_ozeti'ne yazılır; fiyat veya içerik özeti değişene kadar detay sayfası yeniden çekilmez
+    detay_ozeti = models.CharField(max_length=16, blank=True, null=True, verbose_name="Detay Özeti")
+    detay_tarihi = models.DateTimeField(blank=True, null=True, db_index=True, verbose_name="Detay Çekme Tarihi")
+
     class Meta:
         verbose_name = "Kira İlanı"
         verbose_name_plural = "Kira İlanları"
         ordering = ['-ilan_tarihi'] # Varsayılan olarak ilan tarihine göre tersten sırala
+        indexes = [
+            # Bölge + tarih aralığı sorguları (özet yenileme, analizler); fiyat ve m² ortalamaları tabloya gitmeden
+            # indeksten okunur (kopyaları elemek için asil_ilan da indekste)
+            models.Index(fields=['bolge', 'ilan_tarihi'], include=['fiyat', 'metrekare', 'asil_ilan'],
+                         name='kirailani_bolge_tarih_idx'),
+            # Varsayılan sıralama ve admin tarih filtresi
+            models.Index(fields=['-ilan_tarihi'], name='kirailani_tarih_idx'),
+            # Admin'deki kaynak filtresi varsayılan sıralamayla birlikte
+            models.Index(fields=['ilan_kaynagi', '-ilan_tarihi'], name='kirailani_kaynak_tarih_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fiyat} TL - {self.bolge} - {self.ilan_kaynagi}"
+
+class FiyatGozlemi(models.Model):
+    # Bir ilanın belirli bir gündeki fiyatı. Yalnızca eklenir, güncellenmez:
+    # ilan ilk görüldüğünde ve fiyatı değiştiğinde bir satır yazılır (aynı gün içinde son fiyat geçerli).
+    pk = models.CompositePrimaryKey('ilan', 'gozlem_tarihi')
+    # Birincil anahtarın ilk sütunu zaten indeksli; bölümlü ilan tablosunda kısıt IlanAdresi'ne bağlanır
+    ilan = models.ForeignKey(KiraIlani, on_delete=models.CASCADE, related_name='fiyat_gozlemleri',
+                             db_index=False, verbose_name="Kira İlanı")
+    gozlem_tarihi = models.DateField(verbose_name="Gözlem Tarihi")
+    fiyat = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Kira Fiyatı")
+
+    # Bölge bazlı zaman aralığı sorguları KiraIlani'ye join yapmadan çalışsın diye bölge burada da tutulur
+    bolge = models.ForeignKey(Bolge, on_delete=models.CASCADE, related_name='fiyat_gozlemleri',
+                              db_index=False, verbose_name="Bölge")
+
+    class Meta:
+        verbose_name = "Fiyat Gözlemi"
+        verbose_name_plural = "Fiyat Gözlemleri"
+        indexes = [
+            # Bölge + zaman aralığı taramaları; PostgreSQL'de ilan ve fiyat indekse dahil edilir (index-only scan)
+            models.Index(fields=['bolge', 'gozlem_tarihi'], include=['ilan', 'fiyat'], name='fiyatgozlemi_bolge_tarih_idx'),
+            # Tüm şehir için zaman aralığı taramaları
+            models.Index(fields=['gozlem_tarihi'], include=['ilan'], name='fiyatgozlemi_tarih_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fiyat} TL - {self.gozlem_tarihi} - {self.ilan_id}"
+
+
+class BolgeOzeti(models.Model):
+    # Bölge bazlı günlük/aylık kira istatistikleri; her taramadan sonra yalnızca etkilenen dönemler yeniden hesaplanır
+    GUNLUK = 'gun'
+    AYLIK = 'ay'
+    DONEM_SECENEKLERI = [
+        (GUNLUK, 'Günlük'),
+        (AYLIK, 'Aylık'),
+    ]
+
+    bolge = models.ForeignKey(Bolge, on_delete=models.CASCADE, related_name='ozetler', verbose_name="Bölge")
+    donem = models.CharField(max_length=3, choices=DONEM_SECENEKLERI, verbose_name="Dönem")
+    donem_baslangici = models.DateField(verbose_name="Dönem Başlangıcı") # Günlükte gün, aylıkta ayın ilk günü
+
+    ilan_sayisi = models.PositiveIntegerField(verbose_name="İlan Sayısı")
+    fiyat_toplami = models.DecimalField(max_digits=16, decimal_places=2, verbose_name="Fiyat Toplamı")
+    ortalama_fiyat = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Ortalama Fiyat")
+    medyan_fiyat = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Medyan Fiyat")
+    ortalama_m2_fiyati = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name="Ortalama m² Fiyatı")
+
+    guncellenme_tarihi = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
+
+    class Meta:
+        verbose_name = "Bölge Özeti"
+        verbose_name_plural = "Bölge Özetleri"
+        unique_together = (('bolge', 'donem', 'donem_baslangici'),) # Bölge başına her dönem için tek satır
+
+    def __str__(self):
+        return f"{self.bolge} - {self.get_donem_display()} {self.donem_baslangici}: {self.ortalama_fiyat} TL"
+
+
+class TaramaCalismasi(models.Model):
+    # Her scraper çalıştırmasının parametreleri, sayıları ve aşama süreleri (bkz. emlak/telemetry.py);
+    # çalıştırmalar arası karşılaştırma ile site düzeni değiştiğinde yavaşlama ve ayrıştırma hataları görülür
+    CALISIYOR = 'calisiyor'
+    TAMAMLANDI = 'tamamlandi'
+    HATALI = 'hatali'
+    DURUM_SECENEKLERI = [
+        (CALISIYOR, 'Çalışıyor'),
+        (TAMAMLANDI, 'Tamamlandı'),
+        (HATALI, 'Hatalı'),
+    ]
+
+    baslangic = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Başlangıç")
+    bitis = models.DateTimeField(blank=True, null=True, verbose_name="Bitiş")
+    durum = models.CharField(max_length=10, choices=DURUM_SECENEKLERI, default=CALISIYOR, verbose_name="Durum")
+    parametreler = models.JSONField(default=dict, blank=True, verbose_name="Parametreler") # kaynak, ilçe, sayfa, motor...
+
+    sayfa = models.PositiveIntegerField(default=0, verbose_name="Taranan Sayfa")
+    hatali_sayfa = models.PositiveIntegerField(default=0, verbose_name="Hatalı Sayfa")
+    kart = models.PositiveIntegerField(default=0, verbose_name="Kart")
+    eklenen = models.PositiveIntegerField(default=0, verbose_name="Eklenen İlan")
+    guncellenen = models.PositiveIntegerField(default=0, verbose_name="Güncellenen İlan")
+    degismeyen = models.PositiveIntegerField(default=0, verbose_name="Değişmeyen İlan")
+    atlanan = models.PositiveIntegerField(default=0, verbose_name="Eksik Veri Nedeniyle Atlanan")
+    sure_sn = models.FloatField(blank=True, null=True, verbose_name="Süre (sn)")
+
+    # Telemetri özeti: {aşama: {adet, toplam_sn, ortalama_ms, p50_ms, p95_ms, en_uzun_ms, kovalar}} ve {sayaç: adet}
+    asamalar = models.JSONField(default=dict, blank=True, verbose_name="Aşama Süreleri")
+    sayaclar = models.JSONField(default=dict, blank=True, verbose_name="Sayaçlar")
+    hata = models.TextField(blank=True, null=True, verbose_name="Hata")
+
+    class Meta:
+        verbose_name = "Tarama Çalışması"
+        verbose_name_plural = "Tarama Çalışmaları"
+        ordering = ['-baslangic']
+
+    def __str__(self):
+        return f"{self.baslangic:%Y-%m-%d %H:%M} - {self.get_durum_display()} ({self.sayfa} sayfa, {self.kart} kart)"
+
+
+class TaramaSayfasi(models.Model):
+    # Kalıcı URL sınırı (frontier, bkz. emlak/frontier.py): her listeleme sayfası bir kez kaydedilir ve durumu
+    # izlenir; yarıda kesilen uzun bir tarama kaldığı sayfadan devam eder, yakın zamanda çekilen sayfalar atlanır
+    BEKLIYOR = 'bekliyor'
+    TAMAMLANDI = 'tamamlandi'
+    HATALI = 'hatali'
+    DURUM_SECENEKLERI = [
+        (BEKLIYOR, 'Bekliyor'),
+        (TAMAMLANDI, 'Tamamlandı'),
+        (HATALI, 'Hatalı'),
+    ]
+
+    url = models.URLField(max_length=500, unique=True, verbose_name="Sayfa URL'si")
+    kaynak = models.CharField(max_length=50, verbose_name="Kaynak") # emlak.sources anahtarı
+    sehir = models.CharField(max_length=100, verbose_name="Şehir")
+    ilce = models.CharField(max_length=100, verbose_name="İlçe")
+    sayfa = models.PositiveIntegerField(verbose_name="Sayfa No")
+    durum = models.CharField(max_length=10, choices=DURUM_SECENEKLERI, default=BEKLIYOR, verbose_name="Durum")
+    deneme = models.PositiveSmallIntegerField(default=0, verbose_name="Art Arda Başarısız Deneme")
+    kart_sayisi = models.PositiveIntegerField(blank=True, null=True, verbose_name="Kart Sayısı")
+    son_cekme = models.DateTimeField(blank=True, null=True, verbose_name="Son Çekme")
+    hata = models.TextField(blank=True, null=True, verbose_name="Hata")
+    eklenme = models.DateTimeField(auto_now_add=True, verbose_name="Eklenme")
+
+    class Meta:
+        verbose_name = "Tarama Sayfası"
+        verbose_name_plural = "Tarama Sayfaları"
+        indexes = [
+            # Devam eden taramanın bekleyen sayfaları ilçe ilçe okunur
+            models.Index(fields=['durum', 'kaynak', 'sehir', 'ilce'], name='tarama_sayfasi_durum_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({self.get_durum_display()})"
+
+
+class IlanArsivi(models.Model):
+    # Saklama süresi dolan ilan aylarının arşiv kaydı (bkz. emlak/partitioning.py): ayın ilanları ve fiyat gözlemleri
+    # sıkıştırılmış CSV dosyalarına yazılıp tablodan çıkarılır. Arşivlenen ayların bölge özetleri (BolgeOzeti)
+    # korunur ve artık yeniden hesaplanmaz.
+    ay = models.DateField(db_index=True, verbose_name="Ay") # Ayın ilk günü
+    ilan_sayisi = models.PositiveIntegerField(verbose_name="İlan Sayısı")
+    fiyat_gozlemi_sayisi = models.PositiveIntegerField(verbose_name="Fiyat Gözlemi Sayısı")
+    ilan_dosyasi = models.CharField(max_length=500, verbose_name="İlan Dosyası")
+    gozlem_dosyasi = models.CharField(max_length=500, verbose_name="Gözlem Dosyası")
+    olusturma = models.DateTimeField(auto_now_add=True, verbose_name="Arşivlenme")
+
+    class Meta:
+        verbose_name = "İlan Arşivi"
+        verbose_name_plural = "İlan Arşivleri"
+        ordering = ['-ay']
+
+    def __str__(self):
+        return f"{self.ay:%Y-%m}: {self.ilan_sayisi} ilan ({self.ilan_dosyasi})"
+
+
+class IlanAdresi(models.Model):
+    # Bölümlü ilan tablosunun (PostgreSQL, bkz. emlak/partitioning.py) bölümsüz eşi: bölümlü tabloda tekil indeks
+    # bölümleme sütununu içermek zorunda olduğundan ilan_url ve id tekilliği buradaki indekslerle zorlanır, ilana
+    # başvuran yabancı anahtarlar da bu tabloya bağlanır. Satırlarını KiraIlani üzerindeki tetikleyiciler yazar;
+    # bölümsüz tabloda (SQLite) boş kalır.
+    id = models.BigIntegerField(primary_key=True, verbose_name="İlan ID") # KiraIlani.id
+    ilan_url = models.URLField(max_length=500, unique=True, verbose_name="İlan URL'si")
+
+    class Meta:
+        verbose_name = "İlan Adresi"
+        verbose_name_plural = "İlan Adresleri"
 
     def __str__(self):
-        return f"{self.fiyat} TL - {self.bolge} - {self.ilan_kaynagi}"
\ No newline at end of file
+        return self.ilan_url
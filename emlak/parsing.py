@@ -0,0 +1,426 @@
+# emlak/parsing.py
+
+"""
+İlan kartı ayrıştırıcısı.
+
+Sayfa kaynağından (canlı Selenium çıktısı veya diske kaydedilmiş HTML dosyası) ilan kartlarını
+çıkarır ve emlak.persistence'ın beklediği kart sözlüklerine dönüştürür.
+
+Birden fazla HTML arka ucu desteklenir; kurulu olan en hızlısı varsayılan olarak seçilir:
+- 'selectolax' (Lexbor tabanlı, en hızlı)   -> pip install selectolax
+- 'lxml'       (libxml2, derlenmiş XPath)  -> pip install lxml
+- 'bs4'        (BeautifulSoup + html.parser, her zaman mevcut)
+
+Seçiciler modül yüklenirken bir kez derlenir ve her kartın alt ağacı tek geçişte dolaşılır.
+
+extract_details() ise tek bir ilanın detay sayfasından liste sayfasında olmayan alanları (bina yaşı,
+eşya durumu, ısınma tipi, açıklama) çıkarır (bkz. emlak/enrichment.py).
+"""
+
+import re
+import time
+from datetime import date
+
+from emlak import locations, telemetry
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser # selectolax < 0.3.13
+    except ImportError:
+        HTMLParser = None
+
+# Emlakjet site sabitleri (Selenium ve HTTP motorları ortak kullanır)
+EMLAKJET_BASE_URL = "https://www.emlakjet.com"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+
+# Kart kapsayıcıları: eski düzende <a class="styles_listCard__..."> kartın kendisi,
+# güncel düzende <div class="styles_listingWrapper__..."> içindeki <a href="/ilan/...">
+KART_SINIF_RE = re.compile(r'(?:^|\s)styles_(?:listCard|listingWrapper)__')
+
+# Selenium beklemeleri için aynı kartların CSS karşılığı
+KART_CSS_SECICI = "a[class*='styles_listCard__'], div[class*='styles_listingWrapper__'] a[href^='/ilan/']"
+
+# Kart içindeki alanlar: CSS modülü bileşen adı -> alan
+ALAN_BILESENLERI = {
+    'realtyName': 'baslik',         # eski düzen
+    'title': 'baslik',
+    'price': 'fiyat',
+    'realtyLocation': 'konum',      # eski düzen
+    'location': 'konum',
+    'propertyInfoListItem': 'ozellik',  # eski düzen: her özellik ayrı <span>
+    'quickinfoWrapper': 'ozellikler',   # güncel düzen: "Daire | 3+1 | 3. Kat | 130 m²"
+}
+ALAN_SINIF_RE = re.compile(r'(?:^|\s)styles_(%s)__' % '|'.join(ALAN_BILESENLERI))
+
+_RAKAM_DISI_RE = re.compile(r'[^\d]')
+_KONUM_AYIRICI_RE = re.compile(r'[-–]')
+_METREKARE_RE = re.compile(r'(\d[\d.]*)\s*m(?:2|²)')
+
+
+def parse_price(price_str):
+    """Fiyat stringini sayıya dönüştürür."""
+    try:
+        cleaned_price = _RAKAM_DISI_RE.sub('', price_str)
+        return int(cleaned_price)
+    except ValueError:
+        return None
+
+def parse_location(location_str):
+    """Konum stringinden il, ilçe, mahalle ayıklar (gazetteer'da bulunamayan konumlar için yedek, bkz. emlak.locations)."""
+    sehir = "İstanbul" # Şimdilik sabit tutalım
+    ilce = None
+    mahalle = None
+
+    parts = [p.strip() for p in _KONUM_AYIRICI_RE.split(location_str)]
+
+    if len(parts) >= 2:
+        ilce_candidate = parts[0].strip()
+        mahalle_candidate = parts[1].strip()
+
+        if "Mahallesi" in ilce_candidate:
+            ilce_parts = ilce_candidate.split()
+            if len(ilce_parts) > 1:
+                ilce = ilce_parts[0]
+                mahalle = ' '.join(ilce_parts[1:]).replace("Mahallesi", "").strip()
+            else:
+                ilce = ilce_candidate.replace("Mahallesi", "").strip()
+        else:
+            ilce = ilce_candidate
+            mahalle = mahalle_candidate.replace("Mahallesi", "").strip()
+
+    elif len(parts) == 1:
+        location_parts = location_str.split()
+        if len(location_parts) > 0:
+            ilce = location_parts[0].strip()
+            if len(location_parts) > 1:
+                mahalle_temp = ' '.join(location_parts[1:]).strip()
+                mahalle = mahalle_temp.replace("Mahallesi", "").strip()
+
+    if not mahalle:
+        mahalle = None
+
+    if not ilce and len(location_str.split()) > 0:
+        ilce = location_str.split()[0].strip()
+
+    if not sehir: sehir = "İstanbul"
+    if not ilce: ilce = "Kadıköy" # Varsayılan ilçe
+    if mahalle == "": mahalle = None
+
+    return sehir, ilce, mahalle
+
+
+def _alan_ekle(alanlar, sinif, metin_al):
+    """Elemanın sınıfı bilinen bir alana karşılık geliyorsa metnini alanlara ekler."""
+    eslesme = ALAN_SINIF_RE.search(sinif)
+    if not eslesme:
+        return
+    alan = ALAN_BILESENLERI[eslesme.group(1)]
+    if alan == 'ozellik':
+        alanlar['ozellikler'].append(metin_al())
+    elif alan == 'ozellikler':
+        alanlar['ozellikler'].extend(p.strip() for p in metin_al().split('|'))
+    elif alanlar[alan] is None:
+        alanlar[alan] = metin_al()
+
+
+def _yeni_alanlar(href):
+    """Bir kart için _alan_ekle ile doldurulacak ham alanlar."""
+    return {'href': href, 'baslik': None, 'fiyat': None, 'konum': None, 'ozellikler': []}
+
+
+class Bs4Backend:
+    """BeautifulSoup + html.parser; eski scraper.py yolunun karşılığı."""
+    name = 'bs4'
+
+    def __init__(self, html_content):
+        from bs4 import BeautifulSoup  # yalnızca bu motor seçildiğinde yüklenir (~50 ms)
+        self.soup = BeautifulSoup(html_content, 'html.parser')
+
+    def title(self):
+        return self.soup.title.string.strip() if self.soup.title and self.soup.title.string else None
+
+    def raw_cards(self):
+        for kapsayici in self.soup.find_all(class_=KART_SINIF_RE):
+            kart = kapsayici if kapsayici.name == 'a' else kapsayici.find('a', href=True)
+            if kart is None:
+                continue
+            alanlar = _yeni_alanlar(kart.get('href'))
+            for el in kart.find_all(class_=True):
+                _alan_ekle(alanlar, ' '.join(el['class']), lambda el=el: el.get_text(strip=True))
+            yield alanlar
+
+
+class LxmlBackend:
+    """lxml.html ile ayrıştırma; kart kapsayıcıları derlenmiş XPath ile bulunur."""
+    name = 'lxml'
+
+    if lxml_html is not None:
+        _kapsayici_xpath = etree.XPath(
+            "//*[contains(concat(' ', normalize-space(@class)), ' styles_listCard__')"
+            " or contains(concat(' ', normalize-space(@class)), ' styles_listingWrapper__')]"
+        )
+        _link_xpath = etree.XPath("(.//a[@href])[1]")
+
+    def __init__(self, html_content):
+        self.tree = lxml_html.fromstring(html_content)
+
+    def title(self):
+        baslik = self.tree.findtext('.//title')
+        return baslik.strip() if baslik else None
+
+    def raw_cards(self):
+        for kapsayici in self._kapsayici_xpath(self.tree):
+            if kapsayici.tag == 'a':
+                kart = kapsayici
+            else:
+                linkler = self._link_xpath(kapsayici)
+                if not linkler:
+                    continue
+                kart = linkler[0]
+            alanlar = _yeni_alanlar(kart.get('href'))
+            for el in kart.iter():
+                sinif = el.get('class') if isinstance(el.tag, str) else None
+                if sinif:
+                    _alan_ekle(alanlar, sinif, lambda el=el: ''.join(t.strip() for t in el.itertext()))
+            yield alanlar
+
+
+class SelectolaxBackend:
+    """selectolax (Lexbor) ile ayrıştırma; en hızlı arka uç."""
+    name = 'selectolax'
+    _kapsayici_css = "a[class*='styles_listCard__'], [class*='styles_listingWrapper__']"
+
+    def __init__(self, html_content):
+        self.tree = HTMLParser(html_content)
+
+    def title(self):
+        baslik = self.tree.css_first('title')
+        return baslik.text(strip=True) if baslik else None
+
+    def raw_cards(self):
+        for kapsayici in self.tree.css(self._kapsayici_css):
+            kart = kapsayici if kapsayici.tag == 'a' else kapsayici.css_first('a[href]')
+            if kart is None:
+                continue
+            alanlar = _yeni_alanlar(kart.attributes.get('href'))
+            for el in kart.traverse():
+                sinif = el.attributes.get('class')
+                if sinif:
+                    _alan_ekle(alanlar, sinif, lambda el=el: el.text(strip=True))
+            yield alanlar
+
+
+BACKENDS = {
+    Bs4Backend.name: Bs4Backend,
+    LxmlBackend.name: LxmlBackend,
+    SelectolaxBackend.name: SelectolaxBackend,
+}
+
+
+def available_backends():
+    """Kurulu olan arka uçların adlarını hızlıdan yavaşa doğru döndürür."""
+    adlar = []
+    if HTMLParser is not None:
+        adlar.append(SelectolaxBackend.name)
+    if lxml_html is not None:
+        adlar.append(LxmlBackend.name)
+    adlar.append(Bs4Backend.name)
+    return adlar
+
+
+def get_backend(backend=None):
+    """Ad verilmezse kurulu en hızlı arka ucu döndürür."""
+    if backend is None:
+        return BACKENDS[available_backends()[0]]
+    if backend not in available_backends():
+        raise ValueError(f"'{backend}' HTML arka ucu kullanılamıyor. Kurulu olanlar: {', '.join(available_backends())}")
+    return BACKENDS[backend]
+
+
+def build_card(alanlar, sira=None):
+    """
+    Ham kart alanlarını normalize edip kart sözlüğüne dönüştürür.
+    Zorunlu bilgisi eksik kartlar için uyarı basar ve None döndürür.
+    """
+    etiket = f"{sira}. ilan" if sira is not None else "İlan"
+
+    price_str = alanlar['fiyat'] or "Fiyat Yok"
+    price = parse_price(price_str)
+
+    location_str = alanlar['konum'] or "Konum Yok"
+    sehir, ilce, mahalle = locations.resolve_location(alanlar['konum'])
+
+    # Metrekare ve Oda Sayısı
+    metrekare = None
+    oda_sayisi = None
+    for text in alanlar['ozellikler']:
+        eslesme = _METREKARE_RE.search(text)
+        if eslesme:
+            try:
+                metrekare = int(_RAKAM_DISI_RE.sub('', eslesme.group(1)))
+            except ValueError:
+                pass
+        elif '+' in text or text.startswith('Stüdyo'):
+            oda_sayisi = text
+
+    item_url = EMLAKJET_BASE_URL + alanlar['href'] if alanlar['href'] else None
+
+    if not item_url:
+        print(f"Uyarı: {etiket} için URL bulunamadı, atlanıyor.")
+        telemetry.say('atlanan_url_yok')
+        return None
+    if not price:
+        print(f"Uyarı: {etiket} için fiyat ayrıştırılamadı, atlanıyor. Fiyat stringi: {price_str}")
+        telemetry.say('atlanan_fiyat_yok')
+        return None
+    if not ilce:
+        print(f"Uyarı: {etiket} için ilçe ayrıştırılamadı, atlanıyor. Konum stringi: {location_str}")
+        telemetry.say('atlanan_ilce_yok')
+        return None
+
+    return {
+        'ilan_url': item_url,
+        'fiyat': price,
+        'metrekare': metrekare,
+        'oda_sayisi': oda_sayisi,
+        'sehir': sehir,
+        'ilce': ilce,
+        'mahalle': mahalle,
+        'ilan_kaynagi': 'Emlakjet',
+        'ilan_tarihi': date.today(), # İlan Tarihi (şimdilik veri çekme tarihini kullanacağız)
+    }
+
+
+def extract_cards(html_content, backend=None, verbose=True):
+    """
+    Sayfa kaynağındaki ilan kartlarını ayrıştırır.
+    Veritabanına kaydedilmeye hazır kart sözlüklerinin listesini döndürür (bkz. emlak.persistence).
+    Ayrıştırma ve kart başına çıkarma süreleri ile kart sayaçları etkin telemetriye yazılır.
+    """
+    olcum = telemetry.aktif()
+    with olcum.olc('html_ayristirma'):
+        sayfa = get_backend(backend)(html_content)
+    if verbose:
+        print(f"Güncel Sayfa Başlığı: {sayfa.title() or 'Başlık Yok'}")
+
+    kartlar = []
+    bulunan = 0
+    hatali = 0
+    # Kart süresi, arka ucun kartı bulması (raw_cards) ve build_card'ı birlikte kapsar
+    onceki = time.perf_counter()
+    for bulunan, alanlar in enumerate(sayfa.raw_cards(), start=1):
+        try:
+            kart = build_card(alanlar, bulunan)
+        except Exception as e:
+            print(f"İlan {bulunan} işlenirken hata oluştu: {e}")
+            hatali += 1
+            kart = None
+        if kart is not None:
+            kartlar.append(kart)
+        simdi = time.perf_counter()
+        olcum.kaydet('kart_cikarma', simdi - onceki)
+        onceki = simdi
+    olcum.say('kart_bulunan', bulunan)
+    olcum.say('kart_gecerli', len(kartlar))
+    if hatali:
+        olcum.say('kart_hatasi', hatali)
+
+    if not bulunan:
+        # Sessiz modda (toplu yeniden ayrıştırma, benchmark) boş sayfalar çalışma özetindeki sayaçtan izlenir
+        olcum.say('kartsiz_sayfa')
+        if verbose:
+            print("Emlakjet'te hiç ilan bulunamadı. Lütfen HTML elementlerini kontrol edin veya bekleme süresini artırın.")
+    elif verbose:
+        print(f"\nSayfadan bulunan toplam {bulunan} ilan bilgisi ({sayfa.name}).")
+    return kartlar
+
+
+def extract_cards_from_file(dosya_yolu, backend=None, verbose=True):
+    """Diske kaydedilmiş bir sayfa kaynağını (ör. emlakjet_timeout_page_source.html) ayrıştırır."""
+    with open(dosya_yolu, encoding='utf-8') as f:
+        return extract_cards(f.read(), backend=backend, verbose=verbose)
+
+
+# --- İlan detay sayfası ---
+# "İlan Bilgileri" tablosundaki etiketler (locations.fold_tr ile katlanmış) -> KiraIlani alanı
+DETAY_ETIKETLERI = {
+    'binanin yasi': 'binanin_yasi',
+    'bina yasi': 'binanin_yasi',
+    'esya durumu': 'esyalimi',
+    'esyali': 'esyalimi',
+    'isitma tipi': 'isinma_tipi',
+    'isinma tipi': 'isinma_tipi',
+    'isitma': 'isinma_tipi',
+}
+ACIKLAMA_BASLIKLARI = ('ilan aciklamasi', 'aciklama')
+_SAYI_RE = re.compile(r'\d+')
+
+
+def parse_building_age(deger):
+    """'0 (Yeni)', 'Sıfır Bina', '5-10 arası', '21 ve üzeri' gibi yazımlardan yaşı (aralıkta alt sınırı) çıkarır."""
+    eslesme = _SAYI_RE.search(deger)
+    if eslesme:
+        return int(eslesme.group())
+    return 0 if locations.fold_tr(deger) in ('sifir', 'sifir bina', 'yeni') else None
+
+
+def parse_furnished(deger):
+    """'Eşyalı' / 'Evet' -> True, 'Eşyasız' / 'Boş' / 'Hayır' -> False, bilinmiyorsa None."""
+    deger = locations.fold_tr(deger)
+    if deger in ('esyali', 'evet', 'var'):
+        return True
+    if deger in ('esyasiz', 'bos', 'hayir', 'yok'):
+        return False
+    return None
+
+
+def extract_details(html_content):
+    """
+    Emlakjet ilan detay sayfasından liste sayfasında olmayan alanları çıkarır:
+    binanin_yasi, esyalimi, isinma_tipi, aciklama. Yalnızca sayfada bulunan alanları içeren sözlük döndürür.
+    İlan bilgileri etiket/değer çiftleri olarak okunur (etiketten sonraki ilk metin değerdir); böylece
+    tablo, liste veya tanım listesi düzenlerinin hepsi aynı şekilde işlenir.
+    """
+    from bs4 import BeautifulSoup
+    sayfa = BeautifulSoup(html_content, 'lxml' if lxml_html is not None else 'html.parser')
+    for eleman in sayfa(['script', 'style', 'noscript']):
+        eleman.decompose()
+
+    ham = {}
+    metinler = list(sayfa.stripped_strings)
+    for i, metin in enumerate(metinler[:-1]):
+        alan = DETAY_ETIKETLERI.get(locations.fold_tr(metin)) if len(metin) < 30 else None
+        if alan and alan not in ham:
+            ham[alan] = metinler[i + 1]
+
+    detaylar = {}
+    if 'binanin_yasi' in ham:
+        yas = parse_building_age(ham['binanin_yasi'])
+        if yas is not None:
+            detaylar['binanin_yasi'] = yas
+    if 'esyalimi' in ham:
+        esyali = parse_furnished(ham['esyalimi'])
+        if esyali is not None:
+            detaylar['esyalimi'] = esyali
+    if 'isinma_tipi' in ham:
+        detaylar['isinma_tipi'] = ham['isinma_tipi'][:100]
+
+    # Açıklama: "İlan Açıklaması" başlığını izleyen eleman; bulunamazsa meta açıklaması
+    for baslik in sayfa.find_all(string=lambda metin: locations.fold_tr(metin) in ACIKLAMA_BASLIKLARI):
+        icerik = baslik.parent.find_next_sibling()
+        if icerik is not None and icerik.get_text(strip=True):
+            detaylar['aciklama'] = icerik.get_text('\n', strip=True)
+            break
+    else:
+        meta = sayfa.find('meta', attrs={'name': 'description'})
+        if meta is not None and meta.get('content', '').strip():
+            detaylar['aciklama'] = meta['content'].strip()
+    return detaylar
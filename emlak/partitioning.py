@@ -0,0 +1,238 @@
+# emlak/partitioning.py
+
+"""
+İlan tablosunun (KiraIlani) ilan_tarihi'ne göre aylık bölümlenmesi, bölüm bakımı ve arşivleme (PostgreSQL).
+
+migrations/0011 tabloyu `PARTITION BY RANGE (ilan_tarihi)` tablosuna çevirir: her ay bir bölüm
+(emlak_kirailani_p2026_10) ve aralık dışı tarihler için bir varsayılan bölüm (emlak_kirailani_varsayilan).
+Analiz sorguları ilan_tarihi ile filtrelendiğinden (maliyet_hesapla'nın son 90 günü, özet yenilemenin
+bölge-ayları) planlayıcı yalnızca ilgili ayların bölümlerini tarar; VACUUM ve indeks bakımı da bölüm başınadır.
+
+Bölümlemenin bedelleri:
+    - Tekil anahtarlar bölümleme sütununu içermek zorundadır: birincil anahtar (id, ilan_tarihi) olur, ilan_url
+      ve id tek başına bölümlü tabloda tekil tutulamaz. Bunları bölümsüz IlanAdresi tablosu (migrations/0012)
+      taşır: ilan tablosundaki tetikleyiciler her ilan için (id, ilan_url) satırını ekler/siler, tekil indeksleri
+      aynı adresin ikinci kez eklenmesini IntegrityError ile reddeder. İlana başvuran yabancı
+      anahtarlar (FiyatGozlemi.ilan, KiraIlani.asil_ilan) da IlanAdresi.id'ye bağlanır.
+    - ON CONFLICT için hedef tabloda tekil indeks gerektiğinden persistence mevcut ilanları ilan_url ile okuyup
+      yenileri ekler, eskileri id ile günceller. Okuma ile yazma arasında aynı ilanları yazan başka bir işlem
+      (kira_tara, yeniden_ayristir) araya girmesin diye parçanın adresleri önce lock_urls ile kilitlenir.
+      İlan tarihi değişen ilan UPDATE ile kendi ayının bölümüne taşınır.
+    - Bölümleri tetikleyicileri atlayarak değiştiren işlemler (create_partition'ın taşıması, archive_month'un
+      DROP'u) adres satırlarını kendileri yazar/siler.
+
+ilan_bolumleri komutu (cron ile günlük) önümüzdeki ayların bölümlerini oluşturur (ensure_partitions); varsayılan
+bölüme düşmüş satırları kendi ay bölümlerine taşır. ilan_tarihi ilanın son görüldüğü gündür: artımlı taramada
+içeriği değişmeyen ilanlarınki de ilerletilir (bkz. emlak.persistence), UPDATE satırı yeni ayın bölümüne taşır.
+Saklama süresi bu yüzden son görülmeden işler; hâlâ yayında olan bir ilan geçmişiyle birlikte arşivlenmez.
+Saklama süresi dolan aylar archive_expired ile arşivlenir:
+    1. ayın ilanları ve bu ilanların fiyat gözlemleri ILAN_ARSIVI_DIZINI'ne gzip'li CSV olarak yazılır,
+    2. gözlemler silinir, arşivlenen ilanları asil_ilan gösteren kopyaların bağı kaldırılır,
+    3. ilanların adres satırları silinir, ay bölümü ayrılıp (DETACH) silinir; varsayılan bölümdeki o aya ait
+       satırlar DELETE ile silinir,
+    4. IlanArsivi kaydı yazılır. Arşivlenen ayların bölge özetleri korunur ve yeniden hesaplanmaz
+       (bkz. emlak.rollup.archived_months).
+Arşiv dosyaları tablo sütunlarıyla aynı sıradadır ve NULL değerler \\N olarak yazılır; geri yüklemek için:
+    gunzip -c kirailani-2024-09-....csv.gz | psql -c "COPY emlak_kirailani FROM STDIN (FORMAT csv, HEADER, NULL '\\N')"
+
+PostgreSQL dışında (yerel SQLite) tablo bölümlenmez; buradaki bakım fonksiyonları hiçbir şey yapmaz.
+"""
+
+import csv
+import gzip
+import os
+import re
+from datetime import date
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from emlak.models import FiyatGozlemi, IlanAdresi, IlanArsivi, KiraIlani
+
+TABLO = KiraIlani._meta.db_table
+ADRES_TABLOSU = IlanAdresi._meta.db_table
+VARSAYILAN_BOLUM = f'{TABLO}_varsayilan'
+BOS_DEGER = r'\N'
+OKUMA_PARCASI = 5000
+GZIP_SEVIYESI = 6
+_SINIR_RE = re.compile(r"FOR VALUES FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+_bolumlu = None
+
+
+def sonraki_ay(ay):
+    return date(ay.year + ay.month // 12, ay.month % 12 + 1, 1)
+
+
+def ay_ekle(ay, adet):
+    toplam = ay.year * 12 + ay.month - 1 + adet
+    return date(toplam // 12, toplam % 12 + 1, 1)
+
+
+def bolum_adi(ay):
+    return f'{TABLO}_p{ay:%Y_%m}'
+
+
+def is_partitioned():
+    """İlan tablosu bölümlü mü (süreç boyunca bir kez sorgulanır)."""
+    global _bolumlu
+    if _bolumlu is None:
+        if connection.vendor != 'postgresql':
+            _bolumlu = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)',
+                               [TABLO])
+                _bolumlu = cursor.fetchone()[0]
+    return _bolumlu
+
+
+def list_partitions():
+    """Bölümler, başlangıca göre sıralı: (ad, başlangıç, bitiş, tahmini satır); varsayılan bölümde sınırlar None."""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass', [TABLO])
+        satirlar = cursor.fetchall()
+    bolumler = []
+    for ad, sinir, tahmin in satirlar:
+        eslesme = _SINIR_RE.search(sinir)
+        baslangic, bitis = (date.fromisoformat(eslesme[1]), date.fromisoformat(eslesme[2])) if eslesme else (None, None)
+        bolumler.append((ad, baslangic, bitis, max(tahmin, 0)))
+    return sorted(bolumler, key=lambda b: (b[1] is None, b[1] or date.min))
+
+
+def lock_urls(urller):
+    """
+    İlan adreslerini işlemin sonuna kadar kilitler (pg_advisory_xact_lock); aynı adresleri kilitleyen diğer
+    işlemler bu işlem bitene kadar bekler. Kilitler sıralı alındığından işlemler birbirini kilitlemez (deadlock).
+    Bir işlem (transaction.atomic) içinde çağrılmalıdır.
+    """
+    if not is_partitioned() or not urller:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(anahtar) FROM (SELECT DISTINCT hashtextextended(url, 0) '
+                       'AS anahtar FROM unnest(%s::text[]) AS url ORDER BY 1) AS kilitler', [list(urller)])
+
+
+def _varsayilan_aylari(cursor):
+    cursor.execute(f"SELECT DISTINCT date_trunc('month', ilan_tarihi)::date FROM {VARSAYILAN_BOLUM}")
+    return sorted(ay for ay, in cursor.fetchall())
+
+
+def create_partition(ay):
+    """
+    `ay`ın bölümünü oluşturur. Varsayılan bölümde o aya düşmüş satırlar varsa yeni bölüme taşınır
+    (PostgreSQL varsayılan bölümde eşleşen satır varken yeni bölüm eklenmesine izin vermez).
+    """
+    ad, bitis = bolum_adi(ay), sonraki_ay(ay)
+    aralik = f"ilan_tarihi >= '{ay}' AND ilan_tarihi < '{bitis}'"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {ad} (LIKE {TABLO} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(f'WITH tasinan AS (DELETE FROM {VARSAYILAN_BOLUM} WHERE {aralik} RETURNING *) '
+                       f'INSERT INTO {ad} SELECT * FROM tasinan')
+        tasinan = cursor.rowcount
+        # Varsayılan bölümden silme adres satırlarını da sildi; yeni tablo henüz bölüm olmadığından eklemeyi yazmadı
+        cursor.execute(f'INSERT INTO {ADRES_TABLOSU} (id, ilan_url) SELECT id, ilan_url FROM {ad}')
+        # Bölümün indeksleri eklenirken üst tablonun indekslerinden oluşturulur
+        cursor.execute(f"ALTER TABLE {TABLO} ATTACH PARTITION {ad} FOR VALUES FROM ('{ay}') TO ('{bitis}')")
+    return tasinan
+
+
+def ensure_partitions(onden_ay, saklama_ay=0, bugun=None):
+    """
+    Bu aydan `onden_ay` ay sonrasına kadar eksik bölümleri ve varsayılan bölümde satırı olan (arşivlenecek
+    kadar eski olmayan) ayların bölümlerini oluşturur. [(ay, taşınan satır)] döndürür.
+    """
+    if not is_partitioned():
+        return []
+    bu_ay = (bugun or timezone.localdate()).replace(day=1)
+    mevcutlar = {baslangic for _, baslangic, _, _ in list_partitions() if baslangic}
+    with connection.cursor() as cursor:
+        aylar = set(_varsayilan_aylari(cursor))
+    if saklama_ay:
+        sinir = ay_ekle(bu_ay, -saklama_ay)
+        aylar = {ay for ay in aylar if ay >= sinir}
+    aylar |= {ay_ekle(bu_ay, i) for i in range(onden_ay + 1)}
+    return [(ay, create_partition(ay)) for ay in sorted(aylar - mevcutlar)]
+
+
+def _csv_yaz(cursor, sorgu, yol):
+    """Sorgunun sonucunu başlık satırıyla gzip'li CSV'ye parça parça yazar; satır sayısını döndürür."""
+    cursor.execute(sorgu)
+    yazilan = 0
+    with gzip.open(yol, 'wt', encoding='utf-8', newline='', compresslevel=GZIP_SEVIYESI) as f:
+        yazici = csv.writer(f)
+        yazici.writerow([sutun[0] for sutun in cursor.description])
+        while True:
+            satirlar = cursor.fetchmany(OKUMA_PARCASI)
+            if not satirlar:
+                break
+            yazici.writerows([BOS_DEGER if deger is None else deger for deger in satir] for satir in satirlar)
+            yazilan += len(satirlar)
+    return yazilan
+
+
+def archive_month(ay, dizin):
+    """
+    `ay`ın ilanlarını (ay bölümü ve varsayılan bölümdekiler) ve fiyat gözlemlerini arşiv dosyalarına yazıp
+    tablodan çıkarır. IlanArsivi kaydını ve asil_ilan bağı kaldırılan kopyaların (bolge_id, ilan_tarihi)
+    kümesini döndürür; çağıran bu kovaların özetlerini yenilemelidir.
+    """
+    bolum = next((b for b in list_partitions() if b[1] == ay), None)
+    bitis = sonraki_ay(ay)
+    kaynak = (f"(SELECT * FROM {bolum[0]} UNION ALL SELECT * FROM {VARSAYILAN_BOLUM} "
+              f"WHERE ilan_tarihi >= '{ay}' AND ilan_tarihi < '{bitis}')" if bolum else
+              f"(SELECT * FROM {VARSAYILAN_BOLUM} WHERE ilan_tarihi >= '{ay}' AND ilan_tarihi < '{bitis}')")
+    idler = f'SELECT id FROM {kaynak} AS arsivlenen'
+
+    os.makedirs(dizin, exist_ok=True)
+    zaman = timezone.now().strftime('%Y%m%dT%H%M%S')
+    ilan_dosyasi = os.path.join(os.fspath(dizin), f'kirailani-{ay:%Y-%m}-{zaman}.csv.gz')
+    gozlem_dosyasi = os.path.join(os.fspath(dizin), f'fiyatgozlemi-{ay:%Y-%m}-{zaman}.csv.gz')
+    gozlem_tablosu = FiyatGozlemi._meta.db_table
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Dosyalar silmelerle aynı işlemde yazılır; ayın bölümlerine arada yazılan satırlar kaybolmasın diye
+            # yalnızca bu bölümler kilitlenir, güncel aylara yazan tarama beklemez
+            cursor.execute(f'LOCK TABLE {", ".join(filter(None, (bolum and bolum[0], VARSAYILAN_BOLUM)))} '
+                           f'IN SHARE ROW EXCLUSIVE MODE')
+            ilan_sayisi = _csv_yaz(cursor, f'SELECT * FROM {kaynak} AS arsivlenen ORDER BY id', ilan_dosyasi)
+            gozlem_sayisi = _csv_yaz(cursor, f'SELECT * FROM {gozlem_tablosu} WHERE ilan_id IN ({idler}) '
+                                             f'ORDER BY ilan_id, gozlem_tarihi', gozlem_dosyasi)
+            cursor.execute(f'DELETE FROM {gozlem_tablosu} WHERE ilan_id IN ({idler})')
+            cursor.execute(f'UPDATE {TABLO} SET asil_ilan_id = NULL WHERE asil_ilan_id IN ({idler}) '
+                           f'RETURNING bolge_id, ilan_tarihi')
+            kopyalar = set(cursor.fetchall())
+            # DROP tetikleyicileri çalıştırmaz; adres satırları burada silinir
+            cursor.execute(f'DELETE FROM {ADRES_TABLOSU} WHERE id IN ({idler})')
+            cursor.execute(f"DELETE FROM {VARSAYILAN_BOLUM} WHERE ilan_tarihi >= '{ay}' AND ilan_tarihi < '{bitis}'")
+            if bolum:
+                cursor.execute(f'ALTER TABLE {TABLO} DETACH PARTITION {bolum[0]}')
+                cursor.execute(f'DROP TABLE {bolum[0]}')
+            kayit = IlanArsivi.objects.create(ay=ay, ilan_sayisi=ilan_sayisi, fiyat_gozlemi_sayisi=gozlem_sayisi,
+                                              ilan_dosyasi=ilan_dosyasi, gozlem_dosyasi=gozlem_dosyasi)
+    except BaseException:
+        for yol in (ilan_dosyasi, gozlem_dosyasi):
+            if os.path.exists(yol):
+                os.remove(yol)
+        raise
+    return kayit, kopyalar
+
+
+def expired_months(saklama_ay, bugun=None):
+    """Saklama süresi dolmuş ve tabloda satırı olan aylar (ay bölümü veya varsayılan bölümdeki satırlar)."""
+    if not is_partitioned() or not saklama_ay:
+        return []
+    sinir = ay_ekle((bugun or timezone.localdate()).replace(day=1), -saklama_ay)
+    aylar = {baslangic for _, baslangic, _, _ in list_partitions() if baslangic and baslangic < sinir}
+    with connection.cursor() as cursor:
+        aylar |= {ay for ay in _varsayilan_aylari(cursor) if ay < sinir}
+    return sorted(aylar)
+
+
+def archive_expired(saklama_ay, dizin, bugun=None):
+    """Saklama süresi dolan ayları arşivler; [(IlanArsivi, kopyalar)] döndürür."""
+    return [archive_month(ay, dizin) for ay in expired_months(saklama_ay, bugun)]
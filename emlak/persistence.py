@@ -0,0 +1,369 @@
+# emlak/persistence.py
+
+"""
+Scraper'ın ayrıştırdığı ilan kartlarını toplu halde veritabanına yazar.
+
+Her kart için ayrı ayrı Bolge.get_or_create + KiraIlani.update_or_create çağırmak
+ilan başına 2-4 sorgu demek. Burada bir sayfadaki (veya tüm çalıştırmadaki) kartlar
+birlikte işlenir: bölgeler tek sorgu + tek bulk_create ile çözülür, ilanlar ise
+ilan_url üzerinden parça parça upsert edilir.
+
+Bir "kart" şu anahtarlara sahip düz bir sözlüktür:
+    ilan_url, fiyat, metrekare, oda_sayisi, sehir, ilce, mahalle, ilan_kaynagi, ilan_tarihi
+
+Artımlı modda her kartın içerik özeti (listing_fingerprint) veritabanındakiyle karşılaştırılır;
+özeti değişmeyen ilanlar yeniden yazılmaz, yalnızca ilan_tarihi'leri (son görülme günü) tarih başına tek bir
+UPDATE ile ilerletilir. İlan tablosu ilan_tarihi'ne göre bölümlenip arşivlendiği için (bkz. emlak/partitioning.py)
+hâlâ yayındaki bir ilan ilk görüldüğü ayla birlikte arşivlenmemeli.
+
+Yeni ilanlar ve fiyatı değişen ilanlar için FiyatGozlemi tablosuna aynı işlemde bir gözlem eklenir;
+böylece KiraIlani.fiyat üzerine yazılsa da fiyat geçmişi kaybolmaz.
+
+Yazılan ilanlar başka kaynaklardaki aynı dairelerle eşleştirilir (bkz. emlak/dedup.py); kopyalar
+ortalamalara katılmaz.
+
+Yazma bittikten sonra dokunulan (bolge, ilan_tarihi) kovalarının bölge özetleri (BolgeOzeti) yenilenir.
+
+Tarama başında preload_bolgeler() çağrılırsa tüm bölgeler bir kez belleğe alınır; ardından bilinen
+bölgelerin kartları hiç bölge sorgusu atmadan çözülür. Yeni bölgeler gazetteer'daki koordinatlarıyla
+(bkz. emlak/locations.py) oluşturulur.
+"""
+
+import hashlib
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from emlak import dedup, locations, partitioning, rollup
+from emlak.models import Bolge, FiyatGozlemi, KiraIlani
+
+# Tek INSERT ... ON CONFLICT sorgusunda yazılacak en fazla ilan sayısı
+BATCH_SIZE = 500
+
+# Mevcut bir ilan tekrar görüldüğünde güncellenen alanlar (eski update_or_create defaults + içerik özeti)
+GUNCELLENEN_ALANLAR = ['bolge', 'fiyat', 'metrekare', 'oda_sayisi', 'ilan_kaynagi', 'ilan_tarihi', 'icerik_ozeti',
+                       'kopya_anahtari']
+
+ZORUNLU_ALANLAR = ('ilan_url', 'fiyat', 'metrekare', 'ilce', 'ilan_tarihi')
+
+# Bir parçadaki ilanların veritabanındaki hali (özet karşılaştırması, fiyat gözlemi ve bölge özeti için)
+MevcutIlan = namedtuple('MevcutIlan', ['id', 'icerik_ozeti', 'fiyat', 'bolge_id', 'ilan_tarihi'])
+
+
+def bolge_anahtari(kart):
+    """Kartın ait olduğu bölgenin (sehir, ilce, mahalle) anahtarını döndürür."""
+    return (kart['sehir'], kart['ilce'], kart.get('mahalle') or None)
+
+
+def listing_fingerprint(kart):
+    """
+    Kartın içerik özetini döndürür: fiyat, metrekare, oda sayısı, bölge ve kaynaktan üretilen 16 karakterlik hash.
+    ilan_tarihi (şimdilik veri çekme tarihi) özete dahil değildir; yoksa her gün tüm ilanlar "değişmiş" görünürdü.
+    """
+    parcalar = (
+        f"{Decimal(kart['fiyat']):.2f}",
+        kart['metrekare'],
+        kart.get('oda_sayisi'),
+        *bolge_anahtari(kart),
+        kart.get('ilan_kaynagi', 'Emlakjet'),
+    )
+    metin = '\x1f'.join('' if p is None else str(p) for p in parcalar)
+    return hashlib.blake2b(metin.encode('utf-8'), digest_size=8).hexdigest()
+
+
+# (sehir, ilce, mahalle) -> bolge_id; preload_bolgeler() ile doldurulana kadar None (önbellek kapalı)
+_bolge_onbellegi = None
+
+
+def preload_bolgeler():
+    """
+    Tüm bölgeleri tek sorguda bölge önbelleğine yükler (tarama başında bir kez çağrılır) ve sayısını döndürür.
+    Önbellek açıkken resolve_bolgeler yalnızca önbellekte olmayan bölgeler için veritabanına gider.
+    """
+    global _bolge_onbellegi
+    onbellek = {}
+    for bolge_id, sehir, ilce, mahalle in Bolge.objects.order_by('id').values_list('id', 'sehir', 'ilce', 'mahalle'):
+        onbellek.setdefault((sehir, ilce, mahalle), bolge_id)
+    _bolge_onbellegi = onbellek
+    return len(onbellek)
+
+
+def clear_bolge_cache():
+    global _bolge_onbellegi
+    _bolge_onbellegi = None
+
+
+def resolve_bolgeler(anahtarlar):
+    """
+    (sehir, ilce, mahalle) anahtarlarını Bolge id'lerine çözer.
+    Bölge önbelleği yüklüyse bilinen anahtarlar oradan okunur; kalanlar tek sorguda aranır,
+    eksik bölgeler tek bir bulk_create ile oluşturulur.
+    (anahtar -> bolge_id sözlüğü, yeni oluşturulan bölge sayısı) döndürür.
+    """
+    anahtarlar = set(anahtarlar)
+    if _bolge_onbellegi is None:
+        return _veritabanindan_coz(anahtarlar)
+
+    bolge_idleri = {a: _bolge_onbellegi[a] for a in anahtarlar if a in _bolge_onbellegi}
+    eksik_idler, yeni_bolge = _veritabanindan_coz(anahtarlar - bolge_idleri.keys())
+    _bolge_onbellegi.update(eksik_idler)
+    bolge_idleri.update(eksik_idler)
+    return bolge_idleri, yeni_bolge
+
+
+def _yeni_bolge(sehir, ilce, mahalle):
+    koordinat = locations.coordinates(sehir, ilce, mahalle)
+    latitude, longitude = koordinat if koordinat else (None, None)
+    return Bolge(sehir=sehir, ilce=ilce, mahalle=mahalle, latitude=latitude, longitude=longitude)
+
+
+def _veritabanindan_coz(anahtarlar):
+    if not anahtarlar:
+        return {}, 0
+
+    bolge_idleri = {}
+    mevcut_bolgeler = Bolge.objects.filter(
+        sehir__in={a[0] for a in anahtarlar},
+        ilce__in={a[1] for a in anahtarlar},
+    ).values_list('id', 'sehir', 'ilce', 'mahalle')
+    for bolge_id, sehir, ilce, mahalle in mevcut_bolgeler:
+        anahtar = (sehir, ilce, mahalle)
+        if anahtar in anahtarlar:
+            bolge_idleri.setdefault(anahtar, bolge_id)
+
+    # Mahalle None olabildiği için sıralamada boş string ile karşılaştırıyoruz
+    eksikler = sorted((a for a in anahtarlar if a not in bolge_idleri), key=lambda a: (a[0], a[1], a[2] or ''))
+    if eksikler:
+        yeni_bolgeler = Bolge.objects.bulk_create([_yeni_bolge(*anahtar) for anahtar in eksikler])
+        if connection.features.can_return_rows_from_bulk_insert:
+            for bolge in yeni_bolgeler:
+                bolge_idleri[(bolge.sehir, bolge.ilce, bolge.mahalle)] = bolge.pk
+        else:
+            # Veritabanı eklenen satırların id'lerini döndürmüyorsa bir kez daha okuyoruz
+            return _veritabanindan_coz(anahtarlar)[0], len(eksikler)
+
+    return bolge_idleri, len(eksikler)
+
+
+def _kart_to_ilan(kart, bolge_id):
+    return KiraIlani(
+        bolge_id=bolge_id,
+        fiyat=kart['fiyat'],
+        metrekare=kart['metrekare'],
+        oda_sayisi=kart.get('oda_sayisi'),
+        ilan_url=kart['ilan_url'],
+        ilan_kaynagi=kart.get('ilan_kaynagi', 'Emlakjet'),
+        ilan_tarihi=kart['ilan_tarihi'],
+        icerik_ozeti=listing_fingerprint(kart),
+        kopya_anahtari=dedup.duplicate_key(bolge_id, kart.get('oda_sayisi'), kart['metrekare']),
+    )
+
+
+def _fiyat_gozlemlerini_yaz(ilanlar, mevcutlar, gozlem_tarihi):
+    """
+    Yeni ve fiyatı değişen ilanlar için fiyat gözlemlerini toplu ekler; yazılan gözlem sayısını döndürür.
+    Aynı gün ikinci kez değişen fiyat, o günün gözleminin üzerine yazılır.
+    """
+    gozlenecekler = [
+        ilan for ilan in ilanlar
+        if ilan.ilan_url not in mevcutlar or mevcutlar[ilan.ilan_url].fiyat != ilan.fiyat
+    ]
+    if not gozlenecekler:
+        return 0
+
+    # bulk_create id döndürmediyse (ör. MySQL) yeni ilanların id'lerini okuyoruz
+    eksik_idler = [ilan.ilan_url for ilan in gozlenecekler if ilan.pk is None and ilan.ilan_url not in mevcutlar]
+    okunan_idler = dict(
+        KiraIlani.objects.filter(ilan_url__in=eksik_idler).order_by().values_list('ilan_url', 'id')
+    ) if eksik_idler else {}
+
+    gozlemler = []
+    for ilan in gozlenecekler:
+        if ilan.ilan_url in mevcutlar:
+            ilan_id = mevcutlar[ilan.ilan_url].id
+        else:
+            ilan_id = ilan.pk or okunan_idler[ilan.ilan_url]
+        gozlemler.append(FiyatGozlemi(ilan_id=ilan_id, bolge_id=ilan.bolge_id, gozlem_tarihi=gozlem_tarihi, fiyat=ilan.fiyat))
+    return _gozlemleri_ekle(gozlemler)
+
+
+def _gozlemleri_ekle(gozlemler):
+    if not gozlemler:
+        return 0
+    if connection.features.supports_update_conflicts_with_target:
+        FiyatGozlemi.objects.bulk_create(
+            gozlemler,
+            update_conflicts=True,
+            unique_fields=['ilan', 'gozlem_tarihi'],
+            update_fields=['fiyat', 'bolge'],
+        )
+    else:
+        FiyatGozlemi.objects.bulk_create(gozlemler, ignore_conflicts=True)
+    return len(gozlemler)
+
+
+def _gecmis_gozlemleri_yaz(ilanlar, mevcutlar, gozlem_tarihi):
+    """
+    Veritabanında daha yeni tarihle kayıtlı ilanların eski tarihli kartları için (arşivden yeniden ayrıştırma)
+    yalnızca fiyat gözlemi yazar: o güne kadarki son gözlemden farklı fiyatlar eklenir. Yazılan gözlem sayısı.
+    """
+    idler = {ilan.ilan_url: mevcutlar[ilan.ilan_url].id for ilan in ilanlar}
+    o_gunku_fiyat = {}
+    for ilan_id, fiyat in FiyatGozlemi.objects.filter(
+        ilan_id__in=list(idler.values()), gozlem_tarihi__lte=gozlem_tarihi
+    ).order_by('ilan_id', 'gozlem_tarihi').values_list('ilan_id', 'fiyat'):
+        o_gunku_fiyat[ilan_id] = fiyat
+    return _gozlemleri_ekle([
+        FiyatGozlemi(ilan_id=idler[ilan.ilan_url], bolge_id=ilan.bolge_id, gozlem_tarihi=gozlem_tarihi, fiyat=ilan.fiyat)
+        for ilan in ilanlar if o_gunku_fiyat.get(idler[ilan.ilan_url]) != ilan.fiyat
+    ])
+
+
+def _son_gorulmeyi_ilerlet(ilanlar, mevcutlar):
+    """
+    Artımlı modda yazılmayan (içeriği değişmemiş) ilanların ilan_tarihi'ni kartın tarihine ilerletir;
+    tarih yalnızca ileri gider. Taşınan ilanların eski ve yeni (bolge_id, ilan_tarihi) çiftlerini döndürür.
+    """
+    tarihe_gore = defaultdict(list)
+    dokunulan_gunler = set()
+    for ilan in ilanlar:
+        eski = mevcutlar[ilan.ilan_url]
+        if eski.ilan_tarihi < ilan.ilan_tarihi:
+            tarihe_gore[ilan.ilan_tarihi].append(eski.id)
+            dokunulan_gunler |= {(eski.bolge_id, eski.ilan_tarihi), (eski.bolge_id, ilan.ilan_tarihi)}
+    for tarih, idler in tarihe_gore.items():
+        KiraIlani.objects.filter(id__in=idler).update(ilan_tarihi=tarih)
+    return dokunulan_gunler
+
+
+def upsert_ilanlar(kartlar, bolge_idleri, batch_size=BATCH_SIZE, artimli=False, gozlem_tarihi=None):
+    """
+    Kartları ilan_url'e göre parça parça upsert eder ve fiyat gözlemlerini yazar.
+    PostgreSQL (ve ON CONFLICT destekleyen diğer veritabanları) için
+    bulk_create(update_conflicts=True) kullanılır; diğerlerinde ve ilan tablosu bölümlüyse (ilan_url tekilliğini
+    IlanAdresi taşır, ON CONFLICT hedefi olacak indeks yoktur; bkz. emlak/partitioning.py) bulk_create + bulk_update.
+    `artimli` ise içerik özeti veritabanındakiyle aynı olan ilanlar yazılmaz; yalnızca ilan_tarihi'leri ilerletilir.
+    Fiyat gözlemleri `gozlem_tarihi`ne (varsayılan: bugün) yazılır.
+    Kartın ilan_tarihi veritabanındakinden eskiyse (ör. yeniden ayrıştırılan eski bir gün) ilan güncellenmez,
+    değişmeyen sayılır; yalnızca o günün fiyat gözlemi eklenir.
+    (eklenen, güncellenen, değişmeyen, fiyat gözlemi) sayılarını ve bölge özeti yenilenecek
+    (bolge_id, ilan_tarihi) çiftlerinin kümesini döndürür.
+    """
+    eklenen = 0
+    guncellenen = 0
+    degismeyen = 0
+    fiyat_gozlemi = 0
+    dokunulan_gunler = set()
+    bolumlu = partitioning.is_partitioned()
+    upsert_destekleniyor = connection.features.supports_update_conflicts_with_target and not bolumlu
+    gozlem_tarihi = gozlem_tarihi or timezone.localdate()
+
+    for i in range(0, len(kartlar), batch_size):
+        parca = kartlar[i:i + batch_size]
+        with transaction.atomic():
+            if bolumlu:
+                # Mevcutları okuyup yazarken aynı ilanları yazan başka bir işlem araya girmesin
+                partitioning.lock_urls([k['ilan_url'] for k in parca])
+            # Eklenen/güncellenen ayrımı ve özet karşılaştırması için parçadaki mevcut ilanları tek sorguda okuyoruz
+            mevcutlar = {
+                ilan_url: MevcutIlan(*degerler)
+                for ilan_url, *degerler in KiraIlani.objects.filter(
+                    ilan_url__in=[k['ilan_url'] for k in parca]
+                ).order_by().values_list('ilan_url', 'id', 'icerik_ozeti', 'fiyat', 'bolge_id', 'ilan_tarihi')
+            }
+            ilanlar = [_kart_to_ilan(k, bolge_idleri[bolge_anahtari(k)]) for k in parca]
+            # Daha yeni bir günde kaydedilmiş ilanın eski tarihli kartı güncel hâlin yerine geçmemeli
+            eskiler = [
+                ilan for ilan in ilanlar
+                if ilan.ilan_url in mevcutlar and ilan.ilan_tarihi < mevcutlar[ilan.ilan_url].ilan_tarihi
+            ]
+            if eskiler:
+                eski_urller = {ilan.ilan_url for ilan in eskiler}
+                ilanlar = [ilan for ilan in ilanlar if ilan.ilan_url not in eski_urller]
+                fiyat_gozlemi += _gecmis_gozlemleri_yaz(eskiler, mevcutlar, gozlem_tarihi)
+            if artimli:
+                degismeyenler = [
+                    ilan for ilan in ilanlar
+                    if ilan.ilan_url in mevcutlar and mevcutlar[ilan.ilan_url].icerik_ozeti == ilan.icerik_ozeti
+                ]
+                degismeyen_urller = {ilan.ilan_url for ilan in degismeyenler}
+                ilanlar = [ilan for ilan in ilanlar if ilan.ilan_url not in degismeyen_urller]
+                dokunulan_gunler |= _son_gorulmeyi_ilerlet(degismeyenler, mevcutlar)
+
+            yeni_sayisi = sum(1 for ilan in ilanlar if ilan.ilan_url not in mevcutlar)
+            eklenen += yeni_sayisi
+            guncellenen += len(ilanlar) - yeni_sayisi
+            degismeyen += len(parca) - len(ilanlar)
+            if not ilanlar:
+                continue
+
+            if upsert_destekleniyor:
+                KiraIlani.objects.bulk_create(
+                    ilanlar,
+                    update_conflicts=True,
+                    unique_fields=['ilan_url'],
+                    update_fields=GUNCELLENEN_ALANLAR,
+                )
+            else:
+                yeni_ilanlar = []
+                guncel_ilanlar = []
+                for ilan in ilanlar:
+                    if ilan.ilan_url in mevcutlar:
+                        ilan.pk = mevcutlar[ilan.ilan_url].id
+                        guncel_ilanlar.append(ilan)
+                    else:
+                        yeni_ilanlar.append(ilan)
+                KiraIlani.objects.bulk_create(yeni_ilanlar)
+                KiraIlani.objects.bulk_update(guncel_ilanlar, GUNCELLENEN_ALANLAR)
+
+            fiyat_gozlemi += _fiyat_gozlemlerini_yaz(ilanlar, mevcutlar, gozlem_tarihi)
+            dokunulan_gunler |= dedup.mark_duplicates(
+                KiraIlani.objects.filter(ilan_url__in=[ilan.ilan_url for ilan in ilanlar])
+            )
+
+            # Güncellenen ilan başka bir güne/bölgeye taşınmış olabilir; eski kovası da yenilenmeli
+            for ilan in ilanlar:
+                dokunulan_gunler.add((ilan.bolge_id, ilan.ilan_tarihi))
+                eski = mevcutlar.get(ilan.ilan_url)
+                if eski:
+                    dokunulan_gunler.add((eski.bolge_id, eski.ilan_tarihi))
+
+    return eklenen, guncellenen, degismeyen, fiyat_gozlemi, dokunulan_gunler
+
+
+def save_cards(kartlar, batch_size=BATCH_SIZE, artimli=False, gozlem_tarihi=None):
+    """
+    Bir sayfa veya çalıştırma boyunca toplanan kartları toplu olarak kaydeder.
+    Zorunlu alanı eksik kartlar atlanır; aynı ilan_url birden fazla kez geldiyse son kart kullanılır.
+    `artimli` ise içeriği değişmemiş ilanlar yeniden yazılmaz (son görülme tarihleri ilerletilir).
+    `gozlem_tarihi` fiyat gözlemlerinin tarihidir (varsayılan: bugün; arşivden yeniden ayrıştırmada çekme günü).
+    Yazılan ilanların bölge özetleri (BolgeOzeti) ardından yenilenir.
+    Özet sayıları (eklenen, guncellenen, degismeyen, fiyat_gozlemi, atlanan, yeni_bolge, bolge_ozeti)
+    içeren bir sözlük döndürür.
+    """
+    gecerli_kartlar = {}
+    atlanan = 0
+    for kart in kartlar:
+        if any(kart.get(alan) in (None, '') for alan in ZORUNLU_ALANLAR):
+            atlanan += 1
+            continue
+        gecerli_kartlar[kart['ilan_url']] = kart
+    kartlar = list(gecerli_kartlar.values())
+
+    bolge_idleri, yeni_bolge = resolve_bolgeler(bolge_anahtari(k) for k in kartlar)
+    eklenen, guncellenen, degismeyen, fiyat_gozlemi, dokunulan_gunler = upsert_ilanlar(
+        kartlar, bolge_idleri, batch_size=batch_size, artimli=artimli, gozlem_tarihi=gozlem_tarihi
+    )
+    bolge_ozeti = rollup.refresh_buckets(dokunulan_gunler)
+
+    return {
+        'eklenen': eklenen,
+        'guncellenen': guncellenen,
+        'degismeyen': degismeyen,
+        'fiyat_gozlemi': fiyat_gozlemi,
+        'atlanan': atlanan,
+        'yeni_bolge': yeni_bolge,
+        'bolge_ozeti': bolge_ozeti,
+    }
@@ -0,0 +1,94 @@
+# emlak/price_history.py
+
+"""
+Fiyat geçmişi (FiyatGozlemi) üzerinde ilan ve bölge bazlı fiyat değişimi sorguları.
+
+Gözlemler yalnızca ilan ilk görüldüğünde ve fiyatı değiştiğinde yazılır; bir ilanın t tarihindeki
+fiyatı "t'den önceki veya t'deki son gözlem"dir. Bu yüzden bir aralıktaki değişim şöyle hesaplanır:
+    - aralıkta (baslangic, bitis] en az bir gözlemi olan ilanlar bulunur (bolge + tarih indeksi),
+    - her biri için baslangic ve bitis tarihindeki fiyat birincil anahtar (ilan, gozlem_tarihi)
+      üzerinden tek satırlık indeks aramasıyla okunur.
+Böylece sorgu maliyeti tablonun toplam boyutuna değil, aralıkta değişen ilan sayısına bağlıdır.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, F, OuterRef, Subquery
+
+from emlak.models import FiyatGozlemi
+
+
+def _fiyat_tarihinde(tarih):
+    """Dış sorgudaki ilanın verilen tarihteki (o güne kadarki son gözlem) fiyatı."""
+    return Subquery(
+        FiyatGozlemi.objects.filter(ilan=OuterRef('ilan'), gozlem_tarihi__lte=tarih)
+        .order_by('-gozlem_tarihi')
+        .values('fiyat')[:1]
+    )
+
+
+def listing_price_deltas(baslangic, bitis, bolgeler=None, kopyalar_haric=False):
+    """
+    (baslangic, bitis] aralığında fiyatı değişen ilanları döndürür.
+    Her satır: ilan, bolge, degisim_sayisi, onceki_fiyat, son_fiyat, fark.
+    Aralıkta ilk kez görülen ilanlar (baslangic tarihinde fiyatı olmayanlar) dahil edilmez.
+    `bolgeler` verilirse yalnızca bu bölgelerdeki (Bolge nesneleri, id'leri veya queryset) ilanlar.
+    `kopyalar_haric` ise başka kaynaktaki bir ilanın kopyası olan ilanlar atlanır (bkz. emlak/dedup.py).
+    """
+    gozlemler = FiyatGozlemi.objects.filter(gozlem_tarihi__gt=baslangic, gozlem_tarihi__lte=bitis)
+    if bolgeler is not None:
+        gozlemler = gozlemler.filter(bolge__in=bolgeler)
+    if kopyalar_haric:
+        gozlemler = gozlemler.filter(ilan__asil_ilan__isnull=True)
+
+    return (
+        gozlemler.values('ilan', 'bolge')
+        .annotate(
+            degisim_sayisi=Count('gozlem_tarihi'),
+            onceki_fiyat=_fiyat_tarihinde(baslangic),
+            son_fiyat=_fiyat_tarihinde(bitis),
+        )
+        .exclude(onceki_fiyat=None)
+        .annotate(fark=F('son_fiyat') - F('onceki_fiyat'))
+        .order_by('ilan')
+    )
+
+
+def listing_price_history(ilan, baslangic=None, bitis=None):
+    """Bir ilanın fiyat gözlemlerini tarih sırasıyla (gozlem_tarihi, fiyat) olarak döndürür."""
+    gozlemler = FiyatGozlemi.objects.filter(ilan=ilan)
+    if baslangic is not None:
+        gozlemler = gozlemler.filter(gozlem_tarihi__gte=baslangic)
+    if bitis is not None:
+        gozlemler = gozlemler.filter(gozlem_tarihi__lte=bitis)
+    return gozlemler.order_by('gozlem_tarihi').values_list('gozlem_tarihi', 'fiyat')
+
+
+def region_price_deltas(baslangic, bitis, bolgeler=None):
+    """
+    (baslangic, bitis] aralığında bölge bazlı fiyat değişimi özeti; kopya ilanlar iki kez sayılmaz.
+    {bolge_id: {'degisen_ilan', 'artan_ilan', 'azalan_ilan', 'ortalama_fark', 'ortalama_yuzde'}} döndürür.
+    """
+    toplamlar = defaultdict(lambda: {'degisen_ilan': 0, 'artan_ilan': 0, 'azalan_ilan': 0,
+                                     'fark_toplami': Decimal(0), 'yuzde_toplami': Decimal(0)})
+    for satir in listing_price_deltas(baslangic, bitis, bolgeler, kopyalar_haric=True).iterator(chunk_size=2000):
+        if not satir['fark']:
+            continue # Aralık içinde değişip eski fiyatına dönenler
+        bolge = toplamlar[satir['bolge']]
+        bolge['degisen_ilan'] += 1
+        bolge['artan_ilan' if satir['fark'] > 0 else 'azalan_ilan'] += 1
+        bolge['fark_toplami'] += satir['fark']
+        bolge['yuzde_toplami'] += satir['fark'] * 100 / satir['onceki_fiyat']
+
+    sonuc = {}
+    for bolge_id, bolge in toplamlar.items():
+        adet = bolge['degisen_ilan']
+        sonuc[bolge_id] = {
+            'degisen_ilan': adet,
+            'artan_ilan': bolge['artan_ilan'],
+            'azalan_ilan': bolge['azalan_ilan'],
+            'ortalama_fark': round(bolge['fark_toplami'] / adet, 2),
+            'ortalama_yuzde': round(bolge['yuzde_toplami'] / adet, 2),
+        }
+    return sonuc
@@ -0,0 +1,181 @@
+# emlak/readiness.py
+
+"""
+Sabit time.sleep beklemeleri yerine sayfanın gerçekten hazır olduğunu algılayan bekleme koşulları.
+
+Koşullar Selenium'un expected_conditions'ı gibi WebDriverWait(...).until(...) ile kullanılır:
+- kart_sayisi_sabit: ilan kartı sayısı belirli bir süre artmadı
+- ag_bosta: sayfa yüklendi, belirli bir süredir yeni ağ isteği bitmedi ve (sayaç kuruluysa) süren fetch/XHR yok
+- dom_sessiz: MutationObserver belirli bir süredir DOM değişikliği görmedi
+"""
+
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+# Bir koşulun "sessiz" sayılması için değişikliksiz geçmesi gereken süre (saniye)
+VARSAYILAN_SESSIZ_SURE = 0.75
+# Hazır olma beklemesinin üst sınırı (saniye)
+VARSAYILAN_ZAMAN_ASIMI = 10
+# Kaydırmadan sonra yeni kart gelmesi için en fazla bekleme (saniye)
+KAYDIRMA_ZAMAN_ASIMI = 4
+KONTROL_ARALIGI = 0.1
+
+_MUTASYON_GOZLEMCISI_JS = """
+if (!window.__kiraradarGozlemci) {
+    window.__kiraradarSonMutasyon = performance.now();
+    window.__kiraradarGozlemci = new MutationObserver(function () {
+        window.__kiraradarSonMutasyon = performance.now();
+    });
+    window.__kiraradarGozlemci.observe(document.body, {childList: true, subtree: true, attributes: false});
+}
+return performance.now() - window.__kiraradarSonMutasyon;
+"""
+
+# Kaydırır ve sessizlik sayacını sıfırlar; böylece eski bir sessizlik "hazır" sayılmaz
+_KAYDIR_JS = """
+window.scrollTo(0, document.body.scrollHeight);
+window.__kiraradarSonMutasyon = performance.now();
+"""
+
+# Resource Timing kaydı istek bittiğinde oluşur; süren bir XHR'ı görmek için fetch ve XHR sarılıp bitmemiş
+# istekler sayılır. Sayaç yalnızca kurulduktan sonra başlayan istekleri görür.
+_ISTEK_SAYACI_JS = """
+if (window.__kiraradarSurenIstek === undefined) {
+    window.__kiraradarSurenIstek = 0;
+    var bitti = function () { window.__kiraradarSurenIstek = Math.max(0, window.__kiraradarSurenIstek - 1); };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            window.__kiraradarSurenIstek++;
+            return fetch.apply(this, arguments).finally(bitti);
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__kiraradarSurenIstek++;
+        this.addEventListener('loadend', bitti);
+        return send.apply(this, arguments);
+    };
+}
+"""
+
+_AG_DURUMU_JS = """
+return [document.readyState, performance.getEntriesByType('resource').length, window.__kiraradarSurenIstek || 0];
+"""
+
+
+class kart_sayisi_sabit:
+    """Seçiciye uyan eleman sayısı sıfırdan büyük ve `sessiz_sure` boyunca değişmediyse sayıyı döndürür."""
+
+    def __init__(self, secici, sessiz_sure=VARSAYILAN_SESSIZ_SURE):
+        self.secici = secici
+        self.sessiz_sure = sessiz_sure
+        self._son_sayi = None
+        self._degisim_zamani = None
+
+    def __call__(self, driver):
+        sayi = len(driver.find_elements(By.CSS_SELECTOR, self.secici))
+        simdi = time.monotonic()
+        if sayi != self._son_sayi:
+            self._son_sayi = sayi
+            self._degisim_zamani = simdi
+            return False
+        if sayi > 0 and simdi - self._degisim_zamani >= self.sessiz_sure:
+            return sayi
+        return False
+
+
+class ag_bosta:
+    """
+    document.readyState 'complete', `sessiz_sure` boyunca yeni bir kaynak isteği bitmedi ve süren fetch/XHR
+    yoksa True döner (süren istekler yalnızca _ISTEK_SAYACI_JS kurulduysa sayılır).
+    """
+
+    def __init__(self, sessiz_sure=VARSAYILAN_SESSIZ_SURE):
+        self.sessiz_sure = sessiz_sure
+        self._son_istek_sayisi = None
+        self._degisim_zamani = None
+
+    def __call__(self, driver):
+        ready_state, istek_sayisi, suren_istek = driver.execute_script(_AG_DURUMU_JS)
+        simdi = time.monotonic()
+        if istek_sayisi != self._son_istek_sayisi or suren_istek:
+            self._son_istek_sayisi = istek_sayisi
+            self._degisim_zamani = simdi
+            return False
+        return ready_state == 'complete' and simdi - self._degisim_zamani >= self.sessiz_sure
+
+
+class dom_sessiz:
+    """Sayfaya bir MutationObserver yerleştirir; `sessiz_sure` boyunca DOM değişmediyse True döner."""
+
+    def __init__(self, sessiz_sure=VARSAYILAN_SESSIZ_SURE):
+        self.sessiz_sure = sessiz_sure
+
+    def __call__(self, driver):
+        gecen_ms = driver.execute_script(_MUTASYON_GOZLEMCISI_JS)
+        return gecen_ms >= self.sessiz_sure * 1000
+
+
+class yeni_kart_geldi:
+    """Seçiciye uyan eleman sayısı `onceki_sayi`yı aştıysa yeni sayıyı döndürür."""
+
+    def __init__(self, secici, onceki_sayi):
+        self.secici = secici
+        self.onceki_sayi = onceki_sayi
+
+    def __call__(self, driver):
+        sayi = len(driver.find_elements(By.CSS_SELECTOR, self.secici))
+        return sayi if sayi > self.onceki_sayi else False
+
+
+def wait_until_settled(driver, kart_secici, zaman_asimi=VARSAYILAN_ZAMAN_ASIMI, sessiz_sure=VARSAYILAN_SESSIZ_SURE):
+    """
+    Kart sayısı sabitlenene, ağ boşa çıkana veya DOM sessizleşene kadar (hangisi önce olursa) bekler.
+    Beklenen süreyi saniye cinsinden döndürür; zaman aşımında da hata fırlatmaz.
+    """
+    baslangic = time.monotonic()
+    try:
+        WebDriverWait(driver, zaman_asimi, poll_frequency=KONTROL_ARALIGI).until(EC.any_of(
+            kart_sayisi_sabit(kart_secici, sessiz_sure),
+            ag_bosta(sessiz_sure),
+            dom_sessiz(sessiz_sure),
+        ))
+    except TimeoutException:
+        pass
+    return time.monotonic() - baslangic
+
+
+def scroll_while_growing(driver, kart_secici, max_kaydirma=5, zaman_asimi=KAYDIRMA_ZAMAN_ASIMI,
+                         sessiz_sure=VARSAYILAN_SESSIZ_SURE):
+    """
+    Sayfanın sonuna kaydırır ve yalnızca yeni ilan kartları gelmeye devam ettiği sürece kaydırmayı sürdürür.
+    Her kaydırmadan sonra yeni kart gelene veya hem DOM hem ağ sessizleşene kadar beklenir; kartları getiren
+    XHR yavaşsa DOM sessiz kalsa da istek bitene kadar (en fazla `zaman_asimi`) liste tükenmiş sayılmaz.
+    (kaydırma sayısı, beklenen süre) döndürür.
+    """
+    bekleme = 0.0
+    dom_sessiz(sessiz_sure)(driver) # MutationObserver'ın sayfada kurulu olduğundan emin ol
+    driver.execute_script(_ISTEK_SAYACI_JS)  # kaydırmanın başlattığı istekler sayılsın
+    kart_sayisi = len(driver.find_elements(By.CSS_SELECTOR, kart_secici))
+    for kaydirma in range(1, max_kaydirma + 1):
+        driver.execute_script(_KAYDIR_JS)
+        baslangic = time.monotonic()
+        try:
+            WebDriverWait(driver, zaman_asimi, poll_frequency=KONTROL_ARALIGI).until(EC.any_of(
+                yeni_kart_geldi(kart_secici, kart_sayisi),
+                EC.all_of(ag_bosta(sessiz_sure), dom_sessiz(sessiz_sure)),
+            ))
+        except TimeoutException:
+            pass
+        bekleme += time.monotonic() - baslangic
+
+        yeni_sayi = len(driver.find_elements(By.CSS_SELECTOR, kart_secici))
+        if yeni_sayi <= kart_sayisi:
+            return kaydirma, bekleme # Yeni kart gelmedi: liste tükendi
+        kart_sayisi = yeni_sayi
+    return max_kaydirma, bekleme
@@ -0,0 +1,106 @@
+# emlak/reparse.py
+
+"""
+Sayfa arşivindeki (bkz. emlak/archive.py) sayfaları güncel ayrıştırıcıdan geçirip veritabanına yeniden yazar.
+
+Bir seçici düzeltmesinden sonra veritabanı saatler süren yeniden tarama yerine arşivden kurulur:
+    - günler eskiden yeniye işlenir; bir günün tekil sayfaları (aynı içerik bir kez) süreç havuzunda
+      tüm çekirdeklere dağıtılarak ayrıştırılır,
+    - kartlar ana süreçte, çekildikleri sırayla tek yazıcıdan save_cards ile kaydedilir; ilan_tarihi ve
+      fiyat gözlemi tarihi çekme günü olur, böylece fiyat geçmişi de yeniden oluşur,
+    - daha yeni bir günde kaydedilmiş ilanlar eski bir günün kartıyla geri alınmaz (yalnızca o günün fiyat
+      gözlemi yazılır); bu yüzden --baslangic/--bitis ile yalnızca geçmiş bir aralık da güvenle yeniden işlenir,
+    - bir gün kaydedilirken havuz sıradaki günü ayrıştırır.
+
+Komut satırı: python manage.py yeniden_ayristir --baslangic 2026-09-01 --isci 8
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+
+from emlak import archive, sources
+from emlak.persistence import save_cards
+
+# --- İşçi süreç tarafı ---
+_arsiv = None
+
+
+def _isci_baslat(kok):
+    global _arsiv
+    _arsiv = archive.PageArchive(kok)
+
+
+def _ayristir(anahtar):
+    """(özet, kaynak, motor) sayfasını arşivden okuyup ayrıştırır: (anahtar, kartlar, hata)."""
+    ozet, kaynak, motor = anahtar
+    try:
+        sayfa = _arsiv.get(ozet)
+        # Ayrıştırıcının sayfa başına yazdırdığı bilgi satırları binlerce sayfada çıktıyı boğar
+        with contextlib.redirect_stdout(io.StringIO()):
+            kartlar = sources.get_source(kaynak).parse_cards(sayfa, motor)
+        return anahtar, kartlar, None
+    except Exception as e:
+        return anahtar, [], str(e)
+
+
+# --- Ana süreç tarafı ---
+
+def _gunu_yaz(gun, kayitlar, sonuclar, kaydet, ozet):
+    """Bir günün ayrıştırma sonuçlarını çekme sırasıyla birleştirip kaydeder; günün özetini döndürür."""
+    kartlar_ozete_gore = {}
+    gunluk = {'sayfa': len(kayitlar), 'tekil_sayfa': len(sonuclar), 'hatali_sayfa': 0, 'kart': 0}
+    for anahtar, kartlar, hata in sonuclar:
+        if hata:
+            gunluk['hatali_sayfa'] += 1
+            print(f"{gun} {anahtar[0][:12]} ({anahtar[1]}) ayrıştırılamadı: {hata}")
+            continue
+        for kart in kartlar:
+            kart['ilan_tarihi'] = gun  # ilan_tarihi veri çekme tarihidir (bkz. parsing.build_card)
+        kartlar_ozete_gore[anahtar] = kartlar
+
+    # Aynı ilan gün içinde birden fazla sayfada görüldüyse save_cards son görüleni kullanır
+    kartlar = [kart for kayit in kayitlar
+               for kart in kartlar_ozete_gore.get((kayit.ozet, kayit.kaynak, kayit.motor), ())]
+    gunluk['kart'] = len(kartlar)
+    if kaydet is not None and kartlar:
+        for anahtar, deger in kaydet(kartlar, gozlem_tarihi=gun).items():
+            gunluk[anahtar] = gunluk.get(anahtar, 0) + deger
+    for anahtar, deger in gunluk.items():
+        ozet[anahtar] = ozet.get(anahtar, 0) + deger
+    ozet['gun'] += 1
+    return gunluk
+
+
+def reparse(arsiv, baslangic=None, bitis=None, kaynaklar=None, isci_sayisi=None, kaydet=save_cards, ilerleme=None):
+    """
+    Arşivin [baslangic, bitis] günlerindeki sayfalarını yeniden ayrıştırır ve `kaydet` ile yazar
+    (None ise yalnızca ayrıştırır ve sayar). `ilerleme(gun, gunluk_ozet)` her gün kaydedildikten sonra
+    çağrılır. Sayfa, kart, kayıt sayıları ve süreyi içeren özet sözlüğü döndürür.
+    """
+    isci_sayisi = isci_sayisi or os.cpu_count() or 1
+    gunler = [gun for gun in arsiv.days() if not (baslangic and gun < baslangic) and not (bitis and gun > bitis)]
+    ozet = {'gun': 0, 'sayfa': 0, 'tekil_sayfa': 0, 'hatali_sayfa': 0, 'kart': 0}
+    baslangic_zamani = time.monotonic()
+
+    with multiprocessing.Pool(processes=isci_sayisi, initializer=_isci_baslat, initargs=(arsiv.kok,)) as havuz:
+        onceki = None  # (gün, kayıtlar, ayrıştırma işi): havuz sıradaki günü ayrıştırırken bu gün kaydedilir
+        for gun in gunler + [None]:
+            if gun is not None:
+                kayitlar = [k for k in arsiv.day_records(gun) if kaynaklar is None or k.kaynak in kaynaklar]
+                tekiller = list(dict.fromkeys((k.ozet, k.kaynak, k.motor) for k in kayitlar))
+                is_ = havuz.map_async(_ayristir, tekiller, chunksize=max(1, len(tekiller) // (isci_sayisi * 4)))
+            if onceki is not None:
+                onceki_gun, onceki_kayitlar, onceki_is = onceki
+                gunluk = _gunu_yaz(onceki_gun, onceki_kayitlar, onceki_is.get(), kaydet, ozet)
+                if ilerleme is not None:
+                    ilerleme(onceki_gun, gunluk)
+            onceki = (gun, kayitlar, is_) if gun is not None else None
+        havuz.close()
+        havuz.join()
+
+    ozet['sure_sn'] = round(time.monotonic() - baslangic_zamani, 2)
+    ozet['sayfa_saniye'] = round(ozet['sayfa'] / ozet['sure_sn'], 1) if ozet['sure_sn'] else 0.0
+    return ozet
@@ -0,0 +1,106 @@
+# emlak/resource_policy.py
+
+"""
+Headless Chrome'da ilan kartlarını oluşturmak için gerekmeyen alt kaynakların engellenmesi.
+
+Listeleme sayfası yüzlerce görsel, font, harita karosu, reklam ve izleyici betiği yükler; kartları çizen
+sitenin kendi betikleri ise bunların küçük bir kısmıdır. Engelleme CDP'nin Network.setBlockedURLs
+komutuyla yapılır: desenle eşleşen istekler ağa hiç çıkmaz. Desenlerde '*' herhangi bir karakter dizisidir.
+
+    - VARSAYILAN_DESENLER: görsel, font ve medya uzantıları, harita karoları, reklam ve izleyici host'ları
+    - kaynak adaptörünün engellenecek_desenler'i: siteye özel ek engeller (ör. Emlakjet'in görsel sunucusu)
+    - kaynak adaptörünün izinli_desenler'i: kartlar bunlarsız çizilmiyorsa engel listesinden çıkarılır;
+      bir izin ya bir engel deseninin aynısıdır ya da bir engel deseniyle eşleşen bir URL'dir
+
+Sayfa başına aktarılan bayt ve istek sayıları Chrome'un performans günlüğündeki ağ olaylarından
+(Network.loadingFinished.encodedDataLength, sıkıştırılmış hâliyle ve başlıklar dahil), yükleme süresi
+sayfanın Navigation Timing kaydından okunur (bkz. page_load_stats).
+
+Bu modül Selenium'u ve Django'yu import etmez; sürücü nesnesi çağıran taraftan gelir.
+"""
+
+import json
+import re
+
+
+def _uzantilar(*uzantilar):
+    # '*.png*' gibi bir desen 'app.pngutil.js' betiğini de engellerdi; uzantı ya sonda ya sorgudan öncedir
+    return tuple(desen for uzanti in uzantilar for desen in (f'*.{uzanti}', f'*.{uzanti}?*'))
+
+
+GORSEL_DESENLERI = _uzantilar('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp')
+FONT_DESENLERI = _uzantilar('woff', 'woff2', 'ttf', 'otf', 'eot') + ('*fonts.googleapis.com*', '*fonts.gstatic.com*')
+MEDYA_DESENLERI = _uzantilar('mp4', 'webm', 'mp3', 'm3u8', 'ogg')
+HARITA_DESENLERI = ('*maps.googleapis.com*', '*maps.gstatic.com*', '*tile.openstreetmap.org*', '*api.mapbox.com*',
+                    '*tiles.mapbox.com*')
+# Reklam, analitik ve çerez onay servisleri (emlakjet_timeout_page_source.html'de görülenler dahil)
+IZLEYICI_DESENLERI = (
+    '*googletagmanager.com*', '*google-analytics.com*', '*googletagservices.com*', '*googlesyndication.com*',
+    '*doubleclick.net*', '*fundingchoicesmessages.google.com*', '*adservice.google.*', '*connect.facebook.net*',
+    '*facebook.com/tr*', '*analytics.tiktok.com*', '*bat.bing.com*', '*clarity.ms*', '*hotjar.com*',
+    '*mc.yandex.*', '*criteo.com*', '*criteo.net*', '*adnxs.com*', '*taboola.com*', '*creativecdn.com*',
+    '*crazyegg.com*', '*visilabs.net*', '*instana.io*', '*efilli.com*', '*snap.licdn.com*', '*pinimg.com*',
+)
+VARSAYILAN_DESENLER = GORSEL_DESENLERI + FONT_DESENLERI + MEDYA_DESENLERI + HARITA_DESENLERI + IZLEYICI_DESENLERI
+
+# Chrome'un performans günlüğünde yalnızca ağ olayları tutulur (bkz. emlak.scraping.build_chrome_options)
+PERFORMANS_GUNLUGU = 'performance'
+PERFORMANS_TERCIHLERI = {'enableNetwork': True, 'enablePage': False}
+
+_NAVIGASYON_BETIGI = """
+const n = performance.getEntriesByType('navigation')[0];
+return n ? [n.domContentLoadedEventEnd, n.loadEventEnd] : null;
+"""
+
+
+def matches(url, desen):
+    """Chrome'un desen eşleşmesi: yalnızca '*' özeldir ('?' fnmatch'teki gibi joker değildir)."""
+    return re.fullmatch('.*'.join(map(re.escape, desen.split('*'))), url) is not None
+
+
+def blocked_patterns(izinli=(), engellenecek=()):
+    """Varsayılan ve kaynağa özel engel desenlerinden izin verilenleri çıkarır (sıra korunur, tekrarsız)."""
+    desenler = []
+    for desen in (*VARSAYILAN_DESENLER, *engellenecek):
+        if desen in desenler or any(izin == desen or matches(izin, desen) for izin in izinli):
+            continue
+        desenler.append(desen)
+    return desenler
+
+
+def apply(driver, desenler):
+    """Sürücünün sonraki isteklerinde `desenler` ile eşleşenleri engeller; boş liste engellemeyi kaldırır."""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(desenler)})
+
+
+def reset_stats(driver):
+    """Önceki sayfadan kalan ağ olaylarını performans günlüğünden boşaltır."""
+    driver.get_log(PERFORMANS_GUNLUGU)
+
+
+def page_load_stats(driver):
+    """
+    reset_stats'tan (veya önceki çağrıdan) bu yana yapılan isteklerin özeti:
+    {'bayt', 'istek', 'engellenen', 'yukleme_sn', 'dom_hazir_sn'}. Süreler sayfa kaydı yoksa None'dır.
+    """
+    bayt = istek = engellenen = 0
+    for kayit in driver.get_log(PERFORMANS_GUNLUGU):
+        olay = json.loads(kayit['message'])['message']
+        yontem = olay.get('method')
+        if yontem == 'Network.requestWillBeSent':
+            istek += 1
+        elif yontem == 'Network.loadingFinished':
+            bayt += olay['params'].get('encodedDataLength', 0)
+        elif yontem == 'Network.loadingFailed' and olay['params'].get('blockedReason'):
+            engellenen += 1
+    zamanlar = driver.execute_script(_NAVIGASYON_BETIGI)
+    dom_hazir_ms, yukleme_ms = zamanlar or (None, None)
+    return {
+        'bayt': int(bayt),
+        'istek': istek,
+        'engellenen': engellenen,
+        # Ölçüm sırasında load olayı henüz gelmemişse loadEventEnd 0'dır
+        'yukleme_sn': yukleme_ms / 1000 if yukleme_ms else None,
+        'dom_hazir_sn': dom_hazir_ms / 1000 if dom_hazir_ms else None,
+    }
@@ -0,0 +1,180 @@
+# emlak/rollup.py
+
+"""
+Bölge bazlı günlük ve aylık kira özetlerini (BolgeOzeti) günceller.
+
+Özetler her taramadan sonra yalnızca o taramada dokunulan (bolge, gün) kovaları için yeniden
+hesaplanır: save_cards yazdığı ilanların yeni ve (güncellenenler için) eski (bolge_id, ilan_tarihi)
+çiftlerini bildirir, burada bu günleri içeren ayların ilanları tek sorguda okunup ilgili günlük ve
+aylık satırlar değiştirilir. Medyan toplamlardan türetilemediği için kova yeniden hesaplanır; ama
+okunan satır sayısı tablonun tamamına değil, dokunulan bölge-aylara bağlıdır.
+
+Kaynaklar arası kopya olarak işaretlenen ilanlar (asil_ilan dolu) özetlere katılmaz.
+
+Arşivlenen ayların (IlanArsivi, bkz. emlak/partitioning.py) ilanları tablodan çıkarıldığı için bu ayların
+özetleri donmuştur: yeniden hesaplanmaz ve rebuild_all tarafından silinmez.
+
+Özetler değiştiğinde Bolge.ortalama_kira (uyarı referansı: son 90 günden önceki bir yılın ortalaması,
+bkz. emlak.maliyet.referans_donemi) ve Bolge.son_artis_yuzdesi (tamamlanmış son ayın bir önceki aya göre
+değişimi; yarım kalan bu ay karşılaştırılmaz) da güncellenir; işlem tamamlanınca bu bölgelerin API önbelleği
+geçersiz kılınır. İki alan da bugünün tarihine bağlıdır: tarama olmayan bölgelerde bolge_ozeti_yenile ile tazelenir.
+"""
+
+import statistics
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from emlak import api_cache
+from emlak.maliyet import referans_donemi
+from emlak.models import Bolge, BolgeOzeti, IlanArsivi, KiraIlani
+
+IKI_BASAMAK = Decimal('0.01')
+# Bolge.son_artis_yuzdesi max_digits=5 olduğu için sığabilecek en büyük değer
+YUZDE_SINIRI = Decimal('999.99')
+
+
+def ay_baslangici(tarih):
+    return tarih.replace(day=1)
+
+
+def _sonraki_ay(tarih):
+    return (tarih.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _ozet_satiri(bolge_id, donem, baslangic, satirlar):
+    """Bir kovadaki (fiyat, metrekare) satırlarından BolgeOzeti nesnesi üretir."""
+    fiyatlar = [fiyat for fiyat, _ in satirlar]
+    toplam = sum(fiyatlar, Decimal(0))
+    m2_fiyatlari = [fiyat / metrekare for fiyat, metrekare in satirlar if metrekare]
+    return BolgeOzeti(
+        bolge_id=bolge_id,
+        donem=donem,
+        donem_baslangici=baslangic,
+        ilan_sayisi=len(fiyatlar),
+        fiyat_toplami=toplam,
+        ortalama_fiyat=(toplam / len(fiyatlar)).quantize(IKI_BASAMAK),
+        medyan_fiyat=Decimal(statistics.median(fiyatlar)).quantize(IKI_BASAMAK),
+        ortalama_m2_fiyati=(
+            (sum(m2_fiyatlari, Decimal(0)) / len(m2_fiyatlari)).quantize(IKI_BASAMAK) if m2_fiyatlari else None
+        ),
+    )
+
+
+def archived_months():
+    """İlanları arşivlenmiş (özetleri donmuş) ayların ilk günleri."""
+    return set(IlanArsivi.objects.values_list('ay', flat=True).distinct().order_by())
+
+
+def refresh_buckets(dokunulan_gunler):
+    """
+    Verilen (bolge_id, ilan_tarihi) çiftlerinin düştüğü günlük ve aylık özetleri yeniden hesaplar.
+    Dokunulan ayların tüm günleri de yenilenir (ilanı başka güne taşınan eski günler boşalmış olabilir).
+    Yazılan özet satırı sayısını döndürür.
+    """
+    aylar = {(bolge_id, ay_baslangici(tarih)) for bolge_id, tarih in dokunulan_gunler if tarih}
+    if not aylar:
+        return 0
+    # Arşivlenmiş ayın tabloda kalan (sonradan yeniden görülen) birkaç ilanı o ayın özetinin yerini almamalı
+    arsivli = archived_months()
+    aylar = {(bolge_id, ay) for bolge_id, ay in aylar if ay not in arsivli}
+    if not aylar:
+        return 0
+
+    kosul = Q()
+    for bolge_id, ay in aylar:
+        kosul |= Q(bolge_id=bolge_id, ilan_tarihi__gte=ay, ilan_tarihi__lt=_sonraki_ay(ay))
+
+    gunluk = defaultdict(list)
+    aylik = defaultdict(list)
+    for bolge_id, tarih, fiyat, metrekare in KiraIlani.objects.filter(kosul, asil_ilan__isnull=True).values_list(
+        'bolge_id', 'ilan_tarihi', 'fiyat', 'metrekare'
+    ).order_by().iterator(chunk_size=5000):
+        gunluk[(bolge_id, tarih)].append((fiyat, metrekare))
+        aylik[(bolge_id, ay_baslangici(tarih))].append((fiyat, metrekare))
+
+    ozetler = [_ozet_satiri(b, BolgeOzeti.GUNLUK, t, s) for (b, t), s in gunluk.items()]
+    ozetler += [_ozet_satiri(b, BolgeOzeti.AYLIK, t, s) for (b, t), s in aylik.items()]
+
+    silinecek = Q()
+    for bolge_id, ay in aylar:
+        silinecek |= Q(bolge_id=bolge_id, donem_baslangici__gte=ay, donem_baslangici__lt=_sonraki_ay(ay))
+
+    with transaction.atomic():
+        # Kovanın ilanları başka bir güne/bölgeye taşınmış olabilir; dönemin satırlarını silip yeniden yazıyoruz
+        BolgeOzeti.objects.filter(silinecek).delete()
+        BolgeOzeti.objects.bulk_create(ozetler, batch_size=1000)
+        bolge_idleri = {bolge_id for bolge_id, _ in aylar}
+        update_bolge_summaries(bolge_idleri)
+        transaction.on_commit(lambda: api_cache.invalidate_regions(bolge_idleri))
+    return len(ozetler)
+
+
+def update_bolge_summaries(bolge_idleri):
+    """Bölgelerin ortalama_kira (referans dönemi ortalaması) ve son_artis_yuzdesi alanlarını özetlerden günceller."""
+    referans_baslangici, referans_bitisi = referans_donemi()
+    referanslar = {
+        satir['bolge']: satir for satir in BolgeOzeti.objects.filter(
+            bolge_id__in=bolge_idleri, donem=BolgeOzeti.GUNLUK,
+            donem_baslangici__gte=referans_baslangici, donem_baslangici__lt=referans_bitisi,
+        ).values('bolge').annotate(adet=Sum('ilan_sayisi'), toplam=Sum('fiyat_toplami')).order_by()
+    }
+    son_ay = ay_baslangici(ay_baslangici(timezone.localdate()) - timedelta(days=1))
+    onceki_ay = ay_baslangici(son_ay - timedelta(days=1))
+    aylik = dict(
+        ((bolge_id, ay), ortalama) for bolge_id, ay, ortalama in BolgeOzeti.objects.filter(
+            bolge_id__in=bolge_idleri, donem=BolgeOzeti.AYLIK, donem_baslangici__in=(onceki_ay, son_ay)
+        ).values_list('bolge_id', 'donem_baslangici', 'ortalama_fiyat')
+    )
+
+    bolgeler = []
+    for bolge_id in bolge_idleri:
+        bolge = Bolge(pk=bolge_id, ortalama_kira=None, son_artis_yuzdesi=None)
+        referans = referanslar.get(bolge_id)
+        if referans and referans['adet']:
+            bolge.ortalama_kira = (referans['toplam'] / referans['adet']).quantize(IKI_BASAMAK)
+        son, onceki = aylik.get((bolge_id, son_ay)), aylik.get((bolge_id, onceki_ay))
+        if son is not None and onceki:
+            yuzde = ((son - onceki) * 100 / onceki).quantize(IKI_BASAMAK)
+            bolge.son_artis_yuzdesi = max(-YUZDE_SINIRI, min(yuzde, YUZDE_SINIRI))
+        bolgeler.append(bolge)
+    Bolge.objects.bulk_update(bolgeler, ['ortalama_kira', 'son_artis_yuzdesi'], batch_size=1000)
+
+
+def rebuild_all(bolge_idleri=None):
+    """
+    Özetleri ilan tablosundan baştan oluşturur (ilk kurulum, silinen ilanlar veya elle düzeltmeler için).
+    `bolge_idleri` verilirse yalnızca bu bölgeler. Yazılan özet satırı sayısını döndürür.
+    """
+    ilanlar = KiraIlani.objects.all()
+    if bolge_idleri is not None:
+        ilanlar = ilanlar.filter(bolge_id__in=bolge_idleri)
+    gunler = set(ilanlar.values_list('bolge_id', 'ilan_tarihi').distinct().order_by())
+
+    ozetler = BolgeOzeti.objects.all()
+    if bolge_idleri is not None:
+        ozetler = ozetler.filter(bolge_id__in=bolge_idleri)
+    for ay in archived_months():
+        ozetler = ozetler.exclude(donem_baslangici__gte=ay, donem_baslangici__lt=_sonraki_ay(ay))
+    with transaction.atomic():
+        ozetler.delete()
+        # Bölge-ay başına tek kova; refresh_buckets sorgusunu makul boyutta tutmak için bölge gruplarıyla
+        bolgeye_gore = defaultdict(set)
+        for bolge_id, tarih in gunler:
+            bolgeye_gore[bolge_id].add(tarih)
+        yazilan = 0
+        bolge_listesi = sorted(bolgeye_gore)
+        for i in range(0, len(bolge_listesi), 50):
+            yazilan += refresh_buckets(
+                (bolge_id, tarih) for bolge_id in bolge_listesi[i:i + 50] for tarih in bolgeye_gore[bolge_id]
+            )
+        # İlanı kalmamış bölgelerin ortalamalarını da temizliyoruz
+        bos_bolgeler = Bolge.objects.exclude(id__in=bolge_listesi)
+        if bolge_idleri is not None:
+            bos_bolgeler = bos_bolgeler.filter(id__in=bolge_idleri)
+        bos_bolgeler.update(ortalama_kira=None, son_artis_yuzdesi=None)
+    return yazilan
@@ -0,0 +1,110 @@
+# emlak/run_history.py
+
+"""
+Tarama çalıştırmalarının geçmişi (TaramaCalismasi) ve çalıştırmalar arası karşılaştırma.
+
+kira_tara komutu her çalıştırmanın başında start_run() ile bir kayıt açar, sonunda run_targets() özetini
+finish_run() ile yazar. tarama_gecmisi komutu buradaki yardımcılarla son çalıştırmanın en yavaş
+aşamalarını ve önceki çalıştırmalara göre sapmaları gösterir.
+
+Emlakjet düzenini değiştirdiğinde tipik belirtiler:
+    - sayfa başına geçerli kart sayısının düşmesi (seçiciler kartları bulamıyor),
+    - eksik veri nedeniyle atlanan veya hatalı kart oranının artması (alan sınıfları değişti),
+    - zaman aşımlarının ve ilk kart beklemesinin artması (kart seçicisi artık eşleşmiyor).
+"""
+
+from statistics import median
+
+from django.utils import timezone
+
+from emlak.models import TaramaCalismasi
+
+# Son çalıştırmanın ortalama süresi önceki çalıştırmaların medyanının bu katını aşarsa gerileme sayılır
+GERILEME_KATI = 1.5
+# Karşılaştırma için en az bu kadar önceki çalıştırma gerekir
+EN_AZ_ONCEKI = 3
+# Oranlarda bu kadar puanlık (0-1 arası) artış düzen değişikliği belirtisi sayılır
+ORAN_ESIGI = 0.10
+
+_ATLAMA_SAYACLARI = ('atlanan_url_yok', 'atlanan_fiyat_yok', 'atlanan_ilce_yok', 'kart_hatasi')
+
+
+def start_run(parametreler):
+    """Çalışıyor durumunda yeni bir çalıştırma kaydı açar."""
+    return TaramaCalismasi.objects.create(parametreler=parametreler)
+
+
+def finish_run(calisma, ozet=None, hata=None):
+    """run_targets() özetini çalıştırma kaydına yazar; `hata` verilirse durum hatalı olur."""
+    ozet = ozet or {}
+    telemetri = ozet.get('telemetri') or {}
+    calisma.bitis = timezone.now()
+    calisma.durum = TaramaCalismasi.HATALI if hata else TaramaCalismasi.TAMAMLANDI
+    calisma.hata = hata
+    for alan in ('sayfa', 'hatali_sayfa', 'kart', 'eklenen', 'guncellenen', 'degismeyen', 'atlanan'):
+        setattr(calisma, alan, ozet.get(alan, 0))
+    calisma.sure_sn = ozet.get('sure_sn', (calisma.bitis - calisma.baslangic).total_seconds())
+    calisma.asamalar = telemetri.get('asamalar', {})
+    calisma.sayaclar = {**telemetri.get('sayaclar', {}), 'kayit_hatasi': ozet.get('kayit_hatasi', 0)}
+    calisma.save()
+    return calisma
+
+
+def slowest_stages(calisma, limit=10):
+    """Aşamaları toplam süreye göre azalan sırada, toplam içindeki payları ile döndürür."""
+    toplam = sum(asama['toplam_sn'] for asama in calisma.asamalar.values()) or 1
+    asamalar = sorted(calisma.asamalar.items(), key=lambda oge: oge[1]['toplam_sn'], reverse=True)
+    return [(ad, asama, asama['toplam_sn'] / toplam) for ad, asama in asamalar[:limit]]
+
+
+def stage_trends(calisma, onceki_calismalar):
+    """
+    Her aşamanın ortalama süresini önceki çalıştırmaların medyanıyla karşılaştırır:
+    (aşama, son_ms, onceki_medyan_ms, kat, gerileme_mi) listesi, kata göre azalan.
+    """
+    sonuclar = []
+    for ad, asama in calisma.asamalar.items():
+        onceki = [c.asamalar[ad]['ortalama_ms'] for c in onceki_calismalar
+                  if c.asamalar.get(ad, {}).get('ortalama_ms')]
+        if len(onceki) < EN_AZ_ONCEKI or not asama.get('ortalama_ms'):
+            continue
+        onceki_medyan = median(onceki)
+        kat = asama['ortalama_ms'] / onceki_medyan
+        sonuclar.append((ad, asama['ortalama_ms'], onceki_medyan, kat, kat >= GERILEME_KATI))
+    return sorted(sonuclar, key=lambda oge: oge[3], reverse=True)
+
+
+def _oranlar(calisma):
+    sayaclar = calisma.sayaclar or {}
+    bulunan = sayaclar.get('kart_bulunan', 0)
+    return {
+        'kart_sayfa': calisma.kart / calisma.sayfa if calisma.sayfa else None,
+        'atlama_orani': sum(sayaclar.get(s, 0) for s in _ATLAMA_SAYACLARI) / bulunan if bulunan else None,
+        'zaman_asimi_orani': sayaclar.get('zaman_asimi', 0) / calisma.sayfa if calisma.sayfa else None,
+    }
+
+
+def markup_signals(calisma, onceki_calismalar):
+    """Son çalıştırmada site düzeni değişikliğine işaret eden sapmaları açıklama metinleri olarak döndürür."""
+    if len(onceki_calismalar) < EN_AZ_ONCEKI:
+        return []
+    son = _oranlar(calisma)
+    oncekiler = [_oranlar(c) for c in onceki_calismalar]
+    uyarilar = []
+
+    onceki_kart = [o['kart_sayfa'] for o in oncekiler if o['kart_sayfa'] is not None]
+    if son['kart_sayfa'] is not None and onceki_kart:
+        beklenen = median(onceki_kart)
+        if beklenen and son['kart_sayfa'] < beklenen / GERILEME_KATI:
+            uyarilar.append(f"Sayfa başına kart {son['kart_sayfa']:.1f} (önceki medyan {beklenen:.1f}): "
+                            f"kart seçicileri kartların bir kısmını bulamıyor olabilir.")
+    for anahtar, aciklama in (('atlama_orani', 'atlanan/hatalı kart oranı'),
+                              ('zaman_asimi_orani', 'zaman aşımı oranı')):
+        onceki = [o[anahtar] for o in oncekiler if o[anahtar] is not None]
+        if son[anahtar] is None or not onceki:
+            continue
+        beklenen = median(onceki)
+        if son[anahtar] - beklenen >= ORAN_ESIGI:
+            uyarilar.append(f"{aciklama.capitalize()} %{son[anahtar] * 100:.0f} (önceki medyan %{beklenen * 100:.0f}): "
+                            f"alan veya kart seçicileri değişmiş olabilir.")
+    return uyarilar
@@ -0,0 +1,352 @@
+# emlak/scheduler.py
+
+"""
+Birden fazla (şehir, ilçe, sayfa, kaynak) hedefini bir headless Chrome işçi havuzuna dağıtan zamanlayıcı.
+
+- Her hedef kendi kaynağının adaptörüyle (bkz. emlak.sources) çekilir; farklı kaynakların hedefleri
+  aynı havuzda eşzamanlı işlenir ve kartları aynı kayıt kuyruğunda birleşir.
+
+- Her işçi süreç kendi Chrome örneğini (HTTP motorunda HTTP oturumunu) bir kez başlatır ve
+  tüm hedefler boyunca yeniden kullanır.
+- Aynı host'a giden istekler süreçler arası ortak bir nezaket limitiyle (en az aralık + eşzamanlı istek sayısı) sınırlanır.
+- İşçilerin ayrıştırdığı kartlar ana süreçteki tek bir kayıt kuyruğuna akar; veritabanına
+  yalnızca bu kuyruğu tüketen tek bir thread yazar.
+- Aynı URL bir çalıştırmada işçiye yalnızca bir kez verilir. `takip` nesnesi (bkz. emlak.frontier)
+  verilirse hedefler kalıcı URL sınırından geçer; her sayfanın durumu kartları kaydedildikten sonra
+  kayıt thread'inde yazılır ve sayfalamanın keşfettiği sıradaki sayfalar ana döngüye geri gönderilir.
+- `arsiv` (dizin) verilirse işçiler çektikleri her sayfayı sayfa arşivine yazar (bkz. emlak.archive).
+- Aşama süreleri ve sayaçlar (bkz. emlak.telemetry) her hedefle birlikte işçiden ana sürece
+  gönderilir ve çalıştırma özetinin 'telemetri' anahtarında birleştirilir.
+
+Bu modül Django'yu import etmez; kayıt fonksiyonu (ör. emlak.persistence.save_cards) dışarıdan verilir.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from multiprocessing import util
+from urllib.parse import urlsplit
+
+from emlak import archive, sources, telemetry
+from emlak.sources import MOTORLAR, MOTOR_HTTP, MOTOR_SELENIUM, slugify_tr  # noqa: F401 (geriye dönük uyumluluk)
+
+# Bir tarama hedefi: İstanbul / Kadıköy / 1. sayfa / emlakjet gibi
+Hedef = namedtuple('Hedef', ['sehir', 'ilce', 'sayfa', 'kaynak'], defaults=['emlakjet'])
+
+# Varsayılan nezaket limitleri: aynı host'a en az 2 saniye arayla, en fazla 2 eşzamanlı istek
+VARSAYILAN_MIN_ARALIK = 2.0
+VARSAYILAN_ESZAMANLI = 2
+
+
+def hedef_url(hedef):
+    """Hedefin kendi kaynağındaki kiralık konut listeleme URL'sini döndürür."""
+    return sources.get_source(hedef.kaynak).listing_url(hedef)
+
+
+class NezaketLimiti:
+    """
+    Aynı host'a yapılan istekleri süreçler arasında sınırlar:
+    ardışık iki istek arasında en az `min_aralik` saniye ve aynı anda en fazla `eszamanli` istek.
+    """
+
+    def __init__(self, min_aralik=VARSAYILAN_MIN_ARALIK, eszamanli=VARSAYILAN_ESZAMANLI):
+        self.min_aralik = min_aralik
+        self._kilit = multiprocessing.Lock()
+        self._son_istek = multiprocessing.Value('d', 0.0, lock=False)
+        self._semafor = multiprocessing.BoundedSemaphore(eszamanli)
+
+    def __enter__(self):
+        with telemetry.olc('nezaket_bekleme'):
+            self._semafor.acquire()
+            with self._kilit:
+                bekleme = self._son_istek.value + self.min_aralik - time.time()
+                if bekleme > 0:
+                    time.sleep(bekleme)
+                self._son_istek.value = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        self._semafor.release()
+        return False
+
+
+# --- İşçi süreç tarafı ---
+# Her işçi süreçte bir kez doldurulur (bkz. _isci_baslat)
+_motor = MOTOR_SELENIUM
+_limitler = {}
+
+
+class _IsciOrtami:
+    """İşçinin Chrome örneğini ve HTTP oturumunu ilk kullanımda açar; tüm kaynak adaptörleri paylaşır."""
+
+    def __init__(self):
+        self._driver = None
+        self._oturum = None
+        # Selenium'da görsel/font/izleyici engellemesi (bkz. emlak.resource_policy)
+        self.kaynak_engelleme = True
+
+    def driver(self):
+        if self._driver is None:
+            from emlak import scraping  # Selenium yalnızca tarayıcı gereken işçide yüklenir
+            with telemetry.olc('surucu_baslatma'):
+                self._driver = scraping.create_driver()
+            print("Chrome tarayıcısı başlatıldı (işçi).")
+            util.Finalize(None, self._driver.quit, exitpriority=16)
+        return self._driver
+
+    def oturum(self):
+        if self._oturum is None:
+            from emlak import http_fetch
+            self._oturum = http_fetch.create_session()
+        return self._oturum
+
+
+_ortam = _IsciOrtami()
+
+
+def _isci_baslat(limitler, motor, arsiv=None, kaynak_engelleme=True):
+    """Havuz işçisi başlarken sayfa arşivini açar, seçilen motora göre Chrome'u veya HTTP oturumunu bir kez hazırlar."""
+    global _motor, _limitler
+    _limitler = limitler
+    _motor = motor
+    _ortam.kaynak_engelleme = kaynak_engelleme
+    archive.activate(arsiv)
+    if motor == MOTOR_HTTP:
+        # Chrome yalnızca gömülü veri bulunamazsa (yedek yol) başlatılır
+        _ortam.oturum()
+        return
+    try:
+        _ortam.driver()
+    except Exception as e:
+        # Başlatıcıdan hata fırlatmak havuzun işçiyi sürekli yeniden başlatmasına yol açar
+        print(f"İşçi Chrome'u başlatamadı: {e}")
+
+
+def _isci_tara(hedef):
+    """
+    Tek bir hedefi kaynağının adaptörüyle, işçinin açık tarayıcısı/oturumu üzerinden çeker ve
+    normalize edilmiş kartları döndürür: (hedef, kartlar, hata, telemetri).
+    `telemetri` işçinin son hedeften beri topladığı ölçümlerdir (başlatma süresi dahil).
+    """
+    try:
+        adaptor = sources.get_source(hedef.kaynak)
+        url = adaptor.listing_url(hedef)
+        limit = _limitler.get(urlsplit(url).netloc)
+        if limit is not None:
+            with limit:
+                kartlar = adaptor.fetch_cards(url, _ortam, _motor)
+        else:
+            kartlar = adaptor.fetch_cards(url, _ortam, _motor)
+        return hedef, kartlar, None, telemetry.aktif().anlik_goruntu(sifirla=True)
+    except Exception as e:
+        return hedef, [], str(e), telemetry.aktif().anlik_goruntu(sifirla=True)
+
+
+# --- Ana süreç tarafı ---
+
+# Kayıt thread'inin sonuç kuyruğuna gönderdiği "sayfa yazıldı" iletisinin işareti
+_YAZILDI = object()
+
+def _ilce_anahtari(hedef):
+    # Erken durdurma her kaynağın ilçesi için ayrı işler
+    return (hedef.kaynak, hedef.sehir, hedef.ilce)
+
+
+def _sayfa_bitti(takip, sonuclar, hedef, kartlar, hata=None):
+    """Sayfanın işlendiğini ana döngüye bildirir; takip varsa keşfedilen sıradaki hedefler de gönderilir."""
+    yeni_hedefler = []
+    if takip is not None:
+        try:
+            yeni_hedefler = takip.bitti(hedef, kartlar, hata)
+        except Exception as e:
+            print(f"{hedef_url(hedef)} sayfa durumu yazılamadı: {e}")
+    sonuclar.put((_YAZILDI, yeni_hedefler))
+
+
+def _degismeyen_seri_sonu(sayfalar, esik):
+    """
+    {sayfa no: değişiklik var mı} sözlüğünde sayfa numarasına göre ardışık `esik` değişmemiş sayfanın ilk
+    serisinin son sayfasını döndürür; yoksa None. Henüz kaydedilmemiş veya hatalı (sözlükte olmayan) sayfa seriyi böler.
+    """
+    seri = 0
+    onceki = None
+    for sayfa in sorted(sayfalar):
+        if sayfalar[sayfa]:
+            seri = 0
+        else:
+            seri = seri + 1 if onceki is not None and sayfa == onceki + 1 else 1
+            if seri >= esik:
+                return sayfa
+        onceki = sayfa
+    return None
+
+
+def _sinirla(durdurulanlar, ilce, son_sayfa):
+    """İlçenin taranacak son sayfasını düşürür; sınır değiştiyse True döndürür."""
+    if son_sayfa < durdurulanlar.get(ilce, float('inf')):
+        durdurulanlar[ilce] = son_sayfa
+        return True
+    return False
+
+
+def _kayit_dongusu(kuyruk, kaydet, toplam, durdurma_esigi, seriler, durdurulanlar, sonuclar, takip=None):
+    """
+    Kayıt kuyruğunu tüketen tek yazıcı thread.
+    `durdurulanlar` ilçe -> taranacak son sayfa sözlüğüdür; ana döngü bu sayfadan sonrakileri işçiye göndermez:
+        - kartsız (boş) sayfa sayfalamanın sonudur; ilçe o sayfada biter,
+        - `durdurma_esigi` verilmişse her ilçenin sayfaları `seriler`de sayfa numarasıyla tutulur ve sayfa
+          numarasına göre art arda eşik kadar yalnızca değişmemiş ilan içeren sayfa görülünce ilçe serinin
+          son sayfasında biter. Sayfalar işçilerden bitiş sırasıyla gelir; seri bu sırayla sayılmaz.
+    Her sayfa işlendiğinde `sonuclar` kuyruğuna (_YAZILDI, yeni hedefler) gönderir (bkz. _sayfa_bitti).
+    """
+    while True:
+        oge = kuyruk.get()
+        if oge is None:
+            break
+        hedef, kartlar, hata = oge
+        ilce = _ilce_anahtari(hedef)
+        if hata:
+            _sayfa_bitti(takip, sonuclar, hedef, kartlar, hata)
+            continue
+        if not kartlar:
+            _sinirla(durdurulanlar, ilce, hedef.sayfa)
+            _sayfa_bitti(takip, sonuclar, hedef, kartlar)
+            continue
+        try:
+            with telemetry.olc('veritabani_yazma'):
+                ozet = kaydet(kartlar)
+        except Exception as e:
+            print(f"Kartlar kaydedilirken hata oluştu: {e}")
+            toplam['kayit_hatasi'] = toplam.get('kayit_hatasi', 0) + len(kartlar)
+            _sayfa_bitti(takip, sonuclar, hedef, kartlar, f"Kayıt hatası: {e}")
+            continue
+        for anahtar, deger in ozet.items():
+            toplam[anahtar] = toplam.get(anahtar, 0) + deger
+
+        if durdurma_esigi:
+            sayfalar = seriler.setdefault(ilce, {})
+            sayfalar[hedef.sayfa] = bool(ozet.get('eklenen', 0) or ozet.get('guncellenen', 0))
+            son_sayfa = _degismeyen_seri_sonu(sayfalar, durdurma_esigi)
+            if son_sayfa is not None and _sinirla(durdurulanlar, ilce, son_sayfa):
+                print(f"{hedef.ilce}, {hedef.sehir} ({hedef.kaynak}): {son_sayfa - durdurma_esigi + 1}-{son_sayfa}. "
+                      f"sayfalarda değişiklik yok, sonraki sayfalar atlanacak.")
+        # Sınır, sayfalamanın keşfettiği sıradaki sayfalar ana döngüye ulaşmadan yazılır
+        _sayfa_bitti(takip, sonuclar, hedef, kartlar)
+
+
+def run_targets(hedefler, kaydet, isci_sayisi=2, min_aralik=VARSAYILAN_MIN_ARALIK, eszamanli=VARSAYILAN_ESZAMANLI,
+                motor=MOTOR_SELENIUM, durdurma_esigi=None, takip=None, arsiv=None, kaynak_engelleme=True):
+    """
+    Hedefleri `isci_sayisi` kadar işçiye dağıtır, kartları tek kayıt kuyruğundan `kaydet` ile yazar.
+    Hedefler farklı kaynaklara ait olabilir; her host'un nezaket limiti ayrıdır.
+    `motor` 'selenium' (headless Chrome) veya 'http' (gömülü Next.js verisi, gerekirse Selenium'a düşer) olabilir.
+    `durdurma_esigi` verilirse bir ilçede (sayfa numarasına göre) art arda bu kadar sayfa yalnızca değişmemiş
+    ilan içerdiğinde o ilçenin sonraki sayfaları taranmaz (artımlı kayıtla birlikte kullanılır). Boş bir sayfadan
+    sonraki sayfalar da taranmaz.
+    `takip` verilirse (ör. emlak.frontier.Frontier) hedefler önce takip.kesfet()'ten geçer; her sayfa
+    kaydedildikten sonra takip.bitti()'nin döndürdüğü sıradaki sayfalar kuyruğa eklenir.
+    `arsiv` verilirse çekilen sayfalar bu dizindeki sayfa arşivine yazılır.
+    `kaynak_engelleme` False ise Selenium sayfaları görsel, font ve izleyicileriyle birlikte yüklenir.
+    Çalıştırma özetini (sayfa/dakika ve aşama telemetrisi dahil) döndürür.
+    """
+    hedefler = list(hedefler)
+    olcum = telemetry.sifirla()
+    # Sayfalamayla keşfedilen hedefler tohum hedeflerle aynı kaynaklardan (aynı host'lardan) gelir
+    hostlar = {urlsplit(hedef_url(h)).netloc for h in hedefler}
+    if takip is not None:
+        hedefler = takip.kesfet(hedefler)
+    if not hedefler:
+        # Taranacak sayfa yok (ör. hepsi taze): işçi süreçler ve tarayıcılar hiç başlatılmaz
+        return {'sayfa': 0, 'hatali_sayfa': 0, 'erken_durdurulan_sayfa': 0, 'tekrar_eden_url': 0,
+                'taze_atlanan_sayfa': getattr(takip, 'taze_atlanan', 0), 'kart': 0, 'kaynak_kartlari': {},
+                'sure_sn': 0.0, 'sayfa_dakika': 0.0, 'telemetri': olcum.ozet()}
+    limitler = {host: NezaketLimiti(min_aralik, eszamanli) for host in hostlar}
+
+    kuyruk = queue.Queue()
+    # İşçi sonuçları ve kayıt thread'inin "sayfa yazıldı" iletileri aynı kuyruktan okunur
+    sonuclar = queue.Queue()
+    kayit_ozeti = {}
+    durdurulanlar = {}  # ilçe -> taranacak son sayfa
+    yazici = threading.Thread(
+        target=_kayit_dongusu,
+        args=(kuyruk, kaydet, kayit_ozeti, durdurma_esigi, {}, durdurulanlar, sonuclar, takip),
+        daemon=True,
+    )
+    yazici.start()
+
+    # Hedefler havuza toptan değil, küçük bir pencereyle sırayla verilir;
+    # böylece erken durdurulan ilçelerin kalan sayfaları hiç gönderilmez.
+    bekleyenler = deque(hedefler)
+    pencere = isci_sayisi * 2
+    ucustaki = 0
+    yazimda = 0  # işçiden gelmiş, kayıt thread'inde bekleyen sayfalar (sıradaki sayfaları getirebilir)
+
+    gonderilenler = set()
+    basarili = 0
+    hatali = 0
+    erken_durdurulan = 0
+    tekrar_eden = 0
+    kart_sayisi = 0
+    kaynak_kartlari = {}
+    baslangic = time.monotonic()
+    try:
+        with multiprocessing.Pool(processes=isci_sayisi, initializer=_isci_baslat, initargs=(limitler, motor, arsiv, kaynak_engelleme)) as havuz:
+            while bekleyenler or ucustaki or yazimda:
+                while bekleyenler and ucustaki < pencere:
+                    hedef = bekleyenler.popleft()
+                    if hedef.sayfa > durdurulanlar.get(_ilce_anahtari(hedef), hedef.sayfa):
+                        erken_durdurulan += 1
+                        continue
+                    url = hedef_url(hedef)
+                    if url in gonderilenler:
+                        tekrar_eden += 1
+                        continue
+                    gonderilenler.add(url)
+                    havuz.apply_async(
+                        _isci_tara, (hedef,),
+                        callback=sonuclar.put,
+                        error_callback=lambda e, h=hedef: sonuclar.put((h, [], str(e), None)),
+                    )
+                    ucustaki += 1
+                if not ucustaki and not yazimda:
+                    break
+
+                sonuc = sonuclar.get()
+                if sonuc[0] is _YAZILDI:
+                    yazimda -= 1
+                    bekleyenler.extend(sonuc[1])
+                    continue
+                hedef, kartlar, hata, isci_olcumu = sonuc
+                ucustaki -= 1
+                olcum.birlestir(isci_olcumu)
+                kuyruk.put((hedef, kartlar, hata))
+                yazimda += 1
+                if hata:
+                    hatali += 1
+                    print(f"{hedef_url(hedef)} taranamadı: {hata}")
+                    continue
+                basarili += 1
+                kart_sayisi += len(kartlar)
+                kaynak_kartlari[hedef.kaynak] = kaynak_kartlari.get(hedef.kaynak, 0) + len(kartlar)
+            havuz.close()
+            havuz.join()
+    finally:
+        kuyruk.put(None)
+        yazici.join()
+
+    sure = time.monotonic() - baslangic
+    return {
+        'sayfa': basarili,
+        'hatali_sayfa': hatali,
+        'erken_durdurulan_sayfa': erken_durdurulan,
+        'tekrar_eden_url': tekrar_eden,
+        'taze_atlanan_sayfa': getattr(takip, 'taze_atlanan', 0),
+        'kart': kart_sayisi,
+        'kaynak_kartlari': kaynak_kartlari,
+        'sure_sn': round(sure, 2),
+        'sayfa_dakika': round(basarili / (sure / 60), 2) if sure > 0 else 0.0,
+        **kayit_ozeti,
+        'telemetri': olcum.ozet(),
+    }
@@ -0,0 +1,123 @@
+# emlak/scraping.py
+
+"""
+Emlakjet ilan sayfalarını Selenium ile çeken yardımcılar.
+Kartların ayrıştırılması emlak.parsing modülündedir.
+
+Bu modül Django modellerini import etmez; böylece tarayıcı işçisi süreçler
+(bkz. emlak.scheduler) Django ortamını kurmadan çalışabilir.
+"""
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+import time
+
+from emlak import readiness, resource_policy, telemetry
+from emlak.parsing import EMLAKJET_BASE_URL, KART_CSS_SECICI, USER_AGENT
+
+# ChromeDriver'ın yolu (projenin ana dizininde olduğu için sadece dosya adı yeterli)
+CHROME_DRIVER_PATH = './chromedriver.exe'
+
+# İlan kartlarının CSS seçicisi (eski ve güncel Emlakjet düzeni, bkz. emlak.parsing)
+KART_SECICI = KART_CSS_SECICI
+
+
+def build_chrome_options():
+    """Headless Chrome seçeneklerini (anti-bot ayarları dahil) oluşturur."""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    chrome_options.add_argument("--window-size=1920,1080") # Headless modda da ekran boyutunu ayarla
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled") # Yeni anti-bot önlemi
+
+    # Anti-bot argümanları (daha agresif)
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # Sayfa başına aktarılan bayt ve istek sayısı ağ olaylarından okunur (bkz. emlak.resource_policy)
+    chrome_options.set_capability('goog:loggingPrefs', {resource_policy.PERFORMANS_GUNLUGU: 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', resource_policy.PERFORMANS_TERCIHLERI)
+    return chrome_options
+
+
+def create_driver():
+    """Yeni bir headless Chrome örneği başlatır."""
+    driver = webdriver.Chrome(service=Service(CHROME_DRIVER_PATH), options=build_chrome_options())
+    # navigator.webdriver'ı devre dışı bırak
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+
+def fetch_page_source(driver, url, kart_secici=None, engellenecekler=None):
+    """
+    Sayfayı açar, ilan kartlarının yüklenmesini bekler, sonuna kadar kaydırır
+    ve sayfa kaynağını döndürür. `kart_secici` verilmezse Emlakjet kart seçicisi beklenir.
+    `engellenecekler` verilirse bu URL desenleriyle eşleşen alt kaynaklar yüklenmez (boş liste engellemeyi
+    kaldırır, None sürücünün mevcut ayarını korur; bkz. emlak.resource_policy).
+    """
+    kart_secici = kart_secici or KART_SECICI
+    olcum = telemetry.aktif()
+    if engellenecekler is not None:
+        resource_policy.apply(driver, engellenecekler)
+    resource_policy.reset_stats(driver)
+    with olcum.olc('gezinme'):
+        driver.get(url)
+    print(f"URL'ye gidildi: {url}")
+
+    baslangic = time.monotonic()
+    try:
+        # İlan kartlarından birinin yüklenmesini bekleyelim.
+        # Eğer bu element yüklenmiyorsa, sayfanın içeriği gelmiyordur.
+        with olcum.olc('ilk_kart_bekleme'):
+            WebDriverWait(driver, 60).until(
+                EC.visibility_of_element_located((By.CSS_SELECTOR, kart_secici))
+            )
+        print("İlan içeriği yüklendiği algılandı.")
+        # Sabit bekleme yerine: kart sayısı sabitlenene, ağ boşa çıkana veya DOM sessizleşene kadar bekle
+        hazir_bekleme = readiness.wait_until_settled(driver, kart_secici)
+        olcum.kaydet('hazir_bekleme', hazir_bekleme)
+
+        # Sayfayı yalnızca yeni ilan kartları gelmeye devam ettiği sürece aşağı kaydır
+        kaydirma, kaydirma_bekleme = readiness.scroll_while_growing(driver, kart_secici, max_kaydirma=5)
+        olcum.kaydet('kaydirma', kaydirma_bekleme)
+        olcum.say('kaydirma_adimi', kaydirma)
+        toplam_bekleme = time.monotonic() - baslangic
+        print(f"Sayfa {kaydirma} kez kaydırıldı. Bekleme süresi: toplam {toplam_bekleme:.2f} sn "
+              f"(ilk kart {toplam_bekleme - hazir_bekleme - kaydirma_bekleme:.2f} sn, "
+              f"hazır olma {hazir_bekleme:.2f} sn, kaydırma {kaydirma_bekleme:.2f} sn).")
+
+    except TimeoutException:
+        print("Sayfada ilanların yüklenmesi beklenenden uzun sürdü (Timeout).")
+        olcum.say('zaman_asimi')
+        with open("emlakjet_timeout_page_source.html", "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+        print("Mevcut sayfa kaynağı 'emlakjet_timeout_page_source.html' dosyasına kaydedildi.")
+
+    record_page_load(driver, olcum)
+    return driver.page_source
+
+
+def record_page_load(driver, olcum):
+    """Sayfanın (kaydırmayla gelenler dahil) ağ yükünü yazdırır ve telemetriye ekler."""
+    try:
+        yuk = resource_policy.page_load_stats(driver)
+    except WebDriverException as e:
+        # Ölçüm alınamaması sayfanın kendisini geçersiz kılmaz
+        print(f"Sayfa yükü ölçülemedi: {e.msg}")
+        return
+    olcum.say('aktarilan_bayt', yuk['bayt'])
+    olcum.say('ag_istegi', yuk['istek'])
+    olcum.say('engellenen_istek', yuk['engellenen'])
+    if yuk['yukleme_sn'] is not None:
+        olcum.kaydet('sayfa_yukleme', yuk['yukleme_sn'])
+    yukleme = f"{yuk['yukleme_sn']:.2f} sn" if yuk['yukleme_sn'] is not None else "tamamlanmadı"
+    print(f"Sayfa yükü: {yuk['bayt'] / 1024:.0f} KB aktarıldı, {yuk['istek']} istek "
+          f"({yuk['engellenen']} engellendi), yükleme {yukleme}.")
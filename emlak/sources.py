@@ -0,0 +1,213 @@
+# emlak/sources.py
+
+"""
+İlan sitesi (kaynak) adaptörleri.
+
+Her kaynak bir SourceAdapter alt sınıfıdır ve dört adımı tanımlar:
+    listing_url(hedef)                -> (şehir, ilçe, sayfa) hedefinin listeleme URL'si
+    fetch_page(url, ortam, motor)     -> sayfa kaynağı (HTML)
+    extract_cards(sayfa)              -> ham kart sözlükleri (bkz. emlak.persistence)
+    normalize(kart)                   -> kaynaklar arasında ortak biçime getirilmiş kart
+fetch_cards() bu adımları birleştirir; gömülü veri gibi kısa yolları olan kaynaklar onu ezebilir.
+Çekilen her sayfa etkin sayfa arşivine (bkz. emlak/archive.py) yazılır; parse_cards(sayfa, motor)
+aynı sayfayı ağa çıkmadan yeniden ayrıştırır (yeniden_ayristir komutu).
+detay_sayfasi = True olan kaynaklar fetch_details(ilan_url, oturum) ile ilanın detay sayfasındaki
+ek alanları da verir (bkz. emlak/enrichment.py).
+
+Adaptörler @register_source ile KAYNAKLAR sözlüğüne eklenir; zamanlayıcı (emlak.scheduler)
+hedefin `kaynak` alanına göre adaptörü seçer. Yeni bir site eklemek için:
+
+    @register_source
+    class OrnekAdapter(SourceAdapter):
+        anahtar = 'ornek'                # komut satırındaki adı
+        ad = 'Örnek'                     # KiraIlani.ilan_kaynagi değeri
+        kart_secici = 'div.ilan-karti'   # Selenium'un beklediği kart seçicisi
+
+        def listing_url(self, hedef): ...
+        def extract_cards(self, sayfa): ...
+
+`ortam` işçi sürecin tarayıcısını ve HTTP oturumunu tembel olarak veren nesnedir
+(driver() ve oturum() metotları); adaptörler kendi bağlantılarını açmaz. Selenium'da görseller, fontlar ve
+izleyiciler yüklenmez; adaptör engellenecek_desenler / izinli_desenler ile bu listeyi kendi sitesine göre
+genişletir veya daraltır. ortam.kaynak_engelleme False ise engelleme kapalıdır (karşılaştırma için).
+
+Bu modül Django'yu import etmez; işçi süreçlerde de kullanılır. Selenium ve requests (emlak.scraping,
+emlak.http_fetch) yalnızca bir sayfa gerçekten çekildiğinde import edilir; kaynak listesi ve URL
+üretimi için (ör. komut satırı seçenekleri, ayrıştırma) yüklenmezler.
+"""
+
+import re
+
+from emlak import archive, locations, parsing, resource_policy
+
+# Çekme motorları: gerçek tarayıcı veya gömülü veriyi okuyan tarayıcısız HTTP
+MOTOR_SELENIUM = 'selenium'
+MOTOR_HTTP = 'http'
+MOTORLAR = (MOTOR_SELENIUM, MOTOR_HTTP)
+
+_TR_ASCII = str.maketrans('çğıöşüÇĞİÖŞÜ', 'cgiosuCGIOSU')
+_BOSLUK_RE = re.compile(r'\s+')
+
+KAYNAKLAR = {}
+
+
+def slugify_tr(metin):
+    """'Kadıköy' -> 'kadikoy' gibi URL parçası üretir."""
+    metin = metin.strip().translate(_TR_ASCII).lower()
+    return '-'.join(metin.split())
+
+
+def _temiz(metin):
+    if not isinstance(metin, str):
+        return metin
+    return _BOSLUK_RE.sub(' ', metin).strip() or None
+
+
+def normalize_room_count(oda_sayisi):
+    """'3 + 1', '3+1 ' ve '3+1 Oda' gibi yazımları '3+1' biçimine getirir."""
+    oda_sayisi = _temiz(oda_sayisi)
+    if not oda_sayisi:
+        return None
+    oda_sayisi = oda_sayisi.replace(' + ', '+').replace(' +', '+').replace('+ ', '+')
+    if oda_sayisi.endswith(' Oda'):
+        oda_sayisi = oda_sayisi[:-len(' Oda')]
+    return oda_sayisi
+
+
+class SourceAdapter:
+    """Bir ilan sitesinin tarama adaptörü; alt sınıflar en az listing_url ve extract_cards'ı uygular."""
+    anahtar = None
+    ad = None
+    kart_secici = None
+    # Kaynağın desteklediği motorlar; HTTP desteklemeyen kaynaklarda her zaman Selenium kullanılır
+    motorlar = (MOTOR_SELENIUM,)
+    # İlan detay sayfasından ek alanları okuyabilen kaynaklar True yapar ve extract_details'i uygular
+    detay_sayfasi = False
+    # Selenium'da varsayılan engellere (bkz. emlak.resource_policy) eklenen ve onlardan çıkarılan URL desenleri
+    engellenecek_desenler = ()
+    izinli_desenler = ()
+
+    def listing_url(self, hedef):
+        raise NotImplementedError
+
+    def fetch_page(self, url, ortam, motor=MOTOR_SELENIUM):
+        if motor == MOTOR_HTTP and MOTOR_HTTP in self.motorlar:
+            from emlak import http_fetch
+            return http_fetch.fetch_html(ortam.oturum(), url)
+        from emlak import scraping
+        engellenecekler = self.blocked_url_patterns() if getattr(ortam, 'kaynak_engelleme', True) else []
+        return scraping.fetch_page_source(ortam.driver(), url, kart_secici=self.kart_secici,
+                                          engellenecekler=engellenecekler)
+
+    def blocked_url_patterns(self):
+        """Tarayıcının bu kaynağın sayfalarında yüklemeyeceği alt kaynakların URL desenleri."""
+        return resource_policy.blocked_patterns(self.izinli_desenler, self.engellenecek_desenler)
+
+    def extract_cards(self, sayfa):
+        raise NotImplementedError
+
+    def normalize(self, kart):
+        """Konum yazımını (gazetteer ile), oda sayısı yazımını ve metrekare tipini kaynaklar arasında eşitler."""
+        kart = dict(kart)
+        kart['sehir'], kart['ilce'], kart['mahalle'] = locations.canonicalize(
+            *(_temiz(kart.get(alan)) for alan in ('sehir', 'ilce', 'mahalle')))
+        kart['oda_sayisi'] = normalize_room_count(kart.get('oda_sayisi'))
+        if kart.get('metrekare') not in (None, ''):
+            try:
+                kart['metrekare'] = int(kart['metrekare'])
+            except (TypeError, ValueError):
+                kart['metrekare'] = None
+        kart['ilan_kaynagi'] = self.ad
+        return kart
+
+    def fetch_and_archive(self, url, ortam, motor=MOTOR_SELENIUM):
+        """Sayfayı çeker ve etkin sayfa arşivine yazar."""
+        sayfa = self.fetch_page(url, ortam, motor)
+        archive.store(url, sayfa, self.anahtar, motor)
+        return sayfa
+
+    def parse_cards(self, sayfa, motor=MOTOR_SELENIUM):
+        """`motor` ile çekilmiş sayfanın kartlarını çıkarır ve normalize eder."""
+        return [self.normalize(kart) for kart in self.extract_cards(sayfa)]
+
+    def fetch_cards(self, url, ortam, motor=MOTOR_SELENIUM):
+        """Sayfayı çeker, kartları çıkarır ve normalize edilmiş kart listesini döndürür."""
+        if motor == MOTOR_HTTP and MOTOR_HTTP not in self.motorlar:
+            motor = MOTOR_SELENIUM
+        return self.parse_cards(self.fetch_and_archive(url, ortam, motor), motor)
+
+
+    def extract_details(self, sayfa):
+        """Detay sayfasından KiraIlani'nin ek alanlarını (yalnızca bulunanlar) içeren sözlük döndürür."""
+        raise NotImplementedError
+
+    def fetch_details(self, ilan_url, oturum):
+        """İlanın detay sayfasını verilen HTTP oturumuyla indirir ve ek alanlarını döndürür."""
+        from emlak import http_fetch
+        return self.extract_details(http_fetch.fetch_html(oturum, ilan_url))
+
+
+def register_source(sinif):
+    """Adaptör sınıfını KAYNAKLAR'a ekler (sınıf dekoratörü)."""
+    KAYNAKLAR[sinif.anahtar] = sinif
+    return sinif
+
+
+def available_sources():
+    return list(KAYNAKLAR)
+
+
+def detail_sources():
+    """Detay sayfası desteklenen kaynakların adaptörleri, KiraIlani.ilan_kaynagi değerine (ad) göre."""
+    return {sinif.ad: sinif() for sinif in KAYNAKLAR.values() if sinif.detay_sayfasi}
+
+
+def get_source(anahtar):
+    """Kaynak adaptörünün bir örneğini döndürür."""
+    if anahtar not in KAYNAKLAR:
+        raise ValueError(f"Bilinmeyen ilan kaynağı: {anahtar}. Kayıtlı kaynaklar: {', '.join(KAYNAKLAR)}")
+    return KAYNAKLAR[anahtar]()
+
+
+@register_source
+class EmlakjetAdapter(SourceAdapter):
+    anahtar = 'emlakjet'
+    ad = 'Emlakjet'
+    kart_secici = parsing.KART_CSS_SECICI
+    motorlar = (MOTOR_SELENIUM, MOTOR_HTTP)
+    detay_sayfasi = True
+    # İlan fotoğraflarının sunucusu (kartlardan fotoğraf okunmaz; uzantısız yeniden boyutlandırma URL'leri dahil)
+    engellenecek_desenler = ('*imaj.emlakjet.com*',)
+
+    def listing_url(self, hedef):
+        url = f"{parsing.EMLAKJET_BASE_URL}/kiralik-konut/{slugify_tr(hedef.sehir)}-{slugify_tr(hedef.ilce)}/"
+        if hedef.sayfa and hedef.sayfa > 1:
+            url += f"?sayfa={hedef.sayfa}"
+        return url
+
+    def extract_cards(self, sayfa):
+        return parsing.extract_cards(sayfa)
+
+    def extract_details(self, sayfa):
+        return parsing.extract_details(sayfa)
+
+    def _payload_cards(self, sayfa):
+        from emlak import http_fetch
+        kartlar = http_fetch.extract_cards_from_payload(sayfa)
+        return None if kartlar is None else [self.normalize(kart) for kart in kartlar]
+
+    def parse_cards(self, sayfa, motor=MOTOR_SELENIUM):
+        if motor == MOTOR_HTTP:
+            kartlar = self._payload_cards(sayfa)
+            if kartlar is not None:
+                return kartlar
+        return super().parse_cards(sayfa, motor)
+
+    def fetch_cards(self, url, ortam, motor=MOTOR_SELENIUM):
+        # HTTP motorunda ilanlar gömülü Next.js verisinden okunur; veri yoksa Selenium'a düşülür
+        if motor == MOTOR_HTTP:
+            kartlar = self._payload_cards(self.fetch_and_archive(url, ortam, MOTOR_HTTP))
+            if kartlar is not None:
+                return kartlar
+            print(f"{url}: Gömülü Next.js verisi bulunamadı, Selenium yoluna geçiliyor.")
+        return super().fetch_cards(url, ortam, MOTOR_SELENIUM)
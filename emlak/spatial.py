@@ -0,0 +1,223 @@
+# emlak/spatial.py
+
+"""
+Bölge koordinatları üzerinde bellek içi mekânsal indeks ve emsal kira sorguları.
+
+İlanların kendi koordinatı yoktur; her ilan bölgesinin (Bolge.latitude/longitude, bkz. emlak/locations.py)
+konumunu alır. Bu yüzden indeks iki katmanlıdır:
+    - bölgeler sabit boyutlu (HUCRE_KM) bir ızgaraya yerleştirilir; R km içindeki bölgeler yalnızca
+      çevredeki hücreler taranarak bulunur,
+    - her bölgenin ilanları oda sayısına göre kovalara ayrılır ve kova içinde metrekareye göre
+      sıralı sütunsal dizilerde (array) tutulur; benzer m² aralığı ikili aramayla bulunur.
+
+"R km içinde, benzer m² ve aynı oda sayısındaki emsal kiralar" sorgusu bölgeleri yakından uzağa
+dolaşır ve `limit` emsale ulaşınca durur. Sorgu maliyeti ilan sayısına değil yarıçaptaki bölge
+sayısına ve limite bağlıdır; milyonlarca ilanda da milisaniyeler içinde kalır (bkz.
+benchmarks/bench_spatial.py).
+
+Python API:
+    indeks = get_index(sehir='İstanbul')
+    emsaller = indeks.comparables(40.99, 29.03, yaricap_km=2, metrekare=100, oda_sayisi='2+1')
+    ozet = summarize(emsaller)
+
+Komut satırı: python manage.py emsal_kiralar --ilce Kadıköy --mahalle Caferağa --metrekare 100 --oda 2+1
+"""
+
+import math
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from itertools import islice
+from statistics import median, quantiles
+
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from emlak.maliyet import son_donem_baslangici
+from emlak.models import Bolge, KiraIlani
+
+DUNYA_YARICAPI_KM = 6371.0088
+KM_DERECE = 111.32  # Bir enlem derecesinin km karşılığı
+HUCRE_KM = 1.0
+VARSAYILAN_YARICAP_KM = 2.0
+VARSAYILAN_M2_TOLERANSI = 0.15
+VARSAYILAN_LIMIT = 100
+# get_index() ile önbelleğe alınan indeksin yeniden kurulmadan kullanılacağı süre (saniye)
+INDEKS_SURESI = 10 * 60
+OKUMA_PARCASI = 50000
+
+Emsal = namedtuple('Emsal', 'ilan_id bolge_id mesafe_km metrekare fiyat oda_sayisi')
+
+
+def haversine_km(enlem1, boylam1, enlem2, boylam2):
+    """İki nokta arasındaki büyük daire mesafesi (km)."""
+    enlem1, boylam1, enlem2, boylam2 = map(math.radians, (enlem1, boylam1, enlem2, boylam2))
+    a = (math.sin((enlem2 - enlem1) / 2) ** 2
+         + math.cos(enlem1) * math.cos(enlem2) * math.sin((boylam2 - boylam1) / 2) ** 2)
+    return 2 * DUNYA_YARICAPI_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """
+    Bölge ızgarası + bölge/oda kovalarında m²'ye göre sıralı ilan dizileri.
+    add_region/add_listing ile doldurulur, freeze() ile sorguya hazırlanır.
+    """
+
+    def __init__(self, hucre_km=HUCRE_KM):
+        self._hucre = hucre_km / KM_DERECE  # hücre kenarı (derece)
+        self.bolgeler = {}                   # bolge_id -> (enlem, boylam)
+        self._hucreler = defaultdict(list)   # (satır, sütun) -> [bolge_id]
+        self._kovalar = {}                   # bolge_id -> {oda_sayisi: (metrekareler, fiyatlar, idler)}
+        self._bekleyen = defaultdict(list)   # kurulum sırasında (bolge_id, oda_sayisi) -> [(metrekare, fiyat, id)]
+        self.ilan_sayisi = 0
+
+    def _hucre_no(self, enlem, boylam):
+        return math.floor(enlem / self._hucre), math.floor(boylam / self._hucre)
+
+    def add_region(self, bolge_id, enlem, boylam):
+        self.bolgeler[bolge_id] = (enlem, boylam)
+        self._hucreler[self._hucre_no(enlem, boylam)].append(bolge_id)
+
+    def add_listing(self, bolge_id, oda_sayisi, metrekare, fiyat, ilan_id):
+        self._bekleyen[(bolge_id, oda_sayisi)].append((metrekare, fiyat, ilan_id))
+
+    def freeze(self):
+        """Bekleyen ilanları kovalarında metrekareye göre sıralayıp sütunsal dizilere taşır."""
+        for (bolge_id, oda_sayisi), satirlar in self._bekleyen.items():
+            if bolge_id not in self.bolgeler:
+                continue
+            satirlar.sort()
+            metrekareler, fiyatlar, idler = zip(*satirlar)
+            self._kovalar.setdefault(bolge_id, {})[oda_sayisi] = (
+                array('l', metrekareler), array('d', fiyatlar), array('q', idler))
+            self.ilan_sayisi += len(satirlar)
+        self._bekleyen = defaultdict(list)
+        return self
+
+    def regions_within(self, enlem, boylam, yaricap_km):
+        """Noktaya `yaricap_km` içindeki bölgeleri (mesafe_km, bolge_id) olarak yakından uzağa döndürür."""
+        enlem_payi = yaricap_km / KM_DERECE
+        boylam_payi = yaricap_km / (KM_DERECE * max(math.cos(math.radians(enlem)), 0.01))
+        ilk_satir, ilk_sutun = self._hucre_no(enlem - enlem_payi, boylam - boylam_payi)
+        son_satir, son_sutun = self._hucre_no(enlem + enlem_payi, boylam + boylam_payi)
+
+        # Büyük yarıçapta hücreleri tek tek dolaşmak bütün bölgeleri taramaktan pahalıya gelir
+        if (son_satir - ilk_satir + 1) * (son_sutun - ilk_sutun + 1) > len(self._hucreler):
+            adaylar = self.bolgeler
+        else:
+            adaylar = [bolge_id for satir in range(ilk_satir, son_satir + 1) for sutun in range(ilk_sutun, son_sutun + 1)
+                       for bolge_id in self._hucreler.get((satir, sutun), ())]
+        yakinlar = []
+        for bolge_id in adaylar:
+            mesafe = haversine_km(enlem, boylam, *self.bolgeler[bolge_id])
+            if mesafe <= yaricap_km:
+                yakinlar.append((mesafe, bolge_id))
+        yakinlar.sort()
+        return yakinlar
+
+    def comparables(self, enlem, boylam, yaricap_km=VARSAYILAN_YARICAP_KM, metrekare=None, oda_sayisi=None,
+                    m2_toleransi=VARSAYILAN_M2_TOLERANSI, limit=VARSAYILAN_LIMIT, haric=()):
+        """
+        Noktaya en yakın bölgelerden başlayarak emsal ilanları döndürür (en fazla `limit`).
+        `metrekare` verilirse ±`m2_toleransi` oranındaki ilanlar, `oda_sayisi` verilirse yalnızca o oda sayısı.
+        Bir bölgede kalan limitten fazla aday varsa m²'si hedefe en yakın olanlar seçilir.
+        `haric` içindeki ilan id'leri (ör. emsali aranan ilanın kendisi) atlanır.
+        """
+        if metrekare:
+            en_az, en_cok = math.ceil(metrekare * (1 - m2_toleransi)), math.floor(metrekare * (1 + m2_toleransi))
+        haric = set(haric)
+        emsaller = []
+        for mesafe, bolge_id in self.regions_within(enlem, boylam, yaricap_km):
+            kovalar = self._kovalar.get(bolge_id)
+            if not kovalar:
+                continue
+            odalar = (oda_sayisi,) if oda_sayisi is not None else tuple(kovalar)
+            for oda in odalar:
+                kova = kovalar.get(oda)
+                if kova is None:
+                    continue
+                metrekareler, fiyatlar, idler = kova
+                if metrekare:
+                    alt, ust = bisect_left(metrekareler, en_az), bisect_right(metrekareler, en_cok)
+                else:
+                    alt, ust = 0, len(metrekareler)
+                kalan = limit - len(emsaller)
+                for i in _en_yakinlar(metrekareler, alt, ust, metrekare, kalan + len(haric)):
+                    if idler[i] in haric:
+                        continue
+                    emsaller.append(Emsal(idler[i], bolge_id, round(mesafe, 3), metrekareler[i], fiyatlar[i], oda))
+                    if len(emsaller) >= limit:
+                        return emsaller
+        return emsaller
+
+
+def _en_yakinlar(metrekareler, alt, ust, hedef, adet):
+    """[alt, ust) aralığından m²'si hedefe en yakın `adet` indeksi, hedeften dışa doğru genişleyerek üretir."""
+    if ust - alt <= adet or not hedef:
+        yield from range(alt, min(ust, alt + adet))
+        return
+    sag = bisect_left(metrekareler, hedef, alt, ust)
+    sol = sag - 1
+    for _ in range(adet):
+        if sol < alt or (sag < ust and metrekareler[sag] - hedef <= hedef - metrekareler[sol]):
+            yield sag
+            sag += 1
+        else:
+            yield sol
+            sol -= 1
+
+
+def summarize(emsaller):
+    """Emsallerin kira ve m² fiyatı özetini döndürür (emsal yoksa ilan_sayisi 0)."""
+    if not emsaller:
+        return {'ilan_sayisi': 0}
+    fiyatlar = [e.fiyat for e in emsaller]
+    m2_fiyatlari = [e.fiyat / e.metrekare for e in emsaller if e.metrekare]
+    ceyrekler = quantiles(fiyatlar, n=4, method='inclusive') if len(fiyatlar) > 1 else [fiyatlar[0]] * 3
+    return {
+        'ilan_sayisi': len(emsaller),
+        'medyan_kira': round(median(fiyatlar), 2),
+        'q1_kira': round(ceyrekler[0], 2),
+        'q3_kira': round(ceyrekler[2], 2),
+        'medyan_m2_fiyati': round(median(m2_fiyatlari), 2) if m2_fiyatlari else None,
+        'en_uzak_km': max(e.mesafe_km for e in emsaller),
+    }
+
+
+def build_index(sehir=None, gun=None, hucre_km=HUCRE_KM):
+    """
+    Koordinatı olan bölgeleri ve bu bölgelerdeki asıl ilanları (kopyalar hariç) iki sorguda okuyup indeksi kurar.
+    `gun` verilirse yalnızca son N günün ilanları alınır.
+    """
+    indeks = SpatialIndex(hucre_km)
+    bolgeler = Bolge.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    ilanlar = KiraIlani.objects.filter(asil_ilan__isnull=True, metrekare__gt=0,
+                                       bolge__latitude__isnull=False, bolge__longitude__isnull=False)
+    if sehir:
+        bolgeler = bolgeler.filter(sehir__iexact=sehir)
+        ilanlar = ilanlar.filter(bolge__sehir__iexact=sehir)
+    if gun:
+        ilanlar = ilanlar.filter(ilan_tarihi__gte=son_donem_baslangici(gun))
+
+    for bolge_id, enlem, boylam in bolgeler.order_by().values_list('id', 'latitude', 'longitude'):
+        indeks.add_region(bolge_id, float(enlem), float(boylam))
+    satir_akisi = ilanlar.order_by().values_list(
+        'bolge_id', 'oda_sayisi', 'metrekare', Cast('fiyat', FloatField()), 'id'
+    ).iterator(chunk_size=OKUMA_PARCASI)
+    while parca := list(islice(satir_akisi, OKUMA_PARCASI)):
+        for satir in parca:
+            indeks.add_listing(*satir)
+    return indeks.freeze()
+
+
+_indeksler = {}
+
+
+def get_index(sehir=None, gun=None, sure=INDEKS_SURESI):
+    """Süreç içinde önbelleğe alınmış indeksi döndürür; `sure` saniyeden eskiyse yeniden kurar."""
+    anahtar = ((sehir or '').upper(), gun)
+    kayit = _indeksler.get(anahtar)
+    if kayit is None or time.monotonic() - kayit[0] > sure:
+        kayit = _indeksler[anahtar] = (time.monotonic(), build_index(sehir=sehir, gun=gun))
+    return kayit[1]
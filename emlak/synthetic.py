@@ -0,0 +1,122 @@
+# emlak/synthetic.py
+
+"""
+Ölçek ve performans ölçümleri için gerçekçi sentetik kira ilanları.
+
+Konumlar paketle gelen gazetteer'ın (emlak/data/istanbul_konumlar.csv) İstanbul mahalleleridir. Fiyatlar
+çarpık dağılır:
+    - her ilçenin bir m² kira seviyesi vardır (ILCE_M2_KIRASI; listede olmayanlar VARSAYILAN_M2_KIRASI),
+    - her mahalle bu seviyeyi sabit bir lognormal çarpanla kaydırır,
+    - her ilan lognormal gürültü alır; ilanların AYKIRI_ORANI kadarı 10 kat pahalı/ucuz girilmiştir,
+    - eski ilanlar aylık AYLIK_ARTIS enflasyonu kadar ucuzdur (bölge özetlerinde artış uyarısı oluşur).
+İlan sayıları mahallelere Zipf benzeri dağılır: birkaç popüler mahalle ilanların büyük kısmını alır.
+
+Üretim deterministiktir: aynı tohum ve sıra numarası her zaman aynı ilanı verir. Böylece veri artımlı
+büyütülebilir (10 bin ilanlık tablo 100 bine tamamlandığında ilk 10 bin aynı kalır). Sentetik ilanların
+URL'si URL_ONEKI ile başlar (bkz. ornek_veri_uret komutu).
+"""
+
+import random
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.utils import timezone
+
+from emlak import locations
+
+URL_ONEKI = 'https://ornek-veri.invalid/ilan/'
+SEHIR = locations.SEHIR
+
+# Aylık kira, TL/m² (2026 sonbaharı için kabaca); ilçeler arası fark asıl çarpıklık kaynağı
+ILCE_M2_KIRASI = {
+    'Sarıyer': 640, 'Beşiktaş': 610, 'Kadıköy': 560, 'Bakırköy': 520, 'Şişli': 500, 'Beyoğlu': 470,
+    'Ataşehir': 450, 'Üsküdar': 430, 'Adalar': 400, 'Beykoz': 420, 'Fatih': 380, 'Maltepe': 380,
+    'Ümraniye': 340, 'Kartal': 330, 'Başakşehir': 330, 'Çekmeköy': 320, 'Kağıthane': 330, 'Eyüpsultan': 310,
+    'Pendik': 300, 'Tuzla': 290, 'Beylikdüzü': 290, 'Zeytinburnu': 300, 'Bahçelievler': 300,
+    'Küçükçekmece': 280, 'Avcılar': 260, 'Büyükçekmece': 260, 'Bağcılar': 240, 'Arnavutköy': 210,
+}
+VARSAYILAN_M2_KIRASI = 300
+MAHALLE_SAPMASI = 0.15   # mahalle çarpanının lognormal sigması
+ILAN_SAPMASI = 0.20      # ilan gürültüsünün lognormal sigması
+AYKIRI_ORANI = 0.01
+AYLIK_ARTIS = 0.03
+ZIPF_USSU = 0.9
+
+# Oda sayısı -> (ağırlık, ortalama m²)
+ODA_DAGILIMI = {'1+0': (5, 35), '1+1': (25, 55), '2+1': (35, 90), '3+1': (25, 120), '4+1': (8, 165), '5+1': (2, 220)}
+KAYNAK_DAGILIMI = {'Emlakjet': 60, 'Sahibinden': 30, 'Hepsiemlak': 10}
+ACIKLAMA_PARCALARI = [
+    'Metroya yürüme mesafesinde', 'Deniz manzaralı', 'Site içinde, havuzlu', 'Yeni boyanmış',
+    'Doğalgaz kombili', 'Asansörlü binada', 'Otoparklı', 'Eşyalı', 'Öğrenciye uygun', 'Aileye uygun',
+    'Çarşıya yakın', 'Bahçe katı', 'Ara kat', 'Güney cepheli', 'Okullara yakın',
+]
+
+
+class Profil:
+    """Tohuma bağlı sabitler: mahalleler, popülerlik ağırlıkları ve mahalle fiyat çarpanları."""
+
+    def __init__(self, tohum=42):
+        gazetteer = locations.get_gazetteer()
+        rastgele = random.Random(tohum)
+        self.mahalleler = []  # (ilçe, mahalle, m² kirası)
+        for ilce_anahtari, ilce in sorted(gazetteer.ilceler.items()):
+            seviye = ILCE_M2_KIRASI.get(ilce, VARSAYILAN_M2_KIRASI)
+            for mahalle in sorted(gazetteer.mahalleler[ilce_anahtari].values()):
+                self.mahalleler.append((ilce, mahalle, seviye * rastgele.lognormvariate(0, MAHALLE_SAPMASI)))
+        sira = list(range(len(self.mahalleler)))
+        rastgele.shuffle(sira)
+        agirliklar = [1 / (sira[i] + 1) ** ZIPF_USSU for i in range(len(self.mahalleler))]
+        self.birikimli = list(_birikimli(agirliklar))
+        self.odalar = list(ODA_DAGILIMI)
+        self.oda_birikimli = list(_birikimli(agirlik for agirlik, _ in ODA_DAGILIMI.values()))
+        self.kaynaklar = list(KAYNAK_DAGILIMI)
+        self.kaynak_birikimli = list(_birikimli(KAYNAK_DAGILIMI.values()))
+        self.tohum = tohum
+
+
+def _birikimli(agirliklar):
+    toplam = 0
+    for agirlik in agirliklar:
+        toplam += agirlik
+        yield toplam
+
+
+def _sec(birikimli, rastgele):
+    """Birikimli ağırlık listesinden ağırlıklı rastgele bir sıra seçer."""
+    return bisect_left(birikimli, rastgele.random() * birikimli[-1])
+
+
+def generate_cards(baslangic, adet, profil, gun=365, bugun=None, url_oneki=URL_ONEKI):
+    """
+    baslangic..baslangic+adet sıra numaralı ilanların kart sözlüklerini (emlak.persistence.save_cards
+    biçiminde, ek olarak aciklama) üretir. ilan_tarihi son `gun` güne düzgün dağılır.
+    """
+    bugun = bugun or timezone.localdate()
+    for sira in range(baslangic, baslangic + adet):
+        # Her ilan kendi sıra numarasından tohumlanır: parçalara bölünerek üretim aynı sonucu verir
+        rastgele = random.Random(profil.tohum * 1_000_003 + sira)
+        ilce, mahalle, m2_kirasi = profil.mahalleler[_sec(profil.birikimli, rastgele)]
+        oda_sayisi = profil.odalar[_sec(profil.oda_birikimli, rastgele)]
+        metrekare = max(20, round(ODA_DAGILIMI[oda_sayisi][1] * rastgele.lognormvariate(0, 0.15)))
+        gecen_gun = rastgele.randrange(gun)
+        fiyat = metrekare * m2_kirasi * rastgele.lognormvariate(0, ILAN_SAPMASI) / (1 + AYLIK_ARTIS) ** (gecen_gun / 30)
+        if rastgele.random() < AYKIRI_ORANI:
+            fiyat *= rastgele.choice((10, 0.1))  # fazladan/eksik sıfır
+        yield {
+            'ilan_url': f'{url_oneki}{sira}',
+            'fiyat': max(500, round(fiyat / 500) * 500),
+            'metrekare': metrekare,
+            'oda_sayisi': oda_sayisi,
+            'sehir': SEHIR,
+            'ilce': ilce,
+            'mahalle': mahalle,
+            'ilan_kaynagi': profil.kaynaklar[_sec(profil.kaynak_birikimli, rastgele)],
+            'ilan_tarihi': bugun - timedelta(days=gecen_gun),
+            'aciklama': ', '.join(rastgele.sample(ACIKLAMA_PARCALARI, 3)) + f' {oda_sayisi} daire.',
+        }
+
+
+def expected_share(profil, ilk=5):
+    """En popüler `ilk` mahallenin ilanlardan beklenen payı (çarpıklığın özeti)."""
+    agirliklar = sorted((b - a for a, b in zip([0] + profil.birikimli, profil.birikimli)), reverse=True)
+    return sum(agirliklar[:ilk]) / profil.birikimli[-1]
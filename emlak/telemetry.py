@@ -0,0 +1,140 @@
+# emlak/telemetry.py
+
+"""
+Tarama aşamaları için süre histogramları ve sayaçlar.
+
+Kod aşamaları `with telemetry.olc('gezinme'):` ile sarar ve olayları `telemetry.say('kart_bulunan')`
+ile sayar; ölçümler sürecin etkin Telemetri nesnesinde toplanır. Her aşama için adet, toplam, en
+uzun süre ve sabit, logaritmik aralıklı kovalardan oluşan bir histogram tutulur; ham süreler
+saklanmaz, bellek kullanımı ölçüm sayısından bağımsızdır.
+
+İşçi süreçler (bkz. emlak.scheduler) her hedeften sonra kendi ölçümlerini anlik_goruntu(sifirla=True)
+ile alıp sonuçla birlikte ana sürece gönderir; ana süreç bunları birlestir() ile toplar. Çalıştırma
+sonunda özet TaramaCalismasi modeline yazılır (bkz. emlak/run_history.py).
+
+Bu modül Django'yu import etmez.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram kova üst sınırları (saniye); son kova sınırsız
+KOVA_SINIRLARI = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Telemetri:
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self.asamalar = {}
+        self.sayaclar = {}
+
+    def _bos_asama(self):
+        return {'adet': 0, 'toplam': 0.0, 'en_uzun': 0.0, 'kovalar': [0] * (len(KOVA_SINIRLARI) + 1)}
+
+    def kaydet(self, asama, sure):
+        with self._kilit:
+            kayit = self.asamalar.get(asama)
+            if kayit is None:
+                kayit = self.asamalar[asama] = self._bos_asama()
+            kayit['adet'] += 1
+            kayit['toplam'] += sure
+            kayit['en_uzun'] = max(kayit['en_uzun'], sure)
+            kayit['kovalar'][bisect.bisect_left(KOVA_SINIRLARI, sure)] += 1
+
+    @contextmanager
+    def olc(self, asama):
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.kaydet(asama, time.perf_counter() - baslangic)
+
+    def say(self, sayac, adet=1):
+        with self._kilit:
+            self.sayaclar[sayac] = self.sayaclar.get(sayac, 0) + adet
+
+    def anlik_goruntu(self, sifirla=False):
+        """Ölçümlerin süreçler arası gönderilebilir (düz sözlük) kopyasını döndürür."""
+        with self._kilit:
+            goruntu = {
+                'asamalar': {ad: dict(kayit, kovalar=list(kayit['kovalar'])) for ad, kayit in self.asamalar.items()},
+                'sayaclar': dict(self.sayaclar),
+            }
+            if sifirla:
+                self.asamalar = {}
+                self.sayaclar = {}
+        return goruntu
+
+    def birlestir(self, goruntu):
+        """Başka bir sürecin anlik_goruntu() çıktısını bu nesneye ekler."""
+        if not goruntu:
+            return
+        with self._kilit:
+            for ad, diger in goruntu['asamalar'].items():
+                kayit = self.asamalar.get(ad)
+                if kayit is None:
+                    kayit = self.asamalar[ad] = self._bos_asama()
+                kayit['adet'] += diger['adet']
+                kayit['toplam'] += diger['toplam']
+                kayit['en_uzun'] = max(kayit['en_uzun'], diger['en_uzun'])
+                kayit['kovalar'] = [a + b for a, b in zip(kayit['kovalar'], diger['kovalar'])]
+            for sayac, adet in goruntu['sayaclar'].items():
+                self.sayaclar[sayac] = self.sayaclar.get(sayac, 0) + adet
+
+    def ozet(self):
+        """Aşama başına adet, toplam/ortalama/p50/p95/en uzun süre (ms) ve sayaçları döndürür (JSON'a yazılabilir)."""
+        goruntu = self.anlik_goruntu()
+        return {
+            'asamalar': {
+                ad: {
+                    'adet': kayit['adet'],
+                    'toplam_sn': round(kayit['toplam'], 4),
+                    'ortalama_ms': round(kayit['toplam'] * 1000 / kayit['adet'], 3) if kayit['adet'] else None,
+                    'p50_ms': _yuzdelik_ms(kayit, 0.50),
+                    'p95_ms': _yuzdelik_ms(kayit, 0.95),
+                    'en_uzun_ms': round(kayit['en_uzun'] * 1000, 3),
+                    'kovalar': kayit['kovalar'],
+                }
+                for ad, kayit in goruntu['asamalar'].items()
+            },
+            'sayaclar': goruntu['sayaclar'],
+        }
+
+
+def _yuzdelik_ms(kayit, q):
+    """Histogramdan yüzdelik tahmini: q'ya ulaşılan kovanın üst sınırı (en uzun süreyle sınırlı)."""
+    if not kayit['adet']:
+        return None
+    hedef = q * kayit['adet']
+    toplam = 0
+    for i, adet in enumerate(kayit['kovalar']):
+        toplam += adet
+        if toplam >= hedef:
+            ust = KOVA_SINIRLARI[i] if i < len(KOVA_SINIRLARI) else kayit['en_uzun']
+            return round(min(ust, kayit['en_uzun']) * 1000, 3)
+    return round(kayit['en_uzun'] * 1000, 3)
+
+
+# Sürecin etkin ölçüm nesnesi
+_aktif = Telemetri()
+
+
+def aktif():
+    return _aktif
+
+
+def olc(asama):
+    return _aktif.olc(asama)
+
+
+def say(sayac, adet=1):
+    _aktif.say(sayac, adet)
+
+
+def sifirla():
+    """Etkin ölçümleri boşaltır ve yeni (boş) Telemetri nesnesini döndürür."""
+    global _aktif
+    _aktif = Telemetri()
+    return _aktif
@@ -1,3 +1,537 @@
-from django.test import TestCase
+import contextlib
+import csv
+import gzip
+import queue
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from emlak import admin_tools, dedup, locations, parsing, partitioning, rollup, telemetry
+from emlak.frontier import Frontier
+from emlak.maliyet import SEVIYE_ILCE, UYARI_ARTIS, UYARI_FAHIS, UYARI_NORMAL, region_reports
+from emlak.models import Bolge, BolgeOzeti, FiyatGozlemi, IlanAdresi, KiraIlani, TaramaSayfasi
+from emlak.persistence import save_cards
+from emlak.scheduler import Hedef, _kayit_dongusu, hedef_url
+from emlak.rollup import ay_baslangici
+
+YEREL_ONBELLEK = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def ilan_url(no):
+    return f'https://ornek.invalid/ilan/{no}'
+
+
+def kart(no, fiyat, ilan_tarihi, ilce='Kadıköy', mahalle='Moda', **alanlar):
+    """save_cards biçiminde bir ilan kartı."""
+    return {'ilan_url': ilan_url(no), 'fiyat': fiyat, 'metrekare': 100, 'oda_sayisi': '2+1', 'sehir': 'İstanbul',
+            'ilce': ilce, 'mahalle': mahalle, 'ilan_kaynagi': 'Emlakjet', 'ilan_tarihi': ilan_tarihi, **alanlar}
+
+
+def ilan_kaydi(bolge, no, fiyat, ilan_tarihi, **alanlar):
+    """save_cards'tan geçmeden doğrudan yazılacak (özetleri yenilenmeyen) kaydedilmemiş bir KiraIlani."""
+    return KiraIlani(**{'bolge': bolge, 'fiyat': Decimal(fiyat), 'metrekare': 100, 'ilan_url': ilan_url(no),
+                        'ilan_kaynagi': 'Emlakjet', 'ilan_tarihi': ilan_tarihi, **alanlar})
+
+
+def gun_once(gun):
+    return timezone.localdate() - timedelta(days=gun)
+
+
+@override_settings(CACHES=YEREL_ONBELLEK)
+class KiraIlaniAdminSorguSayisiTest(TestCase):
+    """Admin ilan listesinin sorgu sayısı sayfadaki satır sayısından bağımsız olmalı."""
+
+    # Oturum, kullanıcı, sayım ve sayfanın satırları (bölgeleriyle birlikte tek JOIN'li sorgu)
+    SAYFA_SORGUSU = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = get_user_model().objects.create_superuser('yonetici', 'yonetici@example.com', 'parola')
+        cls.bolgeler = [Bolge.objects.create(sehir='İstanbul', ilce=ilce, mahalle=mahalle)
+                        for ilce, mahalle in [('Kadıköy', 'Moda'), ('Kadıköy', 'Fenerbahçe'), ('Beşiktaş', 'Levent')]]
+
+    def setUp(self):
+        self.client.force_login(self.yonetici)
+        admin_tools.refresh_filter_choices()
+
+    def ilan_ekle(self, adet):
+        baslangic = KiraIlani.objects.count()
+        KiraIlani.objects.bulk_create([
+            ilan_kaydi(self.bolgeler[i % len(self.bolgeler)], baslangic + i, 20000 + i, date(2026, 10, 1),
+                       metrekare=80, aciklama='Deniz manzaralı eşyalı daire')
+            for i in range(adet)
+        ])
+
+    def sayfa_sorgulari(self, **parametreler):
+        with CaptureQueriesContext(connection) as sorgular:
+            yanit = self.client.get(reverse('admin:emlak_kirailani_changelist'), parametreler)
+        self.assertEqual(yanit.status_code, 200)
+        return len(sorgular)
+
+    def beklenen(self):
+        # PostgreSQL'de filtresiz sayım önce tablo istatistiğine (reltuples) bakar
+        return self.SAYFA_SORGUSU + (connection.vendor == 'postgresql')
+
+    def test_satir_sayisi_sorgu_sayisini_degistirmez(self):
+        self.ilan_ekle(3)
+        az = self.sayfa_sorgulari()
+        self.ilan_ekle(60)
+        cok = self.sayfa_sorgulari()
+        self.assertEqual(az, cok)
+        self.assertEqual(cok, self.beklenen())
+
+    def test_filtreler_ayri_sorgu_yapmaz(self):
+        self.ilan_ekle(60)
+        # Filtreli sayfada tahmin kullanılmaz; seçenekler önbellekten gelir
+        self.assertEqual(self.sayfa_sorgulari(bolge__sehir='İstanbul', bolge__ilce='Kadıköy',
+                                              ilan_kaynagi='Emlakjet'), self.SAYFA_SORGUSU)
+
+    def test_url_aramasi(self):
+        self.ilan_ekle(5)
+        yanit = self.client.get(reverse('admin:emlak_kirailani_changelist'), {'q': ilan_url(3)})
+        self.assertEqual(yanit.context['cl'].result_count, 1)
+
+
+@override_settings(CACHES=YEREL_ONBELLEK)
+class KiraArtisiUyarisiTest(TestCase):
+    """Uyarı son 90 günü bölgenin önceki yılıyla karşılaştırır; fiyatı artan bölgelerde çıkmalı."""
+
+    def bolge_ilanlari(self, ilce, mahalle, eski_fiyat, yeni_fiyat, adet=4):
+        # Referans döneminde (son 90 günden önce) ve son dönemde birer ilan grubu
+        onek = f'{ilce}-{mahalle}'
+        save_cards([kart(f'{onek}-eski-{i}', eski_fiyat, gun_once(150 + 30 * i), ilce, mahalle) for i in range(adet)]
+                   + [kart(f'{onek}-yeni-{i}', yeni_fiyat, gun_once(10 + 15 * i), ilce, mahalle) for i in range(adet)])
+
+    def uyarilar(self, **secenekler):
+        return {(r['ilce'], r['mahalle']): r for r in region_reports(sehir='İstanbul', **secenekler)}
+
+    def test_mahalle_uyarilari(self):
+        self.bolge_ilanlari('Kadıköy', 'Moda', 20000, 20000)
+        self.bolge_ilanlari('Kadıköy', 'Fenerbahçe', 20000, 23000)
+        self.bolge_ilanlari('Beşiktaş', 'Levent', 20000, 26000)
+        raporlar = self.uyarilar()
+        self.assertEqual(raporlar[('Kadıköy', 'Moda')]['uyari'], UYARI_NORMAL)
+        self.assertEqual(raporlar[('Kadıköy', 'Fenerbahçe')]['uyari'], UYARI_ARTIS)
+        self.assertEqual(raporlar[('Beşiktaş', 'Levent')]['uyari'], UYARI_FAHIS)
+        self.assertEqual(raporlar[('Beşiktaş', 'Levent')]['referans_kira'], Decimal(20000))
+        self.assertEqual(raporlar[('Beşiktaş', 'Levent')]['son_donem_kira'], Decimal(26000))
+
+    def test_bolge_ortalamasi_referans_donemidir(self):
+        self.bolge_ilanlari('Beşiktaş', 'Levent', 20000, 26000)
+        # Son dönem referansa katılsaydı bölge kendi ortalamasıyla (23000) karşılaştırılırdı
+        self.assertEqual(Bolge.objects.get(mahalle='Levent').ortalama_kira, Decimal(20000))
+
+    def test_ilce_referansi_ilcenin_ozetlerinden(self):
+        self.bolge_ilanlari('Kadıköy', 'Moda', 20000, 20000)
+        self.bolge_ilanlari('Kadıköy', 'Fenerbahçe', 30000, 39000)
+        rapor = self.uyarilar(seviye=SEVIYE_ILCE)[('Kadıköy', None)]
+        self.assertEqual(rapor['referans_kira'], Decimal(25000))
+        self.assertEqual(rapor['son_donem_kira'], Decimal(29500))
+        self.assertEqual(rapor['uyari'], UYARI_ARTIS)
+
+    def test_uyarilar_api(self):
+        self.bolge_ilanlari('Kadıköy', 'Moda', 20000, 20000)
+        self.bolge_ilanlari('Beşiktaş', 'Levent', 20000, 26000)
+        yanit = self.client.get(reverse('emlak:uyarilar'), {'sehir': 'İstanbul'})
+        self.assertEqual([(b['mahalle'], b['uyari']) for b in yanit.json()['bolgeler']], [('Levent', UYARI_FAHIS)])
+
+    def test_son_artis_tamamlanmis_aylardan(self):
+        son_ay = ay_baslangici(ay_baslangici(timezone.localdate()) - timedelta(days=1))
+        onceki_ay = ay_baslangici(son_ay - timedelta(days=1))
+        # Yarım kalan bu ayın fiyatı yüzdeye katılmamalı
+        save_cards([kart('onceki', 20000, onceki_ay), kart('son', 21000, son_ay),
+                    kart('bu-ay', 40000, timezone.localdate())])
+        self.assertEqual(Bolge.objects.get(mahalle='Moda').son_artis_yuzdesi, Decimal('5.00'))
+
+
+class IlanKaydiTest(TestCase):
+    """save_cards: ekleme/güncelleme, artımlı mod ve fiyat gözlemleri."""
+
+    def test_ekleme_ve_guncelleme(self):
+        ozet = save_cards([kart(1, 20000, gun_once(2)), kart(2, 25000, gun_once(2)),
+                           kart(3, None, gun_once(2))])
+        self.assertEqual((ozet['eklenen'], ozet['guncellenen'], ozet['atlanan'], ozet['yeni_bolge']), (2, 0, 1, 1))
+        self.assertEqual(FiyatGozlemi.objects.count(), 2)
+
+        # Aynı URL iki kez gelirse son kart kullanılır
+        ozet = save_cards([kart(1, 20000, gun_once(1)), kart(2, 24000, gun_once(1)), kart(2, 26000, gun_once(1))])
+        self.assertEqual((ozet['eklenen'], ozet['guncellenen'], ozet['fiyat_gozlemi']), (0, 2, 1))
+        self.assertEqual(KiraIlani.objects.count(), 2)
+        self.assertEqual(KiraIlani.objects.get(ilan_url=ilan_url(2)).fiyat, Decimal(26000))
+
+    def test_fiyat_gozlemi_yalnizca_fiyat_degisince(self):
+        save_cards([kart(1, 20000, gun_once(3))], gozlem_tarihi=gun_once(3))
+        self.assertEqual(save_cards([kart(1, 20000, gun_once(2), oda_sayisi='3+1')],
+                                    gozlem_tarihi=gun_once(2))['fiyat_gozlemi'], 0)
+        self.assertEqual(save_cards([kart(1, 22000, gun_once(1))], gozlem_tarihi=gun_once(1))['fiyat_gozlemi'], 1)
+        self.assertEqual(list(FiyatGozlemi.objects.order_by('gozlem_tarihi').values_list('gozlem_tarihi', 'fiyat')),
+                         [(gun_once(3), Decimal(20000)), (gun_once(1), Decimal(22000))])
+
+    def test_artimli_mod_degismeyeni_yazmaz(self):
+        save_cards([kart(1, 20000, gun_once(0)), kart(2, 25000, gun_once(0))])
+        ozet = save_cards([kart(1, 20000, gun_once(0)), kart(2, 25000, gun_once(0), oda_sayisi='3+1')], artimli=True)
+        self.assertEqual((ozet['eklenen'], ozet['guncellenen'], ozet['degismeyen']), (0, 1, 1))
+        self.assertEqual(KiraIlani.objects.get(ilan_url=ilan_url(2)).oda_sayisi, '3+1')
+
+    def test_artimli_mod_son_gorulmeyi_ilerletir(self):
+        save_cards([kart(1, 20000, gun_once(40))])
+        ozet = save_cards([kart(1, 20000, gun_once(0))], artimli=True)
+        self.assertEqual((ozet['guncellenen'], ozet['degismeyen'], ozet['fiyat_gozlemi']), (0, 1, 0))
+        # Hâlâ yayındaki ilan ilk görüldüğü ayla birlikte arşivlenmesin diye ilan_tarihi son görülme günüdür
+        self.assertEqual(KiraIlani.objects.get().ilan_tarihi, gun_once(0))
+        self.assertEqual(FiyatGozlemi.objects.count(), 1)
+        gunler = set(BolgeOzeti.objects.filter(donem=BolgeOzeti.GUNLUK).values_list('donem_baslangici', flat=True))
+        self.assertEqual(gunler, {gun_once(0)})
+        # Tarih geri gitmez
+        save_cards([kart(1, 20000, gun_once(10))], artimli=True)
+        self.assertEqual(KiraIlani.objects.get().ilan_tarihi, gun_once(0))
+
+    def test_eski_gunun_karti_guncel_ilani_geri_almaz(self):
+        # Arşivden yalnızca geçmiş bir günün yeniden ayrıştırılması
+        save_cards([kart(1, 20000, gun_once(8))], gozlem_tarihi=gun_once(8))
+        ozet = save_cards([kart(1, 18000, gun_once(47))], gozlem_tarihi=gun_once(47))
+        self.assertEqual((ozet['guncellenen'], ozet['degismeyen'], ozet['fiyat_gozlemi']), (0, 1, 1))
+        ilan = KiraIlani.objects.get()
+        self.assertEqual((ilan.fiyat, ilan.ilan_tarihi), (Decimal(20000), gun_once(8)))
+        self.assertEqual(list(FiyatGozlemi.objects.order_by('gozlem_tarihi').values_list('gozlem_tarihi', 'fiyat')),
+                         [(gun_once(47), Decimal(18000)), (gun_once(8), Decimal(20000))])
+        # O güne kadarki fiyat aynıysa yeni gözlem yazılmaz
+        self.assertEqual(save_cards([kart(1, 18000, gun_once(30))], gozlem_tarihi=gun_once(30))['fiyat_gozlemi'], 0)
+
+
+class BolgeOzetiTest(TestCase):
+    """refresh_buckets: dokunulan bölge-ayların günlük ve aylık özetleri."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bolge = Bolge.objects.create(sehir='İstanbul', ilce='Kadıköy', mahalle='Moda')
+
+    def ozetler(self, donem):
+        return {o.donem_baslangici: (o.ilan_sayisi, o.ortalama_fiyat)
+                for o in BolgeOzeti.objects.filter(bolge=self.bolge, donem=donem)}
+
+    def test_gunluk_ve_aylik_ozet(self):
+        ay = date(2026, 3, 1)
+        KiraIlani.objects.bulk_create([ilan_kaydi(self.bolge, 1, 20000, ay), ilan_kaydi(self.bolge, 2, 30000, ay),
+                                       ilan_kaydi(self.bolge, 3, 40000, ay + timedelta(days=9))])
+        self.assertEqual(rollup.refresh_buckets({(self.bolge.id, ay)}), 3)
+        self.assertEqual(self.ozetler(BolgeOzeti.GUNLUK), {ay: (2, Decimal(25000)),
+                                                            ay + timedelta(days=9): (1, Decimal(40000))})
+        self.assertEqual(self.ozetler(BolgeOzeti.AYLIK), {ay: (3, Decimal(30000))})
+
+    def test_bosalan_gun_silinir_ve_kopyalar_sayilmaz(self):
+        ay = date(2026, 3, 1)
+        asil, tasinan = KiraIlani.objects.bulk_create([ilan_kaydi(self.bolge, 1, 20000, ay),
+                                                       ilan_kaydi(self.bolge, 2, 30000, ay)])
+        rollup.refresh_buckets({(self.bolge.id, ay)})
+        KiraIlani.objects.filter(pk=tasinan.pk).update(ilan_tarihi=date(2026, 4, 2))
+        ilan_kaydi(self.bolge, 3, 99000, ay, asil_ilan=asil).save()
+        rollup.refresh_buckets({(self.bolge.id, ay), (self.bolge.id, date(2026, 4, 2))})
+        self.assertEqual(self.ozetler(BolgeOzeti.GUNLUK), {ay: (1, Decimal(20000)),
+                                                            date(2026, 4, 2): (1, Decimal(30000))})
+        self.assertEqual(self.ozetler(BolgeOzeti.AYLIK), {ay: (1, Decimal(20000)),
+                                                           date(2026, 4, 1): (1, Decimal(30000))})
+
+
+class KopyaIlanTest(TestCase):
+    """dedup.mark_duplicates: kaynaklar arası kopyalar ilk görülen ilana bağlanır."""
+
+    def asil_ilanlar(self):
+        return dict(KiraIlani.objects.values_list('ilan_url', 'asil_ilan__ilan_url'))
+
+    def test_farkli_kaynaktaki_ayni_daire(self):
+        save_cards([kart('ej', 20000, gun_once(1)),
+                    kart('he', 20500, gun_once(1), metrekare=102, ilan_kaynagi='Hepsiemlak'),
+                    kart('ej-2', 20000, gun_once(1)),  # aynı kaynak: kopya sayılmaz
+                    kart('he-2', 30000, gun_once(1), ilan_kaynagi='Hepsiemlak')])  # fiyat toleransın dışında
+        self.assertEqual(self.asil_ilanlar(), {ilan_url('ej'): None, ilan_url('he'): ilan_url('ej'),
+                                               ilan_url('ej-2'): None, ilan_url('he-2'): None})
+        # Kopyalar özetlere katılmaz
+        self.assertEqual(BolgeOzeti.objects.get(donem=BolgeOzeti.GUNLUK).ilan_sayisi, 3)
+
+    def test_eslesme_bozulunca_bag_kalkar(self):
+        save_cards([kart('ej', 20000, gun_once(1)), kart('he', 20000, gun_once(1), ilan_kaynagi='Hepsiemlak')])
+        save_cards([kart('he', 26000, gun_once(0), ilan_kaynagi='Hepsiemlak')])
+        self.assertIsNone(KiraIlani.objects.get(ilan_url=ilan_url('he')).asil_ilan_id)
+        self.assertEqual(BolgeOzeti.objects.filter(donem=BolgeOzeti.GUNLUK).count(), 2)
+
+    def test_asil_ilani_degisen_kopyalar_yeniden_eslestirilir(self):
+        # X'in iki kopyası var (Z ve V). X, Y'ye eşleşecek şekilde güncellenince kopyaları Y'ye taşınmaz,
+        # yeniden değerlendirilir: Z artık kimseyle eşleşmez, V ise bu çağrıda asıla dönen Z'ye bağlanır
+        save_cards([kart('y', 30000, gun_once(1), ilan_kaynagi='Sahibinden')])
+        save_cards([kart('x', 20000, gun_once(1), ilan_kaynagi='Hepsiemlak')])
+        save_cards([kart('z', 20000, gun_once(3))])
+        save_cards([kart('v', 20000, gun_once(1), ilan_kaynagi='Zingat')])
+        y, x, z, v = map(ilan_url, 'yxzv')
+        self.assertEqual(self.asil_ilanlar(), {y: None, x: None, z: x, v: x})
+        self.assertFalse(BolgeOzeti.objects.filter(donem=BolgeOzeti.GUNLUK, donem_baslangici=gun_once(3)).exists())
+
+        save_cards([kart('x', 30000, gun_once(1), ilan_kaynagi='Hepsiemlak')])
+        self.assertEqual(self.asil_ilanlar(), {y: None, x: y, z: None, v: z})
+        # Bağlantısı değişen kopyaların kovaları da yenilenir
+        gunluk = dict(BolgeOzeti.objects.filter(donem=BolgeOzeti.GUNLUK).values_list('donem_baslangici', 'ilan_sayisi'))
+        self.assertEqual(gunluk, {gun_once(1): 1, gun_once(3): 1})
+
+    def test_asil_ilani_eslesmez_olan_kopya_ayrilir(self):
+        save_cards([kart('ej', 20000, gun_once(1)), kart('he', 20000, gun_once(1), ilan_kaynagi='Hepsiemlak')])
+        save_cards([kart('ej', 26000, gun_once(1))])
+        self.assertEqual(self.asil_ilanlar(), {ilan_url('ej'): None, ilan_url('he'): None})
+        self.assertEqual(BolgeOzeti.objects.get(donem=BolgeOzeti.GUNLUK).ilan_sayisi, 2)
+
+    def test_degisiklik_yoksa_bos_doner(self):
+        save_cards([kart('ej', 20000, gun_once(1)), kart('he', 20000, gun_once(1), ilan_kaynagi='Hepsiemlak')])
+        self.assertEqual(dedup.mark_duplicates(KiraIlani.objects.all()), set())
+
+
+class FrontierTest(TestCase):
+    """Frontier: sayfalama, yarıda kalan taramanın devamı ve tazelik."""
+
+    SEHIR, ILCE = 'İstanbul', 'Kadıköy'
+
+    def hedef(self, sayfa):
+        return Hedef(self.SEHIR, self.ILCE, sayfa)
+
+    def sayfa(self, sayfa):
+        return TaramaSayfasi.objects.get(url=hedef_url(self.hedef(sayfa)))
+
+    def test_sayfalama_yeni_ilan_bitince_durur(self):
+        sinir = Frontier(en_fazla_sayfa=5, onden=2)
+        seeds = sinir.seeds(['emlakjet'], self.SEHIR, [self.ILCE])
+        self.assertEqual(sinir.kesfet(seeds), [self.hedef(1), self.hedef(2)])
+        self.assertEqual(self.sayfa(1).durum, TaramaSayfasi.BEKLIYOR)
+
+        kartlar = [kart(no, 20000, gun_once(0)) for no in (1, 2)]
+        self.assertEqual(sinir.bitti(self.hedef(1), kartlar), [self.hedef(3)])
+        self.assertEqual((self.sayfa(1).durum, self.sayfa(1).kart_sayisi), (TaramaSayfasi.TAMAMLANDI, 2))
+        # Yeni ilan getirmeyen sayfa ilçenin sayfalamasını bitirir; bekleyen sayfalar da ileri gitmez
+        self.assertEqual(sinir.bitti(self.hedef(2), kartlar), [])
+        self.assertEqual(sinir.bitti(self.hedef(3), [kart(3, 20000, gun_once(0))]), [])
+
+    def test_yarida_kalan_tarama_devam_eder(self):
+        ilk = Frontier(en_fazla_sayfa=5, onden=1)
+        ilk.kesfet(ilk.seeds(['emlakjet'], self.SEHIR, [self.ILCE]))
+        sonraki = ilk.bitti(self.hedef(1), [kart(1, 20000, gun_once(0))])
+        self.assertEqual(sonraki, [self.hedef(2)])
+        # Sayfa 2 kaydedilmeden tarama kesildi: yeni çalıştırma onu bekleyenlerden alır, taze sayfa 1'i atlar
+        yeni = Frontier(en_fazla_sayfa=5, onden=1)
+        self.assertEqual(yeni.pending(['emlakjet'], self.SEHIR, [self.ILCE]), [self.hedef(2)])
+        self.assertEqual(yeni.kesfet(yeni.seeds(['emlakjet'], self.SEHIR, [self.ILCE])), [self.hedef(2)])
+        self.assertEqual(yeni.taze_atlanan, 1)
+
+    def test_tazeligi_gecen_sayfa_yeniden_cekilir(self):
+        sinir = Frontier(en_fazla_sayfa=1, tazelik_saat=12)
+        sinir.kesfet([self.hedef(1)])
+        sinir.bitti(self.hedef(1), [kart(1, 20000, gun_once(0))])
+        self.assertEqual(Frontier(en_fazla_sayfa=1, tazelik_saat=12).kesfet([self.hedef(1)]), [])
+        TaramaSayfasi.objects.update(son_cekme=timezone.now() - timedelta(hours=13))
+        self.assertEqual(Frontier(en_fazla_sayfa=1, tazelik_saat=12).kesfet([self.hedef(1)]), [self.hedef(1)])
+
+    def test_deneme_hakki_biten_hatali_sayfa_atlanir(self):
+        for _ in range(2):
+            sinir = Frontier(en_fazla_sayfa=1, en_fazla_deneme=2)
+            self.assertEqual(sinir.kesfet([self.hedef(1)]), [self.hedef(1)])
+            self.assertEqual(sinir.bitti(self.hedef(1), [], hata='zaman aşımı'), [])
+        sinir = Frontier(en_fazla_sayfa=1, en_fazla_deneme=2)
+        self.assertEqual(sinir.kesfet([self.hedef(1)]), [])
+        self.assertEqual((sinir.hatali_atlanan, self.sayfa(1).deneme), (1, 2))
+
+
+class ErkenDurdurmaTest(SimpleTestCase):
+    """Kayıt thread'i: erken durdurma serisi sayfa numarasına göre sayılır, boş sayfa sayfalamayı bitirir."""
+
+    def sinirlar(self, sayfalar, esik=2):
+        # sayfalar: işçilerden bitiş sırasıyla (ilçe, sayfa no, 'yeni' | 'ayni' | 'bos')
+        kuyruk = queue.Queue()
+        for ilce, sayfa, durum in sayfalar:
+            kuyruk.put((Hedef('İstanbul', ilce, sayfa), [] if durum == 'bos' else [{'durum': durum}], None))
+        kuyruk.put(None)
+        durdurulanlar = {}
+        with contextlib.redirect_stdout(StringIO()):
+            _kayit_dongusu(kuyruk, lambda kartlar: {'eklenen': int(kartlar[0]['durum'] == 'yeni')}, {}, esik, {},
+                           durdurulanlar, queue.Queue())
+        return {ilce: son for (_, _, ilce), son in durdurulanlar.items()}
+
+    def test_seri_sayfa_sirasiyla_sayilir(self):
+        # Bitiş sırasıyla sayılsaydı 1. sayfanın yeni ilanı seriyi ortadan bölerdi
+        self.assertEqual(self.sinirlar([('Kadıköy', 2, 'ayni'), ('Kadıköy', 1, 'yeni'), ('Kadıköy', 3, 'ayni')]),
+                         {'Kadıköy': 3})
+        # Arada henüz gelmemiş sayfa varsa seri oluşmaz
+        self.assertEqual(self.sinirlar([('Kadıköy', 2, 'ayni'), ('Kadıköy', 4, 'ayni')]), {})
+
+    def test_bos_sayfa_sayfalamanin_sonudur(self):
+        self.assertEqual(self.sinirlar([('Kadıköy', 4, 'bos'), ('Beşiktaş', 1, 'yeni'), ('Kadıköy', 2, 'bos')],
+                                       esik=None), {'Kadıköy': 2})
+
+
+class BolgeKoordinatlariTest(TestCase):
+    """Gazetteer'da olmayan mahalleler ilçe merkezini alır ve bu durum raporlanır."""
+
+    def test_ilce_merkezine_dusen_bolgeler_raporlanir(self):
+        Bolge.objects.create(sehir='İstanbul', ilce='Kadıköy', mahalle='Caferağa')
+        Bolge.objects.create(sehir='İstanbul', ilce='Esenyurt', mahalle='Pınar')
+        cikti = StringIO()
+        call_command('bolge_koordinatlari', verbosity=2, stdout=cikti)
+        self.assertIn('1 mahalle gazetteer\'da yok', cikti.getvalue())
+        self.assertIn('Esenyurt: 1 mahalle (Pınar)', cikti.getvalue())
+        esenyurt = Bolge.objects.get(mahalle='Pınar')
+        self.assertEqual((esenyurt.latitude, esenyurt.longitude), locations.coordinates('İstanbul', 'Esenyurt'))
+        self.assertTrue(locations.locate('İstanbul', 'Kadıköy', 'Caferağa')[1])
+
+
+class KonumCozumlemeTest(SimpleTestCase):
+    """Gazetteer eşleştirmesi: tireli mahalle adları bölünmez, şehir adı mahalle sayılmaz."""
+
+    def test_tireli_mahalle_adi(self):
+        konum = locations.resolve_location('Büyükada-Nizam, Adalar, İstanbul')
+        self.assertEqual(konum, ('İstanbul', 'Adalar', 'Büyükada-Nizam'))
+        self.assertTrue(locations.locate(*konum)[1])  # ilçe merkezine düşmez
+        self.assertEqual(locations.resolve_location('Adalar / Büyükada-Nizam Mah.')[2], 'Büyükada-Nizam')
+        # Boşluksuz tire bilinen bir ad değilse yine ayırıcıdır
+        self.assertEqual(locations.resolve_location('Kadıköy-Caferağa'), ('İstanbul', 'Kadıköy', 'Caferağa'))
+
+    def test_sehir_parcasi_atlanir(self):
+        self.assertEqual(locations.resolve_location('İstanbul - Kadıköy - Moda'), ('İstanbul', 'Kadıköy', 'Moda'))
+        self.assertEqual(locations.resolve_location('Kadıköy, İSTANBUL'), ('İstanbul', 'Kadıköy', None))
+
+
+class KartAyristirmaTest(SimpleTestCase):
+    def setUp(self):
+        self.olcum = telemetry.sifirla()
+        self.addCleanup(telemetry.sifirla)
+
+    def test_kartsiz_sayfa_sessiz_modda_yazdirilmaz_sayilir(self):
+        cikti = StringIO()
+        with contextlib.redirect_stdout(cikti):
+            kartlar = parsing.extract_cards('<html><body></body></html>', verbose=False)
+        self.assertEqual(kartlar, [])
+        self.assertEqual(cikti.getvalue(), '')
+        self.assertEqual(self.olcum.sayaclar['kartsiz_sayfa'], 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'İlan tablosu yalnızca PostgreSQL\'de bölümlenir')
+class IlanBolumlemeTest(TestCase):
+    def setUp(self):
+        self.bolge = Bolge.objects.create(sehir='İstanbul', ilce='Kadıköy', mahalle='Moda')
+        self.bu_ay = timezone.localdate().replace(day=1)
+        # migrations/0011 boş tabloda yalnızca bu ayın ve önümüzdeki üç ayın bölümlerini oluşturur
+        self.eski_ay = partitioning.ay_ekle(self.bu_ay, -24)
+
+    def bolumdeki_ilanlar(self, bolum):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {bolum} ORDER BY id')
+            return [id_ for id_, in cursor.fetchall()]
+
+    def test_ilan_kendi_ayinin_bolumune_duser(self):
+        self.assertTrue(partitioning.is_partitioned())
+        bolumler = partitioning.list_partitions()
+        self.assertEqual([b[1] for b in bolumler[:-1]], [partitioning.ay_ekle(self.bu_ay, i) for i in range(4)])
+        self.assertEqual(bolumler[-1][0], partitioning.VARSAYILAN_BOLUM)
+
+        guncel = ilan_kaydi(self.bolge, 1, 20000, gun_once(0))
+        eski = ilan_kaydi(self.bolge, 2, 20000, self.eski_ay)
+        KiraIlani.objects.bulk_create([guncel, eski])
+        self.assertEqual(self.bolumdeki_ilanlar(partitioning.bolum_adi(self.bu_ay)), [guncel.id])
+        self.assertEqual(self.bolumdeki_ilanlar(partitioning.VARSAYILAN_BOLUM), [eski.id])
+
+    def test_ilan_url_bolumler_arasinda_tekil(self):
+        ilan_kaydi(self.bolge, 1, 20000, gun_once(0)).save()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ilan_kaydi(self.bolge, 1, 21000, self.eski_ay).save()
+        self.assertEqual(KiraIlani.objects.count(), 1)
+
+    def test_ilana_basvuran_anahtarlar_zorlanir(self):
+        # Kısıtlar ertelenmiş (DEFERRABLE INITIALLY DEFERRED); işlem sonunu beklemeden denetlenir
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            FiyatGozlemi.objects.create(ilan_id=10 ** 9, gozlem_tarihi=gun_once(0), fiyat=20000, bolge=self.bolge)
+            connection.check_constraints()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ilan_kaydi(self.bolge, 1, 20000, gun_once(0), asil_ilan_id=10 ** 9).save()
+            connection.check_constraints()
+
+    def test_tarihi_degisen_ilan_bolum_degistirir(self):
+        save_cards([kart(1, 20000, self.eski_ay)])
+        ilan = KiraIlani.objects.get()
+        save_cards([kart(1, 21000, gun_once(0))])
+
+        self.assertEqual(self.bolumdeki_ilanlar(partitioning.bolum_adi(self.bu_ay)), [ilan.id])
+        self.assertEqual(self.bolumdeki_ilanlar(partitioning.VARSAYILAN_BOLUM), [])
+        self.assertEqual(list(IlanAdresi.objects.values_list('id', 'ilan_url')), [(ilan.id, ilan.ilan_url)])
+        self.assertEqual(ilan.fiyat_gozlemleri.get().fiyat, 21000)
+        connection.check_constraints()
+
+    def test_upsert_adresleri_islem_sonuna_kadar_kilitler(self):
+        def baska_baglantidan_dene(sonuc):
+            try:
+                with connections['default'].cursor() as cursor:
+                    cursor.execute('SELECT pg_try_advisory_xact_lock(hashtextextended(%s, 0))', [ilan_url(1)])
+                    sonuc.put(cursor.fetchone()[0])
+            finally:
+                connections['default'].close()
+
+        def dene():
+            sonuc = queue.Queue()
+            kanal = threading.Thread(target=baska_baglantidan_dene, args=(sonuc,))
+            kanal.start()
+            kanal.join()
+            return sonuc.get()
+
+        with transaction.atomic():
+            partitioning.lock_urls([ilan_url(1)])
+            self.assertFalse(dene())
+        # TestCase'in dış işlemi sürdüğü için kilit hâlâ tutuluyor; başka bir adres serbest
+        with transaction.atomic():
+            partitioning.lock_urls([ilan_url(2), ilan_url(2)])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()")
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_bolum_olusturma_varsayilandakileri_tasir(self):
+        save_cards([kart(1, 20000, self.eski_ay), kart(2, 20000, gun_once(0))])
+        eski = KiraIlani.objects.get(ilan_url=ilan_url(1))
+
+        self.assertEqual(partitioning.ensure_partitions(4), [(self.eski_ay, 1), (partitioning.ay_ekle(self.bu_ay, 4), 0)])
+        self.assertEqual(partitioning.ensure_partitions(4), [])
+        self.assertEqual(self.bolumdeki_ilanlar(partitioning.bolum_adi(self.eski_ay)), [eski.id])
+        self.assertEqual(self.bolumdeki_ilanlar(partitioning.VARSAYILAN_BOLUM), [])
+        # Taşınan ilanın adresi ve gözlemleri yerinde, url tekilliği yeni bölümde de geçerli
+        self.assertTrue(IlanAdresi.objects.filter(id=eski.id, ilan_url=eski.ilan_url).exists())
+        connection.check_constraints()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ilan_kaydi(self.bolge, 1, 21000, gun_once(0)).save()
+
+    def test_suresi_dolan_ay_arsivlenir(self):
+        save_cards([kart(1, 20000, self.eski_ay), kart(2, 22000, self.eski_ay, metrekare=60),
+                    kart(3, 20000, gun_once(0), metrekare=80)])
+        # Güncel ilan, arşivlenecek ilanın kopyası olarak işaretli
+        asil = KiraIlani.objects.get(ilan_url=ilan_url(1))
+        KiraIlani.objects.filter(ilan_url=ilan_url(3)).update(asil_ilan=asil)
+        partitioning.ensure_partitions(0)
+
+        self.assertEqual(partitioning.expired_months(12), [self.eski_ay])
+        self.assertEqual(partitioning.expired_months(0), [])
+        with tempfile.TemporaryDirectory() as dizin:
+            kayit, kopyalar = partitioning.archive_month(self.eski_ay, dizin)
+            with gzip.open(kayit.ilan_dosyasi, 'rt', encoding='utf-8') as f:
+                satirlar = list(csv.DictReader(f))
+
+        self.assertEqual((kayit.ay, kayit.ilan_sayisi, kayit.fiyat_gozlemi_sayisi), (self.eski_ay, 2, 2))
+        self.assertEqual({satir['ilan_url'] for satir in satirlar}, {ilan_url(1), ilan_url(2)})
+        self.assertEqual(kopyalar, {(self.bolge.id, gun_once(0))})
+        self.assertNotIn(self.eski_ay, [b[1] for b in partitioning.list_partitions()])
+        self.assertEqual(partitioning.expired_months(12), [])
+        self.assertEqual(list(KiraIlani.objects.values_list('ilan_url', 'asil_ilan')), [(ilan_url(3), None)])
+        self.assertEqual(list(IlanAdresi.objects.values_list('ilan_url', flat=True)), [ilan_url(3)])
+        connection.check_constraints()
+        # Arşivlenen ilan yeniden görülürse yeni ilan olarak eklenir
+        self.assertEqual(save_cards([kart(1, 20000, gun_once(0))])['eklenen'], 1)
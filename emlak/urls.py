@@ -0,0 +1,15 @@
+# emlak/urls.py
+from django.urls import path
+
+from . import views
+
+app_name = 'emlak'
+
+urlpatterns = [
+    path('ozet/', views.bolge_ozeti, name='bolge-ozeti'),
+    path('aylik/', views.aylik_seri, name='aylik-seri'),
+    path('uyarilar/', views.uyarilar, name='uyarilar'),
+    path('istatistik/', views.istatistikler, name='istatistikler'),
+    path('disa-aktar/', views.ilan_disa_aktar, name='ilan-disa-aktar'),
+    path('zenginlestirme/', views.zenginlestirme_durumu, name='zenginlestirme'),
+]
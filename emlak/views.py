@@ -1,3 +1,237 @@
-from django.shortcuts import render
+# emlak/views.py
 
-# Create your views here.
+"""
+Kira istatistikleri için salt okunur JSON API.
+
+    GET /api/ozet/?sehir=İstanbul&ilce=Kadıköy[&mahalle=Moda]          bölge ortalaması, m² fiyatı, uyarı
+    GET /api/aylik/?sehir=İstanbul&ilce=Kadıköy[&mahalle=Moda][&gun=90] son N günün aylık serisi
+    GET /api/uyarilar/?sehir=İstanbul[&seviye=mahalle|ilce]              kira artışı uyarısı olan bölgeler
+    GET /api/istatistik/?sehir=İstanbul[&ilce&mahalle&seviye&gun&oda=1&aykiri=20]
+                                                                          medyan, IQR, m² dağılımı, aykırı ilanlar
+
+Yanıtlar bölge özetlerinden (BolgeOzeti; istatistikler için emlak.analytics) üretilir ve
+emlak.api_cache ile önbelleğe alınır.
+Her yanıtın bir ETag'i vardır; If-None-Match ile gelen koşullu istekler 304 ile yanıtlanır.
+
+    GET /api/disa-aktar/?bicim=csv|ndjson|parquet[&sehir&ilce&mahalle&baslangic&bitis&kaynak]
+
+Tüm ilan tablosunu akış halinde dışa aktaran asenkron uç nokta (yalnızca yönetici kullanıcılar).
+
+    GET /api/zenginlestirme/    detay sayfası kuyruğunun derinliği, son saatin hızı ve son çalışmanın ilerlemesi
+
+Canlı durumdur; önbelleğe alınmaz (bkz. emlak/enrichment.py).
+"""
+
+import json
+from decimal import Decimal
+
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+
+from emlak.analytics import rent_statistics
+from emlak import enrichment
+from emlak.api_cache import cached_response, region_version
+from emlak.export import BICIM_CSV, ICERIK_TIPLERI, aexport_chunks, available_formats, export_queryset
+from emlak.maliyet import SEVIYELER, SEVIYE_ILCE, SEVIYE_MAHALLE, SON_DONEM_GUN, UYARI_NORMAL, region_reports
+
+EN_UZUN_DONEM_GUN = 730
+EN_FAZLA_AYKIRI = 100
+IKI_BASAMAK = Decimal('0.01')
+
+
+def _para(deger):
+    return float(deger.quantize(IKI_BASAMAK)) if deger is not None else None
+
+
+def _json(veri, durum=200):
+    return durum, json.dumps(veri, ensure_ascii=False).encode('utf-8')
+
+
+def _hata(mesaj, durum=400):
+    durum, govde = _json({'hata': mesaj}, durum)
+    return HttpResponse(govde, status=durum, content_type='application/json; charset=utf-8')
+
+
+def _yanit(request, uc_nokta, parametreler, surum, uret):
+    """Önbellekli yanıtı döndürür; istemcinin ETag'i eşleşirse gövdesiz 304 döner."""
+    durum, etag, govde = cached_response(uc_nokta, parametreler, surum, uret)
+    istemci_etaglari = parse_etags(request.headers.get('If-None-Match', ''))
+    if durum == 200 and (etag in istemci_etaglari or '*' in istemci_etaglari):
+        yanit = HttpResponseNotModified()
+    else:
+        yanit = HttpResponse(govde, status=durum, content_type='application/json; charset=utf-8')
+    yanit['ETag'] = etag
+    # Tarayıcı ve ara önbellekler her seferinde ETag ile doğrulasın
+    yanit['Cache-Control'] = 'no-cache'
+    return yanit
+
+
+def _rapor_json(rapor, aylik=False):
+    veri = {
+        'sehir': rapor['sehir'],
+        'ilce': rapor['ilce'],
+        'mahalle': rapor['mahalle'],
+        'ilan_sayisi': rapor['ilan_sayisi'],
+        'ortalama_kira': _para(rapor['ortalama_kira']),
+        'ortalama_m2_fiyati': _para(rapor['ortalama_m2_fiyati']),
+        'son_donem_kira': _para(rapor['son_donem_kira']),
+        'referans_kira': _para(rapor['referans_kira']),
+        'uyari': rapor['uyari'],
+    }
+    if aylik:
+        veri['aylik'] = [
+            {
+                'ay': ay['ay'],
+                'ilan_sayisi': ay['ilan_sayisi'],
+                'ortalama_kira': _para(ay['ortalama_kira']),
+                'ortalama_m2_fiyati': _para(ay['ortalama_m2_fiyati']),
+            }
+            for ay in rapor['aylik']
+        ]
+    return veri
+
+
+def _bolge_raporu(request, uc_nokta, aylik):
+    sehir = request.GET.get('sehir')
+    ilce = request.GET.get('ilce')
+    mahalle = request.GET.get('mahalle') or None
+    if not sehir or not ilce:
+        return _hata("'sehir' ve 'ilce' parametreleri gerekli.")
+    gun = SON_DONEM_GUN
+    if aylik:
+        try:
+            gun = int(request.GET.get('gun', SON_DONEM_GUN))
+        except ValueError:
+            return _hata("'gun' bir tam sayı olmalı.")
+        if not 1 <= gun <= EN_UZUN_DONEM_GUN:
+            return _hata(f"'gun' 1 ile {EN_UZUN_DONEM_GUN} arasında olmalı.")
+
+    def uret():
+        raporlar = region_reports(sehir=sehir, ilce=ilce, mahalle=mahalle, gun=gun,
+                                  seviye=SEVIYE_MAHALLE if mahalle else SEVIYE_ILCE)
+        if not raporlar:
+            return _json({'hata': 'Bu bölge için kira ilanı bulunamadı.'}, 404)
+        return _json(_rapor_json(raporlar[0], aylik=aylik))
+
+    parametreler = {'sehir': sehir, 'ilce': ilce, 'mahalle': mahalle or '', 'gun': gun}
+    return _yanit(request, uc_nokta, parametreler, region_version(sehir, ilce), uret)
+
+
+@require_GET
+def bolge_ozeti(request):
+    return _bolge_raporu(request, 'ozet', aylik=False)
+
+
+@require_GET
+def aylik_seri(request):
+    return _bolge_raporu(request, 'aylik', aylik=True)
+
+
+@require_GET
+def uyarilar(request):
+    sehir = request.GET.get('sehir')
+    seviye = request.GET.get('seviye', SEVIYE_MAHALLE)
+    if not sehir:
+        return _hata("'sehir' parametresi gerekli.")
+    if seviye not in SEVIYELER:
+        return _hata(f"'seviye' şunlardan biri olmalı: {', '.join(SEVIYELER)}.")
+
+    def uret():
+        raporlar = region_reports(sehir=sehir, seviye=seviye)
+        return _json({
+            'sehir': sehir,
+            'seviye': seviye,
+            'bolgeler': [_rapor_json(rapor) for rapor in raporlar if rapor['uyari'] != UYARI_NORMAL],
+        })
+
+    return _yanit(request, 'uyarilar', {'sehir': sehir, 'seviye': seviye}, region_version(sehir), uret)
+
+
+def _tam_sayi(request, ad, en_az, en_cok):
+    """Opsiyonel tam sayı parametresini (deger, hata_yaniti) olarak döndürür."""
+    deger = request.GET.get(ad)
+    if not deger:
+        return None, None
+    try:
+        deger = int(deger)
+    except ValueError:
+        return None, _hata(f"'{ad}' bir tam sayı olmalı.")
+    if not en_az <= deger <= en_cok:
+        return None, _hata(f"'{ad}' {en_az} ile {en_cok} arasında olmalı.")
+    return deger, None
+
+
+@require_GET
+def istatistikler(request):
+    sehir = request.GET.get('sehir')
+    ilce = request.GET.get('ilce') or None
+    mahalle = request.GET.get('mahalle') or None
+    seviye = request.GET.get('seviye', SEVIYE_MAHALLE)
+    oda_bazinda = request.GET.get('oda') in ('1', 'true')
+    if not sehir:
+        return _hata("'sehir' parametresi gerekli.")
+    if seviye not in SEVIYELER:
+        return _hata(f"'seviye' şunlardan biri olmalı: {', '.join(SEVIYELER)}.")
+    gun, hata = _tam_sayi(request, 'gun', 1, EN_UZUN_DONEM_GUN)
+    if hata:
+        return hata
+    aykiri, hata = _tam_sayi(request, 'aykiri', 0, EN_FAZLA_AYKIRI)
+    if hata:
+        return hata
+
+    def uret():
+        try:
+            bolgeler, aykiri_ilanlar = rent_statistics(sehir=sehir, ilce=ilce, mahalle=mahalle, seviye=seviye,
+                                                       gun=gun, oda_bazinda=oda_bazinda, aykiri_limiti=aykiri or 0)
+        except ValueError as e: # numpy kurulu değil
+            return _json({'hata': str(e)}, 503)
+        veri = {'sehir': sehir, 'seviye': seviye, 'bolgeler': bolgeler}
+        if aykiri:
+            veri['aykiri_ilanlar'] = aykiri_ilanlar
+        return _json(veri)
+
+    parametreler = {'sehir': sehir, 'ilce': ilce or '', 'mahalle': mahalle or '', 'seviye': seviye,
+                    'gun': gun or '', 'oda': oda_bazinda, 'aykiri': aykiri or 0}
+    return _yanit(request, 'istatistik', parametreler, region_version(sehir, ilce), uret)
+
+
+@require_GET
+async def ilan_disa_aktar(request):
+    kullanici = await request.auser()
+    if not kullanici.is_staff:
+        return _hata("Dışa aktarma yalnızca yönetici kullanıcılar içindir.", 403)
+
+    bicim = request.GET.get('bicim', BICIM_CSV)
+    if bicim not in available_formats():
+        return _hata(f"'bicim' şunlardan biri olmalı: {', '.join(available_formats())}.")
+    tarihler = {}
+    for ad in ('baslangic', 'bitis'):
+        deger = request.GET.get(ad)
+        if deger:
+            try:
+                tarihler[ad] = parse_date(deger) if len(deger) == 10 else None
+            except ValueError: # Biçimi doğru ama geçersiz tarih (örn. 2026-13-01)
+                tarihler[ad] = None
+            if tarihler[ad] is None:
+                return _hata(f"'{ad}' YYYY-AA-GG biçiminde olmalı.")
+
+    ilanlar = export_queryset(
+        sehir=request.GET.get('sehir'),
+        ilce=request.GET.get('ilce'),
+        mahalle=request.GET.get('mahalle'),
+        kaynak=request.GET.get('kaynak'),
+        **tarihler,
+    )
+    yanit = StreamingHttpResponse(aexport_chunks(ilanlar, bicim), content_type=ICERIK_TIPLERI[bicim])
+    yanit['Content-Disposition'] = f'attachment; filename="kira_ilanlari.{bicim}"'
+    return yanit
+
+
+@require_GET
+def zenginlestirme_durumu(request):
+    durum, govde = _json(enrichment.status())
+    yanit = HttpResponse(govde, status=durum, content_type='application/json; charset=utf-8')
+    yanit['Cache-Control'] = 'no-store'
+    return yanit
@@ -84,6 +84,36 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# API yanıtları için dosya tabanlı önbellek: scraper ayrı bir süreçte çalıştığı için bölge bazlı
+# geçersiz kılmanın web sunucusuna ulaşması gerekiyor (yerel bellek önbelleği süreçler arası paylaşılmaz)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'onbellek',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    }
+}
+
+# Sayfa arşivi (bkz. emlak/archive.py): kira_tara komutu çektiği her sayfayı buraya yazar;
+# sayfa_arsivi --temizle bu kadar günden eski sayfaları siler
+
+SAYFA_ARSIVI_DIZINI = BASE_DIR / 'sayfa_arsivi'
+SAYFA_ARSIVI_SAKLAMA_GUN = 90
+
+# İlan tablosunun aylık bölümleri (bkz. emlak/partitioning.py, ilan_bolumleri komutu): bu kadar ay sonrasının
+# bölümleri önceden oluşturulur; ilan tarihi ILAN_SAKLAMA_AY aydan eski olan aylar ILAN_ARSIVI_DIZINI'ne
+# arşivlenip tablodan çıkarılır (0: arşivleme yok)
+
+ILAN_BOLUMU_ONDEN_AY = 3
+ILAN_SAKLAMA_AY = 24
+ILAN_ARSIVI_DIZINI = BASE_DIR / 'ilan_arsivi'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 